@@ -81,6 +81,7 @@ class InitializationParams(BaseModel):
     var_filters: Optional[dict] = None
     algorithm_parameters: Optional[Dict[str, Any]] = None
     datasets: List[str]
+    data_model: Optional[str] = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -159,6 +160,21 @@ class Algorithm(ABC):
     def datasets(self) -> List[str]:
         return self._initialization_params.datasets
 
+    @property
+    def var_filters(self) -> Optional[dict]:
+        return self._initialization_params.var_filters
+
+    @property
+    def data_model(self) -> Optional[str]:
+        """
+        Returns
+        -------
+        Optional[str]
+            The data model of the data, None if the data were transformed before
+            being passed to the algorithm
+        """
+        return self._initialization_params.data_model
+
     @abstractmethod
     def run(self, data: "LocalWorkersTable", metadata: dict):
         """
@@ -9,7 +9,6 @@ from exareme2.algorithms.exareme2.algorithm import Algorithm
 from exareme2.algorithms.exareme2.algorithm import AlgorithmDataLoader
 from exareme2.algorithms.exareme2.linear_regression import LinearRegression
 from exareme2.algorithms.exareme2.preprocessing import FormulaTransformer
-from exareme2.algorithms.exareme2.preprocessing import relation_to_vector
 from exareme2.algorithms.specifications import AlgorithmName
 from exareme2.worker_communication import BadUserInput
 
@@ -103,11 +102,7 @@ class AnovaTwoWay(Algorithm, algname=ALGORITHM_NAME):
             X = Xs[formula]
             model = models[formula]
             model.fit(X, Y)
-            model.compute_summary(
-                y_test=relation_to_vector(Y, self.engine),
-                y_pred=model.predict(X),
-                p=len(X.columns) - 1,
-            )
+            model.predict_and_compute_summary(X=X, y=Y, p=len(X.columns) - 1)
 
         # ANOVA computation
         terms = [x1, x2, f"{x1}:{x2}", "Residuals"]
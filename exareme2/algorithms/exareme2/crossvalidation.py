@@ -1,24 +1,26 @@
-import json
 import typing as t
 
+from exareme2 import DType
 from exareme2.algorithms.exareme2.udfgen import DEFERRED
 from exareme2.algorithms.exareme2.udfgen import literal
 from exareme2.algorithms.exareme2.udfgen import relation
-from exareme2.algorithms.exareme2.udfgen import state
 from exareme2.algorithms.exareme2.udfgen import transfer
 from exareme2.algorithms.exareme2.udfgen import udf
+from exareme2.algorithms.exareme2.udfgen import udfio
 from exareme2.worker_communication import BadUserInput
 
 
 class KFold:
     """Slits dataset into train and test sets for performing k-flod cross-validation
 
-    NOTE: This is currently implemented in a very inefficient maner, making one
-    `run_udf_on_local_workers` per split, per table. The reason is limitations in
-    the current UDF generator. In the future this class might be re-implemented
-    more efficiently. However, the interface won't change.
+    Each local worker assigns its rows to folds with a single UDF, which stores X,
+    y and the fold of each row in one table. The train and test sets of all the
+    splits are then views on this table, filtered by fold, which are created with
+    a single task per worker.
     """
 
+    _fold_column = "cv_fold"
+
     def __init__(self, engine, n_splits):
         """
         Parameters
@@ -28,17 +30,18 @@ class KFold:
         """
         self._local_run = engine.run_udf_on_local_workers
         self._global_run = engine.run_udf_on_global_worker
+        self._create_views = engine.create_views_on_local_workers
         self.n_splits = n_splits
 
     def split(self, X, y):
-        local_state, local_condition_transfers = self._local_run(
-            func=self._split_local,
-            keyword_args={"x": X, "y": y, "n_splits": self.n_splits},
-            share_to_global=[False, True],
+        local_condition_transfers = self._local_run(
+            func=self._check_n_obs_local,
+            keyword_args={"y": y, "n_splits": self.n_splits},
+            share_to_global=[True],
         )
 
         [transfer_data] = local_condition_transfers.get_table_data()
-        conditions = [json.loads(t) for t in transfer_data]
+        conditions = [udfio.loads_transfer(t) for t in transfer_data]
         if not all(cond["n_obs >= n_splits"] for cond in conditions):
             raise BadUserInput(
                 "Cross validation cannot run because some of the workers "
@@ -46,118 +49,103 @@ class KFold:
                 f"smaller than the number of splits, {self.n_splits}."
             )
 
-        x_train = [
-            self._local_run(
-                func=self._get_split_local,
-                keyword_args=dict(
-                    local_state=local_state,
-                    i=i,
-                    key="x_train",
-                ),
-                share_to_global=[False],
-                output_schema=X.full_schema.to_list(),
-            )
-            for i in range(self.n_splits)
-        ]
-
-        x_test = [
-            self._local_run(
-                func=self._get_split_local,
-                keyword_args=dict(
-                    local_state=local_state,
-                    i=i,
-                    key="x_test",
-                ),
-                share_to_global=[False],
-                output_schema=X.full_schema.to_list(),
+        if len({*X.columns, *y.columns, self._fold_column}) != (
+            len(X.columns) + len(y.columns) + 1
+        ):
+            raise ValueError(
+                f"X, y and the fold column, {self._fold_column}, cannot have "
+                f"common columns. X columns: {X.columns}, y columns: {y.columns}."
             )
-            for i in range(self.n_splits)
+        y_columns_schema = [
+            (name, dtype)
+            for name, dtype in y.full_schema.to_list()
+            if name in y.columns
         ]
+        folds = self._local_run(
+            func=self._assign_folds_local,
+            keyword_args={
+                "x": X,
+                "y": y,
+                "n_splits": self.n_splits,
+                "fold_column": self._fold_column,
+            },
+            share_to_global=[False],
+            output_schema=X.full_schema.to_list()
+            + y_columns_schema
+            + [(self._fold_column, DType.INT)],
+        )
 
-        y_train = [
-            self._local_run(
-                func=self._get_split_local,
-                keyword_args=dict(
-                    local_state=local_state,
-                    i=i,
-                    key="y_train",
-                ),
-                share_to_global=[False],
-                output_schema=y.full_schema.to_list(),
-            )
+        train_filters = [
+            self._get_fold_filter(operator="not_equal", fold=i)
             for i in range(self.n_splits)
         ]
-
-        y_test = [
-            self._local_run(
-                func=self._get_split_local,
-                keyword_args=dict(
-                    local_state=local_state,
-                    i=i,
-                    key="y_test",
-                ),
-                share_to_global=[False],
-                output_schema=y.full_schema.to_list(),
-            )
+        test_filters = [
+            self._get_fold_filter(operator="equal", fold=i)
             for i in range(self.n_splits)
         ]
+        x_columns = X.full_schema.column_names
+        y_columns = y.full_schema.column_names
+        splits = self._create_views(
+            table=folds,
+            columns_per_view=[x_columns] * 2 * self.n_splits
+            + [y_columns] * 2 * self.n_splits,
+            filters_per_view=train_filters
+            + test_filters
+            + train_filters
+            + test_filters,
+        )
 
+        n_splits = self.n_splits
+        x_train = splits[:n_splits]
+        x_test = splits[n_splits : 2 * n_splits]
+        y_train = splits[2 * n_splits : 3 * n_splits]
+        y_test = splits[3 * n_splits :]
         return x_train, x_test, y_train, y_test
 
+    def _get_fold_filter(self, operator, fold):
+        return {
+            "id": self._fold_column,
+            "type": "int",
+            "operator": operator,
+            "value": fold,
+        }
+
     @staticmethod
     @udf(
-        x=relation(),
         y=relation(),
         n_splits=literal(),
-        return_type=[state(), transfer()],
+        return_type=transfer(),
     )
-    def _split_local(x, y, n_splits):
-        import itertools
-
-        import sklearn.model_selection
-
+    def _check_n_obs_local(y, n_splits):
         # Error handling within a UDF is not possible. Instead, I evaluate the
-        # necessary condition len(y) >= n_splits, and proceed with the
-        # computation accordingly. Moreover, the condition value is sent to the
+        # necessary condition len(y) >= n_splits, and send its value to the
         # algorithm flow, where it is handled, using an auxiliary transfer
         # object.
         n_obs = len(y)
-        if n_obs >= n_splits:
-            kf = sklearn.model_selection.KFold(n_splits=n_splits)
-
-            x_cv_indices, y_cv_indices = itertools.tee(kf.split(x), 2)
-
-            x_train, x_test = [], []
-            for train_idx, test_idx in x_cv_indices:
-                x_train.append(x.iloc[train_idx])
-                x_test.append(x.iloc[test_idx])
-
-            y_train, y_test = [], []
-            for train_idx, test_idx in y_cv_indices:
-                y_train.append(y.iloc[train_idx])
-                y_test.append(y.iloc[test_idx])
-
-            state_ = dict(
-                x_train=x_train,
-                x_test=x_test,
-                y_train=y_train,
-                y_test=y_test,
-            )
-        else:
-            state_ = {}
         transfer_ = {"n_obs >= n_splits": n_obs >= n_splits}
-        return state_, transfer_
+        return transfer_
 
     @staticmethod
     @udf(
-        local_state=state(),
-        i=literal(),
-        key=literal(),
+        x=relation(),
+        y=relation(),
+        n_splits=literal(),
+        fold_column=literal(),
         return_type=relation(schema=DEFERRED),
     )
-    def _get_split_local(local_state, i, key):
-        split = local_state[key][i]
-        result = split
+    def _assign_folds_local(x, y, n_splits, fold_column):
+        import numpy
+        import sklearn.model_selection
+
+        folds = x.join(y)
+
+        fold = numpy.empty(len(folds), dtype=int)
+        kf = sklearn.model_selection.KFold(n_splits=n_splits)
+        for i, (_, test_idx) in enumerate(kf.split(folds)):
+            fold[test_idx] = i
+        folds[fold_column] = fold
+
+        result = folds
         return result
 
 
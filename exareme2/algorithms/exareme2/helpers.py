@@ -1,8 +1,7 @@
-import json
-
 from exareme2.algorithms.exareme2.udfgen import secure_transfer
 from exareme2.algorithms.exareme2.udfgen import transfer
 from exareme2.algorithms.exareme2.udfgen import udf
+from exareme2.algorithms.exareme2.udfgen import udfio
 
 
 def get_transfer_data(udf_result) -> dict:
@@ -15,7 +14,7 @@ def get_transfer_data(udf_result) -> dict:
         Result of run_udf_on_global_worker when the corresponding UDF returns a transfer
     """
     [[val]] = udf_result.get_table_data()  # get_table_data returns List[List[str]]
-    return json.loads(val)
+    return udfio.loads_transfer(val)
 
 
 @udf(loctransf=secure_transfer(sum_op=True), return_type=transfer())
@@ -11,17 +11,19 @@ from exareme2.algorithms.exareme2.helpers import get_transfer_data
 # from exareme2.udfgen import scalar
 # from exareme2.udfgen import TensorBinaryOp
 # from exareme2.udfgen import TensorUnaryOp
+from exareme2.algorithms.exareme2.udfgen import cached_matrix
 from exareme2.algorithms.exareme2.udfgen import literal
+from exareme2.algorithms.exareme2.udfgen import matrix
 from exareme2.algorithms.exareme2.udfgen import merge_transfer
 from exareme2.algorithms.exareme2.udfgen import relation
 from exareme2.algorithms.exareme2.udfgen import secure_transfer
 from exareme2.algorithms.exareme2.udfgen import state
-from exareme2.algorithms.exareme2.udfgen import tensor
 from exareme2.algorithms.exareme2.udfgen import transfer
 from exareme2.algorithms.exareme2.udfgen import udf
 
 T = TypeVar("T")
 S = TypeVar("S")
+N = TypeVar("N")
 
 ALGORITHM_NAME = "kmeans"
 
@@ -112,18 +114,18 @@ class KMeansAlgorithm(Algorithm, algname=ALGORITHM_NAME):
         return ret_obj
 
 
-@udf(rel=relation(S), return_type=tensor(float, 2))
+@udf(rel=relation(S), return_type=matrix(float, N))
 def relation_to_matrix(rel):
     return rel
 
 
-@udf(a=tensor(T, 2), return_type=tensor(T, 2))
+@udf(a=matrix(T, N), return_type=matrix(T, N))
 def remove_nulls(a):
     a_sel = a[~numpy.isnan(a).any(axis=1)]
     return a_sel
 
 
-@udf(X=tensor(T, 2), n_clusters=literal(), return_type=[transfer()])
+@udf(X=matrix(T, N), n_clusters=literal(), return_type=[transfer()])
 def init_centers_local(X, n_clusters):
     from sklearn.utils import check_random_state
 
@@ -133,12 +135,13 @@ def init_centers_local(X, n_clusters):
     seeds = random_state.permutation(n_samples)[:n_clusters]
     centers = X[seeds]
     # np.random.rand(n_samples,n_clusters)
-    transfer_ = {"centers": centers.tolist()}
+    transfer_ = {"centers": centers}
     return transfer_
 
 
 @udf(
-    X=tensor(T, 2), return_type=[secure_transfer(sum_op=True, min_op=True, max_op=True)]
+    X=cached_matrix(T, N),
+    return_type=[secure_transfer(sum_op=True, min_op=True, max_op=True)],
 )
 def init_centers_local2(X):
     import numpy
@@ -175,7 +178,7 @@ def init_centers_global2(min_max_transfer, n_clusters):
         low=min_array, high=max_array, size=(n_clusters, min_array.shape[0])
     )
 
-    transfer_ = {"centers": centers_global.tolist()}
+    transfer_ = {"centers": centers_global}
     # state_ = {"centers": centers_global.tolist()}
     return transfer_, transfer_
 
@@ -192,12 +195,12 @@ def init_centers_global(centers_transfer, n_clusters):
     centers_merged = numpy.vstack(centers_all)
     centers_global = centers_merged[:n_clusters]
 
-    transfer_ = {"centers": centers_global.tolist()}
+    transfer_ = {"centers": centers_global}
     state_ = {"centers": centers_global.tolist()}
     return state_, transfer_
 
 
-@udf(X=tensor(dtype=T, ndims=2), global_transfer=transfer(), return_type=state())
+@udf(X=matrix(dtype=T, ncols=N), global_transfer=transfer(), return_type=state())
 def compute_cluster_labels(X, global_transfer):
     from sklearn.metrics.pairwise import euclidean_distances
 
@@ -212,7 +215,7 @@ def compute_cluster_labels(X, global_transfer):
 
 
 @udf(
-    X=tensor(dtype=T, ndims=2),
+    X=matrix(dtype=T, ncols=N),
     label_state=state(),
     n_clusters=literal(),
     return_type=secure_transfer(sum_op=True, min_op=True, max_op=True),
@@ -247,7 +250,7 @@ def compute_metrics(X, label_state, n_clusters):
 
 
 @udf(
-    X=tensor(dtype=T, ndims=2),
+    X=cached_matrix(dtype=T, ncols=N),
     global_transfer=transfer(),
     n_clusters=literal(),
     return_type=secure_transfer(sum_op=True, min_op=True, max_op=True),
@@ -318,6 +321,5 @@ def compute_centers_from_metrics(transfers, n_clusters):
         centers.append(final_i)
     centers_array = numpy.vstack(centers)
     # raise ValueError(centers_array.shape)
-    ret_val = centers_array.tolist()
-    ret_val2 = {"centers": ret_val}
+    ret_val2 = {"centers": centers_array}
     return ret_val2, ret_val2
@@ -1,4 +1,6 @@
+import json
 from typing import List
+from typing import Optional
 
 import numpy
 import scipy.stats as stats
@@ -8,7 +10,11 @@ from exareme2.algorithms.exareme2.algorithm import Algorithm
 from exareme2.algorithms.exareme2.algorithm import AlgorithmDataLoader
 from exareme2.algorithms.exareme2.helpers import get_transfer_data
 from exareme2.algorithms.exareme2.preprocessing import DummyEncoder
-from exareme2.algorithms.exareme2.preprocessing import relation_to_vector
+from exareme2.algorithms.exareme2.preprocessing import relation_to_vector_local_udf
+from exareme2.algorithms.exareme2.udf_pipeline import UDFPipelineOutput
+from exareme2.algorithms.exareme2.udf_pipeline import UDFPipelineStep
+from exareme2.algorithms.exareme2.udfgen import DATASETS_CONTENT_HASH
+from exareme2.algorithms.exareme2.udfgen import chunked_relation
 from exareme2.algorithms.exareme2.udfgen import literal
 from exareme2.algorithms.exareme2.udfgen import relation
 from exareme2.algorithms.exareme2.udfgen import secure_transfer
@@ -16,6 +22,7 @@ from exareme2.algorithms.exareme2.udfgen import state
 from exareme2.algorithms.exareme2.udfgen import tensor
 from exareme2.algorithms.exareme2.udfgen import transfer
 from exareme2.algorithms.exareme2.udfgen import udf
+from exareme2.algorithms.exareme2.udfgen import udfio
 from exareme2.algorithms.specifications import AlgorithmName
 
 ALPHA = 0.05  # NOTE maybe this should be a model parameter
@@ -59,14 +66,13 @@ class LinearRegressionAlgorithm(Algorithm, algname=ALGORITHM_NAME):
 
         p = len(dummy_encoder.new_varnames) - 1
 
-        lr = LinearRegression(self.engine)
-        lr.fit(X=X, y=y)
-        y_pred: RealVector = lr.predict(X)
-        lr.compute_summary(
-            y_test=relation_to_vector(y, self.engine),
-            y_pred=y_pred,
-            p=p,
+        lr = LinearRegression(
+            self.engine,
+            gram_cache_key=get_gram_cache_key(self),
+            x_labels=dummy_encoder.new_varnames,
         )
+        lr.fit(X=X, y=y)
+        lr.predict_and_compute_summary(X=X, y=y, p=p)
 
         result = LinearRegressionResult(
             dependent_var=self.variables.y[0],
@@ -89,15 +95,51 @@ class LinearRegressionAlgorithm(Algorithm, algname=ALGORITHM_NAME):
         return result
 
 
+def get_gram_cache_key(algorithm: Algorithm) -> Optional[str]:
+    """
+    Returns the key under which the workers cache the Gram matrices computed on
+    the data of the algorithm, None if the data were transformed before being
+    passed to the algorithm and must not be cached. The workers add the hash of
+    the content of their datasets to the key, so that the matrices computed
+    before a dataset was added, removed, enabled or disabled are not used.
+    """
+    if algorithm.data_model is None:
+        return None
+    return json.dumps(
+        [algorithm.data_model, sorted(algorithm.datasets), algorithm.var_filters],
+        sort_keys=True,
+    )
+
+
 class LinearRegression:
-    def __init__(self, engine):
+    def __init__(self, engine, gram_cache_key=None, x_labels=None):
+        """
+        Parameters
+        ----------
+        engine : AlgorithmExecutionEngine
+        gram_cache_key : Optional[str]
+            If given, the local X^T X and X^T y are sliced from Gram matrices
+            cached by the workers under this key, see get_gram_cache_key
+        x_labels : Optional[List[str]]
+            Labels identifying the columns of X within the data of the
+            gram_cache_key, defaults to the column names of X
+        """
         self.local_run = engine.run_udf_on_local_workers
+        self.local_run_pipeline = engine.run_udf_pipeline_on_local_workers
         self.global_run = engine.run_udf_on_global_worker
+        self.gram_cache_key = gram_cache_key
+        self.x_labels = x_labels
 
     def fit(self, X, y):
         local_transfers = self.local_run(
             func=self._fit_local,
-            keyword_args={"x": X, "y": y},
+            keyword_args={
+                "x": X,
+                "y": y,
+                "x_labels": self.x_labels or list(X.columns),
+                "y_labels": list(y.columns),
+                "gram_cache_key": self.gram_cache_key,
+            },
             share_to_global=[True],
         )
         self.global_state, global_transfer = self.global_run(
@@ -109,20 +151,32 @@ class LinearRegression:
         self.coefficients = global_transfer_data["coefficients"]
 
     @staticmethod
-    @udf(x=relation(), y=relation(), return_type=[secure_transfer(sum_op=True)])
-    def _fit_local(x, y):
-        xTx = x.T @ x
-        xTy = x.T @ y
-        n_obs_train = len(y)
+    @udf(
+        x=chunked_relation(),
+        y=chunked_relation(),
+        x_labels=literal(),
+        y_labels=literal(),
+        gram_cache_key=literal(),
+        datasets_content_hash=DATASETS_CONTENT_HASH,
+        return_type=[secure_transfer(sum_op=True)],
+    )
+    def _fit_local(x, y, x_labels, y_labels, gram_cache_key, datasets_content_hash):
+        if gram_cache_key is not None:
+            gram_cache_key = f"{gram_cache_key}/{datasets_content_hash}"
+        gram, n_obs_train = udfio.gram_matrix(
+            [x, y], [x_labels, y_labels], gram_cache_key
+        )
+        xTx = gram.loc[x_labels, x_labels]
+        xTy = gram.loc[x_labels, y_labels]
 
         stransfer = {}
         stransfer["xTx"] = {
-            "data": xTx.to_numpy().tolist(),
+            "data": xTx.to_numpy(),
             "operation": "sum",
             "type": "float",
         }
         stransfer["xTy"] = {
-            "data": xTy.to_numpy().tolist(),
+            "data": xTy.to_numpy(),
             "operation": "sum",
             "type": "float",
         }
@@ -170,11 +224,50 @@ class LinearRegression:
         y_pred = x @ coefficients
         return y_pred
 
+    def predict_and_compute_summary(self, X, y, p):
+        """Same as `compute_summary` where `y_pred` is `predict(X)`, but all local
+        steps run in a single UDF pipeline"""
+        predict_step = UDFPipelineStep(
+            func=self._predict_local,
+            keyword_args=dict(x=X, coefficients=self.coefficients),
+        )
+        self._compute_summary(
+            local_steps=[predict_step],
+            y_test=y,
+            y_pred=UDFPipelineOutput(step=0),
+            p=p,
+        )
+
     def compute_summary(self, y_test, y_pred, p):
-        local_transfers = self.local_run(
-            func=self._compute_summary_local,
-            keyword_args=dict(y_test=y_test, y_pred=y_pred),
-            share_to_global=[True],
+        """
+        Parameters
+        ----------
+        y_test : relation
+            The true values of the target
+        y_pred : RealVector
+            The predicted values of the target
+        p : int
+            The number of the predictors, without the intercept
+        """
+        self._compute_summary(local_steps=[], y_test=y_test, y_pred=y_pred, p=p)
+
+    def _compute_summary(self, local_steps, y_test, y_pred, p):
+        *_, local_transfers = self.local_run_pipeline(
+            steps=[
+                *local_steps,
+                UDFPipelineStep(
+                    func=relation_to_vector_local_udf,
+                    keyword_args={"rel": y_test},
+                ),
+                UDFPipelineStep(
+                    func=self._compute_summary_local,
+                    keyword_args=dict(
+                        y_test=UDFPipelineOutput(step=len(local_steps)),
+                        y_pred=y_pred,
+                    ),
+                    share_to_global=[True],
+                ),
+            ]
         )
         global_transfer = self.global_run(
             func=self._compute_summary_global,
@@ -9,8 +9,8 @@ from exareme2.algorithms.exareme2.algorithm import AlgorithmDataLoader
 from exareme2.algorithms.exareme2.crossvalidation import KFold
 from exareme2.algorithms.exareme2.crossvalidation import cross_validate
 from exareme2.algorithms.exareme2.linear_regression import LinearRegression
+from exareme2.algorithms.exareme2.linear_regression import get_gram_cache_key
 from exareme2.algorithms.exareme2.preprocessing import DummyEncoder
-from exareme2.algorithms.exareme2.preprocessing import relation_to_vector
 from exareme2.algorithms.specifications import AlgorithmName
 
 ALGORITHM_NAME = AlgorithmName.LINEAR_REGRESSION_CV
@@ -48,15 +48,18 @@ class LinearRegressionCVAlgorithm(Algorithm, algname=ALGORITHM_NAME):
 
         # Perform cross-validation
         kf = KFold(self.engine, n_splits=n_splits)
-        models = [LinearRegression(self.engine) for _ in range(n_splits)]
+        models = [
+            LinearRegression(
+                self.engine,
+                gram_cache_key=get_gram_cache_key(self),
+                x_labels=dummy_encoder.new_varnames,
+            )
+            for _ in range(n_splits)
+        ]
         y_pred, y_true = cross_validate(X, y, models, kf, pred_type="values")
 
         for model, y_p, y_t in zip(models, y_pred, y_true):
-            model.compute_summary(
-                y_test=relation_to_vector(y_t, self.engine),
-                y_pred=y_p,
-                p=p,
-            )
+            model.compute_summary(y_test=y_t, y_pred=y_p, p=p)
 
         rms_errors = numpy.array([m.rmse for m in models])
         r2s = numpy.array([m.r_squared for m in models])
@@ -10,6 +10,7 @@ from exareme2.algorithms.exareme2.algorithm import AlgorithmDataLoader
 from exareme2.algorithms.exareme2.helpers import get_transfer_data
 from exareme2.algorithms.exareme2.preprocessing import DummyEncoder
 from exareme2.algorithms.exareme2.preprocessing import LabelBinarizer
+from exareme2.algorithms.exareme2.udfgen import cached_relation
 from exareme2.algorithms.exareme2.udfgen import literal
 from exareme2.algorithms.exareme2.udfgen import relation
 from exareme2.algorithms.exareme2.udfgen import secure_transfer
@@ -131,8 +132,8 @@ class LogisticRegression:
 
     @staticmethod
     @udf(
-        X=relation(),
-        y=relation(),
+        X=cached_relation(),
+        y=cached_relation(),
         coeff=literal(),
         return_type=secure_transfer(sum_op=True),
     )
@@ -63,7 +63,7 @@ def _confusion_matrix_binary_local(ytrue, proba):
     return result
 
 
-def roc_curve(engine, ytrue, proba):
+def roc_curve(engine, ytrue, proba, num_thresholds=200):
     """
     Compute Receiver operating characteristic (ROC) for binary classification
 
@@ -75,6 +75,9 @@ def roc_curve(engine, ytrue, proba):
         Ground truth (correct) target values.
     proba : relation
         Estimated target probabilities returned by the classifier.
+    num_thresholds : int
+        Number of equally spaced thresholds, from 1 to 0, where the rates are
+        computed.
 
     Returns
     -------
@@ -82,7 +85,7 @@ def roc_curve(engine, ytrue, proba):
         A pair of lists of floats, the first being the true positive rate TPR,
         and the second the false positive rate FPR.
     """
-    thresholds = numpy.linspace(1.0, 0.0, num=200).tolist()
+    thresholds = numpy.linspace(1.0, 0.0, num=num_thresholds).tolist()
     loctransf = engine.run_udf_on_local_workers(
         func=_roc_curve_local,
         keyword_args={"ytrue": ytrue, "proba": proba, "thresholds": thresholds},
@@ -106,16 +109,22 @@ def _roc_curve_local(ytrue, proba, thresholds):
     ytrue, proba = ytrue.align(proba, axis=0, copy=False)
     ytrue, proba = ytrue["ybin"].to_numpy(), proba["proba"].to_numpy()
 
-    tp = numpy.empty(len(thresholds), dtype=int)
-    tn = numpy.empty(len(thresholds), dtype=int)
-    fp = numpy.empty(len(thresholds), dtype=int)
-    fn = numpy.empty(len(thresholds), dtype=int)
-
-    for i, thres in enumerate(thresholds):
-        tp[i] = ((proba > thres) & (ytrue == 1)).sum()
-        tn[i] = ((proba <= thres) & (ytrue == 0)).sum()
-        fp[i] = ((proba > thres) & (ytrue == 0)).sum()
-        fn[i] = ((proba <= thres) & (ytrue == 1)).sum()
+    # Probabilities are sorted once and the number of positives and negatives with
+    # probability less than or equal to each threshold is found with a binary search
+    # on their cumulative sums.
+    valid = ~numpy.isnan(proba)
+    ytrue, proba = ytrue[valid], proba[valid]
+    order = numpy.argsort(proba, kind="stable")
+    sorted_proba = proba[order]
+    sorted_ytrue = ytrue[order]
+    cum_positives = numpy.concatenate(([0], numpy.cumsum(sorted_ytrue == 1)))
+    cum_negatives = numpy.concatenate(([0], numpy.cumsum(sorted_ytrue == 0)))
+
+    n_below = numpy.searchsorted(sorted_proba, thresholds, side="right")
+    fn = cum_positives[n_below]
+    tn = cum_negatives[n_below]
+    tp = cum_positives[-1] - fn
+    fp = cum_negatives[-1] - tn
 
     result = dict(
         tp={"data": tp.tolist(), "type": "int", "operation": "sum"},
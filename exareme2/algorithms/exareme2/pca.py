@@ -7,11 +7,13 @@ from pydantic import BaseModel
 from exareme2.algorithms.exareme2.algorithm import Algorithm
 from exareme2.algorithms.exareme2.algorithm import AlgorithmDataLoader
 from exareme2.algorithms.exareme2.helpers import get_transfer_data
+from exareme2.algorithms.exareme2.udfgen import chunked_relation
 from exareme2.algorithms.exareme2.udfgen import relation
 from exareme2.algorithms.exareme2.udfgen import secure_transfer
 from exareme2.algorithms.exareme2.udfgen import state
 from exareme2.algorithms.exareme2.udfgen import transfer
 from exareme2.algorithms.exareme2.udfgen import udf
+from exareme2.algorithms.exareme2.udfgen import udfio
 
 ALGORITHM_NAME = "pca"
 
@@ -62,8 +64,8 @@ class PCAAlgorithm(Algorithm, algname=ALGORITHM_NAME):
         result = PCAResult(
             title="Eigenvalues and Eigenvectors",
             n_obs=n_obs,
-            eigenvalues=eigenvalues,
-            eigenvectors=eigenvectors,
+            eigenvalues=eigenvalues.tolist(),
+            eigenvectors=eigenvectors.tolist(),
         )
         return result
 
@@ -71,16 +73,23 @@ class PCAAlgorithm(Algorithm, algname=ALGORITHM_NAME):
 S = TypeVar("S")
 
 
-@udf(x=relation(schema=S), return_type=[secure_transfer(sum_op=True)])
+@udf(x=chunked_relation(schema=S), return_type=[secure_transfer(sum_op=True)])
 def local1(x):
-    n_obs = len(x)
-    sx = numpy.einsum("ij->j", x)
-    sxx = numpy.einsum("ij,ij->j", x, x)
+    def sum_chunk(x_chunk):
+        n_obs = len(x_chunk)
+        sx = numpy.einsum("ij->j", x_chunk)
+        sxx = numpy.einsum("ij,ij->j", x_chunk, x_chunk)
+        return n_obs, sx, sxx
+
+    def combine(partial1, partial2):
+        return tuple(p1 + p2 for p1, p2 in zip(partial1, partial2))
+
+    n_obs, sx, sxx = udfio.map_combine(sum_chunk, combine, x)
 
     transfer_ = {}
     transfer_["n_obs"] = {"data": n_obs, "operation": "sum", "type": "int"}
-    transfer_["sx"] = {"data": sx.tolist(), "operation": "sum", "type": "float"}
-    transfer_["sxx"] = {"data": sxx.tolist(), "operation": "sum", "type": "float"}
+    transfer_["sx"] = {"data": sx, "operation": "sum", "type": "float"}
+    transfer_["sxx"] = {"data": sxx, "operation": "sum", "type": "float"}
     return transfer_
 
 
@@ -94,7 +103,7 @@ def global1(local_transfers):
     sigmas = ((sxx - n_obs * means**2) / (n_obs - 1)) ** 0.5
 
     state_ = dict(n_obs=n_obs)
-    transfer_ = dict(means=means.tolist(), sigmas=sigmas.tolist())
+    transfer_ = dict(means=means, sigmas=sigmas)
     return state_, transfer_
 
 
@@ -116,7 +125,7 @@ def local2(x, global_transfer):
 
     transfer_ = {
         "gramian": {
-            "data": gramian.tolist(),
+            "data": gramian,
             "operation": "sum",
             "type": "float",
         }
@@ -142,7 +151,7 @@ def global2(local_transfers, prev_state):
 
     transfer_ = dict(
         n_obs=n_obs,
-        eigenvalues=eigenvalues.tolist(),
-        eigenvectors=eigenvectors.tolist(),
+        eigenvalues=eigenvalues,
+        eigenvectors=eigenvectors,
     )
     return transfer_
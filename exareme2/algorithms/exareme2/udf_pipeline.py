@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from exareme2 import DType
+
+
+@dataclass(frozen=True)
+class UDFPipelineStep:
+    """
+    A UDF call of a pipeline of local UDFs, see
+    AlgorithmExecutionEngine.run_udf_pipeline_on_local_workers. The parameters
+    are the ones of AlgorithmExecutionEngine.run_udf_on_local_workers.
+    """
+
+    func: Callable
+    positional_args: Optional[List[Any]] = None
+    keyword_args: Optional[Dict[str, Any]] = None
+    share_to_global: Union[bool, Sequence[bool]] = False
+    output_schema: Optional[List[Tuple[str, DType]]] = None
+
+
+@dataclass(frozen=True)
+class UDFPipelineOutput:
+    """
+    An output of a previous step of a pipeline of local UDFs, used as an argument
+    of a following step.
+    """
+
+    step: int
+    output: int = 0
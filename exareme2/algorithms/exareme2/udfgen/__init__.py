@@ -2,9 +2,14 @@ from exareme2.algorithms.exareme2.udfgen.adhoc_udfgenerator import AdhocUdfGener
 from exareme2.algorithms.exareme2.udfgen.decorator import udf
 from exareme2.algorithms.exareme2.udfgen.factory import get_udfgenerator
 from exareme2.algorithms.exareme2.udfgen.helpers import make_unique_func_name
+from exareme2.algorithms.exareme2.udfgen.iotypes import DATASETS_CONTENT_HASH
 from exareme2.algorithms.exareme2.udfgen.iotypes import DEFERRED
 from exareme2.algorithms.exareme2.udfgen.iotypes import MIN_ROW_COUNT
+from exareme2.algorithms.exareme2.udfgen.iotypes import cached_matrix
+from exareme2.algorithms.exareme2.udfgen.iotypes import cached_relation
+from exareme2.algorithms.exareme2.udfgen.iotypes import chunked_relation
 from exareme2.algorithms.exareme2.udfgen.iotypes import literal
+from exareme2.algorithms.exareme2.udfgen.iotypes import matrix
 from exareme2.algorithms.exareme2.udfgen.iotypes import merge_tensor
 from exareme2.algorithms.exareme2.udfgen.iotypes import merge_transfer
 from exareme2.algorithms.exareme2.udfgen.iotypes import relation
@@ -16,8 +21,12 @@ from exareme2.algorithms.exareme2.udfgen.py_udfgenerator import FlowUdfArg
 from exareme2.algorithms.exareme2.udfgen.smpc import secure_transfer
 
 __all__ = [
+    "cached_matrix",
+    "cached_relation",
+    "chunked_relation",
     "literal",
     "make_unique_func_name",
+    "matrix",
     "merge_tensor",
     "merge_transfer",
     "relation",
@@ -32,4 +41,5 @@ __all__ = [
     "get_udfgenerator",
     "DEFERRED",
     "MIN_ROW_COUNT",
+    "DATASETS_CONTENT_HASH",
 ]
@@ -26,10 +26,10 @@ from exareme2.algorithms.exareme2.udfgen.iotypes import InputType
 from exareme2.algorithms.exareme2.udfgen.iotypes import LiteralArg
 from exareme2.algorithms.exareme2.udfgen.iotypes import LiteralType
 from exareme2.algorithms.exareme2.udfgen.iotypes import LoopbackOutputType
+from exareme2.algorithms.exareme2.udfgen.iotypes import LoopbackTableType
 from exareme2.algorithms.exareme2.udfgen.iotypes import OutputType
 from exareme2.algorithms.exareme2.udfgen.iotypes import ParametrizedType
 from exareme2.algorithms.exareme2.udfgen.iotypes import PlaceholderArg
-from exareme2.algorithms.exareme2.udfgen.iotypes import StateType
 from exareme2.algorithms.exareme2.udfgen.iotypes import TableArg
 from exareme2.algorithms.exareme2.udfgen.iotypes import TableType
 from exareme2.algorithms.exareme2.udfgen.iotypes import TransferTypeBase
@@ -54,6 +54,14 @@ SEPLN = SEP + LN
 ANDLN = " " + AND + LN
 SPC4 = " " * 4
 
+# Name of the UDF parameter with the names of the tables that the UDF reads or
+# writes with loopback queries, when they are passed as an argument.
+LOOPBACK_TABLE_NAMES = "loopback_table_names"
+
+# Name of the UDF parameter with the id of the request, passed to the UDFs with a
+# logger so that their definition, hence their name, does not depend on it.
+REQUEST_ID = "request_id"
+
 
 class Signature(NamedTuple):
     parameters: Dict[str, InputType]
@@ -134,13 +142,19 @@ class UDFSignature(ASTNode):
         udfname: str,
         table_args: Dict[str, TableArg],
         return_type: OutputType,
+        bind_loopback_tables: bool = False,
+        bind_request_id: bool = False,
     ):
         self.udfname = udfname
+        # Loopback tables are read by the UDF itself, they are not parameters
         self.parameter_types = [
             UDFParameter(arg, name)
             for name, arg in table_args.items()
             if isinstance(arg.type, ParametrizedType)
+            and not isinstance(arg.type, LoopbackTableType)
         ]
+        self.bind_loopback_tables = bind_loopback_tables
+        self.bind_request_id = bind_request_id
         self.return_type = UDFReturnType(return_type)
 
     def compile(self) -> str:
@@ -156,7 +170,12 @@ class UDFSignature(ASTNode):
         return f"{self.udfname}({self._format_parameters()})"
 
     def _format_parameters(self):
-        return SEP.join(param.compile() for param in self.parameter_types)
+        parameters = [param.compile() for param in self.parameter_types]
+        if self.bind_loopback_tables:
+            parameters.append(f'"{LOOPBACK_TABLE_NAMES}" CLOB')
+        if self.bind_request_id:
+            parameters.append(f'"{REQUEST_ID}" CLOB')
+        return SEP.join(parameters)
 
 
 class UDFHeader(ASTNode):
@@ -165,8 +184,12 @@ class UDFHeader(ASTNode):
         udfname: str,
         table_args: Dict[str, TableArg],
         return_type: OutputType,
+        bind_loopback_tables: bool = False,
+        bind_request_id: bool = False,
     ):
-        self.signature = UDFSignature(udfname, table_args, return_type)
+        self.signature = UDFSignature(
+            udfname, table_args, return_type, bind_loopback_tables, bind_request_id
+        )
 
     def compile(self) -> str:
         return LN.join(
@@ -180,11 +203,8 @@ class UDFHeader(ASTNode):
 
 class Imports(ASTNode):
     # TODO imports should be dynamic
-    def __init__(self, import_pickle, import_json):
+    def __init__(self, import_json):
         self._import_lines = ["import pandas as pd", "import udfio"]
-        if import_pickle:
-            pickle_import = "import pickle"
-            self._import_lines.append(pickle_import)
         if import_json:
             json_import = "import json"
             self._import_lines.append(json_import)
@@ -193,6 +213,16 @@ class Imports(ASTNode):
         return LN.join(self._import_lines)
 
 
+class LoopbackTablesBinding(ASTNode):
+    def __init__(self, bind_loopback_tables: bool):
+        self.bind_loopback_tables = bind_loopback_tables
+
+    def compile(self) -> str:
+        if not self.bind_loopback_tables:
+            return ""
+        return f"_conn = udfio.bind_loopback_tables(_conn, {LOOPBACK_TABLE_NAMES})"
+
+
 class TableBuild(ASTNode):
     def __init__(self, arg_name, arg, template):
         self.arg_name = arg_name
@@ -248,6 +278,14 @@ class UDFLoopbackReturnStatements(ASTNode):
         )
 
 
+def get_loopback_table_placeholder(position: int) -> str:
+    """
+    Returns the placeholder of the loopback table passed at the position of the
+    loopback_table_names argument of a UDF.
+    """
+    return f"__loopback_table_{position}__"
+
+
 def get_name_loopback_table_pairs(
     output_types: List[LoopbackOutputType],
 ) -> List[Tuple[str, LoopbackOutputType]]:
@@ -280,8 +318,7 @@ class LoggerAssignment(ASTNode):
             return ""
         name, logger_arg = self.logger
         udf_name = logger_arg.udf_name
-        request_id = logger_arg.request_id
-        return f"{name} = udfio.get_logger('{udf_name}', '{request_id}')"
+        return f"{name} = udfio.get_logger('{udf_name}', {REQUEST_ID})"
 
 
 class PlaceholderAssignments(ASTNode):
@@ -319,6 +356,7 @@ class UDFBody(ASTNode):
         sec_return_names: List[str],
         sec_return_types: List[OutputType],
         sec_output_table_names: List[str],
+        bind_loopback_tables: bool = False,
     ):
         all_types = (
             [arg.type for arg in table_args.values()]
@@ -326,18 +364,13 @@ class UDFBody(ASTNode):
             + sec_return_types
         )
 
-        import_pickle = is_any_element_of_type(StateType, all_types)
         import_json = is_any_element_of_type(TransferTypeBase, all_types)
 
         self.statements = []
 
         # imports
-        self.statements.append(
-            Imports(
-                import_pickle=import_pickle,
-                import_json=import_json,
-            )
-        )
+        self.statements.append(Imports(import_json=import_json))
+        self.statements.append(LoopbackTablesBinding(bind_loopback_tables))
 
         # initial assignments
         self.statements.append(TableBuilds(table_args))
@@ -540,10 +573,17 @@ class ScalarFunction(ASTNode):
 
 
 class TableFunction(ASTNode):
-    def __init__(self, name: str, subquery: "Select" = None, alias=""):
+    def __init__(
+        self,
+        name: str,
+        subquery: "Select" = None,
+        alias="",
+        arguments: Tuple[str, ...] = (),
+    ):
         self.name = name
         self.subquery = subquery
         self.alias = alias
+        self.arguments = arguments
 
     def compile(self, use_alias=False) -> str:
         postfix = f" AS {self.alias}" if self.alias and use_alias else ""
@@ -555,7 +595,8 @@ class TableFunction(ASTNode):
                     "))" + postfix,
                 ]
             )
-        return self.name + "()" + postfix
+        arguments = SEP.join(f"'{argument}'" for argument in self.arguments)
+        return f"{self.name}({arguments})" + postfix
 
 
 class Table(ASTNode):
@@ -8,8 +8,12 @@ from exareme2.algorithms.exareme2.udfgen.helpers import get_func_body_from_ast
 from exareme2.algorithms.exareme2.udfgen.helpers import get_func_parameter_names
 from exareme2.algorithms.exareme2.udfgen.helpers import get_items_of_type
 from exareme2.algorithms.exareme2.udfgen.helpers import parse_func
+from exareme2.algorithms.exareme2.udfgen.iotypes import CachedRelationType
+from exareme2.algorithms.exareme2.udfgen.iotypes import ChunkedRelationType
 from exareme2.algorithms.exareme2.udfgen.iotypes import InputType
 from exareme2.algorithms.exareme2.udfgen.iotypes import LoopbackOutputType
+from exareme2.algorithms.exareme2.udfgen.iotypes import LoopbackTableType
+from exareme2.algorithms.exareme2.udfgen.iotypes import MatrixType
 from exareme2.algorithms.exareme2.udfgen.iotypes import OutputType
 from exareme2.algorithms.exareme2.udfgen.iotypes import RelationType
 from exareme2.algorithms.exareme2.udfgen.iotypes import TensorType
@@ -152,10 +156,40 @@ def validate_udf_return_statement(func):
 
 
 def validate_udf_table_input_types(table_input_types):
+    # Loopback tables are read by the udf itself, they are not joined
+    loopback_tables = get_items_of_type(LoopbackTableType, table_input_types)
+    table_input_types = {
+        name: table_type
+        for name, table_type in table_input_types.items()
+        if name not in loopback_tables
+    }
+    cached_relations = get_items_of_type(CachedRelationType, loopback_tables)
+    chunked_relations = get_items_of_type(ChunkedRelationType, loopback_tables)
     tensors = get_items_of_type(TensorType, table_input_types)
     relations = get_items_of_type(RelationType, table_input_types)
+    matrices = get_items_of_type(MatrixType, table_input_types)
     if tensors and relations:
         raise UDFBadDefinition("Cannot pass both tensors and relations to udf.")
+    if matrices and (tensors or relations):
+        raise UDFBadDefinition(
+            "Cannot pass matrices together with tensors or relations to udf."
+        )
+    # Matrix rows have no index column, so there is nothing to join on
+    if len(matrices) > 1:
+        raise UDFBadDefinition("Cannot pass more than one matrix to udf.")
+    # Cached relations are aligned on their row ids, by sorting them
+    if cached_relations and (tensors or relations):
+        raise UDFBadDefinition(
+            "Cannot pass cached relations together with tensors or relations to udf."
+        )
+    # Chunked relations are aligned on their row ids, by reading them in chunks
+    # of the same row ids
+    if chunked_relations and (
+        len(chunked_relations) != len(loopback_tables) or table_input_types
+    ):
+        raise UDFBadDefinition(
+            "Cannot pass chunked relations together with other tables to udf."
+        )
 
 
 class UDFBadDefinition(Exception):
@@ -12,6 +12,7 @@ def get_udfgenerator(
     request_id,
     output_schema,
     min_row_count,
+    datasets_content_hash=None,
 ):
     if func_name in udfregistry:
         return PyUdfGenerator(
@@ -23,6 +24,7 @@ def get_udfgenerator(
             request_id,
             output_schema,
             min_row_count,
+            datasets_content_hash,
         )
     elif AdhocUdfGenerator.is_registered(func_name):
         udfgen_class = AdhocUdfGenerator.get_subclass(func_name)
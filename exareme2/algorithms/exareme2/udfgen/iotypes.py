@@ -8,6 +8,7 @@ from exareme2.algorithms.exareme2.udfgen.helpers import recursive_repr
 
 LN = "\n"
 ROWID = "row_id"
+MATRIX_ROW = "matrix_row"
 DEFERRED = "deferred"
 
 
@@ -99,6 +100,11 @@ def placeholder(name):
 # value so here it's exported as a placeholder and replaced by Worker.
 MIN_ROW_COUNT = placeholder("min_row_count")
 
+# special type for passing the hash of the content of the worker's datasets in
+# UDF, see worker_info_db.get_datasets_content_hash. Only Worker knows the actual
+# value so here it's exported as a placeholder and replaced by Worker.
+DATASETS_CONTENT_HASH = placeholder("datasets_content_hash")
+
 
 class TableType(ABC):
     @property
@@ -137,6 +143,34 @@ def tensor(dtype, ndims):
     return TensorType(dtype, ndims)
 
 
+class MatrixType(TableType, ParametrizedType, InputType, OutputType):
+    """Dense two dimensional array stored column-wise, one table column per
+    matrix column, along with the position of each row. The row position marks
+    the table as a matrix and keeps the row order, which the database doesn't
+    guarantee."""
+
+    def __init__(self, dtype, ncols):
+        self.dtype = dt.from_py(dtype) if isinstance(dtype, type) else dtype
+        self.ncols = ncols
+
+    @property
+    def schema(self):
+        return [(MATRIX_ROW, dt.INT)] + [
+            (f"col{i}", self.dtype) for i in range(self.ncols)
+        ]
+
+    def get_build_template(self) -> str:
+        columns_tmpl = "{{name: _columns[name_w_prefix] for name, name_w_prefix in zip({colnames}, {colnames_w_prefix})}}"
+        return f"{{varname}} = udfio.from_matrix_table({columns_tmpl}, '{MATRIX_ROW}')"
+
+    def get_main_return_stmt_template(self) -> str:
+        return f"return udfio.as_matrix_table(numpy.array({{return_name}}), '{MATRIX_ROW}')"
+
+
+def matrix(dtype, ncols):
+    return MatrixType(dtype, ncols)
+
+
 class MergeTensorType(TableType, ParametrizedType, InputType, OutputType):
     def __init__(self, dtype, ndims):
         self.dtype = dt.from_py(dtype) if isinstance(dtype, type) else dtype
@@ -211,6 +245,81 @@ def relation(schema=None):
     return RelationType(schema)
 
 
+class LoopbackTableType(TableType, ABC):
+    """Table input read by the UDF itself, with loopback queries, instead of
+    being passed as columns to the UDF."""
+
+
+class CachedTableType(LoopbackTableType, ABC):
+    """Table input whose decoded value is kept in a cache of the UDF interpreter,
+    keyed by the table name, so that UDFs running repeatedly on the same table,
+    i.e. in the iterations of an algorithm, do not read and decode it again.
+    Cached inputs are shared between UDF calls and must not be modified in
+    place."""
+
+    _input_kind: str
+
+    def get_build_template(self) -> str:
+        load_tmpl = f"lambda: {self.get_load_template()}"
+        return (
+            f'{{varname}} = udfio.get_cached_input(_conn, "{{table_name}}", '
+            f'"{self._input_kind}", {load_tmpl})'
+        )
+
+    @abstractmethod
+    def get_load_template(self) -> str:
+        raise NotImplementedError
+
+
+class CachedMatrixType(CachedTableType, MatrixType):
+    _input_kind = "matrix"
+
+    def get_load_template(self) -> str:
+        return (
+            'udfio.from_matrix_table(_conn.execute("SELECT * FROM {table_name};"), '
+            f"'{MATRIX_ROW}')"
+        )
+
+
+def cached_matrix(dtype, ncols):
+    return CachedMatrixType(dtype, ncols)
+
+
+class CachedRelationType(CachedTableType, RelationType):
+    _input_kind = "relation"
+
+    def get_load_template(self) -> str:
+        # Rows are sorted by their id, so that relations with the same rows are
+        # aligned, as when they are passed to the UDF together.
+        return (
+            'udfio.from_relational_table(_conn.execute("SELECT * FROM {table_name};"), '
+            f"'{ROWID}').sort_index()"
+        )
+
+
+def cached_relation(schema=None):
+    schema = schema or TypeVar("S")
+    return CachedRelationType(schema)
+
+
+class ChunkedRelationType(LoopbackTableType, RelationType):
+    """Relation read in chunks of a bounded number of rows, so that the UDF runs
+    in bounded memory. The UDF receives a udfio.RelationChunks and passes
+    it to udfio.map_combine, together with a function computing a partial
+    result on the chunks and an associative function combining two partial
+    results."""
+
+    def get_build_template(self) -> str:
+        return (
+            f"{{varname}} = udfio.RelationChunks(_conn, \"{{table_name}}\", '{ROWID}')"
+        )
+
+
+def chunked_relation(schema=None):
+    schema = schema or TypeVar("S")
+    return ChunkedRelationType(schema)
+
+
 class DictType(TableType, ABC):
     _data_column_name: str
     _data_column_type: dt
@@ -237,18 +346,18 @@ class TransferType(DictType, InputType, LoopbackOutputType):
         return LN.join(
             [
                 f'__transfer_str = _conn.execute("SELECT {colname} from {{table_name}};")["{colname}"][0]',
-                "{varname} = json.loads(__transfer_str)",
+                "{varname} = udfio.loads_transfer(__transfer_str)",
             ]
         )
 
     def get_main_return_stmt_template(self) -> str:
-        return "return json.dumps({return_name})"
+        return "return udfio.dumps_transfer({return_name})"
 
     def get_secondary_return_stmt_template(self, tablename_placeholder) -> str:
         return (
             '_conn.execute(f"INSERT INTO '
             + tablename_placeholder
-            + " VALUES ('{{json.dumps({return_name})}}');\")"
+            + " VALUES ('{{udfio.dumps_transfer({return_name})}}');\")"
         )
 
 
@@ -265,7 +374,7 @@ class MergeTransferType(DictType, InputType):
         return LN.join(
             [
                 f'__transfer_strs = _conn.execute("SELECT {colname} from {{table_name}};")["{colname}"]',
-                "{varname} = [json.loads(str) for str in __transfer_strs]",
+                "{varname} = [udfio.loads_transfer(str) for str in __transfer_strs]",
             ]
         )
 
@@ -283,6 +392,9 @@ TransferTypeBase.register(MergeTransferType)
 
 
 class StateType(DictType, InputType, LoopbackOutputType):
+    """State kept by the worker between UDF calls. Large states are stored out
+    of band, by udfio.dump_state, and only their handle is kept in the table."""
+
     _data_column_name = "state"
     _data_column_type = dt.BINARY
 
@@ -291,18 +403,22 @@ class StateType(DictType, InputType, LoopbackOutputType):
         return LN.join(
             [
                 f'__state_str = _conn.execute("SELECT {colname} from {{table_name}};")["{colname}"][0]',
-                "{varname} = pickle.loads(__state_str)",
+                "{varname} = udfio.load_state(__state_str)",
             ]
         )
 
     def get_main_return_stmt_template(self) -> str:
-        return "return pickle.dumps({return_name})"
+        return (
+            'return udfio.dump_state(_conn, "$main_output_table_name", {return_name})'
+        )
 
     def get_secondary_return_stmt_template(self, tablename_placeholder) -> str:
         return (
             '_conn.execute(f"INSERT INTO '
             + tablename_placeholder
-            + " VALUES ('{{pickle.dumps({return_name}).hex()}}');\")"
+            + " VALUES ('{{udfio.dump_state(_conn, '"
+            + tablename_placeholder
+            + "', {return_name}).hex()}}');\")"
         )
 
 
@@ -330,9 +446,8 @@ class UDFLoggerArg(UDFArgument):
     type = UDFLoggerType()
     udf_name: str
 
-    def __init__(self, udf_name="", request_id=""):
+    def __init__(self, udf_name=""):
         self.udf_name = udf_name
-        self.request_id = request_id
 
 
 class PlaceholderArg(UDFArgument):
@@ -377,6 +492,29 @@ class TensorArg(TableArg):
         return True
 
 
+class MatrixArg(TableArg):
+    def __init__(self, table_name, dtype, ncols):
+        self.type: MatrixType = matrix(dtype, ncols)
+        super().__init__(table_name)
+
+    @property
+    def ncols(self):
+        return self.type.ncols
+
+    @property
+    def dtype(self):
+        return self.type.dtype
+
+    def __eq__(self, other):
+        if self.table_name != other.table_name:
+            return False
+        if self.dtype != other.dtype:
+            return False
+        if self.ncols != other.ncols:
+            return False
+        return True
+
+
 class RelationArg(TableArg):
     def __init__(self, table_name, schema):
         self.type = relation(schema)
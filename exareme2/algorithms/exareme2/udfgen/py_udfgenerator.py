@@ -123,6 +123,30 @@ becomes
 The first two columns are the indices for the two dimensions and the third
 column is the value found at the position specified by the respective indices.
 
+Matrices explained
+~~~~~~~~~~~~~~~~~~
+Two dimensional numerical data, such as a design matrix, can be represented
+more compactly with the matrix type. A matrix is written as a table with one
+column per matrix column and a single index column, matrix_row, holding the
+position of each row. The index column marks the table as a matrix and keeps
+the order of the rows, which the database doesn't guarantee. The matrix is
+loaded with a single numpy.column_stack, sorted only when the rows are read out
+of order.
+
+The matrix above becomes
+    |------------+------+------+------|
+    | matrix_row | col0 | col1 | col2 |
+    |------------+------+------+------|
+    |          0 |    1 |    2 |    3 |
+    |          1 |    4 |    5 |    6 |
+    |          2 |    7 |    8 |    9 |
+    |------------+------+------+------|
+
+The row positions are not row ids, so a matrix cannot be joined with other
+tables and a UDF accepts at most one matrix input. The number of columns of a matrix
+returned by a UDF taking a relation can be left generic, in which case it is
+inferred from the relation's columns.
+
 State and Transfer explained
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 State and Transfer are special input/output types. They are materialized as a
@@ -257,6 +281,7 @@ Exposed object          Description
 ======================= ========================================================
 udf                     Decorator for registering python funcs as UDFs
 tensor                  Tensor type factory
+matrix                  Matrix type factory
 relation                Relation type factory
 merge_tensor            Merge tensor type factory
 literal                 Literal type factory
@@ -278,6 +303,8 @@ from typing import Optional
 from typing import Tuple
 from typing import Union
 
+from exareme2.algorithms.exareme2.udfgen.ast import REQUEST_ID
+from exareme2.algorithms.exareme2.udfgen.ast import ConstColumn
 from exareme2.algorithms.exareme2.udfgen.ast import CreateTable
 from exareme2.algorithms.exareme2.udfgen.ast import FunctionParts
 from exareme2.algorithms.exareme2.udfgen.ast import Insert
@@ -288,13 +315,20 @@ from exareme2.algorithms.exareme2.udfgen.ast import TableFunction
 from exareme2.algorithms.exareme2.udfgen.ast import UDFBody
 from exareme2.algorithms.exareme2.udfgen.ast import UDFDefinition
 from exareme2.algorithms.exareme2.udfgen.ast import UDFHeader
+from exareme2.algorithms.exareme2.udfgen.ast import get_loopback_table_placeholder
 from exareme2.algorithms.exareme2.udfgen.decorator import UDFBadCall
 from exareme2.algorithms.exareme2.udfgen.decorator import UdfRegistry
 from exareme2.algorithms.exareme2.udfgen.helpers import get_items_of_type
 from exareme2.algorithms.exareme2.udfgen.helpers import merge_args_and_kwargs
+from exareme2.algorithms.exareme2.udfgen.iotypes import MATRIX_ROW
+from exareme2.algorithms.exareme2.udfgen.iotypes import CachedMatrixType
+from exareme2.algorithms.exareme2.udfgen.iotypes import CachedRelationType
+from exareme2.algorithms.exareme2.udfgen.iotypes import ChunkedRelationType
 from exareme2.algorithms.exareme2.udfgen.iotypes import InputType
 from exareme2.algorithms.exareme2.udfgen.iotypes import LiteralArg
 from exareme2.algorithms.exareme2.udfgen.iotypes import LoopbackOutputType
+from exareme2.algorithms.exareme2.udfgen.iotypes import LoopbackTableType
+from exareme2.algorithms.exareme2.udfgen.iotypes import MatrixArg
 from exareme2.algorithms.exareme2.udfgen.iotypes import MergeTensorType
 from exareme2.algorithms.exareme2.udfgen.iotypes import MergeTransferType
 from exareme2.algorithms.exareme2.udfgen.iotypes import OutputType
@@ -311,6 +345,9 @@ from exareme2.algorithms.exareme2.udfgen.iotypes import TransferArg
 from exareme2.algorithms.exareme2.udfgen.iotypes import TransferType
 from exareme2.algorithms.exareme2.udfgen.iotypes import UDFArgument
 from exareme2.algorithms.exareme2.udfgen.iotypes import UDFLoggerArg
+from exareme2.algorithms.exareme2.udfgen.iotypes import cached_matrix
+from exareme2.algorithms.exareme2.udfgen.iotypes import cached_relation
+from exareme2.algorithms.exareme2.udfgen.iotypes import chunked_relation
 from exareme2.algorithms.exareme2.udfgen.iotypes import merge_tensor
 from exareme2.algorithms.exareme2.udfgen.iotypes import merge_transfer
 from exareme2.algorithms.exareme2.udfgen.iotypes import relation
@@ -325,6 +362,7 @@ from exareme2.algorithms.exareme2.udfgen.udfgen_DTOs import UDFGenResult
 from exareme2.algorithms.exareme2.udfgen.udfgen_DTOs import UDFGenSMPCResult
 from exareme2.algorithms.exareme2.udfgen.udfgen_DTOs import UDFGenTableResult
 from exareme2.algorithms.exareme2.udfgen.udfgenerator import UdfGenerator
+from exareme2.datatypes import DType
 from exareme2.worker_communication import SMPCTablesInfo
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableType as DBTableType
@@ -356,6 +394,7 @@ class PyUdfGenerator(UdfGenerator):
         request_id: Optional[str] = None,
         output_schema=None,
         min_row_count: int = None,
+        datasets_content_hash: Optional[str] = None,
     ):
         """
         Parameters
@@ -377,12 +416,15 @@ class PyUdfGenerator(UdfGenerator):
             deferred
         min_row_count : int
             Minimum allowed number of rows for an input table
+        datasets_content_hash : Optional[str]
+            Hash of the content of the worker's datasets
         """
         self.func_name = func_name
         self.smpc_used = smpc_used
         self.request_id = request_id
         self.output_schema = output_schema
         self.min_row_count = min_row_count
+        self.datasets_content_hash = datasets_content_hash
 
         self.funcparts = udfregistry[func_name]
         if smpc_used:
@@ -458,7 +500,7 @@ class PyUdfGenerator(UdfGenerator):
             input_args=self.udf_args,
             output_types=self.output_types,
             smpc_used=self.smpc_used,
-            request_id=self.request_id,
+            bind_loopback_tables=self.binds_loopback_tables,
         )
         definition = builder.build_udf_definition(udf_name, sec_table_names)
 
@@ -477,9 +519,84 @@ class PyUdfGenerator(UdfGenerator):
 
         # XXX and another hack
         definition = definition.replace("$min_row_count", str(self.min_row_count))
+        definition = definition.replace(
+            "$datasets_content_hash", repr(self.datasets_content_hash)
+        )
+
+        # The longest names are replaced first, so that names that are prefixes of
+        # other names do not replace a part of them.
+        loopback_table_names = self._get_loopback_table_names(output_table_names)
+        placeholders = sorted(
+            (
+                (table_name, get_loopback_table_placeholder(position))
+                for position, table_name in enumerate(loopback_table_names)
+            ),
+            key=lambda name_placeholder: len(name_placeholder[0]),
+            reverse=True,
+        )
+        for table_name, placeholder in placeholders:
+            definition = definition.replace(table_name, placeholder)
 
         return definition
 
+    @functools.cached_property
+    def binds_loopback_tables(self) -> bool:
+        """
+        True when the names of the tables that the UDF reads or writes with
+        loopback queries are passed to the UDF, as the loopback_table_names
+        argument, instead of being written in its definition. Then the definition
+        does not depend on the tables of a command, i.e. the same UDF can be used
+        on the transfers and states of every iteration of an algorithm.
+
+        The names are only passed to UDFs without table parameters, which are
+        called with scalar arguments. The other UDFs read all their parameters
+        from a subquery, so their loopback tables are written in the definition.
+        """
+        table_args = get_items_of_type(TableArg, mapping=self.udf_args)
+        if any(
+            isinstance(arg.type, ParametrizedType)
+            and not isinstance(arg.type, LoopbackTableType)
+            for arg in table_args.values()
+        ):
+            return False
+        smpc_args = get_items_of_type(SMPCSecureTransferArg, mapping=self.udf_args)
+        main_output_type, *sec_output_types = self.output_types
+        main_return_stmt = main_output_type.get_main_return_stmt_template()
+        return bool(
+            table_args
+            or smpc_args
+            or sec_output_types
+            or "main_output_table_name" in main_return_stmt
+        )
+
+    def _get_loopback_table_names(
+        self, output_table_names: Optional[List[str]]
+    ) -> List[str]:
+        """
+        Returns the names of the tables passed in the loopback_table_names argument,
+        the input tables first, so that their positions do not depend on the output
+        tables.
+        """
+        if not self.binds_loopback_tables:
+            return []
+        table_names = [
+            arg.table_name
+            for arg in get_items_of_type(TableArg, mapping=self.udf_args).values()
+        ]
+        for arg in get_items_of_type(SMPCSecureTransferArg, self.udf_args).values():
+            table_names.extend(
+                table_name
+                for table_name in (
+                    arg.template_table_name,
+                    arg.sum_op_values_table_name,
+                    arg.min_op_values_table_name,
+                    arg.max_op_values_table_name,
+                )
+                if table_name
+            )
+        table_names.extend(output_table_names or [])
+        return list(dict.fromkeys(table_names))
+
     def get_exec_stmt(self, udf_name: str, output_table_names: List[str]) -> str:
         """
         Computes UDF execution query
@@ -501,8 +618,17 @@ class PyUdfGenerator(UdfGenerator):
         table_args = get_items_of_type(TableArg, mapping=self.udf_args)
         main_output_type, *_ = self.output_types
         main_table_name, *_ = output_table_names
+        loopback_table_names = self._get_loopback_table_names(output_table_names)
         builder = UdfExecStmtBuildfer(table_args)
-        return builder.build_exec_stmt(udf_name, main_table_name)
+        # The request id is passed to the UDFs with a logger, see REQUEST_ID
+        request_id = self.request_id if self.funcparts.logger_param_name else None
+        return builder.build_exec_stmt(
+            udf_name,
+            main_table_name,
+            binds_loopback_tables=self.binds_loopback_tables,
+            loopback_table_names=loopback_table_names,
+            request_id=request_id,
+        )
 
     def get_results(self, output_table_names: List[str]) -> List[UDFGenResult]:
         """
@@ -593,6 +719,9 @@ class FlowArgsToUdfArgsConverter:
                 raise UDFBadCall("Usage of state is only allowed on local tables.")
             return StateArg(table_name=table_info.name)
 
+        if self._is_matrix_schema(table_info.schema_.columns):
+            return self._get_matrix_arg_from_table_info(table_info)
+
         if self._is_tensor_schema(table_info.schema_.columns):
             return self._get_tensor_arg_from_table_info(table_info)
 
@@ -610,6 +739,19 @@ class FlowArgsToUdfArgsConverter:
         dtype = valcol.dtype
         return TensorArg(table_name=table_info.name, dtype=dtype, ndims=ndims)
 
+    @staticmethod
+    def _get_matrix_arg_from_table_info(table_info):
+        _, *columns = table_info.schema_.columns
+        dtype = columns[0].dtype
+        return MatrixArg(table_name=table_info.name, dtype=dtype, ncols=len(columns))
+
+    @staticmethod
+    def _is_matrix_schema(schema):
+        if not schema or (schema[0].name, schema[0].dtype) != (MATRIX_ROW, DType.INT):
+            return False
+        colnames = [col.name for col in schema[1:]]
+        return bool(colnames) and colnames == [f"col{i}" for i in range(len(colnames))]
+
     @staticmethod
     def _is_tensor_schema(schema):
         colnames = [col.name for col in schema]
@@ -674,6 +816,7 @@ class UdfArgsBuilder:
         self._prepare_placeholder_args(udf_args)
 
         self._resolve_merge_table_args(udf_args)
+        self._resolve_loopback_table_args(udf_args)
 
         self._validate_arg_names(udf_args)
         self._validate_arg_types(udf_args)
@@ -722,6 +865,24 @@ class UdfArgsBuilder:
             if is_merge_transfer(arg, argname, self.funcparts.table_input_types):
                 udf_args[argname].type = merge_transfer()
 
+    def _resolve_loopback_table_args(self, udf_args: Dict[str, UDFArgument]) -> None:
+        """LoopbackTableTypes have the same schema as the tables that the UDF
+        reads. The UDFArgument always contains the initial table type and must be
+        resolved to a LoopbackTableType, if needed, based on the function parts."""
+        exp_types = self.funcparts.table_input_types
+        for argname, arg in udf_args.items():
+            exp_type = exp_types.get(argname)
+            if isinstance(arg, MatrixArg) and isinstance(exp_type, CachedMatrixType):
+                arg.type = cached_matrix(dtype=arg.type.dtype, ncols=arg.type.ncols)
+            if isinstance(arg, RelationArg) and isinstance(
+                exp_type, CachedRelationType
+            ):
+                arg.type = cached_relation(schema=arg.type.schema)
+            if isinstance(arg, RelationArg) and isinstance(
+                exp_type, ChunkedRelationType
+            ):
+                arg.type = chunked_relation(schema=arg.type.schema)
+
     def _validate_arg_names(
         self,
         udf_args: Dict[str, UDFArgument],
@@ -775,13 +936,13 @@ class UdfDefinitionBuilder:
         input_args: Dict[str, UDFArgument],
         output_types: List[OutputType],
         smpc_used: bool,
-        request_id: str,
+        bind_loopback_tables: bool = False,
     ) -> Template:
         self.funcparts = funcparts
         self.input_args = input_args
         self.output_types = output_types
         self.smpc_used = smpc_used
-        self.request_id = request_id
+        self.bind_loopback_tables = bind_loopback_tables
 
         self.main_output_type, *self.sec_output_types = output_types
         self.main_return_name, *self.sec_return_names = funcparts.return_names
@@ -795,9 +956,9 @@ class UdfDefinitionBuilder:
             sec_output_names = []
         header = self._build_header(udf_name)
         if self.smpc_used:
-            body = self._build_body_smpc(udf_name, sec_output_names, self.request_id)
+            body = self._build_body_smpc(udf_name, sec_output_names)
         else:
-            body = self._build_body(udf_name, sec_output_names, self.request_id)
+            body = self._build_body(udf_name, sec_output_names)
         udf_definition = UDFDefinition(header=header, body=body)
         return udf_definition.compile()
 
@@ -813,13 +974,12 @@ class UdfDefinitionBuilder:
     def _literal_args(self):
         return get_items_of_type(LiteralArg, mapping=self.input_args)
 
-    def _logger_arg(self, udf_name, request_id):
+    def _logger_arg(self, udf_name):
         logger_arg_: Optional[str, UDFLoggerArg] = None
         logger_param = self.funcparts.logger_param_name
         if logger_param:
             arg = self.input_args[logger_param]
             arg.udf_name = udf_name
-            arg.request_id = request_id
             logger_arg_ = (logger_param, self.input_args[logger_param])
         return logger_arg_
 
@@ -832,13 +992,15 @@ class UdfDefinitionBuilder:
             udfname=udf_name,
             table_args=self._table_args,
             return_type=self.main_output_type,
+            bind_loopback_tables=self.bind_loopback_tables,
+            bind_request_id=bool(self.funcparts.logger_param_name),
         )
 
-    def _build_body(self, udf_name, sec_output_table_names, request_id):
+    def _build_body(self, udf_name, sec_output_table_names):
         return UDFBody(
             table_args=self._table_args,
             literal_args=self._literal_args,
-            logger_arg=self._logger_arg(udf_name, request_id),
+            logger_arg=self._logger_arg(udf_name),
             placeholder_args=self._placeholder_args,
             statements=self.funcparts.body_statements,
             main_return_name=self.main_return_name,
@@ -846,14 +1008,15 @@ class UdfDefinitionBuilder:
             sec_return_names=self.sec_return_names,
             sec_return_types=self.sec_output_types,
             sec_output_table_names=sec_output_table_names,
+            bind_loopback_tables=self.bind_loopback_tables,
         )
 
-    def _build_body_smpc(self, udf_name, sec_output_table_names, request_id):
+    def _build_body_smpc(self, udf_name, sec_output_table_names):
         return UDFBodySMPC(
             table_args=self._table_args,
             smpc_args=self._smpc_args,
             literal_args=self._literal_args,
-            logger_arg=self._logger_arg(udf_name, request_id),
+            logger_arg=self._logger_arg(udf_name),
             placeholder_args=self._placeholder_args,
             statements=self.funcparts.body_statements,
             main_return_name=self.main_return_name,
@@ -861,6 +1024,7 @@ class UdfDefinitionBuilder:
             sec_return_names=self.sec_return_names,
             sec_return_types=self.sec_output_types,
             sec_output_table_names=sec_output_table_names,
+            bind_loopback_tables=self.bind_loopback_tables,
         )
 
 
@@ -870,10 +1034,18 @@ class UdfExecStmtBuildfer:
     def __init__(self, table_args: Dict[str, TableArg]):
         self.table_args = table_args
 
-    def build_exec_stmt(self, udf_name: str, main_table_name: str) -> str:
+    def build_exec_stmt(
+        self,
+        udf_name: str,
+        main_table_name: str,
+        binds_loopback_tables: bool = False,
+        loopback_table_names: List[str] = (),
+        request_id: Optional[str] = None,
+    ) -> str:
         tensors = self._make_table_ast(self.table_args, arg_type=TensorArg)
         relations = self._make_table_ast(self.table_args, arg_type=RelationArg)
-        tables = tensors or relations
+        matrices = self._make_table_ast(self.table_args, arg_type=MatrixArg)
+        tables = tensors or relations or matrices
         columns = [column for table in tables for column in table.columns.values()]
         if tensors:
             where_clause = self._make_tensors_where_clause(tensors)
@@ -881,17 +1053,27 @@ class UdfExecStmtBuildfer:
             where_clause = self._make_relations_where_clause(relations)
         else:
             where_clause = None
+        # The request id is passed as the last column of the subquery of the UDFs
+        # with table parameters, or as their last argument otherwise
+        if tables and request_id is not None:
+            columns.append(ConstColumn(f"'{request_id}'", alias=REQUEST_ID))
         subselect = Select(columns, tables, where_clause) if tables else None
-        func = TableFunction(name=udf_name, subquery=subselect)
+        # The loopback tables are only passed to UDFs without table parameters
+        arguments = (",".join(loopback_table_names),) if binds_loopback_tables else ()
+        if not tables and request_id is not None:
+            arguments += (request_id,)
+        func = TableFunction(name=udf_name, subquery=subselect, arguments=arguments)
         select = Select([StarColumn()], [func])
         insert = Insert(table=main_table_name, values=select)
         return insert.compile()
 
     @staticmethod
     def _make_table_ast(table_args, arg_type):
+        # Loopback tables are read by the UDF itself
         return [
             Table(name=table.table_name, columns=table.column_names())
             for table in get_items_of_type(arg_type, table_args).values()
+            if not isinstance(table.type, LoopbackTableType)
         ]
 
     @staticmethod
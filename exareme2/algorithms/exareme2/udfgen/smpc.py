@@ -8,6 +8,7 @@ from exareme2.algorithms.exareme2.udfgen.ast import ASTNode
 from exareme2.algorithms.exareme2.udfgen.ast import Imports
 from exareme2.algorithms.exareme2.udfgen.ast import LiteralAssignments
 from exareme2.algorithms.exareme2.udfgen.ast import LoggerAssignment
+from exareme2.algorithms.exareme2.udfgen.ast import LoopbackTablesBinding
 from exareme2.algorithms.exareme2.udfgen.ast import PlaceholderAssignments
 from exareme2.algorithms.exareme2.udfgen.ast import TableBuilds
 from exareme2.algorithms.exareme2.udfgen.ast import UDFBody
@@ -23,7 +24,6 @@ from exareme2.algorithms.exareme2.udfgen.iotypes import LoopbackOutputType
 from exareme2.algorithms.exareme2.udfgen.iotypes import MergeTransferType
 from exareme2.algorithms.exareme2.udfgen.iotypes import OutputType
 from exareme2.algorithms.exareme2.udfgen.iotypes import PlaceholderArg
-from exareme2.algorithms.exareme2.udfgen.iotypes import StateType
 from exareme2.algorithms.exareme2.udfgen.iotypes import TableArg
 from exareme2.algorithms.exareme2.udfgen.iotypes import TransferType
 from exareme2.algorithms.exareme2.udfgen.iotypes import TransferTypeBase
@@ -65,19 +65,19 @@ class SecureTransferType(DictType, InputType, LoopbackOutputType):
         return LN.join(
             [
                 f'__transfer_strs = _conn.execute("SELECT {colname} from {{table_name}};")["{colname}"]',
-                "__transfers = [json.loads(str) for str in __transfer_strs]",
+                "__transfers = [udfio.loads_transfer(str) for str in __transfer_strs]",
                 "{varname} = udfio.secure_transfers_to_merged_dict(__transfers)",
             ]
         )
 
     def get_main_return_stmt_template(self) -> str:
-        return "return json.dumps({return_name})"
+        return "return udfio.dumps_transfer({return_name})"
 
     def get_secondary_return_stmt_template(self, tablename_placeholder) -> str:
         return (
             '_conn.execute(f"INSERT INTO '
             + tablename_placeholder
-            + " VALUES ('{{json.dumps({return_name})}}');\")"
+            + " VALUES ('{{udfio.dumps_transfer({return_name})}}');\")"
         )
 
 
@@ -90,7 +90,7 @@ class SMPCSecureTransferType(SecureTransferType):
         return LN.join(
             [
                 f'__transfer_strs = _conn.execute("SELECT {colname} FROM {{table_name}};")["{colname}"]',
-                "__transfers = [json.loads(str) for str in __transfer_strs]",
+                "__transfers = [udfio.loads_transfer(str) for str in __transfer_strs]",
                 "{varname} = udfio.secure_transfers_to_merged_dict(__transfers)",
             ]
         )
@@ -276,6 +276,7 @@ class UDFBodySMPC(UDFBody):
         sec_return_names: List[str],
         sec_return_types: List[OutputType],
         sec_output_table_names: List[str],
+        bind_loopback_tables: bool = False,
     ):
         all_types = (
             [arg.type for arg in table_args.values()]
@@ -283,7 +284,6 @@ class UDFBodySMPC(UDFBody):
             + sec_return_types
         )
 
-        import_pickle = is_any_element_of_type(StateType, all_types)
         import_json = is_any_element_of_type(
             (TransferType, SecureTransferType, MergeTransferType), all_types
         )
@@ -291,12 +291,8 @@ class UDFBodySMPC(UDFBody):
         self.statements = []
 
         # imports
-        self.statements.append(
-            Imports(
-                import_pickle=import_pickle,
-                import_json=import_json,
-            )
-        )
+        self.statements.append(Imports(import_json=import_json))
+        self.statements.append(LoopbackTablesBinding(bind_loopback_tables))
 
         # initial assignments
         self.statements.append(TableBuilds(table_args))
@@ -4,9 +4,13 @@ from typing import Union
 
 from exareme2.algorithms.exareme2.udfgen.decorator import UDFBadCall
 from exareme2.algorithms.exareme2.udfgen.helpers import compose_mappings
+from exareme2.algorithms.exareme2.udfgen.helpers import get_items_of_type
 from exareme2.algorithms.exareme2.udfgen.helpers import mapping_inverse
 from exareme2.algorithms.exareme2.udfgen.helpers import merge_mappings_consistently
+from exareme2.algorithms.exareme2.udfgen.iotypes import ROWID
+from exareme2.algorithms.exareme2.udfgen.iotypes import MatrixType
 from exareme2.algorithms.exareme2.udfgen.iotypes import ParametrizedType
+from exareme2.algorithms.exareme2.udfgen.iotypes import RelationType
 from exareme2.algorithms.exareme2.udfgen.iotypes import TableType
 
 KnownTypeParams = Union[type, int]
@@ -27,6 +31,10 @@ def infer_output_type(
         declared_input_types,
         passed_input_types,
     )
+    inferred_input_typeparams = {
+        **infer_matrix_ncols_from_relation(declared_output_type, passed_input_types),
+        **inferred_input_typeparams,
+    }
     known_output_typeparams = dict(**declared_output_type.known_typeparams)
     inferred_output_typeparams = compose_mappings(
         declared_output_type.unknown_typeparams,
@@ -55,6 +63,25 @@ def infer_unknown_input_typeparams(
     return distinct_inferred_typeparams
 
 
+def infer_matrix_ncols_from_relation(
+    declared_output_type: ParametrizedType,
+    passed_input_types: Dict[str, ParametrizedType],
+) -> TypeParamsInference:
+    """When a relation is converted to a matrix, the number of matrix columns
+    cannot be found in the input typeparams. It is the number of relation
+    columns, excluding the row id."""
+    if not isinstance(declared_output_type, MatrixType):
+        return {}
+    if not isinstance(declared_output_type.ncols, TypeVar):
+        return {}
+    relations = get_items_of_type(RelationType, passed_input_types)
+    if len(relations) != 1:
+        return {}
+    (relation,) = relations.values()
+    ncols = sum(1 for name, _ in relation.schema if name != ROWID)
+    return {declared_output_type.ncols: ncols}
+
+
 def map_unknown_to_known_typeparams(
     unknown_params: Dict[str, UnknownTypeParams],
     known_params: Dict[str, KnownTypeParams],
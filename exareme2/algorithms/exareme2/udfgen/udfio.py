@@ -1,22 +1,43 @@
+import base64
+import hashlib
+import json
 import logging
+import mmap
 import os
+import pickle
 import re
-from functools import partial
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
 from functools import reduce
 from typing import Any
+from typing import Callable
 from typing import List
+from typing import Optional
 from typing import Set
 from typing import Tuple
-from typing import Type
 
 import numpy as np
 import pandas as pd
 
 LOG_LEVEL_ENV_VARIABLE = "LOG_LEVEL"
 LOG_LEVEL_DEFAULT_VALUE = "INFO"
+CACHED_INPUTS_MAX_BYTES_ENV_VARIABLE = "UDF_CACHED_INPUTS_MAX_BYTES"
+# Must match 'monetdb.udf_cached_inputs_max_mb' of the worker's configuration
+CACHED_INPUTS_MAX_BYTES_DEFAULT_VALUE = str(128 * 1024**2)
+CHUNK_ROWS_ENV_VARIABLE = "UDF_CHUNK_ROWS"
+CHUNK_ROWS_DEFAULT_VALUE = "100000"
+STATE_STORE_DIR_ENV_VARIABLE = "UDF_STATE_STORE_DIR"
+STATE_STORE_MIN_BYTES_ENV_VARIABLE = "UDF_STATE_STORE_MIN_BYTES"
+STATE_STORE_MIN_BYTES_DEFAULT_VALUE = str(1024**2)
 
 
 def get_logger(udf_name: str, request_id: str):
+    # MonetDB passes the request_id argument as an array, of one item when it is a
+    # scalar argument, or of one item per row when it is a column of a subquery.
+    if isinstance(request_id, np.ndarray):
+        request_id = request_id.item(0) if request_id.size else ""
     logger = logging.getLogger("monetdb_udf")
     for handler in logger.handlers:
         logger.removeHandler(handler)
@@ -54,6 +75,32 @@ def from_tensor_table(table: dict):
     return np.array(array)
 
 
+def as_matrix_table(array: np.ndarray, row: str):
+    if array.ndim == 1:
+        array = array[:, np.newaxis]
+    if array.ndim != 2:
+        raise ValueError(f"Expected a 1 or 2 dimensional array, got {array.ndim}.")
+    table = {row: np.arange(array.shape[0], dtype=np.int32)}
+    for i in range(array.shape[1]):
+        table[f"col{i}"] = np.ascontiguousarray(array[:, i])
+    return table
+
+
+def from_matrix_table(table: dict, row: str):
+    """
+    Returns the matrix of a table with a column per matrix column and a column
+    with the position of each row, in the order of the positions.
+    """
+    rows = np.asarray(table[row])
+    ncols = len(table) - 1
+    if ncols == 0:
+        return np.empty((len(rows), 0))
+    array = np.column_stack([np.asarray(table[f"col{i}"]) for i in range(ncols)])
+    if np.any(rows[1:] < rows[:-1]):
+        array = array[np.argsort(rows, kind="stable")]
+    return array
+
+
 def from_relational_table(table: dict, row_id: str):
     result = pd.DataFrame(table, copy=False)
     if row_id in result.columns:
@@ -67,21 +114,463 @@ def as_relational_table(result, row_id):
     return result
 
 
-def reduce_tensor_pair(op, a: pd.DataFrame, b: pd.DataFrame):
-    ndims = len(a.columns) - 1
-    dimensions = [f"dim{_}" for _ in range(ndims)]
-    merged = a.merge(b, left_on=dimensions, right_on=dimensions)
-    merged["val"] = merged.apply(lambda df: op(df.val_x, df.val_y), axis=1)
-    return merged[dimensions + ["val"]]
+class _CachedInputs:
+    """
+    Least recently used cache of the decoded UDF inputs. The cache lives in the
+    interpreter that runs the UDFs, so it is shared by all the UDF calls. The
+    inputs are keyed by their table name and the kind of input they were decoded
+    to. The inputs of the tables dropped by the worker are evicted with
+    evict_cached_inputs, the least recently used ones when the cache is full.
+    The Gram matrices of gram_matrix are kept in the same cache, keyed by the
+    data and rows they were computed on, so that they outlive the tables of a
+    request.
+
+    The cached inputs are shared by the UDF calls, so their arrays are made read
+    only and each call gets its own shallow copy of a cached data frame, to which
+    it can add or drop columns.
+    """
 
+    def __init__(self):
+        self._inputs = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, table_name: str, input_kind: str, load: Callable[[], Any]):
+        key = (table_name, input_kind)
+        with self._lock:
+            if key in self._inputs:
+                self._inputs.move_to_end(key)
+                return _share(self._inputs[key][0])
+
+        value = load()
+        nbytes = _get_nbytes(value)
+        max_nbytes = int(
+            os.getenv(
+                CACHED_INPUTS_MAX_BYTES_ENV_VARIABLE,
+                CACHED_INPUTS_MAX_BYTES_DEFAULT_VALUE,
+            )
+        )
+        if nbytes > max_nbytes:
+            return value
+
+        _freeze(value)
+        with self._lock:
+            if key not in self._inputs:
+                self._inputs[key] = (value, nbytes)
+                self._nbytes += nbytes
+            while self._nbytes > max_nbytes:
+                _, (_, evicted_nbytes) = self._inputs.popitem(last=False)
+                self._nbytes -= evicted_nbytes
+        return _share(value)
+
+    def discard(self, table_name: str, input_kind: str):
+        with self._lock:
+            if (table_name, input_kind) in self._inputs:
+                _, nbytes = self._inputs.pop((table_name, input_kind))
+                self._nbytes -= nbytes
+
+    def evict(self, table_names: List[str]):
+        table_names = set(table_names)
+        with self._lock:
+            for key in [key for key in self._inputs if key[0] in table_names]:
+                _, nbytes = self._inputs.pop(key)
+                self._nbytes -= nbytes
+
+    def clear(self):
+        with self._lock:
+            self._inputs.clear()
+            self._nbytes = 0
+
+
+def _freeze(value):
+    if isinstance(value, pd.DataFrame):
+        arrays = value._mgr.arrays
+    else:
+        arrays = [value]
+    for array in arrays:
+        if isinstance(array, np.ndarray):
+            array.flags.writeable = False
 
-def reduce_tensor_merge_table(op, merge_table):
-    groups = [group for _, group in merge_table.groupby("worker_id")]
-    groups = [group.drop("worker_id", 1) for group in groups]
-    result = reduce(partial(reduce_tensor_pair, op), groups)
+
+def _share(value):
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    return value
+
+
+def _get_nbytes(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    return int(value.nbytes)
+
+
+_cached_inputs = _CachedInputs()
+
+
+def get_cached_input(conn, table_name: str, input_kind: str, load: Callable[[], Any]):
+    """
+    Returns the input of the table decoded to the input_kind, loading it only if
+    it is not cached.
+    """
+    return _cached_inputs.get(_resolve_table_name(conn, table_name), input_kind, load)
+
+
+def evict_cached_inputs(table_names: List[str]):
+    """
+    Evicts the cached inputs of the tables. It is called by the worker, with a
+    loopback function, when the tables are dropped.
+    """
+    _cached_inputs.evict(table_names)
+
+
+class LoopbackTables:
+    """
+    Connection of a UDF whose loopback tables are passed as an argument. The UDF
+    refers to the tables with placeholders, which are replaced by the names of
+    the tables in the loopback queries.
+    """
+
+    def __init__(self, conn, table_names: List[str]):
+        self._conn = conn
+        # The placeholders of udfgen.ast.get_loopback_table_placeholder
+        self._table_names = {
+            f"__loopback_table_{position}__": table_name
+            for position, table_name in enumerate(table_names)
+        }
+
+    def resolve(self, text: str) -> str:
+        for placeholder, table_name in self._table_names.items():
+            text = text.replace(placeholder, table_name)
+        return text
+
+    def execute(self, query: str, *args, **kwargs):
+        return self._conn.execute(self.resolve(query), *args, **kwargs)
+
+
+def bind_loopback_tables(conn, table_names) -> LoopbackTables:
+    """
+    Binds the placeholders of the loopback tables of a UDF to the comma
+    separated names of its loopback_table_names argument.
+    """
+    # MonetDB passes the scalar arguments of table functions as arrays of one item
+    if isinstance(table_names, np.ndarray):
+        table_names = table_names.item(0)
+    return LoopbackTables(conn, str(table_names).split(","))
+
+
+def _resolve_table_name(conn, table_name: str) -> str:
+    if isinstance(conn, LoopbackTables):
+        return conn.resolve(table_name)
+    return table_name
+
+
+class RelationChunks:
+    """
+    Relation read by the UDF in chunks of chunk_rows rows, with loopback
+    queries, so that only one chunk is held in memory at a time.
+    """
+
+    def __init__(self, conn, table_name: str, row_id: str, chunk_rows: int = None):
+        self._conn = conn
+        self.table_name = table_name
+        self.row_id = row_id
+        self.chunk_rows = chunk_rows or int(
+            os.getenv(CHUNK_ROWS_ENV_VARIABLE, CHUNK_ROWS_DEFAULT_VALUE)
+        )
+
+    def row_ids(self) -> np.ndarray:
+        table = self._conn.execute(f"SELECT {self.row_id} FROM {self.table_name};")
+        return np.asarray(table[self.row_id])
+
+    def columns(self) -> List[str]:
+        """Returns the names of the columns of the relation, except the row id."""
+        table = self._conn.execute(f"SELECT * FROM {self.table_name} LIMIT 0;")
+        return [column for column in table if column != self.row_id]
+
+
+def map_combine(
+    map_func: Callable[..., Any],
+    combine_func: Callable[[Any, Any], Any],
+    *relations: RelationChunks,
+):
+    """
+    Applies map_func on the chunks of the relations having the same row ids and
+    folds the partial results with combine_func, which must be associative.
+    Rows missing from any of the relations are dropped, as in a join of the
+    relations on their row ids. On empty relations map_func is applied once on
+    the empty relations.
+
+    The relations are joined on their row ids by a single query, ordered by row
+    id, whose result is fetched in chunks of chunk_rows joined rows however
+    sparse the row ids are.
+    """
+    chunk_rows = min(relation.chunk_rows for relation in relations)
+    result = None
+    for chunks in _fetch_joined_chunks(relations, chunk_rows):
+        partial = map_func(*chunks)
+        result = partial if result is None else combine_func(result, partial)
     return result
 
 
+def _fetch_joined_chunks(relations: Tuple[RelationChunks, ...], chunk_rows: int):
+    row_id = relations[0].row_id
+    columns = [relation.columns() for relation in relations]
+    # The columns are aliased by position, since relations may share column names
+    aliases = [
+        [f"c{position}_{index}" for index in range(len(relation_columns))]
+        for position, relation_columns in enumerate(columns)
+    ]
+    select = [f"r0.{row_id} AS {row_id}"] + [
+        f'r{position}."{column}" AS {alias}'
+        for position, (relation_columns, relation_aliases) in enumerate(
+            zip(columns, aliases)
+        )
+        for column, alias in zip(relation_columns, relation_aliases)
+    ]
+    joins = [f"{relations[0].table_name} AS r0"] + [
+        f"JOIN {relation.table_name} AS r{position} "
+        f"ON r{position}.{row_id} = r0.{row_id}"
+        for position, relation in enumerate(relations[1:], start=1)
+    ]
+    table = relations[0]._conn.execute(
+        f"SELECT {', '.join(select)} FROM {' '.join(joins)} ORDER BY r0.{row_id};"
+    )
+
+    # The loopback connection of MonetDB returns the result as column arrays,
+    # without a cursor, so the chunks are fetched as fetchmany(chunk_rows) would.
+    n_rows = len(table[row_id])
+    for start in range(0, max(n_rows, 1), chunk_rows):
+        stop = start + chunk_rows
+        index = pd.Index(np.asarray(table[row_id])[start:stop], name=row_id)
+        yield [
+            pd.DataFrame(
+                {
+                    column: np.asarray(table[alias])[start:stop]
+                    for column, alias in zip(relation_columns, relation_aliases)
+                },
+                index=index,
+                columns=relation_columns,
+            )
+            for relation_columns, relation_aliases in zip(columns, aliases)
+        ]
+
+
+def gram_matrix(
+    relations: List[RelationChunks],
+    labels: List[List[str]],
+    cache_key: Optional[str] = None,
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Returns the Gram matrix of the columns of the relations, joined on their row
+    ids, and the number of joined rows. The columns are renamed to their labels,
+    which must identify their values within the data of the cache_key.
+
+    If a cache_key is given, the Gram matrix is cached for the cache_key and the
+    row ids of the joined rows. Later calls on the same rows, i.e. requests on
+    the same data with the same rows left after dropping the missing values,
+    slice the cached matrix if it contains all the labels, reading only the row
+    ids of the relations. Otherwise, the Gram matrix of the labels is computed
+    and merged into the cached one, which then holds the union of the labels.
+    The products of labels that were never requested together are unknown, NaN,
+    since their columns are not read together.
+    """
+    if cache_key is None:
+        return _compute_gram_matrix(relations, labels)
+
+    row_ids = reduce(np.intersect1d, (relation.row_ids() for relation in relations))
+    row_ids_digest = hashlib.sha256(row_ids.astype(np.int64).tobytes()).hexdigest()
+    name = f"{cache_key}/{row_ids_digest}"
+    all_labels = [label for relation_labels in labels for label in relation_labels]
+
+    def load():
+        gram, _ = _compute_gram_matrix(relations, labels)
+        return gram
+
+    cached_gram = _cached_inputs.get(name, "gram", load)
+    gram = cached_gram.reindex(index=all_labels, columns=all_labels)
+    if gram.isna().to_numpy().any():
+        gram = load()
+        union_labels = list(cached_gram.columns)
+        union_labels += [label for label in all_labels if label not in cached_gram]
+        union_gram = cached_gram.reindex(index=union_labels, columns=union_labels)
+        union_gram.loc[all_labels, all_labels] = gram
+        _cached_inputs.discard(name, "gram")
+        _cached_inputs.get(name, "gram", lambda: union_gram)
+    return gram.loc[all_labels, all_labels], len(row_ids)
+
+
+def _compute_gram_matrix(relations: List[RelationChunks], labels: List[List[str]]):
+    def gram_chunk(*chunks):
+        z = pd.concat(
+            [
+                chunk.set_axis(chunk_labels, axis=1)
+                for chunk, chunk_labels in zip(chunks, labels)
+            ],
+            axis=1,
+        ).astype(float)
+        return z.T @ z, len(z)
+
+    def combine(partial1, partial2):
+        return partial1[0] + partial2[0], partial1[1] + partial2[1]
+
+    return map_combine(gram_chunk, combine, *relations)
+
+
+_STATE_HANDLE_PREFIX = b"exareme2-state:"
+_STATE_FILE_SUFFIX = ".state"
+_STATE_HEADER = struct.Struct("<QQ")
+_STATE_BUFFER_LENGTH = struct.Struct("<Q")
+_STATE_BUFFER_ALIGNMENT = 64
+
+
+def _get_state_store_dir() -> str:
+    default = os.path.join(tempfile.gettempdir(), "exareme2_udf_states")
+    return os.getenv(STATE_STORE_DIR_ENV_VARIABLE, default)
+
+
+def _get_state_path(store_dir: str, table_name: str) -> str:
+    return os.path.join(store_dir, table_name + _STATE_FILE_SUFFIX)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _STATE_BUFFER_ALIGNMENT) * _STATE_BUFFER_ALIGNMENT
+
+
+def dump_state(conn, table_name: str, state) -> bytes:
+    """
+    Serializes the state returned in table_name. States smaller than
+    UDF_STATE_STORE_MIN_BYTES are pickled inline. Larger states are written to
+    a file of the worker's state store, with their numpy buffers out of band,
+    and only a handle to the file is returned, to be stored in the table.
+
+    The file is removed by the worker, with remove_states, when the table is
+    dropped.
+    """
+    table_name = _resolve_table_name(conn, table_name)
+    buffers = []
+    data = pickle.dumps(state, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    nbytes = len(data) + sum(raw.nbytes for raw in raws)
+    min_bytes = int(
+        os.getenv(
+            STATE_STORE_MIN_BYTES_ENV_VARIABLE, STATE_STORE_MIN_BYTES_DEFAULT_VALUE
+        )
+    )
+    if nbytes < min_bytes:
+        return pickle.dumps(state)
+
+    store_dir = _get_state_store_dir()
+    os.makedirs(store_dir, exist_ok=True)
+    path = _get_state_path(store_dir, table_name)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_STATE_HEADER.pack(len(data), len(raws)))
+        for raw in raws:
+            f.write(_STATE_BUFFER_LENGTH.pack(raw.nbytes))
+        f.write(data)
+        for raw in raws:
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            f.write(raw)
+    os.replace(tmp_path, path)
+    return _STATE_HANDLE_PREFIX + table_name.encode()
+
+
+def load_state(blob: bytes):
+    """
+    Deserializes a state serialized by dump_state. The numpy arrays of states
+    kept in the state store are memory mapped from their file, copy on write,
+    instead of being read.
+    """
+    blob = bytes(blob)
+    if not blob.startswith(_STATE_HANDLE_PREFIX):
+        return pickle.loads(blob)
+
+    table_name = blob[len(_STATE_HANDLE_PREFIX) :].decode()
+    with open(_get_state_path(_get_state_store_dir(), table_name), "rb") as f:
+        view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+
+    data_length, n_buffers = _STATE_HEADER.unpack_from(view, 0)
+    offset = _STATE_HEADER.size
+    lengths = []
+    for _ in range(n_buffers):
+        (length,) = _STATE_BUFFER_LENGTH.unpack_from(view, offset)
+        lengths.append(length)
+        offset += _STATE_BUFFER_LENGTH.size
+    data = view[offset : offset + data_length]
+    offset += data_length
+    buffers = []
+    for length in lengths:
+        offset = _align(offset)
+        buffers.append(view[offset : offset + length])
+        offset += length
+    return pickle.loads(data, buffers=buffers)
+
+
+def remove_states(store_dir: str, table_names: List[str]):
+    """
+    Removes the files of the states returned in the tables, if any. It is called
+    by the worker when the tables are dropped, with the state store directory of
+    its configuration.
+    """
+    for table_name in table_names:
+        try:
+            os.remove(_get_state_path(store_dir, table_name))
+        except FileNotFoundError:
+            pass
+
+
+_NDARRAY_KEY = "__ndarray__"
+
+
+def dumps_transfer(transfer: dict) -> str:
+    """
+    JSON encodes a transfer. Its numpy arrays are kept as typed binary buffers,
+    encoded as {"__ndarray__": <base64 bytes>, "dtype": ..., "shape": ...}
+    objects, instead of being converted to nested lists.
+    """
+    return json.dumps(transfer, default=_encode_transfer_value)
+
+
+def loads_transfer(transfer_str: str) -> dict:
+    """
+    Decodes a transfer encoded by dumps_transfer, or by plain json.dumps, back
+    to a dict with its numpy arrays restored.
+    """
+    return json.loads(transfer_str, object_hook=_decode_transfer_object)
+
+
+def _encode_transfer_value(value):
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            return value.tolist()
+        data = np.ascontiguousarray(value).data
+        return {
+            _NDARRAY_KEY: base64.b64encode(data).decode("ascii"),
+            "dtype": value.dtype.str,
+            "shape": list(value.shape),
+        }
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not transferable.")
+
+
+def _decode_transfer_object(obj: dict):
+    if _NDARRAY_KEY not in obj:
+        return obj
+    data = bytearray(base64.b64decode(obj[_NDARRAY_KEY]))
+    return np.frombuffer(data, dtype=np.dtype(obj["dtype"])).reshape(obj["shape"])
+
+
+def reduce_tensor_merge_table(op, merge_table):
+    columns = {colname: merge_table[colname].values for colname in merge_table.columns}
+    stacked = merge_tensor_to_array(columns)
+    if isinstance(op, np.ufunc):
+        result = op.reduce(stacked, axis=0)
+    else:
+        result = reduce(op, stacked)
+    return pd.DataFrame(as_tensor_table(np.asarray(result)))
+
+
 def make_tensor_merge_table(columns):
     colnames = columns.keys()
     expected = {"worker_id", "val"}
@@ -93,24 +582,35 @@ def make_tensor_merge_table(columns):
     return pd.DataFrame(columns)
 
 
-def merge_tensor_to_list(columns):
+def merge_tensor_to_array(columns):
+    """Stacks the tensors found in a merge tensor table into a single array of
+    shape (n_workers, *shape), ordered by worker id."""
     colnames = list(columns.keys())
     try:
-        worker_id_column_idx = next(
-            i for i, colname in enumerate(colnames) if re.match(r".*worker_id", colname)
+        worker_id_name = next(
+            colname for colname in colnames if re.match(r".*worker_id", colname)
         )
     except StopIteration:
         raise ValueError("No column is named .*worker_id")
-    worker_id_name = colnames[worker_id_column_idx]
-    merge_df = pd.DataFrame(columns)
-    groups = [group for _, group in merge_df.groupby(worker_id_name)]
-    groups = [group.drop(worker_id_name, axis=1) for group in groups]
-    all_cols = [
-        {colname: np.array(x) for colname, x in df.to_dict(orient="list").items()}
-        for df in groups
-    ]
-    xs = [from_tensor_table(cols) for cols in all_cols]
-    return xs
+    ndims = sum(1 for colname in colnames if colname.startswith("dim"))
+    multi_index = [np.asarray(columns[f"dim{i}"]) for i in range(ndims)]
+    shape = tuple(int(idx.max()) + 1 for idx in multi_index)
+    lin_index = np.ravel_multi_index(multi_index, shape)
+    worker_ids, worker_codes = np.unique(
+        np.asarray(columns[worker_id_name]), return_inverse=True
+    )
+    values = np.asarray(columns["val"])
+    if len(values) != len(worker_ids) * np.prod(shape, dtype=int):
+        raise ValueError(
+            f"Merge tensor table does not hold {len(worker_ids)} tensors of "
+            f"shape {shape}."
+        )
+    order = np.lexsort((lin_index, worker_codes))
+    return values[order].reshape((len(worker_ids),) + shape)
+
+
+def merge_tensor_to_list(columns):
+    return list(merge_tensor_to_array(columns))
 
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~ Secure Transfer methods ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -214,94 +714,76 @@ def _validate_transfer_key_type(transfer_value: dict):
 def _operation_on_secure_transfer_key_data(key, transfers: List[dict], operation: str):
     """
     Given a list of secure_transfer dicts, it makes the appropriate operation on the data of the key provided.
+    The data of all the transfers are stacked in one array and reduced at once.
     """
-    result = transfers[0][key][smpc_transfer_data_key]
-    for transfer in transfers[1:]:
-        result = _calc_values(result, transfer[key][smpc_transfer_data_key], operation)
-    return result
-
-
-def _calc_values(value1: Any, value2: Any, operation: str):
-    """
-    The values could be either integers/floats or lists that contain other lists or integers/floats.
-    """
-    _validate_calc_values(value1, value2)
-
-    if isinstance(value1, list) and isinstance(value2, list):
-        result = []
-        for e1, e2 in zip(value1, value2):
-            result.append(_calc_values(e1, e2, operation))
-        return result
-
-    return _calc_numeric_values(value1, value2, operation)
-
-
-def _validate_calc_values(value1, value2):
-    allowed_types = [int, float, list]
-    for value in [value1, value2]:
-        if type(value) not in allowed_types:
+    flat_data = []
+    shapes = []
+    for transfer in transfers:
+        data = transfer[key][smpc_transfer_data_key]
+        try:
+            flat, shape = _flatten_secure_transfer_data(data)
+        except TypeError:
             raise TypeError(
                 f"Secure transfer data must have one of the following types: "
-                f"{allowed_types}. Type provided: {type(value)}"
+                f"{_secure_transfer_data_types}. Type provided: {type(data)}"
             )
-    if (isinstance(value1, list) or isinstance(value2, list)) and (
-        type(value1) != type(value2)
-    ):
+        flat_data.append(flat)
+        shapes.append(shape)
+    if any(shape != shapes[0] for shape in shapes[1:]):
         raise ValueError("Secure transfers' data should have the same structure.")
 
+    result = _secure_transfer_reductions[operation](np.stack(flat_data), axis=0)
+    return _structure_secure_transfer_data(result, shapes[0])
 
-def _calc_numeric_values(value1: Any, value2: Any, operation: str):
-    if operation == smpc_sum_op:
-        return value1 + value2
-    elif operation == smpc_min_op:
-        return min(value1, value2)
-    elif operation == smpc_max_op:
-        return max(value1, value2)
-    else:
-        raise NotImplementedError
+
+_secure_transfer_reductions = {
+    smpc_sum_op: np.sum,
+    smpc_min_op: np.min,
+    smpc_max_op: np.max,
+}
 
 
 def split_secure_transfer_dict(secure_transfer: dict) -> Tuple[dict, list, list, list]:
     """
     When SMPC is used, a secure transfer dict should be split in different parts:
-    1) The template of the dict with relative positions instead of values,
+    1) The template of the dict with the offset and the shape descriptor of
+    each key's data, instead of the values,
     2) flattened lists for each operation, containing the values.
     """
     secure_transfer_template = {}
     op_flat_data = {smpc_sum_op: [], smpc_min_op: [], smpc_max_op: []}
-    op_indexes = {smpc_sum_op: 0, smpc_min_op: 0, smpc_max_op: 0}
+    op_sizes = {smpc_sum_op: 0, smpc_min_op: 0, smpc_max_op: 0}
     for key, data_transfer in secure_transfer.items():
         _validate_secure_transfer_item(key, data_transfer)
         cur_op = data_transfer[smpc_transfer_op_key]
         try:
-            (
-                data_transfer_tmpl,
-                cur_flat_data,
-                op_indexes[cur_op],
-            ) = _flatten_data_and_keep_relative_positions(
-                op_indexes[cur_op],
-                data_transfer[smpc_transfer_data_key],
-                [list, int, float],
+            flat, shape = _flatten_secure_transfer_data(
+                data_transfer[smpc_transfer_data_key]
             )
         except TypeError as e:
             raise TypeError(
                 f"Secure Transfer key: '{key}', operation: '{cur_op}'. Error: {str(e)}"
             )
-        op_flat_data[cur_op].extend(cur_flat_data)
+        op_flat_data[cur_op].append(flat)
 
         secure_transfer_key_template = {
             smpc_transfer_op_key: secure_transfer[key][smpc_transfer_op_key],
             smpc_transfer_val_type_key: secure_transfer[key][
                 smpc_transfer_val_type_key
             ],
-            smpc_transfer_data_key: data_transfer_tmpl,
+            smpc_transfer_data_key: {"offset": op_sizes[cur_op], "shape": shape},
         }
         secure_transfer_template[key] = secure_transfer_key_template
+        op_sizes[cur_op] += flat.size
+
+    def concatenate(flat_data):
+        return np.concatenate(flat_data).tolist() if flat_data else []
+
     return (
         secure_transfer_template,
-        op_flat_data[smpc_sum_op],
-        op_flat_data[smpc_min_op],
-        op_flat_data[smpc_max_op],
+        concatenate(op_flat_data[smpc_sum_op]),
+        concatenate(op_flat_data[smpc_min_op]),
+        concatenate(op_flat_data[smpc_max_op]),
     )
 
 
@@ -338,97 +820,82 @@ def construct_secure_transfer_dict(
     When SMPC is used, a secure_transfer dict is broken into template and values.
     In order to be used from a udf it needs to take it's final key - value form.
     """
+    op_values = {
+        smpc_sum_op: sum_op_values,
+        smpc_min_op: min_op_values,
+        smpc_max_op: max_op_values,
+    }
+    op_values = {
+        op: np.asarray(values) for op, values in op_values.items() if values is not None
+    }
     final_dict = {}
     for key, data_transfer_tmpl in template.items():
-        if data_transfer_tmpl[smpc_transfer_op_key] == smpc_sum_op:
-            structured_data = _structure_data_using_relative_positions(
-                data_transfer_tmpl[smpc_transfer_data_key],
-                data_transfer_tmpl[smpc_transfer_val_type_key],
-                sum_op_values,
-                [int, float],
-            )
-        elif data_transfer_tmpl[smpc_transfer_op_key] == smpc_min_op:
-            structured_data = _structure_data_using_relative_positions(
-                data_transfer_tmpl[smpc_transfer_data_key],
-                data_transfer_tmpl[smpc_transfer_val_type_key],
-                min_op_values,
-                [int, float],
-            )
-        elif data_transfer_tmpl[smpc_transfer_op_key] == smpc_max_op:
-            structured_data = _structure_data_using_relative_positions(
-                data_transfer_tmpl[smpc_transfer_data_key],
-                data_transfer_tmpl[smpc_transfer_val_type_key],
-                max_op_values,
-                [int, float],
-            )
-        else:
-            raise ValueError(
-                f"Operation not supported: {data_transfer_tmpl[smpc_transfer_op_key]}"
-            )
-
-        final_dict[key] = structured_data
+        operation = data_transfer_tmpl[smpc_transfer_op_key]
+        if operation not in smpc_numeric_operations:
+            raise ValueError(f"Operation not supported: {operation}")
+
+        offset = data_transfer_tmpl[smpc_transfer_data_key]["offset"]
+        shape = data_transfer_tmpl[smpc_transfer_data_key]["shape"]
+        flat = op_values[operation][offset : offset + _get_data_size(shape)]
+        if data_transfer_tmpl[smpc_transfer_val_type_key] == smpc_int_type:
+            flat = flat.astype(int)
+        final_dict[key] = _structure_secure_transfer_data(flat, shape)
     return final_dict
 
 
-def _flatten_data_and_keep_relative_positions(
-    index: int,
-    data: Any,
-    allowed_types: List[Type],
-) -> Tuple[Any, List[Any], int]:
+_secure_transfer_data_types = [int, float, list, np.ndarray]
+
+
+def _flatten_secure_transfer_data(data: Any) -> Tuple[np.ndarray, list]:
     """
-    Iterates through a nested list structure and:
-    1) keeps the structure of the data with relative positions in the flat array,
-    2) flattens the values to a new array and
-    3) also returns the final index so it can be used again.
+    Converts the data of a secure transfer key to a flat array and returns it
+    together with the shape descriptor needed to restore the data. The shape
+    descriptor is the shape of the data or, for nested lists of different
+    lengths, the list of the shape descriptors of their elements.
 
     For example:
-    >>> _flatten_data_and_keep_relative_positions(0, [[7,6,7],[8,9,10]])
+    >>> _flatten_secure_transfer_data([[7, 6, 7], [8, 9, 10]])
         Returns:
-        [7, 6, 7, 8, 9, 10], [[0, 1, 2], [3, 4, 5]], 6
-
+        array([7, 6, 7, 8, 9, 10]), [2, 3]
+    >>> _flatten_secure_transfer_data([[7, 6, 7], [8]])
+        Returns:
+        array([7, 6, 7, 8]), [[3], [1]]
     """
-    if type(data) not in allowed_types:
-        raise TypeError(f"Types allowed: {allowed_types}")
+    if type(data) not in _secure_transfer_data_types:
+        raise TypeError(f"Types allowed: {_secure_transfer_data_types}")
 
-    if isinstance(data, list):
-        data_pos_template = []
-        flat_data = []
-        for elem in data:
-            (
-                data_template,
-                cur_flat_data,
-                index,
-            ) = _flatten_data_and_keep_relative_positions(index, elem, allowed_types)
-            data_pos_template.append(data_template)
-            flat_data.extend(cur_flat_data)
-        return data_pos_template, flat_data, index
-
-    return index, [data], index + 1
+    try:
+        array = np.asarray(data)
+    except ValueError:
+        flat_data, shapes = zip(*(_flatten_secure_transfer_data(elem) for elem in data))
+        return np.concatenate(flat_data), list(shapes)
+    if array.dtype.kind not in "iuf":
+        raise TypeError(f"Types allowed: {_secure_transfer_data_types}")
+    return array.ravel(), list(array.shape)
 
 
-def _structure_data_using_relative_positions(
-    data_tmpl: Any,
-    data_values_type: str,
-    flat_values: List[Any],
-    allowed_types: List[Type],
-):
+def _structure_secure_transfer_data(flat_data: np.ndarray, shape: list):
     """
-    It's doing the exact opposite of _flatten_int_data_and_keep_relative_positions.
-    This is used to reconstruct the secure_transfer object after the computations
-    from the SMPC.
+    It's doing the exact opposite of _flatten_secure_transfer_data, returning
+    the data as (nested lists of) Python numbers.
     """
-    if isinstance(data_tmpl, list):
-        return [
-            _structure_data_using_relative_positions(
-                elem, data_values_type, flat_values, allowed_types
+    if all(isinstance(dim, int) for dim in shape):
+        return flat_data.reshape(shape).tolist()
+
+    data = []
+    offset = 0
+    for elem_shape in shape:
+        size = _get_data_size(elem_shape)
+        data.append(
+            _structure_secure_transfer_data(
+                flat_data[offset : offset + size], elem_shape
             )
-            for elem in data_tmpl
-        ]
-
-    if type(data_tmpl) not in allowed_types:
-        raise TypeError(f"Types allowed: {allowed_types}")
+        )
+        offset += size
+    return data
 
-    if data_values_type == smpc_int_type:
-        return int(flat_values[data_tmpl])
 
-    return flat_values[data_tmpl]
+def _get_data_size(shape: list) -> int:
+    if all(isinstance(dim, int) for dim in shape):
+        return int(np.prod(shape, dtype=int))
+    return sum(_get_data_size(elem_shape) for elem_shape in shape)
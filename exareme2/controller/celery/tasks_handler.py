@@ -11,6 +11,7 @@ from exareme2.controller.celery.app import CeleryWrapper
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableSchema
 from exareme2.worker_communication import WorkerUDFKeyArguments
+from exareme2.worker_communication import WorkerUDFPipeline
 from exareme2.worker_communication import WorkerUDFPosArguments
 
 TASK_SIGNATURES: Final = {
@@ -22,17 +23,22 @@ TASK_SIGNATURES: Final = {
     "create_table": "exareme2.worker.exareme2.tables.tables_api.create_table",
     "create_remote_table": "exareme2.worker.exareme2.tables.tables_api.create_remote_table",
     "create_merge_table": "exareme2.worker.exareme2.tables.tables_api.create_merge_table",
+    "create_remote_tables_and_merge_table": "exareme2.worker.exareme2.tables.tables_api.create_remote_tables_and_merge_table",
     "get_views": "exareme2.worker.exareme2.views.views_api.get_views",
     "create_data_model_views": "exareme2.worker.exareme2.views.views_api.create_data_model_views",
+    "create_views": "exareme2.worker.exareme2.views.views_api.create_views",
     "run_udf": "exareme2.worker.exareme2.udfs.udfs_api.run_udf",
+    "run_udf_pipeline": "exareme2.worker.exareme2.udfs.udfs_api.run_udf_pipeline",
     "cleanup": "exareme2.worker.exareme2.cleanup.cleanup_api.cleanup",
     "validate_smpc_templates_match": "exareme2.worker.exareme2.smpc.smpc_api.validate_smpc_templates_match",
     "load_data_to_smpc_client": "exareme2.worker.exareme2.smpc.smpc_api.load_data_to_smpc_client",
-    "get_smpc_result": "exareme2.worker.exareme2.smpc.smpc_api.get_smpc_result",
+    "get_smpc_results": "exareme2.worker.exareme2.smpc.smpc_api.get_smpc_results",
     "get_worker_info": "exareme2.worker.worker_info.worker_info_api.get_worker_info",
     "get_worker_datasets_per_data_model": "exareme2.worker.worker_info.worker_info_api.get_worker_datasets_per_data_model",
     "get_data_model_cdes": "exareme2.worker.worker_info.worker_info_api.get_data_model_cdes",
     "get_data_model_attributes": "exareme2.worker.worker_info.worker_info_api.get_data_model_attributes",
+    "get_worker_metadata_snapshot": "exareme2.worker.worker_info.worker_info_api.get_worker_metadata_snapshot",
+    "get_execution_scheduler_stats": "exareme2.worker.worker_info.worker_info_api.get_execution_scheduler_stats",
     "healthcheck": "exareme2.worker.worker_info.worker_info_api.healthcheck",
     "start_flower_client": "exareme2.worker.flower.starter.starter_api.start_flower_client",
     "start_flower_server": "exareme2.worker.flower.starter.starter_api.start_flower_server",
@@ -136,6 +142,25 @@ class WorkerTasksHandler:
             check_min_rows=check_min_rows,
         )
 
+    def create_views(
+        self,
+        request_id: str,
+        context_id: str,
+        command_id: str,
+        table_name: str,
+        columns_per_view: List[List[str]],
+        filters_per_view: List[Optional[dict]],
+    ) -> WorkerTaskResult:
+        return self._queue_task(
+            task_signature=TASK_SIGNATURES["create_views"],
+            request_id=request_id,
+            context_id=context_id,
+            command_id=command_id,
+            table_name=table_name,
+            columns_per_view=columns_per_view,
+            filters_per_view=filters_per_view,
+        )
+
     def get_merge_tables(self, request_id: str, context_id: str) -> WorkerTaskResult:
         return self._queue_task(
             task_signature=TASK_SIGNATURES["get_merge_tables"],
@@ -180,6 +205,23 @@ class WorkerTasksHandler:
             request_id=request_id,
         )
 
+    def create_remote_tables_and_merge_table(
+        self,
+        request_id: str,
+        context_id: str,
+        command_id: str,
+        table_infos: List[TableInfo],
+        monetdb_socket_addresses: List[str],
+    ) -> WorkerTaskResult:
+        return self._queue_task(
+            task_signature=TASK_SIGNATURES["create_remote_tables_and_merge_table"],
+            request_id=request_id,
+            context_id=context_id,
+            command_id=command_id,
+            table_infos_json=[table_info.json() for table_info in table_infos],
+            monetdb_socket_addresses=monetdb_socket_addresses,
+        )
+
     def queue_run_udf(
         self,
         request_id: str,
@@ -203,6 +245,21 @@ class WorkerTasksHandler:
             output_schema=output_schema.json() if output_schema else None,
         )
 
+    def queue_run_udf_pipeline(
+        self,
+        request_id: str,
+        context_id: str,
+        pipeline: WorkerUDFPipeline,
+        use_smpc: bool = False,
+    ) -> WorkerTaskResult:
+        return self._queue_task(
+            task_signature=TASK_SIGNATURES["run_udf_pipeline"],
+            request_id=request_id,
+            context_id=context_id,
+            pipeline_json=pipeline.json(),
+            use_smpc=use_smpc,
+        )
+
     def validate_smpc_templates_match(
         self,
         request_id: str,
@@ -224,29 +281,33 @@ class WorkerTasksHandler:
             jobid=jobid,
         )
 
-    def get_smpc_result(
+    def get_smpc_results(
         self,
         request_id: str,
-        jobid: str,
         context_id: str,
         command_id: str,
-        command_subid: Optional[str] = "0",
+        template_json: str,
+        sum_op_jobid: Optional[str] = None,
+        min_op_jobid: Optional[str] = None,
+        max_op_jobid: Optional[str] = None,
     ) -> WorkerTaskResult:
         return self._queue_task(
-            task_signature=TASK_SIGNATURES["get_smpc_result"],
+            task_signature=TASK_SIGNATURES["get_smpc_results"],
             request_id=request_id,
-            jobid=jobid,
             context_id=context_id,
             command_id=command_id,
-            command_subid=command_subid,
+            template_json=template_json,
+            sum_op_jobid=sum_op_jobid,
+            min_op_jobid=min_op_jobid,
+            max_op_jobid=max_op_jobid,
         )
 
     # CLEANUP functionality
-    def queue_cleanup(self, request_id: str, context_id: str):
+    def queue_cleanup(self, request_id: str, context_ids: List[str]):
         return self._queue_task(
             task_signature=TASK_SIGNATURES["cleanup"],
             request_id=request_id,
-            context_id=context_id,
+            context_ids=context_ids,
         )
 
     def queue_worker_info_task(self, request_id: str) -> WorkerTaskResult:
@@ -285,6 +346,23 @@ class WorkerTasksHandler:
             priority=CELERY_APP_QUEUE_MAX_PRIORITY,
         )
 
+    def queue_worker_metadata_snapshot_task(
+        self, request_id: str, known_content_hash: Optional[str] = None
+    ) -> WorkerTaskResult:
+        return self._queue_task(
+            task_signature=TASK_SIGNATURES["get_worker_metadata_snapshot"],
+            request_id=request_id,
+            known_content_hash=known_content_hash,
+            priority=CELERY_APP_QUEUE_MAX_PRIORITY,
+        )
+
+    def queue_execution_scheduler_stats_task(self, request_id: str) -> WorkerTaskResult:
+        return self._queue_task(
+            task_signature=TASK_SIGNATURES["get_execution_scheduler_stats"],
+            request_id=request_id,
+            priority=CELERY_APP_QUEUE_MAX_PRIORITY,
+        )
+
     # --------------- healthcheck task ---------------
     # NON-BLOCKING
     def queue_healthcheck_task(
@@ -9,16 +9,19 @@ from typing import Union
 import pandas as pd
 
 from exareme2 import DATA_TABLE_PRIMARY_KEY
+from exareme2.algorithms.exareme2.udf_pipeline import UDFPipelineOutput
 from exareme2.controller.services.exareme2.workers import GlobalWorker
 from exareme2.controller.services.exareme2.workers import LocalWorker
 from exareme2.worker_communication import SMPCTablesInfo
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableSchema
+from exareme2.worker_communication import UDFPipelineOutputInfo
 from exareme2.worker_communication import WorkerLiteralDTO
 from exareme2.worker_communication import WorkerSMPCDTO
 from exareme2.worker_communication import WorkerTableDTO
 from exareme2.worker_communication import WorkerUDFDTO
 from exareme2.worker_communication import WorkerUDFKeyArguments
+from exareme2.worker_communication import WorkerUDFPipelineOutputDTO
 from exareme2.worker_communication import WorkerUDFPosArguments
 
 
@@ -326,6 +329,12 @@ def _algoexec_udf_arg_to_worker_udf_arg(
         )
     elif isinstance(algoexec_arg, GlobalWorkerSMPCTables):
         return WorkerSMPCDTO(value=algoexec_arg.smpc_tables_info)
+    elif isinstance(algoexec_arg, UDFPipelineOutput):
+        return WorkerUDFPipelineOutputDTO(
+            value=UDFPipelineOutputInfo(
+                step=algoexec_arg.step, output=algoexec_arg.output
+            )
+        )
     else:
         return WorkerLiteralDTO(value=algoexec_arg)
 
@@ -1,5 +1,4 @@
-import os
-import string
+import sqlite3
 import threading
 import time
 import traceback
@@ -7,6 +6,7 @@ from datetime import datetime
 from datetime import timezone
 from logging import Logger
 from pathlib import Path
+from typing import Dict
 from typing import List
 
 import toml
@@ -18,7 +18,7 @@ from exareme2.controller.services.worker_landscape_aggregator.worker_landscape_a
 )
 
 CLEANER_REQUEST_ID = "CLEANER"
-CLEANUP_FILE_TEMPLATE = string.Template("cleanup_${context_id}.toml")
+CLEANUP_JOURNAL_FILENAME = "cleanup_journal.sqlite"
 
 
 class _WorkerInfoDTO(BaseModel):
@@ -32,13 +32,6 @@ class _WorkerInfoDTO(BaseModel):
         allow_mutation = False
 
 
-class _CleanupEntry(BaseModel):
-    context_id: str
-    worker_ids: List[str]
-    timestamp: str
-    released: bool
-
-
 class Cleaner:
     """
     The Cleaner class handles the cleaning of database artifacts created during the
@@ -46,23 +39,23 @@ class Cleaner:
 
     How it works:
     Just before an algorithm starts executing, Cleaner::add_contextid_for_cleanup(context_id)
-    is called (from the Controller). This creates a new file(ex. "cleanup_3502300.toml")
-    containing a cleanup entry. As soon as the algorithm execution finishes,
-    Cleaner::release_context_id(context_id) is called (from the Controller), which sets the
-    'released' flag, of the respective cleanup entry, to 'true'. When the Cleaner object is
-    started (method start()), it constantly loops through all the entries, finds the ones that
-    either have their 'released' flag set to 'true' or their 'timestamp' has expired
-    (check _is_timestamp_expired function) and processes them by calling the cleanup celery
-    on the respective workers for the respective context_id. When the cleanup celery on all
-    the workers of an entry are succesfull, the entry file is deleted. Otherwise the 'worker_ids'
-    list of the entry is updated to contain only the failed 'worker_ids' and will be re-processed
-    in the next iteration of the loop.
+    is called (from the Controller). This adds a cleanup entry, for each worker of the
+    context_id, in a cleanup journal (an SQLite database in the "contextids_cleanup_folder").
+    Each entry becomes due when its release time limit expires. As soon as the algorithm
+    execution finishes, Cleaner::release_context_id(context_id) is called (from the
+    Controller), which sets the 'released' flag of the entries of the context_id and makes
+    them due immediately. When the Cleaner object is started (method start()), it
+    constantly loops, fetching only the due entries from the journal, through an index on
+    their due time, and processes them by calling one cleanup celery task per worker for
+    all of its due context_ids. The entries of the workers that were cleaned up
+    successfully are deleted from the journal. The rest will be re-processed in the next
+    iteration of the loop.
 
     Cleanup entry example:
-    context_id= "3502300"
-    worker_ids = [ "testglobalworker", "testlocalworker1", "testlocalworker2",]
-    timestamp = "2022-05-23T14:40:34.203085+00:00"
+    context_id = "3502300"
+    worker_id = "testlocalworker1"
     released = false
+    due_at = 1653320434.203085
 
     Methods
     -------
@@ -77,10 +70,10 @@ class Cleaner:
         Stop the cleanup loop
 
     add_contextid_for_cleanup(context_id: str, algo_execution_worker_ids: List[str]):
-        Create a new cleanup entry
+        Create the cleanup entries of a context_id
 
     release_context_id(context_id):
-        Set the "released" flag of the cleanup entry to true.
+        Set the "released" flag of the cleanup entries of a context_id to true.
     """
 
     def __init__(
@@ -100,9 +93,10 @@ class Cleaner:
         self._celery_run_udf_task_timeout = run_udf_task_timeout
         self._contextids_cleanup_folder = contextids_cleanup_folder
         self._worker_landscape_aggregator = worker_landscape_aggregator
-        self._cleanup_files_processor = CleanupFilesProcessor(
+        self._cleanup_journal = CleanupJournal(
             self._logger, self._contextids_cleanup_folder
         )
+        self._cleanup_journal.import_cleanup_files(self._contextid_release_timelimit)
 
         self._keep_cleaning_up = True
         self._cleanup_loop_thread = None
@@ -124,32 +118,35 @@ class Cleaner:
             True if the cleanup task was successful on all workers, False otherwise.
         """
         # returns True if cleanup task was succesful for all workers of the context_id
-        entry = self._cleanup_files_processor.get_entry_by_context_id(context_id)
-        return self._exec_cleanup(entry)
+        worker_ids = self._cleanup_journal.get_worker_ids_by_context_id(context_id)
+        failed_worker_ids = self._exec_cleanup(
+            {worker_id: [context_id] for worker_id in worker_ids}
+        )
+        return not failed_worker_ids
 
     def _cleanup_loop(self):
         while self._keep_cleaning_up:
             try:
-                all_entries = self._cleanup_files_processor.get_all_entries() or []
-                for entry in all_entries:
-                    if entry.released or self._is_timestamp_expired(entry.timestamp):
-                        self._exec_cleanup(entry)
+                due_context_ids_per_worker = (
+                    self._cleanup_journal.get_due_context_ids_per_worker(_now())
+                )
+                if due_context_ids_per_worker:
+                    self._exec_cleanup(due_context_ids_per_worker)
             except Exception:
                 self._logger.error(traceback.format_exc())
             finally:
                 time.sleep(self._cleanup_interval)
 
-    def _is_timestamp_expired(self, timestamp: str):
-        now = datetime.now(timezone.utc)
-        timestamp = datetime.fromisoformat(timestamp)
-        time_elapsed = now - timestamp
-        return time_elapsed.total_seconds() > self._contextid_release_timelimit
+    def _exec_cleanup(self, context_ids_per_worker: Dict[str, List[str]]) -> List[str]:
+        """
+        Calls one cleanup task on each worker, for all of its context_ids, and deletes
+        the cleanup entries of the workers that were cleaned up successfully.
 
-    def _exec_cleanup(self, entry: _CleanupEntry) -> bool:
-        # returns True if cleanup task was succesful for all workers of the context_id
+        Returns the worker_ids where the cleanup failed.
+        """
         failed_worker_ids = []
         worker_task_results = {}
-        for worker_id in entry.worker_ids:
+        for worker_id, context_ids in context_ids_per_worker.items():
             try:
                 worker_info = self._get_worker_info_by_id(worker_id)
             except Exception as exc:
@@ -162,13 +159,14 @@ class Cleaner:
             task_handler = _get_worker_task_handler(worker_info)
 
             worker_task_results[task_handler] = task_handler.queue_cleanup(
-                context_id=entry.context_id,
+                context_ids=context_ids,
             )
 
         for (
             task_handler,
             worker_task_result,
         ) in worker_task_results.items():
+            context_ids = context_ids_per_worker[task_handler.worker_id]
             try:
                 task_handler.wait_queued_cleanup_complete(
                     worker_task_result=worker_task_result
@@ -176,7 +174,7 @@ class Cleaner:
             except Exception as exc:
                 failed_worker_ids.append(task_handler.worker_id)
                 self._logger.warning(
-                    f"Cleanup task for {task_handler.worker_id=}, for {entry.context_id=} FAILED. "
+                    f"Cleanup task for {task_handler.worker_id=}, for {context_ids=} FAILED. "
                     f"Will retry in {self._cleanup_interval=} secs. Failure occured while "
                     "waiting the completion of the task (wait_queued_cleanup_complete), "
                     f"the exception raised was: {type(exc)}:{exc}"
@@ -184,22 +182,11 @@ class Cleaner:
                 continue
 
             self._logger.debug(
-                f"Cleanup task succeeded for {task_handler.worker_id=} for {entry.context_id=}"
+                f"Cleanup task succeeded for {task_handler.worker_id=} for {context_ids=}"
             )
+            self._cleanup_journal.delete_entries(task_handler.worker_id, context_ids)
 
-        if not failed_worker_ids:
-            self._logger.debug(f"Cleanup for {entry.context_id=} complete.")
-            self._cleanup_files_processor.delete_file_by_context_id(entry.context_id)
-            return True
-        else:
-            self._logger.debug(
-                f"'Altering' file with {entry.context_id=}, removing worker ids "
-                "which succeeded cleanup, keeping only failed worker ids: "
-                f"{failed_worker_ids=}"
-            )
-            entry.worker_ids = failed_worker_ids
-            self._cleanup_files_processor.update_file(entry)
-            return False
+        return failed_worker_ids
 
     def start(self):
         """
@@ -237,20 +224,17 @@ class Cleaner:
         algo_execution_worker_ids : List[str]
             The worker_ids participating in the algorithm execution.
         """
-        self._logger.debug(f"Creating file for new {context_id=}")
-        now_timestamp = datetime.now(timezone.utc).isoformat()
-        entry = _CleanupEntry(
+        self._logger.debug(f"Adding cleanup entries for new {context_id=}")
+        self._cleanup_journal.add_entries(
             context_id=context_id,
             worker_ids=algo_execution_worker_ids,
-            timestamp=now_timestamp,
-            released=False,
+            due_at=_now() + self._contextid_release_timelimit,
         )
-        self._cleanup_files_processor.create_file_from_cleanup_entry(entry)
 
     def release_context_id(self, context_id):
         """
-        Asynchronously cleanup context_id. Sets the "released" flag of the cleanup entry
-        to true and will call the cleanup task on the relevant workers again and again in
+        Asynchronously cleanup context_id. Sets the "released" flag of the cleanup entries
+        to true, making them due, and will call the cleanup task on the relevant workers again and again in
         the "cleanup loop" until the task succeeds on all workers
 
         Parameters
@@ -258,11 +242,8 @@ class Cleaner:
         context_id : str
             The context_id of the cleanup entry.
         """
-        self._logger.debug(f"Setting released to true for file with {context_id=}")
-        entry = self._cleanup_files_processor.get_entry_by_context_id(context_id)
-        entry.released = True
-        self._cleanup_files_processor.delete_file_by_context_id(context_id)
-        self._cleanup_files_processor.create_file_from_cleanup_entry(entry)
+        self._logger.debug(f"Setting released to true for entries with {context_id=}")
+        self._cleanup_journal.release_entries(context_id, released_at=_now())
 
     def _get_worker_info_by_id(self, worker_id: str) -> _WorkerInfoDTO:
         worker_info = self._worker_landscape_aggregator.get_worker_info(worker_id)
@@ -277,7 +258,7 @@ class Cleaner:
     # This is only supposed to be called from a test.
     # In all other circumstances the cleaner should not be reset manually
     def _reset(self):
-        self._cleanup_files_processor._delete_all_entries()
+        self._cleanup_journal._delete_all_entries()
 
 
 def _get_worker_task_handler(worker_info: _WorkerInfoDTO) -> Exareme2TasksHandler:
@@ -291,7 +272,17 @@ def _get_worker_task_handler(worker_info: _WorkerInfoDTO) -> Exareme2TasksHandle
     )
 
 
-class CleanupFilesProcessor:
+def _now() -> float:
+    return datetime.now(timezone.utc).timestamp()
+
+
+class CleanupJournal:
+    """
+    Keeps the cleanup entries, one for each context_id and worker_id, in an SQLite
+    database, indexed on the time they become due, so that the cleanup loop only
+    reads the due entries.
+    """
+
     def __init__(self, logger, contextids_cleanup_folder: str):
         self._logger = logger
         self._cleanup_entries_folder_path = Path(contextids_cleanup_folder)
@@ -299,77 +290,106 @@ class CleanupFilesProcessor:
         # Create the folder, if does not exist.
         self._cleanup_entries_folder_path.mkdir(parents=True, exist_ok=True)
 
-    def create_file_from_cleanup_entry(self, entry: _CleanupEntry):
-        entry_dict = entry.dict()
-        filename = CLEANUP_FILE_TEMPLATE.substitute(context_id=entry.context_id)
-        full_path_and_filename = os.path.join(
-            self._cleanup_entries_folder_path, filename
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self._cleanup_entries_folder_path / CLEANUP_JOURNAL_FILENAME,
+            check_same_thread=False,
         )
-        with open(full_path_and_filename, "x") as f:
-            toml.dump(entry_dict, f)
-        self._logger.debug(f"Created file with {entry.context_id=}")
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cleanup_entries (
+                    context_id TEXT NOT NULL,
+                    worker_id TEXT NOT NULL,
+                    released INTEGER NOT NULL DEFAULT 0,
+                    due_at REAL NOT NULL,
+                    PRIMARY KEY (context_id, worker_id)
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS cleanup_entries_due_at "
+                "ON cleanup_entries (due_at)"
+            )
+
+    def add_entries(self, context_id: str, worker_ids: List[str], due_at: float):
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO cleanup_entries (context_id, worker_id, due_at) "
+                "VALUES (?, ?, ?)",
+                [(context_id, worker_id, due_at) for worker_id in worker_ids],
+            )
+        self._logger.debug(f"Added cleanup entries with {context_id=}")
+
+    def release_entries(self, context_id: str, released_at: float):
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "UPDATE cleanup_entries SET released = 1, due_at = MIN(due_at, ?) "
+                "WHERE context_id = ?",
+                (released_at, context_id),
+            )
+        if not cursor.rowcount:
+            self._logger.warning(
+                f"Could not find cleanup entries with {context_id=}. "
+                "This should not happen."
+            )
 
-    def update_file(self, entry: _CleanupEntry):
+    def get_worker_ids_by_context_id(self, context_id: str) -> List[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT worker_id FROM cleanup_entries WHERE context_id = ?",
+                (context_id,),
+            ).fetchall()
+        if not rows:
+            self._logger.warning(f"Could not find cleanup entries with {context_id=}")
+        return [worker_id for worker_id, in rows]
+
+    def get_due_context_ids_per_worker(self, now: float) -> Dict[str, List[str]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT worker_id, context_id FROM cleanup_entries "
+                "WHERE due_at <= ? ORDER BY due_at",
+                (now,),
+            ).fetchall()
+        context_ids_per_worker = {}
+        for worker_id, context_id in rows:
+            context_ids_per_worker.setdefault(worker_id, []).append(context_id)
+        return context_ids_per_worker
+
+    def delete_entries(self, worker_id: str, context_ids: List[str]):
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM cleanup_entries WHERE context_id = ? AND worker_id = ?",
+                [(context_id, worker_id) for context_id in context_ids],
+            )
         self._logger.debug(
-            f"File with {entry.context_id=} is updated by deleting "
-            "and re-creating it"
+            f"Deleted cleanup entries of {worker_id=} for {context_ids=}"
         )
-        self.delete_file_by_context_id(entry.context_id)
-        self.create_file_from_cleanup_entry(entry)
 
-    def get_all_entries(self) -> [_CleanupEntry]:
-        cleanup_entries = []
+    def import_cleanup_files(self, contextid_release_timelimit: int):
+        """
+        Imports the cleanup entries of the toml files, one per context_id, that were
+        used before the journal, deleting the files.
+        """
         for _file in self._cleanup_entries_folder_path.glob("cleanup_*.toml"):
             try:
-                parsed_toml = toml.load(_file)
-            except Exception as exc:
-                self._logger.warning(
-                    f"Trying to read {_file.name=} raised exception: {exc}"
+                entry = toml.load(_file)
+                timestamp = datetime.fromisoformat(entry["timestamp"]).timestamp()
+                self.add_entries(
+                    context_id=entry["context_id"],
+                    worker_ids=entry["worker_ids"],
+                    due_at=timestamp + contextid_release_timelimit,
                 )
-
-            cleanup_entries.append(_CleanupEntry(**parsed_toml))
-        return cleanup_entries
-
-    def delete_file_by_context_id(self, context_id: str):
-        try:
-            os.unlink(self._get_file_by_context_id(context_id))
-        except FileNotFoundError as exc:
-            self._logger.warning(
-                f"Tried to delete file with {context_id=} but could not find such file. "
-                f"This should not happen. \n{exc=}"
-            )
-        self._logger.debug(f"Deleted file with {context_id=}")
-
-    def get_entry_by_context_id(self, context_id) -> _CleanupEntry:
-        file_full_path = self._get_file_by_context_id(context_id)
-        if file_full_path:
-            try:
-                parsed_toml = toml.load(file_full_path)
+                if entry["released"]:
+                    self.release_entries(entry["context_id"], released_at=timestamp)
             except Exception as exc:
                 self._logger.warning(
-                    f"Trying to read {file_full_path=} raised exception: {exc}"
+                    f"Trying to import {_file.name=} raised exception: {exc}"
                 )
-                raise exc
-            return _CleanupEntry(**parsed_toml)
-        self._logger.warning(f"Could not find cleanup entry file with {context_id=}")
-
-    def _get_file_by_context_id(self, context_id: str) -> str:
-        filename_to_look_for = CLEANUP_FILE_TEMPLATE.substitute(context_id=context_id)
-        file_full_path = os.path.join(
-            self._cleanup_entries_folder_path, filename_to_look_for
-        )
-        try:
-            parsed_toml = toml.load(file_full_path)
-        except Exception as exc:
-            self._logger.warning(
-                f"Trying to read {file_full_path=} raised exception: {exc}"
-            )
-            return
-        if parsed_toml["context_id"] != context_id:
-            self._logger.error(f"File {file_full_path} contains wrnong {context_id=}")
-        else:
-            return file_full_path
+                continue
+            _file.unlink()
 
     def _delete_all_entries(self):
-        for _file in self._cleanup_entries_folder_path.glob("cleanup_*.toml"):
-            _file.unlink()
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cleanup_entries")
@@ -228,15 +228,24 @@ class DataModelViewsCreator:
         if self._data_model_views:
             return
 
+        # The creation of the views is queued first, on all the workers, and then
+        # all of them are awaited together.
+        worker_task_results = {
+            worker: worker.queue_create_data_model_views(
+                command_id=self._command_id,
+                columns_per_view=self._variable_groups,
+                filters=self._var_filters,
+                dropna=self._dropna,
+                check_min_rows=self._check_min_rows,
+            )
+            for worker in self._local_workers
+        }
+
         views_per_localworker = {}
-        for worker in self._local_workers:
+        for worker, worker_task_result in worker_task_results.items():
             try:
-                data_model_views = worker.create_data_model_views(
-                    command_id=self._command_id,
-                    columns_per_view=self._variable_groups,
-                    filters=self._var_filters,
-                    dropna=self._dropna,
-                    check_min_rows=self._check_min_rows,
+                data_model_views = worker.get_create_data_model_views_result(
+                    worker_task_result
                 )
             except InsufficientDataError:
                 continue
@@ -651,6 +660,7 @@ class SingleAlgorithmStrategy(ExecutionStrategy):
             filters=self._algorithm_request_dto.inputdata.filters,
             params=self._algorithm_request_dto.parameters,
             logger=self._logger,
+            data_model=self._algorithm_request_dto.inputdata.data_model,
         )
 
         algorithm_result = await algorithm_executor.run(data=data, metadata=metadata)
@@ -672,6 +682,7 @@ class AlgorithmExecutor:
         filters: dict,
         params: dict,
         logger: Logger,
+        data_model: Optional[str] = None,
     ):
         self._engine = engine
 
@@ -681,6 +692,7 @@ class AlgorithmExecutor:
         self._datasets = datasets
         self._filters = filters
         self._params = params
+        self._data_model = data_model
 
         self._logger = logger
 
@@ -691,6 +703,7 @@ class AlgorithmExecutor:
             var_filters=self._filters,
             algorithm_parameters=self._params,
             datasets=self._datasets,
+            data_model=self._data_model,
         )
         algorithm = algorithm_classes[self._algorithm_name](
             initialization_params=init_params,
@@ -841,11 +854,13 @@ class Controller:
                 logger=logger,
             )
 
-        # Create the "data model views"
-        data_model_views = workers_federation.create_data_model_views(
-            variable_groups=execution_strategy.algorithm_data_loader.get_variable_groups(),
-            dropna=execution_strategy.algorithm_data_loader.get_dropna(),
-            check_min_rows=execution_strategy.algorithm_data_loader.get_check_min_rows(),
+        # Create the "data model views", without blocking the event loop while
+        # waiting for the workers
+        data_model_views = await _run_in_executor(
+            workers_federation.create_data_model_views,
+            execution_strategy.algorithm_data_loader.get_variable_groups(),
+            execution_strategy.algorithm_data_loader.get_dropna(),
+            execution_strategy.algorithm_data_loader.get_check_min_rows(),
         )
 
         # Execute the strategy
@@ -857,7 +872,7 @@ class Controller:
         logger.debug(f"Algorithm {request_id=} result-> {algorithm_result=}")
 
         # Cleanup artifacts created in the workers' databases during the execution
-        if not self._cleaner.cleanup_context_id(context_id=context_id):
+        if not await _run_in_executor(self._cleaner.cleanup_context_id, context_id):
             # if the cleanup did not succeed, set the current "context_id" as released
             # so that the Cleaner retries later
             self._cleaner.release_context_id(context_id=context_id)
@@ -979,15 +994,18 @@ def sanitize_request_variable(variable: list):
 _thread_pool_executor = concurrent.futures.ThreadPoolExecutor()
 
 
+async def _run_in_executor(func, *args):
+    # By calling a blocking function inside run_in_executor(), the function will
+    # execute in a separate thread of the threadpool and at the same time yield
+    # control to the executor event loop, through await
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(_thread_pool_executor, func, *args)
+
+
 # TODO add types
 # TODO change func name, Transformers runs through this as well
 async def _algorithm_run_in_event_loop(algorithm, data_model_views, metadata):
-    # By calling blocking method Algorithm.run() inside run_in_executor(),
-    # Algorithm.run() will execute in a separate thread of the threadpool and at
-    # the same time yield control to the executor event loop, through await
-    loop = asyncio.get_event_loop()
-    algorithm_result = await loop.run_in_executor(
-        _thread_pool_executor,
+    algorithm_result = await _run_in_executor(
         algorithm.run,
         data_model_views.to_list(),
         metadata,
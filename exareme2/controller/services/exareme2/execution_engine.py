@@ -9,6 +9,7 @@ from typing import Tuple
 from typing import Union
 
 from exareme2 import DType
+from exareme2.algorithms.exareme2.udf_pipeline import UDFPipelineStep
 from exareme2.algorithms.exareme2.udfgen import make_unique_func_name
 from exareme2.controller import logger as ctrl_logger
 from exareme2.controller.celery.tasks_handler import WorkerTaskResult
@@ -57,13 +58,14 @@ from exareme2.controller.services.exareme2.smpc_cluster_comm_helpers import (
 from exareme2.controller.services.exareme2.workers import GlobalWorker
 from exareme2.controller.services.exareme2.workers import LocalWorker
 from exareme2.smpc_cluster_communication import DifferentialPrivacyParams
-from exareme2.worker_communication import SMPCTablesInfo
 from exareme2.worker_communication import TableData
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableSchema
 from exareme2.worker_communication import WorkerSMPCDTO
 from exareme2.worker_communication import WorkerTableDTO
 from exareme2.worker_communication import WorkerUDFDTO
+from exareme2.worker_communication import WorkerUDFPipeline
+from exareme2.worker_communication import WorkerUDFPipelineStep
 
 
 @dataclass(frozen=True)
@@ -215,6 +217,87 @@ class AlgorithmExecutionEngine:
             tasks[worker] = task
 
         all_workers_results = self._get_local_run_udfs_results(tasks)
+        return self._share_local_run_udf_results(all_workers_results, share_to_global)
+
+    def run_udf_pipeline_on_local_workers(
+        self, steps: List[UDFPipelineStep]
+    ) -> List[Union[AlgoFlowData, List[AlgoFlowData]]]:
+        """
+        Runs a pipeline of UDFs on the local workers, with a single task per worker.
+        A step can use the outputs of the previous steps, passing UDFPipelineOutput
+        objects as arguments.
+
+        Returns the results of each step, in the form that run_udf_on_local_workers
+        returns them.
+        """
+        command_ids = [self._command_id_generator.get_next_command_id() for _ in steps]
+
+        shares_to_global = []
+        output_schemas = []
+        for step in steps:
+            self._validate_local_run_udf_args(
+                positional_args=step.positional_args,
+                keyword_args=step.keyword_args,
+            )
+            share_to_global = step.share_to_global
+            if isinstance(share_to_global, bool):
+                share_to_global = (share_to_global,)
+            output_schema = step.output_schema
+            if output_schema:
+                if len(share_to_global) != 1:
+                    msg = "output_schema cannot be used with multiple output UDFs."
+                    raise ValueError(msg)
+                output_schema = TableSchema.from_list(output_schema)
+            shares_to_global.append(share_to_global)
+            output_schemas.append(output_schema)
+
+        # Queue the pipeline on all local workers
+        tasks = {}
+        for worker in self._workers.local_workers:
+            pipeline = WorkerUDFPipeline(
+                steps=[
+                    WorkerUDFPipelineStep(
+                        command_id=command_id,
+                        func_name=make_unique_func_name(step.func),
+                        positional_args=algoexec_udf_posargs_to_worker_udf_posargs(
+                            step.positional_args, worker
+                        ),
+                        keyword_args=algoexec_udf_kwargs_to_worker_udf_kwargs(
+                            step.keyword_args, worker
+                        ),
+                        output_schema=output_schema,
+                    )
+                    for step, command_id, output_schema in zip(
+                        steps, command_ids, output_schemas
+                    )
+                ]
+            )
+            tasks[worker] = worker.queue_run_udf_pipeline(
+                pipeline=pipeline, use_smpc=self.use_smpc
+            )
+
+        results_per_worker = {
+            worker: worker.get_udf_pipeline_result(task)
+            for worker, task in tasks.items()
+        }
+        return [
+            self._share_local_run_udf_results(
+                self._group_local_run_udf_results(
+                    {
+                        worker: worker_results[index]
+                        for worker, worker_results in results_per_worker.items()
+                    }
+                ),
+                share_to_global,
+            )
+            for index, share_to_global in enumerate(shares_to_global)
+        ]
+
+    def _share_local_run_udf_results(
+        self,
+        all_workers_results: List[List[Tuple[LocalWorker, WorkerUDFDTO]]],
+        share_to_global: Sequence[bool],
+    ) -> Union[AlgoFlowData, List[AlgoFlowData]]:
         all_local_workers_data = self._convert_local_udf_results_to_local_workers_data(
             all_workers_results
         )
@@ -224,16 +307,9 @@ class AlgorithmExecutionEngine:
         self._validate_share_to(share_to_global, number_of_results)
 
         # Share result to global worker when necessary
-        results_after_sharing_step = [
-            self._share_local_worker_data(
-                local_workers_data, self._command_id_generator.get_next_command_id()
-            )
-            if share
-            else local_workers_data
-            for share, local_workers_data in zip(
-                share_to_global, all_local_workers_data
-            )
-        ]
+        results_after_sharing_step = self._share_local_workers_data(
+            share_to_global, all_local_workers_data
+        )
 
         # SMPC Tables MUST be shared to the global worker
         for result in results_after_sharing_step:
@@ -346,14 +422,23 @@ class AlgorithmExecutionEngine:
     def _share_global_table_to_locals(
         self, global_table: GlobalWorkerTable
     ) -> LocalWorkersTable:
-        local_tables = {
-            worker: worker.create_remote_table(
+        # Queue the remote table creation on all local workers and then wait for all
+        tasks = {
+            worker: worker.queue_create_remote_table(
                 table_name=global_table.table_info.name,
                 table_schema=global_table.table_info.schema_,
                 native_worker=self._workers.global_worker,
             )
             for worker in self._workers.local_workers
         }
+        local_tables = {
+            worker: worker.get_create_remote_table_result(
+                worker_task_result=task,
+                table_name=global_table.table_info.name,
+                table_schema=global_table.table_info.schema_,
+            )
+            for worker, task in tasks.items()
+        }
         return LocalWorkersTable(workers_tables_info=local_tables)
 
     # TABLES functionality
@@ -363,6 +448,39 @@ class AlgorithmExecutionEngine:
     def get_table_schema(self, worker_table) -> TableSchema:
         return worker_table.get_table_schema()
 
+    # VIEWS functionality
+    def create_views_on_local_workers(
+        self,
+        table: LocalWorkersTable,
+        columns_per_view: List[List[str]],
+        filters_per_view: List[Optional[dict]],
+    ) -> List[LocalWorkersTable]:
+        """
+        Creates views, with different columns and filters, on a table of the local
+        workers. Each local worker creates all the views with a single task.
+        """
+        command_id = self._command_id_generator.get_next_command_id()
+
+        tasks = {
+            worker: worker.queue_create_views(
+                command_id=command_id,
+                table_name=table_info.name,
+                columns_per_view=columns_per_view,
+                filters_per_view=filters_per_view,
+            )
+            for worker, table_info in table.workers_tables_info.items()
+        }
+        views_per_worker = {
+            worker: worker.get_create_views_result(task)
+            for worker, task in tasks.items()
+        }
+        return [
+            LocalWorkersTable(
+                {worker: views[count] for worker, views in views_per_worker.items()}
+            )
+            for count in range(len(columns_per_view))
+        ]
+
     def _convert_local_udf_results_to_local_workers_data(
         self, all_workers_results: List[List[Tuple[LocalWorker, WorkerUDFDTO]]]
     ) -> List[LocalWorkersData]:
@@ -393,6 +511,46 @@ class AlgorithmExecutionEngine:
                 raise NotImplementedError
         return results
 
+    def _share_local_workers_data(
+        self,
+        share_to_global: Sequence[bool],
+        all_local_workers_data: List[LocalWorkersData],
+    ) -> List[AlgoFlowData]:
+        command_ids = [
+            self._command_id_generator.get_next_command_id() if share else None
+            for share in share_to_global
+        ]
+
+        # The sharing of all the tables is queued first, on the global worker,
+        # and then all of them are awaited together.
+        tables_sharing_tasks = {
+            index: self._queue_share_local_table_to_global(
+                local_workers_table=local_workers_data,
+                command_id=command_id,
+            )
+            for index, (command_id, local_workers_data) in enumerate(
+                zip(command_ids, all_local_workers_data)
+            )
+            if command_id is not None
+            and isinstance(local_workers_data, LocalWorkersTable)
+        }
+
+        results = []
+        for index, (command_id, local_workers_data) in enumerate(
+            zip(command_ids, all_local_workers_data)
+        ):
+            if command_id is None:
+                results.append(local_workers_data)
+            elif index in tables_sharing_tasks:
+                results.append(
+                    self._get_shared_local_table(tables_sharing_tasks[index])
+                )
+            else:
+                results.append(
+                    self._share_local_worker_data(local_workers_data, command_id)
+                )
+        return results
+
     def _share_local_worker_data(
         self,
         local_workers_data: LocalWorkersData,
@@ -415,26 +573,42 @@ class AlgorithmExecutionEngine:
         local_workers_table: LocalWorkersTable,
         command_id: int,
     ) -> GlobalWorkerTable:
+        task = self._queue_share_local_table_to_global(
+            local_workers_table=local_workers_table,
+            command_id=command_id,
+        )
+        return self._get_shared_local_table(task)
+
+    def _queue_share_local_table_to_global(
+        self,
+        local_workers_table: LocalWorkersTable,
+        command_id: int,
+    ) -> WorkerTaskResult:
         workers_tables = local_workers_table.workers_tables_info
 
         # check the tables have the same schema
         common_schema = self._validate_same_schema_tables(workers_tables)
 
-        # create remote tables on global worker
-        table_infos = [
-            self._workers.global_worker.create_remote_table(
-                table_name=worker_table.name,
-                table_schema=common_schema,
-                native_worker=worker,
-            )
-            for worker, worker_table in workers_tables.items()
-        ]
-
-        # merge remote tables into one merge table on global worker
-        merge_table = self._workers.global_worker.create_merge_table(
-            str(command_id), table_infos
+        # create remote tables on global worker and merge them into one merge
+        # table, in a single task
+        return self._workers.global_worker.queue_create_remote_tables_and_merge_table(
+            command_id=str(command_id),
+            table_info_per_native_worker={
+                worker: TableInfo(
+                    name=worker_table.name,
+                    schema_=common_schema,
+                    type_=worker_table.type_,
+                )
+                for worker, worker_table in workers_tables.items()
+            },
         )
 
+    def _get_shared_local_table(
+        self, worker_task_result: WorkerTaskResult
+    ) -> GlobalWorkerTable:
+        merge_table = self._workers.global_worker.get_create_merge_table_result(
+            worker_task_result
+        )
         return GlobalWorkerTable(
             worker=self._workers.global_worker, table_info=merge_table
         )
@@ -473,14 +647,11 @@ class AlgorithmExecutionEngine:
             max_op=max_op,
         )
 
-        (
-            sum_op_result_table,
-            min_op_result_table,
-            max_op_result_table,
-        ) = get_smpc_results(
+        smpc_tables_info = get_smpc_results(
             worker=self._workers.global_worker,
             context_id=self._workers.global_worker.context_id,
             command_id=command_id,
+            template=global_template_table.table_info,
             sum_op=sum_op,
             min_op=min_op,
             max_op=max_op,
@@ -488,12 +659,7 @@ class AlgorithmExecutionEngine:
 
         return GlobalWorkerSMPCTables(
             worker=self._workers.global_worker,
-            smpc_tables_info=SMPCTablesInfo(
-                template=global_template_table.table_info,
-                sum_op=sum_op_result_table,
-                min_op=min_op_result_table,
-                max_op=max_op_result_table,
-            ),
+            smpc_tables_info=smpc_tables_info,
         )
 
     # -------------helper methods------------
@@ -537,10 +703,16 @@ class AlgorithmExecutionEngine:
 
     def _get_local_run_udfs_results(
         self, tasks: Dict[LocalWorker, WorkerTaskResult]
+    ) -> List[List[Tuple[LocalWorker, WorkerUDFDTO]]]:
+        return self._group_local_run_udf_results(
+            {worker: worker.get_udf_result(task) for worker, task in tasks.items()}
+        )
+
+    def _group_local_run_udf_results(
+        self, results_per_worker: Dict[LocalWorker, List[WorkerUDFDTO]]
     ) -> List[List[Tuple[LocalWorker, WorkerUDFDTO]]]:
         all_workers_results = {}
-        for worker, task in tasks.items():
-            worker_results = worker.get_udf_result(task)
+        for worker, worker_results in results_per_worker.items():
             for index, worker_result in enumerate(worker_results):
                 if index not in all_workers_results:
                     all_workers_results[index] = []
@@ -599,6 +771,22 @@ class AlgorithmExecutionEngineSingleLocalWorker(AlgorithmExecutionEngine):
         super().__init__(**kwargs)
         self._workers.global_worker = self._workers.local_workers[0]
 
+    def _share_local_workers_data(
+        self,
+        share_to_global: Sequence[bool],
+        all_local_workers_data: List[LocalWorkersData],
+    ) -> List[AlgoFlowData]:
+        return [
+            self._share_local_worker_data(
+                local_workers_data, self._command_id_generator.get_next_command_id()
+            )
+            if share
+            else local_workers_data
+            for share, local_workers_data in zip(
+                share_to_global, all_local_workers_data
+            )
+        ]
+
     def _share_local_worker_data(
         self,
         local_workers_data: LocalWorkersData,
@@ -1,11 +1,16 @@
+import concurrent.futures
 from logging import Logger
+from time import monotonic
 from time import sleep
+from typing import Callable
 from typing import List
 from typing import Optional
 from typing import Tuple
+from typing import TypeVar
 
 from exareme2 import smpc_cluster_communication as smpc_cluster
 from exareme2.controller import config as ctrl_config
+from exareme2.controller.celery.tasks_handler import WorkerTaskResult
 from exareme2.controller.services.exareme2.algorithm_flow_data_objects import (
     LocalWorkersSMPCTables,
 )
@@ -13,6 +18,7 @@ from exareme2.controller.services.exareme2.algorithm_flow_data_objects import (
     LocalWorkersTable,
 )
 from exareme2.controller.services.exareme2.workers import GlobalWorker
+from exareme2.controller.services.exareme2.workers import LocalWorker
 from exareme2.smpc_cluster_communication import DifferentialPrivacyParams
 from exareme2.smpc_cluster_communication import SMPCComputationError
 from exareme2.smpc_cluster_communication import SMPCRequestType
@@ -20,8 +26,27 @@ from exareme2.smpc_cluster_communication import SMPCResponse
 from exareme2.smpc_cluster_communication import SMPCResponseStatus
 from exareme2.smpc_cluster_communication import create_payload
 from exareme2.smpc_cluster_communication import trigger_smpc
+from exareme2.worker_communication import SMPCTablesInfo
 from exareme2.worker_communication import TableInfo
 
+# The polling of the SMPC results starts with this interval, in seconds, which
+# is doubled after each poll, up to the configured get_result_interval.
+SMPC_GET_RESULT_INITIAL_INTERVAL = 0.05
+
+T = TypeVar("T")
+
+
+def _run_concurrently(funcs: List[Callable[[], T]]) -> List[T]:
+    """
+    Runs the functions in separate threads and returns their results, in the
+    order of the functions. Exceptions raised by the functions are re-raised.
+    """
+    if len(funcs) <= 1:
+        return [func() for func in funcs]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(funcs)) as executor:
+        futures = [executor.submit(func) for func in funcs]
+        return [future.result() for future in futures]
+
 
 def get_smpc_job_id(
     context_id: str, command_id: int, operation: SMPCRequestType
@@ -29,34 +54,48 @@ def get_smpc_job_id(
     return context_id + "_" + str(command_id) + "_" + str(operation)
 
 
-def load_operation_data_to_smpc_clients(
+def queue_load_operation_data_to_smpc_clients(
     command_id: int,
     local_workers_table: Optional[LocalWorkersTable],
     op_type: SMPCRequestType,
-) -> List[str]:
-    smpc_clients = []
+) -> List[Tuple[LocalWorker, WorkerTaskResult]]:
+    queued_tasks = []
     if local_workers_table:
         for worker, table_info in local_workers_table.workers_tables_info.items():
-            smpc_clients.append(
-                worker.load_data_to_smpc_client(
-                    table_name=table_info.name,
-                    jobid=get_smpc_job_id(table_info.context_id, command_id, op_type),
-                )
+            task = worker.queue_load_data_to_smpc_client(
+                table_name=table_info.name,
+                jobid=get_smpc_job_id(table_info.context_id, command_id, op_type),
             )
-    return smpc_clients
+            queued_tasks.append((worker, task))
+    return queued_tasks
 
 
 def load_data_to_smpc_clients(
     command_id: int, smpc_tables: LocalWorkersSMPCTables
 ) -> Tuple[List[str], List[str], List[str]]:
-    sum_op_smpc_clients = load_operation_data_to_smpc_clients(
-        command_id, smpc_tables.sum_op_local_workers_table, SMPCRequestType.SUM
-    )
-    min_op_smpc_clients = load_operation_data_to_smpc_clients(
-        command_id, smpc_tables.min_op_local_workers_table, SMPCRequestType.MIN
-    )
-    max_op_smpc_clients = load_operation_data_to_smpc_clients(
-        command_id, smpc_tables.max_op_local_workers_table, SMPCRequestType.MAX
+    """
+    Loads the data of all the SMPC operations to the SMPC clients of the local
+    workers. The loading tasks of all the workers and operations are queued
+    before waiting for any of them.
+    """
+    queued_tasks_per_op = [
+        queue_load_operation_data_to_smpc_clients(
+            command_id, smpc_tables.sum_op_local_workers_table, SMPCRequestType.SUM
+        ),
+        queue_load_operation_data_to_smpc_clients(
+            command_id, smpc_tables.min_op_local_workers_table, SMPCRequestType.MIN
+        ),
+        queue_load_operation_data_to_smpc_clients(
+            command_id, smpc_tables.max_op_local_workers_table, SMPCRequestType.MAX
+        ),
+    ]
+    (
+        sum_op_smpc_clients,
+        min_op_smpc_clients,
+        max_op_smpc_clients,
+    ) = (
+        [worker.get_load_data_to_smpc_client_result(task) for worker, task in tasks]
+        for tasks in queued_tasks_per_op
     )
     return (
         sum_op_smpc_clients,
@@ -98,151 +137,148 @@ def trigger_smpc_operations(
     smpc_clients_per_op: Tuple[List[str], List[str], List[str]],
     dp_params: DifferentialPrivacyParams = None,
 ) -> Tuple[bool, bool, bool]:
+    """
+    Triggers the SMPC operations concurrently and returns whether each of the
+    sum, min and max operations was triggered.
+    """
     (
         sum_op_smpc_clients,
         min_op_smpc_clients,
         max_op_smpc_clients,
     ) = smpc_clients_per_op
-    sum_op = _trigger_smpc_operation(
-        logger,
-        context_id,
-        command_id,
-        SMPCRequestType.SUM,
-        sum_op_smpc_clients,
-        dp_params,
-    )
-    min_op = _trigger_smpc_operation(
-        logger,
-        context_id,
-        command_id,
-        SMPCRequestType.MIN,
-        min_op_smpc_clients,
-        dp_params,
-    )
-    max_op = _trigger_smpc_operation(
-        logger,
-        context_id,
-        command_id,
-        SMPCRequestType.MAX,
-        max_op_smpc_clients,
-        dp_params,
+    sum_op, min_op, max_op = _run_concurrently(
+        [
+            lambda: _trigger_smpc_operation(
+                logger,
+                context_id,
+                command_id,
+                SMPCRequestType.SUM,
+                sum_op_smpc_clients,
+                dp_params,
+            ),
+            lambda: _trigger_smpc_operation(
+                logger,
+                context_id,
+                command_id,
+                SMPCRequestType.MIN,
+                min_op_smpc_clients,
+                dp_params,
+            ),
+            lambda: _trigger_smpc_operation(
+                logger,
+                context_id,
+                command_id,
+                SMPCRequestType.MAX,
+                max_op_smpc_clients,
+                dp_params,
+            ),
+        ]
     )
     return sum_op, min_op, max_op
 
 
-def wait_for_smpc_result_to_be_ready(
+def _is_smpc_result_ready(jobid: str) -> bool:
+    response = smpc_cluster.get_smpc_result(
+        coordinator_address=ctrl_config.smpc.coordinator_address,
+        jobid=jobid,
+    )
+    try:
+        smpc_response = SMPCResponse.parse_raw(response)
+    except Exception as exc:
+        raise SMPCComputationError(
+            f"The SMPC response could not be parsed. \nResponse{response}. \nException: {exc}"
+        )
+
+    if smpc_response.status == SMPCResponseStatus.FAILED:
+        raise SMPCComputationError(
+            f"The SMPC returned a {SMPCResponseStatus.FAILED} status. Body: {response}"
+        )
+    return smpc_response.status == SMPCResponseStatus.COMPLETED
+
+
+def wait_for_smpc_results_to_be_ready(
     logger: Logger,
     context_id: str,
     command_id: int,
-    operation: SMPCRequestType,
+    sum_op: bool,
+    min_op: bool,
+    max_op: bool,
 ):
-    jobid = get_smpc_job_id(
-        context_id=context_id,
-        command_id=command_id,
-        operation=operation,
-    )
+    """
+    Waits for all the triggered SMPC operations at once, polling the pending
+    ones concurrently. The polling interval starts at
+    SMPC_GET_RESULT_INITIAL_INTERVAL and is doubled after each poll, up to
+    get_result_interval. The operations should finish within
+    get_result_max_retries times the get_result_interval.
+    """
+    jobids = [
+        get_smpc_job_id(context_id=context_id, command_id=command_id, operation=op)
+        for op, triggered in [
+            (SMPCRequestType.SUM, sum_op),
+            (SMPCRequestType.MIN, min_op),
+            (SMPCRequestType.MAX, max_op),
+        ]
+        if triggered
+    ]
+    if not jobids:
+        return
 
-    logger.info(f"Waiting for SMPC, with jobid: '{jobid}', to finish.")
+    logger.info(f"Waiting for SMPC, with jobids: '{jobids}', to finish.")
 
-    attempts = 0
+    max_interval = ctrl_config.smpc.get_result_interval
+    deadline = monotonic() + max_interval * ctrl_config.smpc.get_result_max_retries
+    interval = min(SMPC_GET_RESULT_INITIAL_INTERVAL, max_interval)
+    pending_jobids = jobids
     while True:
-        sleep(ctrl_config.smpc.get_result_interval)
+        sleep(interval)
 
-        response = smpc_cluster.get_smpc_result(
-            coordinator_address=ctrl_config.smpc.coordinator_address,
-            jobid=jobid,
+        ready = _run_concurrently(
+            [
+                lambda jobid=jobid: _is_smpc_result_ready(jobid)
+                for jobid in pending_jobids
+            ]
         )
-        try:
-            smpc_response = SMPCResponse.parse_raw(response)
-        except Exception as exc:
-            raise SMPCComputationError(
-                f"The SMPC response could not be parsed. \nResponse{response}. \nException: {exc}"
-            )
-
-        if smpc_response.status == SMPCResponseStatus.FAILED:
-            raise SMPCComputationError(
-                f"The SMPC returned a {SMPCResponseStatus.FAILED} status. Body: {response}"
-            )
-        elif smpc_response.status == SMPCResponseStatus.COMPLETED:
+        pending_jobids = [
+            jobid for jobid, is_ready in zip(pending_jobids, ready) if not is_ready
+        ]
+        if not pending_jobids:
             break
 
-        if attempts > ctrl_config.smpc.get_result_max_retries:
+        if monotonic() > deadline:
             raise SMPCComputationError(
                 f"Max retries for the SMPC exceeded the limit: {ctrl_config.smpc.get_result_max_retries}"
             )
-        attempts += 1
-    logger.info(f"SMPC, with jobid: '{jobid}', finished.")
-
-
-def wait_for_smpc_results_to_be_ready(
-    logger: Logger,
-    context_id: str,
-    command_id: int,
-    sum_op: bool,
-    min_op: bool,
-    max_op: bool,
-):
-    wait_for_smpc_result_to_be_ready(
-        logger, context_id, command_id, SMPCRequestType.SUM
-    ) if sum_op else None
-    wait_for_smpc_result_to_be_ready(
-        logger, context_id, command_id, SMPCRequestType.MIN
-    ) if min_op else None
-    wait_for_smpc_result_to_be_ready(
-        logger, context_id, command_id, SMPCRequestType.MAX
-    ) if max_op else None
+        interval = min(interval * 2, max_interval)
+    logger.info(f"SMPC, with jobids: '{jobids}', finished.")
 
 
 def get_smpc_results(
     worker: GlobalWorker,
     context_id: str,
     command_id: int,
+    template: TableInfo,
     sum_op: bool,
     min_op: bool,
     max_op: bool,
-) -> Tuple[TableInfo, TableInfo, TableInfo]:
-    sum_op_result_table = (
-        worker.get_smpc_result(
-            jobid=get_smpc_job_id(
-                context_id=context_id,
-                command_id=command_id,
-                operation=SMPCRequestType.SUM,
-            ),
-            command_id=str(command_id),
-            command_subid="0",
-        )
-        if sum_op
+) -> SMPCTablesInfo:
+    """
+    Fetches the results of the SMPC operations into tables of the global
+    worker, in a single task, and returns them with their template table.
+    """
+    sum_op_jobid, min_op_jobid, max_op_jobid = (
+        get_smpc_job_id(context_id=context_id, command_id=command_id, operation=op)
+        if triggered
         else None
+        for op, triggered in [
+            (SMPCRequestType.SUM, sum_op),
+            (SMPCRequestType.MIN, min_op),
+            (SMPCRequestType.MAX, max_op),
+        ]
     )
-    min_op_result_table = (
-        worker.get_smpc_result(
-            jobid=get_smpc_job_id(
-                context_id=context_id,
-                command_id=command_id,
-                operation=SMPCRequestType.MIN,
-            ),
-            command_id=str(command_id),
-            command_subid="1",
-        )
-        if min_op
-        else None
-    )
-    max_op_result_table = (
-        worker.get_smpc_result(
-            jobid=get_smpc_job_id(
-                context_id=context_id,
-                command_id=command_id,
-                operation=SMPCRequestType.MAX,
-            ),
-            command_id=str(command_id),
-            command_subid="2",
-        )
-        if max_op
-        else None
-    )
-
-    return (
-        sum_op_result_table,
-        min_op_result_table,
-        max_op_result_table,
+    return worker.get_smpc_results(
+        command_id=str(command_id),
+        template=template,
+        sum_op_jobid=sum_op_jobid,
+        min_op_jobid=min_op_jobid,
+        max_op_jobid=max_op_jobid,
     )
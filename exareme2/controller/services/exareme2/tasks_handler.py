@@ -4,12 +4,15 @@ from typing import Optional
 from exareme2.controller import logger as ctrl_logger
 from exareme2.controller.celery.tasks_handler import WorkerTaskResult
 from exareme2.controller.celery.tasks_handler import WorkerTasksHandler
+from exareme2.worker_communication import SMPCTablesInfo
 from exareme2.worker_communication import TableData
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableSchema
 from exareme2.worker_communication import TableType
 from exareme2.worker_communication import WorkerUDFDTO
 from exareme2.worker_communication import WorkerUDFKeyArguments
+from exareme2.worker_communication import WorkerUDFPipeline
+from exareme2.worker_communication import WorkerUDFPipelineResults
 from exareme2.worker_communication import WorkerUDFPosArguments
 from exareme2.worker_communication import WorkerUDFResults
 
@@ -57,7 +60,7 @@ class Exareme2TasksHandler:
         result = self._worker_tasks_handler.get_table_data(
             request_id=self._request_id, table_name=table_name
         ).get(self._tasks_timeout)
-        return TableData.parse_raw(result)
+        return TableData.parse_trusted_raw(result)
 
     def create_table(
         self, context_id: str, command_id: str, schema: TableSchema
@@ -87,7 +90,30 @@ class Exareme2TasksHandler:
         dropna: bool = True,
         check_min_rows: bool = True,
     ) -> List[TableInfo]:
-        result_str = self._worker_tasks_handler.create_data_model_views(
+        worker_task_result = self.queue_create_data_model_views(
+            context_id=context_id,
+            command_id=command_id,
+            data_model=data_model,
+            datasets=datasets,
+            columns_per_view=columns_per_view,
+            filters=filters,
+            dropna=dropna,
+            check_min_rows=check_min_rows,
+        )
+        return self.get_create_data_model_views_result(worker_task_result)
+
+    def queue_create_data_model_views(
+        self,
+        context_id: str,
+        command_id: str,
+        data_model: str,
+        datasets: List[str],
+        columns_per_view: List[List[str]],
+        filters: dict,
+        dropna: bool = True,
+        check_min_rows: bool = True,
+    ) -> WorkerTaskResult:
+        return self._worker_tasks_handler.create_data_model_views(
             request_id=self._request_id,
             context_id=context_id,
             command_id=command_id,
@@ -97,10 +123,38 @@ class Exareme2TasksHandler:
             filters=filters,
             dropna=dropna,
             check_min_rows=check_min_rows,
-        ).get(self._tasks_timeout)
+        )
+
+    def get_create_data_model_views_result(
+        self, worker_task_result: WorkerTaskResult
+    ) -> List[TableInfo]:
+        result_str = worker_task_result.get(self._tasks_timeout)
         result = [TableInfo.parse_raw(res) for res in result_str]
         return result
 
+    def queue_create_views(
+        self,
+        context_id: str,
+        command_id: str,
+        table_name: str,
+        columns_per_view: List[List[str]],
+        filters_per_view: List[Optional[dict]],
+    ) -> WorkerTaskResult:
+        return self._worker_tasks_handler.create_views(
+            request_id=self._request_id,
+            context_id=context_id,
+            command_id=command_id,
+            table_name=table_name,
+            columns_per_view=columns_per_view,
+            filters_per_view=filters_per_view,
+        )
+
+    def get_create_views_result(
+        self, worker_task_result: WorkerTaskResult
+    ) -> List[TableInfo]:
+        result_str = worker_task_result.get(self._tasks_timeout)
+        return [TableInfo.parse_raw(res) for res in result_str]
+
     # MERGE TABLES functionality
     def get_merge_tables(self, context_id: str) -> List[str]:
         return self._worker_tasks_handler.get_merge_tables(
@@ -137,18 +191,64 @@ class Exareme2TasksHandler:
         table_schema: TableSchema,
         monetdb_socket_address: str,
     ) -> TableInfo:
-        self._worker_tasks_handler.create_remote_table(
+        worker_task_result = self.queue_create_remote_table(
+            table_name=table_name,
+            table_schema=table_schema,
+            monetdb_socket_address=monetdb_socket_address,
+        )
+        return self.get_create_remote_table_result(
+            worker_task_result=worker_task_result,
+            table_name=table_name,
+            table_schema=table_schema,
+        )
+
+    def queue_create_remote_table(
+        self,
+        table_name: str,
+        table_schema: TableSchema,
+        monetdb_socket_address: str,
+    ) -> WorkerTaskResult:
+        return self._worker_tasks_handler.create_remote_table(
             request_id=self._request_id,
             table_name=table_name,
             table_schema=table_schema,
             monetdb_socket_address=monetdb_socket_address,
-        ).get(self._tasks_timeout)
+        )
+
+    def get_create_remote_table_result(
+        self,
+        worker_task_result: WorkerTaskResult,
+        table_name: str,
+        table_schema: TableSchema,
+    ) -> TableInfo:
+        worker_task_result.get(self._tasks_timeout)
         return TableInfo(
             name=table_name,
             schema_=table_schema,
             type_=TableType.REMOTE,
         )
 
+    def queue_create_remote_tables_and_merge_table(
+        self,
+        context_id: str,
+        command_id: str,
+        table_infos: List[TableInfo],
+        monetdb_socket_addresses: List[str],
+    ) -> WorkerTaskResult:
+        return self._worker_tasks_handler.create_remote_tables_and_merge_table(
+            request_id=self._request_id,
+            context_id=context_id,
+            command_id=command_id,
+            table_infos=table_infos,
+            monetdb_socket_addresses=monetdb_socket_addresses,
+        )
+
+    def get_create_merge_table_result(
+        self, worker_task_result: WorkerTaskResult
+    ) -> TableInfo:
+        result = worker_task_result.get(self._tasks_timeout)
+        return TableInfo.parse_raw(result)
+
     # UDFs functionality
     def queue_run_udf(
         self,
@@ -177,6 +277,28 @@ class Exareme2TasksHandler:
         result = worker_task_result.get(self._tasks_timeout)
         return (WorkerUDFResults.parse_raw(result)).results
 
+    def queue_run_udf_pipeline(
+        self,
+        context_id: str,
+        pipeline: WorkerUDFPipeline,
+        use_smpc: bool = False,
+    ) -> WorkerTaskResult:
+        return self._worker_tasks_handler.queue_run_udf_pipeline(
+            request_id=self._request_id,
+            context_id=context_id,
+            pipeline=pipeline,
+            use_smpc=use_smpc,
+        )
+
+    def get_udf_pipeline_result(
+        self, worker_task_result: WorkerTaskResult
+    ) -> List[List[WorkerUDFDTO]]:
+        result = worker_task_result.get(self._tasks_timeout)
+        return [
+            udf_results.results
+            for udf_results in WorkerUDFPipelineResults.parse_raw(result).results
+        ]
+
     # ------------- SMPC functionality ---------------
     def validate_smpc_templates_match(
         self,
@@ -187,34 +309,44 @@ class Exareme2TasksHandler:
             table_name=table_name,
         ).get(self._tasks_timeout)
 
-    def load_data_to_smpc_client(self, table_name: str, jobid: str) -> str:
-        result = self._worker_tasks_handler.load_data_to_smpc_client(
+    def queue_load_data_to_smpc_client(
+        self, table_name: str, jobid: str
+    ) -> WorkerTaskResult:
+        return self._worker_tasks_handler.load_data_to_smpc_client(
             request_id=self._request_id,
             table_name=table_name,
             jobid=jobid,
-        ).get(self._tasks_timeout)
-        return result
+        )
 
-    def get_smpc_result(
+    def get_load_data_to_smpc_client_result(
+        self, worker_task_result: WorkerTaskResult
+    ) -> str:
+        return worker_task_result.get(self._tasks_timeout)
+
+    def get_smpc_results(
         self,
-        jobid: str,
         context_id: str,
         command_id: str,
-        command_subid: Optional[str] = "0",
-    ) -> TableInfo:
-        result = self._worker_tasks_handler.get_smpc_result(
+        template: TableInfo,
+        sum_op_jobid: Optional[str] = None,
+        min_op_jobid: Optional[str] = None,
+        max_op_jobid: Optional[str] = None,
+    ) -> SMPCTablesInfo:
+        result = self._worker_tasks_handler.get_smpc_results(
             request_id=self._request_id,
-            jobid=jobid,
             context_id=context_id,
             command_id=command_id,
-            command_subid=command_subid,
+            template_json=template.json(),
+            sum_op_jobid=sum_op_jobid,
+            min_op_jobid=min_op_jobid,
+            max_op_jobid=max_op_jobid,
         ).get(self._tasks_timeout)
-        return TableInfo.parse_raw(result)
+        return SMPCTablesInfo.parse_raw(result)
 
-    def queue_cleanup(self, context_id: str):
+    def queue_cleanup(self, context_ids: List[str]):
         return self._worker_tasks_handler.queue_cleanup(
             request_id=self._request_id,
-            context_id=context_id,
+            context_ids=context_ids,
         )
 
     def wait_queued_cleanup_complete(self, worker_task_result: WorkerTaskResult):
@@ -1,17 +1,20 @@
 from abc import ABC
 from abc import abstractmethod
+from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Tuple
 
 from exareme2.controller.celery.tasks_handler import WorkerTaskResult
 from exareme2.controller.services.exareme2.tasks_handler import Exareme2TasksHandler
+from exareme2.worker_communication import SMPCTablesInfo
 from exareme2.worker_communication import TableData
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableSchema
 from exareme2.worker_communication import WorkerSMPCDTO
 from exareme2.worker_communication import WorkerUDFDTO
 from exareme2.worker_communication import WorkerUDFKeyArguments
+from exareme2.worker_communication import WorkerUDFPipeline
 from exareme2.worker_communication import WorkerUDFPosArguments
 
 
@@ -117,6 +120,26 @@ class _Worker(_IWorker, ABC):
     def get_views(self) -> List[str]:
         return self._tasks_handler.get_views(context_id=self.context_id)
 
+    def queue_create_views(
+        self,
+        command_id: str,
+        table_name: str,
+        columns_per_view: List[List[str]],
+        filters_per_view: List[Optional[dict]],
+    ) -> WorkerTaskResult:
+        return self._tasks_handler.queue_create_views(
+            context_id=self.context_id,
+            command_id=command_id,
+            table_name=table_name,
+            columns_per_view=columns_per_view,
+            filters_per_view=filters_per_view,
+        )
+
+    def get_create_views_result(
+        self, worker_task_result: WorkerTaskResult
+    ) -> List[TableInfo]:
+        return self._tasks_handler.get_create_views_result(worker_task_result)
+
     # MERGE TABLES functionality
     def get_merge_tables(self) -> List[str]:
         return self._tasks_handler.get_merge_tables(context_id=self.context_id)
@@ -147,6 +170,30 @@ class _Worker(_IWorker, ABC):
             monetdb_socket_address=monetdb_socket_addr,
         )
 
+    def queue_create_remote_table(
+        self,
+        table_name: str,
+        table_schema: TableSchema,
+        native_worker: "_Worker",
+    ) -> WorkerTaskResult:
+        return self._tasks_handler.queue_create_remote_table(
+            table_name=table_name,
+            table_schema=table_schema,
+            monetdb_socket_address=native_worker.worker_address,
+        )
+
+    def get_create_remote_table_result(
+        self,
+        worker_task_result: WorkerTaskResult,
+        table_name: str,
+        table_schema: TableSchema,
+    ) -> TableInfo:
+        return self._tasks_handler.get_create_remote_table_result(
+            worker_task_result=worker_task_result,
+            table_name=table_name,
+            table_schema=table_schema,
+        )
+
     # UDFs functionality
     def queue_run_udf(
         self,
@@ -242,16 +289,90 @@ class LocalWorker(_Worker):
             check_min_rows=check_min_rows,
         )
 
+    def queue_create_data_model_views(
+        self,
+        command_id: str,
+        columns_per_view: List[List[str]],
+        filters: dict = None,
+        dropna: bool = True,
+        check_min_rows: bool = True,
+    ) -> WorkerTaskResult:
+        return self._tasks_handler.queue_create_data_model_views(
+            context_id=self.context_id,
+            command_id=command_id,
+            data_model=self._data_model,
+            datasets=self._datasets,
+            columns_per_view=columns_per_view,
+            filters=filters,
+            dropna=dropna,
+            check_min_rows=check_min_rows,
+        )
+
+    def get_create_data_model_views_result(
+        self, worker_task_result: WorkerTaskResult
+    ) -> List[TableInfo]:
+        return self._tasks_handler.get_create_data_model_views_result(
+            worker_task_result
+        )
+
     def get_udf_result(
         self, worker_task_result: WorkerTaskResult
     ) -> List[WorkerUDFDTO]:
         return self._tasks_handler.get_udf_result(worker_task_result)
 
-    def load_data_to_smpc_client(self, table_name: str, jobid: str) -> str:
-        return self._tasks_handler.load_data_to_smpc_client(table_name, jobid)
+    def queue_run_udf_pipeline(
+        self, pipeline: WorkerUDFPipeline, use_smpc: bool = False
+    ) -> WorkerTaskResult:
+        return self._tasks_handler.queue_run_udf_pipeline(
+            context_id=self.context_id,
+            pipeline=pipeline,
+            use_smpc=use_smpc,
+        )
+
+    def get_udf_pipeline_result(
+        self, worker_task_result: WorkerTaskResult
+    ) -> List[List[WorkerUDFDTO]]:
+        return self._tasks_handler.get_udf_pipeline_result(worker_task_result)
+
+    def queue_load_data_to_smpc_client(
+        self, table_name: str, jobid: str
+    ) -> WorkerTaskResult:
+        return self._tasks_handler.queue_load_data_to_smpc_client(table_name, jobid)
+
+    def get_load_data_to_smpc_client_result(
+        self, worker_task_result: WorkerTaskResult
+    ) -> str:
+        return self._tasks_handler.get_load_data_to_smpc_client_result(
+            worker_task_result
+        )
 
 
 class GlobalWorker(_Worker):
+    def queue_create_remote_tables_and_merge_table(
+        self,
+        command_id: str,
+        table_info_per_native_worker: Dict[_Worker, TableInfo],
+    ) -> WorkerTaskResult:
+        """
+        Queues, in a single task, the creation of a remote table for each of the
+        given tables, located on their native workers, and the creation of a merge
+        table on top of them.
+        """
+        return self._tasks_handler.queue_create_remote_tables_and_merge_table(
+            context_id=self.context_id,
+            command_id=command_id,
+            table_infos=list(table_info_per_native_worker.values()),
+            monetdb_socket_addresses=[
+                native_worker.worker_address
+                for native_worker in table_info_per_native_worker.keys()
+            ],
+        )
+
+    def get_create_merge_table_result(
+        self, worker_task_result: WorkerTaskResult
+    ) -> TableInfo:
+        return self._tasks_handler.get_create_merge_table_result(worker_task_result)
+
     def get_udf_result(
         self, worker_task_result: WorkerTaskResult
     ) -> List[WorkerUDFDTO]:
@@ -269,15 +390,19 @@ class GlobalWorker(_Worker):
     ):
         self._tasks_handler.validate_smpc_templates_match(table_name)
 
-    def get_smpc_result(
+    def get_smpc_results(
         self,
-        jobid: str,
         command_id: str,
-        command_subid: Optional[str] = "0",
-    ) -> TableInfo:
-        return self._tasks_handler.get_smpc_result(
-            jobid=jobid,
+        template: TableInfo,
+        sum_op_jobid: Optional[str] = None,
+        min_op_jobid: Optional[str] = None,
+        max_op_jobid: Optional[str] = None,
+    ) -> SMPCTablesInfo:
+        return self._tasks_handler.get_smpc_results(
             context_id=self.context_id,
             command_id=str(command_id),
-            command_subid=command_subid,
+            template=template,
+            sum_op_jobid=sum_op_jobid,
+            min_op_jobid=min_op_jobid,
+            max_op_jobid=max_op_jobid,
         )
@@ -1,11 +1,13 @@
-from typing import Dict
+from typing import Optional
 
 from exareme2.controller import logger as ctrl_logger
+from exareme2.controller.celery.tasks_handler import WorkerTaskResult
 from exareme2.controller.celery.tasks_handler import WorkerTasksHandler
 from exareme2.worker_communication import CommonDataElements
 from exareme2.worker_communication import DataModelAttributes
 from exareme2.worker_communication import DatasetsInfoPerDataModel
 from exareme2.worker_communication import WorkerInfo
+from exareme2.worker_communication import WorkerMetadataSnapshot
 
 
 class WorkerInfoTasksHandler:
@@ -18,31 +20,87 @@ class WorkerInfoTasksHandler:
             self._worker_queue_addr, self._logger
         )
 
-    def get_worker_info_task(self) -> WorkerInfo:
-        result = self._worker_tasks_handler.queue_worker_info_task(
-            self._request_id
-        ).get(self._tasks_timeout)
+    def _get_result(
+        self, worker_task_result: WorkerTaskResult, timeout: Optional[float]
+    ):
+        if timeout is None:
+            timeout = self._tasks_timeout
+        return worker_task_result.get(timeout)
+
+    def queue_worker_info_task(self) -> WorkerTaskResult:
+        return self._worker_tasks_handler.queue_worker_info_task(self._request_id)
+
+    def get_worker_info_result(
+        self, worker_task_result: WorkerTaskResult, timeout: Optional[float] = None
+    ) -> WorkerInfo:
+        result = self._get_result(worker_task_result, timeout)
         return WorkerInfo.parse_raw(result)
 
-    def get_worker_datasets_per_data_model_task(self) -> DatasetsInfoPerDataModel:
-        result = self._worker_tasks_handler.queue_worker_datasets_per_data_model_task(
+    def get_worker_info_task(self) -> WorkerInfo:
+        return self.get_worker_info_result(self.queue_worker_info_task())
+
+    def queue_worker_datasets_per_data_model_task(self) -> WorkerTaskResult:
+        return self._worker_tasks_handler.queue_worker_datasets_per_data_model_task(
             self._request_id
-        ).get(self._tasks_timeout)
+        )
+
+    def get_worker_datasets_per_data_model_result(
+        self, worker_task_result: WorkerTaskResult, timeout: Optional[float] = None
+    ) -> DatasetsInfoPerDataModel:
+        result = self._get_result(worker_task_result, timeout)
         return DatasetsInfoPerDataModel.parse_raw(result)
 
-    def get_data_model_cdes_task(self, data_model: str) -> CommonDataElements:
-        result = self._worker_tasks_handler.queue_data_model_cdes_task(
+    def get_worker_datasets_per_data_model_task(self) -> DatasetsInfoPerDataModel:
+        return self.get_worker_datasets_per_data_model_result(
+            self.queue_worker_datasets_per_data_model_task()
+        )
+
+    def queue_data_model_cdes_task(self, data_model: str) -> WorkerTaskResult:
+        return self._worker_tasks_handler.queue_data_model_cdes_task(
             request_id=self._request_id,
             data_model=data_model,
-        ).get(self._tasks_timeout)
+        )
+
+    def get_data_model_cdes_result(
+        self, worker_task_result: WorkerTaskResult, timeout: Optional[float] = None
+    ) -> CommonDataElements:
+        result = self._get_result(worker_task_result, timeout)
         return CommonDataElements.parse_raw(result)
 
-    def get_data_model_attributes_task(self, data_model: str) -> DataModelAttributes:
-        result = self._worker_tasks_handler.queue_data_model_attributes_task(
+    def get_data_model_cdes_task(self, data_model: str) -> CommonDataElements:
+        return self.get_data_model_cdes_result(
+            self.queue_data_model_cdes_task(data_model)
+        )
+
+    def queue_data_model_attributes_task(self, data_model: str) -> WorkerTaskResult:
+        return self._worker_tasks_handler.queue_data_model_attributes_task(
             self._request_id, data_model
-        ).get(self._tasks_timeout)
+        )
+
+    def get_data_model_attributes_result(
+        self, worker_task_result: WorkerTaskResult, timeout: Optional[float] = None
+    ) -> DataModelAttributes:
+        result = self._get_result(worker_task_result, timeout)
         return DataModelAttributes.parse_raw(result)
 
+    def get_data_model_attributes_task(self, data_model: str) -> DataModelAttributes:
+        return self.get_data_model_attributes_result(
+            self.queue_data_model_attributes_task(data_model)
+        )
+
+    def queue_worker_metadata_snapshot_task(
+        self, known_content_hash: Optional[str] = None
+    ) -> WorkerTaskResult:
+        return self._worker_tasks_handler.queue_worker_metadata_snapshot_task(
+            self._request_id, known_content_hash
+        )
+
+    def get_worker_metadata_snapshot_result(
+        self, worker_task_result: WorkerTaskResult, timeout: Optional[float] = None
+    ) -> WorkerMetadataSnapshot:
+        result = self._get_result(worker_task_result, timeout)
+        return WorkerMetadataSnapshot.parse_raw(result)
+
     def get_healthcheck_task(self, check_db: bool):
         return self._worker_tasks_handler.queue_healthcheck_task(
             request_id=self._request_id,
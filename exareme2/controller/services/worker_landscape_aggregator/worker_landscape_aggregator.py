@@ -29,14 +29,19 @@ from exareme2.utils import AttrDict
 from exareme2.worker_communication import CommonDataElement
 from exareme2.worker_communication import CommonDataElements
 from exareme2.worker_communication import DataModelAttributes
+from exareme2.worker_communication import DataModelsMetadataSnapshot
 from exareme2.worker_communication import DatasetInfo
 from exareme2.worker_communication import DatasetMissingCsvPathError
-from exareme2.worker_communication import DatasetsInfoPerDataModel
 from exareme2.worker_communication import WorkerInfo
+from exareme2.worker_communication import WorkerMetadataSnapshot
 from exareme2.worker_communication import WorkerRole
 
 WORKER_LANDSCAPE_AGGREGATOR_REQUEST_ID = "WORKER_LANDSCAPE_AGGREGATOR"
 LONGITUDINAL = "longitudinal"
+MIN_TASK_TIMEOUT = 0.1
+# Number of consecutive updates a worker may fail to respond in time, while
+# keeping its last known snapshot, before it is removed from the federation.
+MAX_CONSECUTIVE_TIMEOUTS = 3
 
 
 class ImmutableBaseModel(BaseModel, ABC):
@@ -44,10 +49,6 @@ class ImmutableBaseModel(BaseModel, ABC):
         allow_mutation = False
 
 
-def _get_worker_socket_addr(worker_info: WorkerInfo):
-    return f"{worker_info.ip}:{worker_info.port}"
-
-
 def _have_common_elements(a: List[Any], b: List[Any]):
     return bool(set(a) & set(b))
 
@@ -274,6 +275,26 @@ class DataModelsMetadataPerWorker(ImmutableBaseModel):
     data_models_metadata_per_worker: Dict[str, DataModelsMetadata]
 
 
+def _get_data_models_metadata_from_snapshot(
+    snapshot: DataModelsMetadataSnapshot,
+) -> DataModelsMetadata:
+    return DataModelsMetadata(
+        data_models_metadata={
+            data_model: DataModelMetadata(
+                dataset_infos=dataset_infos,
+                cdes=snapshot.cdes_per_data_model.get(data_model),
+                attributes=snapshot.attributes_per_data_model.get(data_model),
+            )
+            for data_model, dataset_infos in snapshot.datasets_info_per_data_model.items()
+        }
+    )
+
+
+def _get_remaining_timeout(deadline: float) -> float:
+    # A celery timeout of 0 means no timeout at all, so a minimum is required
+    return max(deadline - time.monotonic(), MIN_TASK_TIMEOUT)
+
+
 class WorkerLandscapeAggregator:
     def __init__(
         self,
@@ -290,6 +311,8 @@ class WorkerLandscapeAggregator:
         self._deployment_type = deployment_type
         self._localworkers = localworkers
         self._registries = _wlaRegistries()
+        self._metadata_snapshots_cache: Dict[str, WorkerMetadataSnapshot] = {}
+        self._consecutive_timeouts: Dict[str, int] = {}
         self._keep_updating = True
         self._update_loop_thread = None
 
@@ -301,8 +324,8 @@ class WorkerLandscapeAggregator:
         The Data Model Registry contains two types of information, data_models and datasets_locations.
         data_models contains information about the data models and their corresponding cdes.
         datasets_locations contains information about datasets and their locations(workers).
-        wla periodically will send requests (get_worker_info, get_worker_datasets_per_data_model, get_data_model_cdes),
-        to the workers to retrieve the current information that they contain.
+        wla periodically will send a get_worker_metadata_snapshot request to each worker, to retrieve the current
+        information that they contain. The data models metadata are only sent back when they have changed.
         Once all information about data models and cdes is aggregated,
         any data model that is incompatible across workers will be removed.
         A data model is incompatible when the cdes across workers are not identical, except one edge case.
@@ -373,90 +396,100 @@ class WorkerLandscapeAggregator:
         for task_handler in worker_info_tasks_handlers:
             task_handler.get_healthcheck_task(False)
 
-    def _get_workers_info(self, workers_socket_addr: List[str]) -> List[WorkerInfo]:
-        worker_info_tasks_handlers = [
-            WorkerInfoTasksHandler(
-                worker_queue_addr=worker_queue_addr,
-                tasks_timeout=self._worker_info_tasks_timeout,
-                request_id=WORKER_LANDSCAPE_AGGREGATOR_REQUEST_ID,
+    def _get_worker_info_tasks_handler(
+        self, worker_queue_addr: str
+    ) -> WorkerInfoTasksHandler:
+        return WorkerInfoTasksHandler(
+            worker_queue_addr=worker_queue_addr,
+            tasks_timeout=self._worker_info_tasks_timeout,
+            request_id=WORKER_LANDSCAPE_AGGREGATOR_REQUEST_ID,
+        )
+
+    def _get_workers_metadata_snapshots(
+        self, workers_socket_addr: List[str]
+    ) -> List[WorkerMetadataSnapshot]:
+        """
+        Fetches a metadata snapshot from each worker, sending the content hash of the
+        last snapshot received by the worker, so that unchanged data models metadata
+        are not sent again.
+
+        A worker that fails to respond in time keeps its last known snapshot for up to
+        MAX_CONSECUTIVE_TIMEOUTS updates, and is then removed from the federation until
+        it responds again. A worker whose address is no longer discovered, or whose
+        broker cannot be reached, is removed from the federation.
+        """
+        # All the tasks are queued before waiting for any of them, so the
+        # total waiting time is bounded by the slowest worker, not their sum.
+        deadline = time.monotonic() + self._worker_info_tasks_timeout
+        queued_tasks = []
+        for worker_queue_addr in workers_socket_addr:
+            tasks_handler = self._get_worker_info_tasks_handler(worker_queue_addr)
+            last_known = self._metadata_snapshots_cache.get(worker_queue_addr)
+            known_content_hash = (
+                last_known.data_models_metadata.content_hash if last_known else None
             )
-            for worker_queue_addr in workers_socket_addr
-        ]
-        workers_info = []
-        for tasks_handler in worker_info_tasks_handlers:
             try:
-                result = tasks_handler.get_worker_info_task()
-                workers_info.append(result)
-            except (CeleryConnectionError, CeleryTaskTimeoutException) as exc:
+                queued_tasks.append(
+                    (
+                        worker_queue_addr,
+                        tasks_handler,
+                        tasks_handler.queue_worker_metadata_snapshot_task(
+                            known_content_hash
+                        ),
+                    )
+                )
+            except CeleryConnectionError as exc:
                 # just log the exception do not reraise it
                 self._logger.warning(exc)
             except Exception:
                 # just log full traceback exception as error and do not reraise it
                 self._logger.error(traceback.format_exc())
-        return workers_info
 
-    def _get_worker_datasets_per_data_model(
-        self,
-        worker_queue_addr: str,
-    ) -> DatasetsInfoPerDataModel:
-        tasks_handler = WorkerInfoTasksHandler(
-            worker_queue_addr=worker_queue_addr,
-            tasks_timeout=self._worker_info_tasks_timeout,
-            request_id=WORKER_LANDSCAPE_AGGREGATOR_REQUEST_ID,
-        )
-        try:
-            datasets_per_data_model = (
-                tasks_handler.get_worker_datasets_per_data_model_task()
-            )
-        except (CeleryConnectionError, CeleryTaskTimeoutException) as exc:
-            # just log the exception do not reraise it
-            self._logger.warning(exc)
-            return {}
-        except Exception:
-            # just log full traceback exception as error and do not reraise it
-            self._logger.error(traceback.format_exc())
-            return {}
-        return datasets_per_data_model
+        snapshots = []
+        new_snapshots_cache = {}
+        new_consecutive_timeouts = {}
+        for worker_queue_addr, tasks_handler, task_result in queued_tasks:
+            last_known = self._metadata_snapshots_cache.get(worker_queue_addr)
+            try:
+                snapshot = tasks_handler.get_worker_metadata_snapshot_result(
+                    task_result, _get_remaining_timeout(deadline)
+                )
+            except CeleryTaskTimeoutException as exc:
+                # just log the exception do not reraise it
+                self._logger.warning(exc)
+                timeouts = self._consecutive_timeouts.get(worker_queue_addr, 0) + 1
+                if last_known and timeouts <= MAX_CONSECUTIVE_TIMEOUTS:
+                    snapshots.append(last_known)
+                    new_snapshots_cache[worker_queue_addr] = last_known
+                    new_consecutive_timeouts[worker_queue_addr] = timeouts
+                continue
+            except CeleryConnectionError as exc:
+                # just log the exception do not reraise it
+                self._logger.warning(exc)
+                continue
+            except Exception:
+                # just log full traceback exception as error and do not reraise it
+                self._logger.error(traceback.format_exc())
+                continue
 
-    def _get_worker_cdes(
-        self, worker_queue_addr: str, data_model: str
-    ) -> CommonDataElements:
-        tasks_handler = WorkerInfoTasksHandler(
-            worker_queue_addr=worker_queue_addr,
-            tasks_timeout=self._worker_info_tasks_timeout,
-            request_id=WORKER_LANDSCAPE_AGGREGATOR_REQUEST_ID,
-        )
-        try:
-            worker_cdes = tasks_handler.get_data_model_cdes_task(
-                data_model=data_model,
-            )
-            return worker_cdes
-        except (CeleryConnectionError, CeleryTaskTimeoutException) as exc:
-            # just log the exception do not reraise it
-            self._logger.warning(exc)
-        except Exception:
-            # just log full traceback exception as error and do not reraise it
-            self._logger.error(traceback.format_exc())
-
-    def _get_data_model_attributes(
-        self, worker_queue_addr: str, data_model: str
-    ) -> DataModelAttributes:
-        tasks_handler = WorkerInfoTasksHandler(
-            worker_queue_addr=worker_queue_addr,
-            tasks_timeout=self._worker_info_tasks_timeout,
-            request_id=WORKER_LANDSCAPE_AGGREGATOR_REQUEST_ID,
-        )
-        try:
-            attributes = tasks_handler.get_data_model_attributes_task(
-                data_model=data_model
-            )
-            return attributes
-        except (CeleryConnectionError, CeleryTaskTimeoutException) as exc:
-            # just log the exception do not reraise it
-            self._logger.warning(exc)
-        except Exception:
-            # just log full traceback exception as error and do not reraise it
-            self._logger.error(traceback.format_exc())
+            if snapshot.data_models_metadata.is_omitted:
+                if not last_known:
+                    self._logger.error(
+                        f"Worker '{snapshot.worker_info.id}' omitted its data models "
+                        f"metadata, but there is no known snapshot of them."
+                    )
+                    continue
+                snapshot = WorkerMetadataSnapshot(
+                    worker_info=snapshot.worker_info,
+                    data_models_metadata=last_known.data_models_metadata,
+                )
+            snapshots.append(snapshot)
+            new_snapshots_cache[worker_queue_addr] = snapshot
+
+        # Workers that left the federation, or cannot be reached, are not cached
+        self._metadata_snapshots_cache = new_snapshots_cache
+        self._consecutive_timeouts = new_consecutive_timeouts
+        return snapshots
 
     def _set_new_registries(self, worker_registry, data_model_registry):
         _log_worker_changes(
@@ -556,52 +589,17 @@ class WorkerLandscapeAggregator:
             .get_workers_addresses()
             .socket_addresses
         )
-        workers_info = self._get_workers_info(workers_addresses)
-        local_workers = [
-            worker_info
-            for worker_info in workers_info
-            if worker_info.role == WorkerRole.LOCALWORKER
-        ]
-        data_models_metadata_per_worker = self._get_data_models_metadata_per_worker(
-            local_workers
-        )
-        return workers_info, data_models_metadata_per_worker
-
-    def _get_data_models_metadata_per_worker(
-        self,
-        workers: List[WorkerInfo],
-    ) -> DataModelsMetadataPerWorker:
-        data_models_metadata_per_worker = {}
-
-        for worker_info in workers:
-            data_models_metadata = {}
-
-            worker_socket_addr = _get_worker_socket_addr(worker_info)
-            datasets_per_data_model = self._get_worker_datasets_per_data_model(
-                worker_socket_addr
+        snapshots = self._get_workers_metadata_snapshots(workers_addresses)
+        workers_info = [snapshot.worker_info for snapshot in snapshots]
+        data_models_metadata_per_worker = {
+            snapshot.worker_info.id: _get_data_models_metadata_from_snapshot(
+                snapshot.data_models_metadata
             )
-            if datasets_per_data_model:
-                worker_socket_addr = _get_worker_socket_addr(worker_info)
-                for (
-                    data_model,
-                    dataset_infos,
-                ) in datasets_per_data_model.datasets_info_per_data_model.items():
-                    cdes = self._get_worker_cdes(worker_socket_addr, data_model)
-                    attributes = self._get_data_model_attributes(
-                        worker_socket_addr, data_model
-                    )
-                    cdes = cdes if cdes else None
-                    attributes = attributes if attributes else None
-                    data_models_metadata[data_model] = DataModelMetadata(
-                        dataset_infos=dataset_infos,
-                        cdes=cdes,
-                        attributes=attributes,
-                    )
-                    data_models_metadata_per_worker[
-                        worker_info.id
-                    ] = DataModelsMetadata(data_models_metadata=data_models_metadata)
-
-        return DataModelsMetadataPerWorker(
+            for snapshot in snapshots
+            if snapshot.worker_info.role == WorkerRole.LOCALWORKER
+            and snapshot.data_models_metadata.datasets_info_per_data_model
+        }
+        return workers_info, DataModelsMetadataPerWorker(
             data_models_metadata_per_worker=data_models_metadata_per_worker
         )
 
@@ -1,46 +1,77 @@
+import uuid
 from typing import Dict
 from typing import List
 
 from exareme2.worker.exareme2.monetdb import monetdb_facade
+from exareme2.worker.exareme2.monetdb.guard import is_dict_of_lists_of_identifiers
+from exareme2.worker.exareme2.monetdb.guard import is_list_of_identifiers
 from exareme2.worker.exareme2.monetdb.guard import sql_injection_guard
-from exareme2.worker.exareme2.tables.tables_db import get_tables_by_type
+from exareme2.worker.exareme2.tables.tables_db import get_table_types_by_name
 from exareme2.worker_communication import TableType
 
 
-def drop_db_artifacts_by_context_id(context_id: str):
+@sql_injection_guard(
+    udf_names=is_list_of_identifiers,
+    table_names_by_type=is_dict_of_lists_of_identifiers,
+)
+def drop_db_artifacts(
+    udf_names: List[str], table_names_by_type: Dict[TableType, List[str]]
+):
     """
-    Drops all tables of any type and functions with name that contain a specific
-    context_id from the DB.
+    Drops the given functions and tables of any type from the DB, in one query.
 
     Parameters
     ----------
-    context_id : str
-        The id of the experiment
+    udf_names : List[str]
+        The names of the functions
+    table_names_by_type : Dict[TableType, List[str]]
+        The names of the tables of each type, in the order they should be dropped
     """
-
-    function_names = _get_function_names_query_by_context_id(context_id)
-
-    udfs_deletion_query = _get_drop_udfs_query(function_names)
-    table_names_by_type = get_tables_by_type(context_id)
+    udfs_deletion_query = _get_drop_udfs_query(udf_names)
     tables_deletion_query = _get_drop_tables_query(table_names_by_type)
-    monetdb_facade.execute_query(udfs_deletion_query + tables_deletion_query)
+    deletion_query = udfs_deletion_query + tables_deletion_query
+    if deletion_query:
+        monetdb_facade.execute_query(deletion_query)
 
 
-@sql_injection_guard(context_id=str.isalnum)
-def _get_function_names_query_by_context_id(context_id: str) -> List[str]:
+@sql_injection_guard(table_names=is_list_of_identifiers)
+def evict_cached_inputs(table_names: List[str]):
     """
-    Retrieve all functions of specific context_id from the DB.
+    Evicts the inputs of the given tables from the udfio cache, which lives in the
+    interpreter of the DB that runs the UDFs. A loopback function calling
+    udfio.evict_cached_inputs is created, executed and dropped in one query.
 
     Parameters
     ----------
-    context_id : str
-        The id of the experiment
+    table_names : List[str]
+        The names of the dropped tables
+    """
+    if not table_names:
+        return
+    # The name is unique so that concurrent cleanups don't conflict
+    function_name = f"evict_cached_inputs_{uuid.uuid4().hex}"
+    monetdb_facade.execute_query(
+        f"CREATE FUNCTION {function_name}()\n"
+        "RETURNS INT\n"
+        "LANGUAGE PYTHON\n"
+        "{\n"
+        "import udfio\n"
+        f"udfio.evict_cached_inputs({table_names!r})\n"
+        "return 0\n"
+        "};"
+        f"SELECT {function_name}();"
+        f"DROP FUNCTION {function_name};"
+    )
+
+
+def get_udf_names() -> List[str]:
+    """
+    Retrieve the names of all the non system functions from the DB.
     """
     result = monetdb_facade.execute_and_fetchall(
-        f"""
+        """
         SELECT name FROM functions
-        WHERE name LIKE '%{context_id.lower()}%'
-        AND system = false
+        WHERE system = false
         """
     )
     return [attributes[0] for attributes in result]
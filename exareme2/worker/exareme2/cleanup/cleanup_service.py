@@ -1,15 +1,42 @@
-from exareme2.worker.exareme2.cleanup.cleanup_db import drop_db_artifacts_by_context_id
+from typing import List
+
+from exareme2.algorithms.exareme2.udfgen import udfio
+from exareme2.worker import config as worker_config
+from exareme2.worker.exareme2.cleanup.cleanup_db import drop_db_artifacts
+from exareme2.worker.exareme2.cleanup.cleanup_db import evict_cached_inputs
+from exareme2.worker.exareme2.cleanup.context_artifacts_registry import (
+    context_artifacts_registry,
+)
 from exareme2.worker.utils.logger import initialise_logger
 
 
 @initialise_logger
-def cleanup(request_id: str, context_id: str):
+def cleanup(request_id: str, context_ids: List[str]):
     """
+    Drops all the tables that were created for the context_ids and the udfs that no
+    other context_id uses, in one query. Then it removes the states of the dropped
+    tables that are kept in the state store of the worker, and evicts their inputs
+    cached by the UDFs.
+
     Parameters
     ----------
     request_id : str
         The identifier for the logging
-    context_id : str
-        The id of the experiment
+    context_ids : List[str]
+        The ids of the experiments
     """
-    drop_db_artifacts_by_context_id(context_id)
+    with context_artifacts_registry.removed_contexts(context_ids) as (
+        table_names_by_type,
+        udf_names,
+    ):
+        drop_db_artifacts(udf_names=udf_names, table_names_by_type=table_names_by_type)
+    dropped_table_names = [
+        table_name
+        for table_names in table_names_by_type.values()
+        for table_name in table_names
+    ]
+    udfio.remove_states(
+        store_dir=worker_config.monetdb.udf_state_store_dir,
+        table_names=dropped_table_names,
+    )
+    evict_cached_inputs(table_names=dropped_table_names)
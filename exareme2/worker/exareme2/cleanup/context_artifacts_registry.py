@@ -0,0 +1,259 @@
+import re
+from contextlib import contextmanager
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from eventlet.event import Event
+from eventlet.lock import Semaphore
+
+from exareme2.worker.exareme2.cleanup import cleanup_db
+from exareme2.worker_communication import TableType
+
+
+def get_context_id_from_table_name(table_name: str) -> Optional[str]:
+    """
+    Returns the context_id of a table name with the format
+    <tableType>_<workerId>_<contextId>_<commandId>_<command_subid>, or None if
+    the table name does not have this format. The name is split from the right,
+    since the worker_id may contain underscores.
+    """
+    parts = table_name.lower().rsplit("_", 3)
+    if len(parts) != 4 or not all(part.isalnum() for part in parts[1:]):
+        return None
+    table_type_name, _, worker_id = parts[0].partition("_")
+    if table_type_name not in _TABLE_TYPE_NAME_PREFIXES or not worker_id:
+        return None
+    return parts[1]
+
+
+def is_udf_name(name: str) -> bool:
+    """
+    Checks if a function name has the format <func_name>_<definitionHash> of the
+    udfs that the worker creates, the hash being 16 hex digits.
+    """
+    return bool(_UDF_NAME_PATTERN.fullmatch(name.lower()))
+
+
+_UDF_NAME_PATTERN = re.compile(r"[a-z_][a-z0-9_]*_[0-9a-f]{16}")
+
+
+_TABLE_TYPE_NAME_PREFIXES = {str(table_type).lower() for table_type in TableType}
+
+
+class ContextArtifactsRegistry:
+    """
+    Keeps the tables and the udfs that the worker created for each context_id, in
+    the order they were created, so that they can be listed and dropped without
+    searching the catalog of the database.
+
+    The tables are registered before they are created, so a table whose creation
+    failed may still be registered. That is why they are dropped with "IF EXISTS"
+    statements.
+
+    On its first use, the registry reconciles with the database, registering the
+    artifacts left behind by a previous run of the worker (i.e. after a crash),
+    so that they are dropped on the cleanup of their context_id. The udfs left
+    behind are not used by any context_id, they are registered as created, to be
+    reused, and are dropped on the next cleanup if no context_id uses them by
+    then. This is the only time the catalog of the database is searched, the
+    cleanup of an unknown context_id, e.g. a retried one, drops nothing.
+
+    A udf can be used by more than one context_id, so the registry also counts
+    the context_ids that use each udf. A udf is dropped on the cleanup of the
+    last context_id that uses it. A udf is marked as created only after its
+    creation succeeds, while it is created or dropped the other context_ids that
+    use it wait.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, Dict[str, TableType]] = {}
+        self._udfs: Dict[str, Dict[str, None]] = {}
+        self._udf_reference_counts: Dict[str, int] = {}
+        self._created_udfs: Set[str] = set()
+        self._udf_creations: Dict[str, Event] = {}
+        self._lock = Semaphore()
+        self._reconciled = False
+
+    def register_table(self, context_id: str, table_name: str, table_type: TableType):
+        with self._lock:
+            self._reconcile()
+            self._register_table(context_id.lower(), table_name.lower(), table_type)
+
+    def register_udf(self, context_id: str, udf_name: str) -> bool:
+        """
+        Registers a udf used by the context_id. Returns True if the udf needs to be
+        created, in which case the caller must call 'finish_udf_creation' once the
+        creation is over. If the udf is being created or dropped, it waits until
+        this is over.
+        """
+        context_id = context_id.lower()
+        udf_name = udf_name.lower()
+        while True:
+            with self._lock:
+                self._reconcile()
+                self._register_udf(context_id, udf_name)
+                if udf_name in self._created_udfs:
+                    return False
+                udf_creation = self._udf_creations.get(udf_name)
+                if not udf_creation:
+                    self._udf_creations[udf_name] = Event()
+                    return True
+            udf_creation.wait()
+
+    def finish_udf_creation(self, udf_name: str, created: bool):
+        """
+        Ends the creation of a udf that 'register_udf' assigned to the caller. If
+        the creation failed, the next context_id that uses the udf creates it.
+        """
+        with self._lock:
+            udf_name = udf_name.lower()
+            if created:
+                self._created_udfs.add(udf_name)
+            self._udf_creations.pop(udf_name).send()
+
+    def unregister_table(self, context_id: str, table_name: str):
+        with self._lock:
+            self._tables.get(context_id.lower(), {}).pop(table_name.lower(), None)
+
+    def unregister_udf(self, context_id: str, udf_name: str):
+        with self._lock:
+            self._unregister_udf(context_id.lower(), udf_name.lower())
+
+    def get_table_names(self, context_id: str, table_type: TableType) -> List[str]:
+        """
+        Returns the names of the tables of a type, in the order they were created.
+        """
+        with self._lock:
+            self._reconcile()
+            tables = self._tables.get(context_id.lower(), {})
+            return [name for name, type_ in tables.items() if type_ == table_type]
+
+    def get_table_names_by_type(self, context_id: str) -> Dict[TableType, List[str]]:
+        """
+        Returns the names of the tables of each type, in the reverse order they
+        were created, so that tables are dropped before the ones they depend on.
+        """
+        with self._lock:
+            self._reconcile()
+            tables = self._tables.get(context_id.lower(), {})
+            table_names_by_type = {table_type: [] for table_type in TableType}
+            for name, table_type in reversed(tables.items()):
+                table_names_by_type[table_type].append(name)
+            return table_names_by_type
+
+    def get_udf_names(self, context_id: str) -> List[str]:
+        with self._lock:
+            self._reconcile()
+            return list(self._udfs.get(context_id.lower(), {}))
+
+    @contextmanager
+    def removed_contexts(
+        self, context_ids: List[str]
+    ) -> Iterator[Tuple[Dict[TableType, List[str]], List[str]]]:
+        """
+        Removes the context_ids and yields the artifacts to drop, i.e. the names of
+        their tables of each type, in the reverse order they were created, and the
+        names of the udfs that no other context_id uses. Until the drop is over,
+        the other context_ids that use these udfs wait. If the drop fails, the
+        context_ids are restored and their udfs are created again on their next use.
+        """
+        context_ids = list(dict.fromkeys(map(str.lower, context_ids)))
+        with self._lock:
+            self._reconcile()
+            tables = {
+                context_id: self._tables.pop(context_id)
+                for context_id in context_ids
+                if context_id in self._tables
+            }
+            udfs = {
+                context_id: self._udfs.pop(context_id)
+                for context_id in context_ids
+                if context_id in self._udfs
+            }
+            udf_names = []
+            for context_udfs in udfs.values():
+                for udf_name in context_udfs:
+                    self._udf_reference_counts[udf_name] -= 1
+                    if self._udf_reference_counts[udf_name]:
+                        continue
+                    del self._udf_reference_counts[udf_name]
+                    if udf_name not in self._udf_creations:
+                        udf_names.append(udf_name)
+            # The udfs left behind by a previous run of the worker, that no
+            # context_id has used since the reconciliation
+            udf_names.extend(
+                udf_name
+                for udf_name in self._created_udfs
+                if udf_name not in self._udf_reference_counts
+                and udf_name not in udf_names
+            )
+            for udf_name in udf_names:
+                self._created_udfs.discard(udf_name)
+                self._udf_creations[udf_name] = Event()
+
+        table_names_by_type = {table_type: [] for table_type in TableType}
+        for context_tables in tables.values():
+            for name, table_type in reversed(context_tables.items()):
+                table_names_by_type[table_type].append(name)
+        try:
+            yield table_names_by_type, udf_names
+        except Exception:
+            with self._lock:
+                for context_id, context_tables in tables.items():
+                    self._tables[context_id] = {
+                        **context_tables,
+                        **self._tables.get(context_id, {}),
+                    }
+                for context_id, context_udfs in udfs.items():
+                    for udf_name in context_udfs:
+                        self._register_udf(context_id, udf_name)
+            raise
+        finally:
+            with self._lock:
+                for udf_name in udf_names:
+                    self._udf_creations.pop(udf_name).send()
+
+    def _reconcile(self):
+        if self._reconciled:
+            return
+
+        for table_name, table_type in cleanup_db.get_table_types_by_name().items():
+            context_id = get_context_id_from_table_name(table_name)
+            if context_id:
+                self._register_table(context_id, table_name, table_type)
+
+        # The udfs are named after the hash of their definition, not after a
+        # context_id, so no context_id uses them until their definition is
+        # created again.
+        for udf_name in cleanup_db.get_udf_names():
+            if is_udf_name(udf_name):
+                self._created_udfs.add(udf_name.lower())
+
+        self._reconciled = True
+
+    def _register_table(self, context_id: str, table_name: str, table_type: TableType):
+        self._tables.setdefault(context_id, {}).setdefault(table_name, table_type)
+
+    def _register_udf(self, context_id: str, udf_name: str):
+        udfs = self._udfs.setdefault(context_id, {})
+        if udf_name not in udfs:
+            udfs[udf_name] = None
+            self._udf_reference_counts[udf_name] = (
+                self._udf_reference_counts.get(udf_name, 0) + 1
+            )
+
+    def _unregister_udf(self, context_id: str, udf_name: str):
+        udfs = self._udfs.get(context_id, {})
+        if udf_name not in udfs:
+            return
+        del udfs[udf_name]
+        self._udf_reference_counts[udf_name] -= 1
+        if not self._udf_reference_counts[udf_name]:
+            del self._udf_reference_counts[udf_name]
+
+
+context_artifacts_registry = ContextArtifactsRegistry()
@@ -10,10 +10,12 @@ from typing import Optional
 from exareme2.worker_communication import SMPCTablesInfo
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableSchema
+from exareme2.worker_communication import UDFPipelineOutputInfo
 from exareme2.worker_communication import WorkerLiteralDTO
 from exareme2.worker_communication import WorkerSMPCDTO
 from exareme2.worker_communication import WorkerTableDTO
 from exareme2.worker_communication import WorkerUDFDTO
+from exareme2.worker_communication import WorkerUDFPipelineOutputDTO
 
 
 def sql_injection_guard(**validators: Optional[Callable[[Any], bool]]):
@@ -132,6 +134,10 @@ def is_datamodel(string):
     return bool(datamodel_ptrn.fullmatch(string))
 
 
+def is_list_of_datamodels(lst):
+    return all(is_datamodel(s) for s in lst)
+
+
 def is_primary_data_table(string):
     return string.isidentifier() or bool(datatable_ptrn.fullmatch(string))
 
@@ -140,6 +146,14 @@ def is_list_of_identifiers(lst):
     return all(s.isidentifier() for s in lst)
 
 
+def is_list_of_lists_of_identifiers(lst):
+    return all(is_list_of_identifiers(inner_lst) for inner_lst in lst)
+
+
+def is_dict_of_lists_of_identifiers(dct):
+    return all(is_list_of_identifiers(lst) for lst in dct.values())
+
+
 def is_valid_filter(filter):
     if filter is None:
         return True
@@ -150,6 +164,10 @@ def is_valid_filter(filter):
     return False
 
 
+def is_list_of_valid_filters(lst):
+    return all(is_valid_filter(filter) for filter in lst)
+
+
 def is_valid_table_schema(schema: TableSchema):
     return all(col.name.isidentifier() for col in schema.columns)
 
@@ -162,10 +180,16 @@ def is_valid_udf_arg(arg):
             return is_valid_smpc_tables_info(arg.value)
         elif isinstance(arg, WorkerLiteralDTO):
             return is_valid_literal_value(arg.value)
+        elif isinstance(arg, WorkerUDFPipelineOutputDTO):
+            return is_valid_pipeline_output_info(arg.value)
         raise NotImplementedError(f"{arg.__class__} has no validator implementation")
     raise TypeError("UDF args have to be subclasses of WorkerUDFDTO")
 
 
+def is_valid_pipeline_output_info(info: UDFPipelineOutputInfo):
+    return info.step >= 0 and info.output >= 0
+
+
 def is_valid_table_info(info: TableInfo):
     return info.name.isidentifier() and is_valid_table_schema(info.schema_)
 
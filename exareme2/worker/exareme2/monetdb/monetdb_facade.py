@@ -1,12 +1,17 @@
 import re
+import time
+from collections import deque
 from contextlib import contextmanager
+from enum import Enum
 from functools import wraps
 from math import log2
 from typing import Any
+from typing import Dict
 from typing import List
 from typing import Optional
 
 import pymonetdb
+from eventlet.event import Event
 from eventlet.greenthread import sleep
 from eventlet.lock import Semaphore
 from pydantic import BaseModel
@@ -16,9 +21,6 @@ from pymonetdb import ProgrammingError
 from exareme2.worker import config as worker_config
 from exareme2.worker.utils import logger as logging
 
-query_execution_lock = Semaphore()
-udf_execution_lock = Semaphore()
-
 
 class _DBExecutionDTO(BaseModel):
     query: str
@@ -52,10 +54,17 @@ def execute_query(query: str, parameters=None, use_public_user: bool = False):
         use_public_user=use_public_user,
         timeout=query_execution_timeout,
     )
-    _execute(db_execution_dto=db_execution_dto, lock=query_execution_lock)
+    _execute(
+        db_execution_dto=db_execution_dto,
+        statement_class=_get_statement_class(query),
+    )
 
 
-def execute_udf(query: str, parameters=None):
+def execute_udf(query: str, parameters=None, memory_mb: Optional[int] = None):
+    """
+    Executes a UDF, once the scheduler admits it. The UDF is assumed to need
+    'memory_mb' of memory, by default the 'monetdb.udf_memory_estimate_mb'.
+    """
     # Check if there is only one query
     split_queries = [query for query in query.strip().split(";") if query]
     if len(split_queries) > 1:
@@ -66,33 +75,196 @@ def execute_udf(query: str, parameters=None):
     db_execution_dto = _DBExecutionDTO(
         query=query, parameters=parameters, timeout=udf_execution_timeout
     )
-    _execute(db_execution_dto=db_execution_dto, lock=udf_execution_lock)
+    if memory_mb is None:
+        memory_mb = worker_config.monetdb.udf_memory_estimate_mb
+    _execute(
+        db_execution_dto=db_execution_dto,
+        statement_class=StatementClass.UDF,
+        memory_mb=memory_mb,
+    )
 
 
-# Connection Pool disabled due to bugs in maintaining connections
-@contextmanager
-def _connection(use_public_user: bool):
-    if use_public_user:
-        username = worker_config.monetdb.public_username
-        password = worker_config.monetdb.public_password
-    else:
-        username = worker_config.monetdb.local_username
-        password = worker_config.monetdb.local_password
-
-    conn = pymonetdb.connect(
-        hostname=worker_config.monetdb.ip,
-        port=worker_config.monetdb.port,
-        username=username,
-        password=password,
-        database=worker_config.monetdb.database,
+def execute_udfs(queries: List[str], memory_mb: Optional[int] = None):
+    """
+    Executes UDFs one after the other, in a single transaction, so a UDF can use
+    the outputs of the previous ones and either all of them or none is
+    committed. The UDFs are admitted by the scheduler as one execution, since
+    they don't run at the same time.
+    """
+    for query in queries:
+        split_queries = [
+            split_query for split_query in query.strip().split(";") if split_query
+        ]
+        if len(split_queries) > 1:
+            raise ValueError(
+                f"UDF execution query: {query} should contain only one query."
+            )
+
+    udf_execution_timeout = worker_config.celery.run_udf_task_timeout
+    query = "\n".join(convert_udf_execution_query_to_idempotent(q) for q in queries)
+    db_execution_dto = _DBExecutionDTO(query=query, timeout=udf_execution_timeout)
+    if memory_mb is None:
+        memory_mb = worker_config.monetdb.udf_memory_estimate_mb
+    _execute(
+        db_execution_dto=db_execution_dto,
+        statement_class=StatementClass.UDF,
+        memory_mb=memory_mb,
     )
-    yield conn
-    conn.close()
+
+
+class ConnectionPoolStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    idle: int = 0
+
+
+class _ConnectionPool:
+    """
+    Keeps open connections of one db user so that the queries don't pay the
+    connection and authentication handshake every time.
+
+    A connection is checked out by one query execution at a time. On checkout
+    it is validated with a 'ROLLBACK', which also discards any leftover
+    transaction of the previous execution and starts a fresh snapshot.
+    Connections that fail the validation, or were used in an execution that
+    failed with a connection error, are evicted.
+
+    At most 'monetdb.connection_pool_size' connections are checked out at the
+    same time, so that is also the number of open connections of the db user.
+    A checkout waits for a connection to be released when all of them are in use.
+    """
+
+    def __init__(self, use_public_user: bool):
+        self._use_public_user = use_public_user
+        self._idle_connections = []
+        self._lock = Semaphore()
+        self._checkout_slots = None
+        self._stats = ConnectionPoolStats()
+
+    @property
+    def stats(self) -> ConnectionPoolStats:
+        return self._stats.copy(update={"idle": len(self._idle_connections)})
+
+    def checkout(self, timeout=None):
+        if not self._get_checkout_slots().acquire(timeout=timeout):
+            raise TimeoutError(
+                f"No database connection was released in the designed timeout of "
+                f"{timeout} seconds."
+            )
+        try:
+            return self._checkout()
+        except BaseException:
+            self._checkout_slots.release()
+            raise
+
+    def release(self, conn):
+        with self._lock:
+            self._idle_connections.append(conn)
+        self._checkout_slots.release()
+
+    def evict(self, conn):
+        self._stats.evictions += 1
+        self._close(conn)
+        self._checkout_slots.release()
+
+    def _get_checkout_slots(self) -> Semaphore:
+        # Created on the first checkout, when the worker config is loaded.
+        with self._lock:
+            if self._checkout_slots is None:
+                self._checkout_slots = Semaphore(
+                    worker_config.monetdb.connection_pool_size
+                )
+            return self._checkout_slots
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                conn = self._idle_connections.pop() if self._idle_connections else None
+            if conn is None:
+                self._stats.misses += 1
+                return self._connect()
+            if self._is_alive(conn):
+                self._stats.hits += 1
+                return conn
+            self._stats.evictions += 1
+            self._close(conn)
+
+    def clear(self):
+        with self._lock:
+            connections, self._idle_connections = self._idle_connections, []
+        for conn in connections:
+            self._close(conn)
+
+    def _connect(self):
+        if self._use_public_user:
+            username = worker_config.monetdb.public_username
+            password = worker_config.monetdb.public_password
+        else:
+            username = worker_config.monetdb.local_username
+            password = worker_config.monetdb.local_password
+
+        return pymonetdb.connect(
+            hostname=worker_config.monetdb.ip,
+            port=worker_config.monetdb.port,
+            username=username,
+            password=password,
+            database=worker_config.monetdb.database,
+        )
+
+    @staticmethod
+    def _is_alive(conn) -> bool:
+        try:
+            conn.rollback()
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            # The connection is discarded either way, a broken one cannot be closed.
+            pass
+
+
+_connection_pools = {
+    False: _ConnectionPool(use_public_user=False),
+    True: _ConnectionPool(use_public_user=True),
+}
+
+
+def get_connection_pool_stats(use_public_user: bool = False) -> ConnectionPoolStats:
+    return _connection_pools[use_public_user].stats
+
+
+@contextmanager
+def _connection(use_public_user: bool, timeout=None):
+    pool = _connection_pools[use_public_user]
+    conn = pool.checkout(timeout)
+    # Evicted unless the execution completed or failed with a query error. An
+    # execution interrupted by a BaseException, e.g. an eventlet Timeout, could
+    # leave the connection in the middle of a query.
+    evict = True
+    try:
+        yield conn
+        evict = False
+    except Exception as exc:
+        # The connection could be the cause of a recoverable error, it
+        # shouldn't be reused.
+        evict = _validate_exception_could_be_recovered(exc)
+        raise
+    finally:
+        if evict:
+            pool.evict(conn)
+        else:
+            pool.release(conn)
 
 
 @contextmanager
-def _cursor(use_public_user: bool, commit: bool = False):
-    with _connection(use_public_user) as conn:
+def _cursor(use_public_user: bool, commit: bool = False, timeout=None):
+    with _connection(use_public_user, timeout) as conn:
         cur = conn.cursor()
         yield cur
         cur.close()
@@ -100,15 +272,160 @@ def _cursor(use_public_user: bool, commit: bool = False):
             conn.commit()
 
 
-@contextmanager
-def _lock(query_lock, timeout):
-    acquired = query_lock.acquire(timeout=timeout)
-    if not acquired:
-        raise TimeoutError("Could not acquire the lock in the designed timeout.")
-    try:
-        yield
-    finally:
-        query_lock.release()
+class StatementClass(str, Enum):
+    """
+    The classes of statements scheduled separately. UDFs are admitted against
+    the concurrency and memory limits of the worker. Function creations and
+    drops, as well as remote table creations, are serialized within their class,
+    because of MonetDB bugs when they run concurrently, see _execute. All other
+    queries run freely.
+    """
+
+    UDF = "UDF"
+    CREATE_FUNCTION = "CREATE_FUNCTION"
+    CREATE_REMOTE_TABLE = "CREATE_REMOTE_TABLE"
+    QUERY = "QUERY"
+
+
+def _get_statement_class(query: str) -> StatementClass:
+    if re.search(r"(?i)CREATE\s+REMOTE\s+TABLE", query):
+        return StatementClass.CREATE_REMOTE_TABLE
+    if re.search(r"(?i)(CREATE\s+(OR\s+REPLACE\s+)?|DROP\s+)FUNCTION", query):
+        return StatementClass.CREATE_FUNCTION
+    return StatementClass.QUERY
+
+
+class StatementClassStats(BaseModel):
+    queued: int = 0
+    running: int = 0
+    admitted: int = 0
+    timed_out: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class ExecutionSchedulerStats(BaseModel):
+    memory_in_use_mb: int = 0
+    statement_classes: Dict[StatementClass, StatementClassStats]
+
+
+class _ScheduledExecution:
+    def __init__(self, statement_class: StatementClass, memory_mb: int):
+        self.statement_class = statement_class
+        self.memory_mb = memory_mb
+        self.admitted = Event()
+
+
+class _ExecutionScheduler:
+    """
+    Admits the statement executions of the worker. Executions of the same
+    class are admitted in the order they arrive, as soon as the limits of their
+    class allow it, see StatementClass.
+
+    UDFs are admitted while fewer than 'monetdb.max_concurrent_udfs' are running
+    and the memory they are assumed to need fits, along with the running ones,
+    in 'monetdb.udfs_memory_budget_mb'. The inputs that the UDFs keep cached
+    between calls, up to 'monetdb.udf_cached_inputs_max_mb', are counted in the
+    budget too. A UDF needing more than the whole budget is admitted only when no
+    other UDF is running.
+    """
+
+    def __init__(self):
+        self._lock = Semaphore()
+        self._queue = deque()
+        self._memory_in_use_mb = 0
+        self._stats = {
+            statement_class: StatementClassStats() for statement_class in StatementClass
+        }
+
+    @property
+    def stats(self) -> ExecutionSchedulerStats:
+        with self._lock:
+            return ExecutionSchedulerStats(
+                memory_in_use_mb=self._memory_in_use_mb,
+                statement_classes={
+                    statement_class: stats.copy()
+                    for statement_class, stats in self._stats.items()
+                },
+            )
+
+    @contextmanager
+    def admit(self, statement_class: StatementClass, memory_mb: int = 0, timeout=None):
+        execution = _ScheduledExecution(statement_class, memory_mb)
+        stats = self._stats[statement_class]
+        start = time.monotonic()
+        with self._lock:
+            self._queue.append(execution)
+            stats.queued += 1
+            self._admit_queued()
+
+        if not execution.admitted.ready():
+            execution.admitted.wait(timeout)
+        with self._lock:
+            if not execution.admitted.ready():
+                self._queue.remove(execution)
+                stats.queued -= 1
+                stats.timed_out += 1
+                self._admit_queued()
+                raise TimeoutError(
+                    f"The {statement_class.value} execution was not admitted in the "
+                    f"designed timeout of {timeout} seconds."
+                )
+            wait_seconds = time.monotonic() - start
+            stats.total_wait_seconds += wait_seconds
+            stats.max_wait_seconds = max(stats.max_wait_seconds, wait_seconds)
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                stats.running -= 1
+                self._memory_in_use_mb -= memory_mb
+                self._admit_queued()
+
+    def _admit_queued(self):
+        blocked_classes = set()
+        for execution in list(self._queue):
+            statement_class = execution.statement_class
+            if statement_class in blocked_classes:
+                continue
+            if not self._can_admit(execution):
+                blocked_classes.add(statement_class)
+                continue
+            self._queue.remove(execution)
+            stats = self._stats[statement_class]
+            stats.queued -= 1
+            stats.running += 1
+            stats.admitted += 1
+            self._memory_in_use_mb += execution.memory_mb
+            execution.admitted.send()
+
+    def _can_admit(self, execution: _ScheduledExecution) -> bool:
+        running = self._stats[execution.statement_class].running
+        if execution.statement_class == StatementClass.UDF:
+            if running >= worker_config.monetdb.max_concurrent_udfs:
+                return False
+            memory_budget_mb = (
+                worker_config.monetdb.udfs_memory_budget_mb
+                - worker_config.monetdb.udf_cached_inputs_max_mb
+            )
+            return (
+                running == 0
+                or self._memory_in_use_mb + execution.memory_mb <= memory_budget_mb
+            )
+        if execution.statement_class in (
+            StatementClass.CREATE_FUNCTION,
+            StatementClass.CREATE_REMOTE_TABLE,
+        ):
+            return running == 0
+        return True
+
+
+_execution_scheduler = _ExecutionScheduler()
+
+
+def get_execution_scheduler_stats() -> ExecutionSchedulerStats:
+    return _execution_scheduler.stats
 
 
 def _validate_exception_could_be_recovered(exc):
@@ -179,7 +496,10 @@ def _execute_and_fetchall(db_execution_dto) -> List:
     Used to execute only select queries that return a result.
     'parameters' option to provide the functionality of bind-parameters.
     """
-    with _cursor(use_public_user=db_execution_dto.use_public_user) as cur:
+    with _cursor(
+        use_public_user=db_execution_dto.use_public_user,
+        timeout=db_execution_dto.timeout,
+    ) as cur:
         cur.execute(db_execution_dto.query, db_execution_dto.parameters)
         result = cur.fetchall()
     return result
@@ -245,35 +565,40 @@ def convert_to_idempotent(query: str) -> str:
 
 
 @_execute_queries_with_error_handling
-def _execute(db_execution_dto: _DBExecutionDTO, lock):
+def _execute(
+    db_execution_dto: _DBExecutionDTO,
+    statement_class: StatementClass,
+    memory_mb: int = 0,
+):
     """
     Executes statements that don't have a result. For example "CREATE,DROP,UPDATE,INSERT".
 
-    By adding create_function_query_lock we serialized the execution of the queries that contain 'create remote table',
-    in order to a bug that was found.
+    The executions are admitted by the _execution_scheduler, which serializes
+    only the statement classes that conflict:
+    The queries that contain 'create remote table' are serialized, in order to
+    avoid a bug that was found.
     https://github.com/MonetDB/MonetDB/issues/7304
 
-    By adding create_remote_table_query_lock we serialized the execution of the queries that contain 'create or replace function',
-    in order to handle the error 'CREATE OR REPLACE FUNCTION: transaction conflict detected'
+    The queries that contain 'create or replace function' or 'drop function' are
+    serialized, in order to handle the error
+    'CREATE OR REPLACE FUNCTION: transaction conflict detected'
     https://www.mail-archive.com/checkin-list@monetdb.org/msg46062.html
 
-    By adding insert_query_lock we serialized the execution of the queries that contain 'INSERT INTO'.
-    We need this insert_query_lock in order to ensure that we will have the zero-cost that the monetdb provides on the udfs.
+    All other DDL statements run concurrently and rely on the retry of the
+    transaction conflicts, with backoff.
+
+    The UDFs are admitted against the concurrency and memory limits of the
+    worker, so that the memory allocated by the UDFs running at the same time is
+    bounded.
 
     'parameters' option to provide the functionality of bind-parameters.
     """
-
-    try:
-        with _lock(lock, db_execution_dto.timeout):
-            with _cursor(
-                use_public_user=db_execution_dto.use_public_user,
-                commit=True,
-            ) as cur:
-                cur.execute(db_execution_dto.query, db_execution_dto.parameters)
-    except TimeoutError:
-        error_msg = f"""
-        The execution of {db_execution_dto} failed because the
-        lock was not acquired during
-        {db_execution_dto.timeout}
-        """
-        raise TimeoutError(error_msg)
+    with _execution_scheduler.admit(
+        statement_class, memory_mb=memory_mb, timeout=db_execution_dto.timeout
+    ):
+        with _cursor(
+            use_public_user=db_execution_dto.use_public_user,
+            commit=True,
+            timeout=db_execution_dto.timeout,
+        ) as cur:
+            cur.execute(db_execution_dto.query, db_execution_dto.parameters)
@@ -3,6 +3,7 @@ from typing import Optional
 from celery import shared_task
 
 from exareme2.worker.exareme2.smpc import smpc_service
+from exareme2.worker_communication import TableInfo
 
 
 @shared_task
@@ -19,13 +20,22 @@ def load_data_to_smpc_client(request_id: str, table_name: str, jobid: str) -> st
 
 
 @shared_task
-def get_smpc_result(
+def get_smpc_results(
     request_id: str,
-    jobid: str,
     context_id: str,
     command_id: str,
-    command_subid: Optional[str] = "0",
+    template_json: str,
+    sum_op_jobid: Optional[str] = None,
+    min_op_jobid: Optional[str] = None,
+    max_op_jobid: Optional[str] = None,
 ) -> str:
-    return smpc_service.get_smpc_result(
-        request_id, jobid, context_id, command_id, command_subid
+    template = TableInfo.parse_raw(template_json)
+    return smpc_service.get_smpc_results(
+        request_id,
+        context_id,
+        command_id,
+        template,
+        sum_op_jobid,
+        min_op_jobid,
+        max_op_jobid,
     ).json()
@@ -8,13 +8,17 @@ from exareme2.smpc_cluster_communication import SMPCComputationError
 from exareme2.smpc_cluster_communication import SMPCResponseWithOutput
 from exareme2.smpc_cluster_communication import SMPCUsageError
 from exareme2.worker import config as worker_config
+from exareme2.worker.exareme2.cleanup.context_artifacts_registry import (
+    context_artifacts_registry,
+)
 from exareme2.worker.exareme2.tables.tables_db import create_table
 from exareme2.worker.exareme2.tables.tables_db import create_table_name
 from exareme2.worker.exareme2.tables.tables_db import get_table_data
 from exareme2.worker.exareme2.tables.tables_db import insert_data_to_table
 from exareme2.worker.utils.logger import initialise_logger
-from exareme2.worker_communication import ColumnData
+from exareme2.worker_communication import ColumnBuffer
 from exareme2.worker_communication import ColumnInfo
+from exareme2.worker_communication import SMPCTablesInfo
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableSchema
 from exareme2.worker_communication import TableType
@@ -81,28 +85,50 @@ def load_data_to_smpc_client(request_id: str, table_name: str, jobid: str) -> st
 
 
 @initialise_logger
-def get_smpc_result(
+def get_smpc_results(
     request_id: str,
-    jobid: str,
     context_id: str,
     command_id: str,
-    command_subid: Optional[str] = "0",
-) -> TableInfo:
+    template: TableInfo,
+    sum_op_jobid: Optional[str] = None,
+    min_op_jobid: Optional[str] = None,
+    max_op_jobid: Optional[str] = None,
+) -> SMPCTablesInfo:
     """
-    Fetches the results from an SMPC and writes them into a table.
+    Fetches the results of the SMPC operations of a command, in a single task,
+    and writes each of them into a table.
 
     Parameters
     ----------
     request_id: The identifier for the logging
-    jobid: The identifier for the smpc job.
     context_id: An identifier of the action.
-    command_id: An identifier for the command, used for naming the result table.
-    command_subid: An identifier for the command, used for naming the result table.
-    jobid: The jobid of the SMPC.
+    command_id: An identifier for the command, used for naming the result tables.
+    template: The global template table of the SMPC operations.
+    sum_op_jobid: The jobid of the SMPC sum operation, if there is one.
+    min_op_jobid: The jobid of the SMPC min operation, if there is one.
+    max_op_jobid: The jobid of the SMPC max operation, if there is one.
     """
     if worker_config.role != WorkerRole.GLOBALWORKER:
-        raise PermissionError("get_smpc_result is allowed only for a GLOBALWORKER.")
+        raise PermissionError("get_smpc_results is allowed only for a GLOBALWORKER.")
+
+    sum_op, min_op, max_op = (
+        _get_smpc_result(request_id, jobid, context_id, command_id, str(subid))
+        if jobid
+        else None
+        for subid, jobid in enumerate([sum_op_jobid, min_op_jobid, max_op_jobid])
+    )
+    return SMPCTablesInfo(
+        template=template, sum_op=sum_op, min_op=min_op, max_op=max_op
+    )
+
 
+def _get_smpc_result(
+    request_id: str,
+    jobid: str,
+    context_id: str,
+    command_id: str,
+    command_subid: str,
+) -> TableInfo:
     response = smpc_cluster.get_smpc_result(
         coordinator_address=worker_config.smpc.coordinator_address,
         jobid=jobid,
@@ -155,6 +181,7 @@ def _create_smpc_results_table(
             ),
         ]
     )
+    context_artifacts_registry.register_table(context_id, table_name, TableType.NORMAL)
     create_table(table_name, table_schema)
 
     table_values = [[json.dumps(smpc_op_result_data)]]
@@ -163,10 +190,11 @@ def _create_smpc_results_table(
     return table_name, table_schema
 
 
-def _get_smpc_values_from_table_data(table_data: List[ColumnData]):
+def _get_smpc_values_from_table_data(table_data: List[ColumnBuffer]):
     values_column, *_ = table_data
+    values = values_column.data
 
-    if not values_column.data:
+    if not values:
         raise SMPCUsageError("A worker doesn't have data to contribute to the SMPC.")
 
-    return values_column.data
+    return values
@@ -57,6 +57,22 @@ def create_merge_table(
     ).json()
 
 
+@shared_task
+def create_remote_tables_and_merge_table(
+    request_id: str,
+    context_id: str,
+    command_id: str,
+    table_infos_json: List[str],
+    monetdb_socket_addresses: List[str],
+) -> str:
+    table_infos = [
+        TableInfo.parse_raw(table_info_json) for table_info_json in table_infos_json
+    ]
+    return tables_service.create_remote_tables_and_merge_table(
+        request_id, context_id, command_id, table_infos, monetdb_socket_addresses
+    ).json()
+
+
 @shared_task
 def get_table_data(request_id: str, table_name: str) -> str:
     return tables_service.get_table_data(request_id, table_name).json()
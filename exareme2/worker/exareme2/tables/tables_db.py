@@ -1,4 +1,3 @@
-from typing import Any
 from typing import Dict
 from typing import List
 from typing import Union
@@ -12,12 +11,7 @@ from exareme2.worker.exareme2.monetdb.guard import is_list_of_identifiers
 from exareme2.worker.exareme2.monetdb.guard import is_socket_address
 from exareme2.worker.exareme2.monetdb.guard import is_valid_table_schema
 from exareme2.worker.exareme2.monetdb.guard import sql_injection_guard
-from exareme2.worker_communication import ColumnData
-from exareme2.worker_communication import ColumnDataBinary
-from exareme2.worker_communication import ColumnDataFloat
-from exareme2.worker_communication import ColumnDataInt
-from exareme2.worker_communication import ColumnDataJSON
-from exareme2.worker_communication import ColumnDataStr
+from exareme2.worker_communication import ColumnBuffer
 from exareme2.worker_communication import ColumnInfo
 from exareme2.worker_communication import IncompatibleSchemasMergeException
 from exareme2.worker_communication import TableSchema
@@ -53,47 +47,6 @@ def create_table_name(
     return f"{table_type}_{worker_id}_{context_id}_{command_id}_{result_id}".lower()
 
 
-@sql_injection_guard(table_type=None, context_id=str.isalnum)
-def get_table_names(table_type: TableType, context_id: str) -> List[str]:
-    """
-    Retrieves a list of table names, which contain the context_id from the monetdb.
-
-    Parameters
-    ----------
-    table_type : str
-        The type of the table
-    context_id : str
-        The id of the experiment
-
-    Returns
-    ------
-    List[str]
-        A list of table names.
-    """
-    table_names = monetdb_facade.execute_and_fetchall(
-        f"""
-        SELECT name FROM tables
-        WHERE
-         type = {str(_convert_mip2monet_table_type(table_type))} AND
-        name LIKE '%{context_id.lower()}%' AND
-        system = false"""
-    )
-
-    return [table[0] for table in table_names]
-
-
-def get_normal_table_names(context_id: str) -> List[str]:
-    return get_table_names(TableType.NORMAL, context_id)
-
-
-def get_merge_tables_names(context_id: str) -> List[str]:
-    return get_table_names(TableType.MERGE, context_id)
-
-
-def get_remote_table_names(context_id: str) -> List[str]:
-    return get_table_names(TableType.REMOTE, context_id)
-
-
 @sql_injection_guard(table_name=str.isidentifier)
 def get_table_schema(table_name: str) -> TableSchema:
     """
@@ -232,9 +185,10 @@ def create_remote_table(
     table_name=str.isidentifier,
     use_public_user=None,
 )
-def get_table_data(table_name: str, use_public_user: bool = True) -> List[ColumnData]:
+def get_table_data(table_name: str, use_public_user: bool = True) -> List[ColumnBuffer]:
     """
-    Returns a list of columns data which will contain name, type and the data of the specific column.
+    Returns the data of each column of the table as a typed buffer, along with the
+    name and the type of the column.
 
     Parameters
     ----------
@@ -245,8 +199,8 @@ def get_table_data(table_name: str, use_public_user: bool = True) -> List[Column
 
     Returns
     ------
-    List[ColumnData]
-        A list of column data
+    List[ColumnBuffer]
+        A list of column buffers
     """
 
     schema = get_table_schema(table_name)
@@ -266,9 +220,10 @@ def get_table_data(table_name: str, use_public_user: bool = True) -> List[Column
     if not column_stored_data:
         column_stored_data = [[] for _ in schema.columns]
 
-    return _convert_column_stored_data_to_column_data_objects(
-        column_stored_data, schema
-    )
+    return [
+        ColumnBuffer.from_data(name=column.name, type=column.dtype, data=values)
+        for column, values in zip(schema.columns, column_stored_data)
+    ]
 
 
 @sql_injection_guard(table_name=str.isidentifier, table_values=None)
@@ -294,36 +249,6 @@ def insert_data_to_table(
     monetdb_facade.execute_query(query, parameters)
 
 
-def _convert_column_stored_data_to_column_data_objects(
-    column_stored_data: List[List[Any]], schema: TableSchema
-):
-    table_data = []
-    for current_column, current_values in zip(schema.columns, column_stored_data):
-        if current_column.dtype == DType.INT:
-            table_data.append(
-                ColumnDataInt(name=current_column.name, data=current_values)
-            )
-        elif current_column.dtype == DType.STR:
-            table_data.append(
-                ColumnDataStr(name=current_column.name, data=current_values)
-            )
-        elif current_column.dtype == DType.FLOAT:
-            table_data.append(
-                ColumnDataFloat(name=current_column.name, data=current_values)
-            )
-        elif current_column.dtype == DType.JSON:
-            table_data.append(
-                ColumnDataJSON(name=current_column.name, data=current_values)
-            )
-        elif current_column.dtype == DType.BINARY:
-            table_data.append(
-                ColumnDataBinary(name=current_column.name, data=current_values)
-            )
-        else:
-            raise ValueError("Invalid column type")
-    return table_data
-
-
 def convert_schema_to_sql_query_format(schema: TableSchema) -> str:
     """
     Converts a table's schema to a sql query.
@@ -382,28 +307,21 @@ def _convert_monet2exareme2table_type(monet_table_type: int) -> TableType:
     return type_mapping.get(monet_table_type)
 
 
-@sql_injection_guard(context_id=str.isalnum)
-def get_tables_by_type(context_id: str) -> Dict[TableType, List[str]]:
+def get_table_types_by_name() -> Dict[str, TableType]:
     """
-    Retrieve table names by type that contains a specific context_id from the DB.
-
-    Parameters
-    ----------
-    context_id : str
-        The id of the experiment
+    Retrieve the names of all the non system tables, along with their type, from the DB.
     """
+    monet_table_types = ", ".join(
+        str(_convert_mip2monet_table_type(table_type)) for table_type in TableType
+    )
     table_names_and_types = monetdb_facade.execute_and_fetchall(
         f"""
         SELECT name, type FROM tables
-        WHERE name LIKE '%{context_id.lower()}%'
+        WHERE type IN ({monet_table_types})
         AND system = false
         """
     )
-    table_names_by_type = {}
-    for table_type in TableType:
-        table_names_by_type[table_type] = []
-
-    for name, table_type in table_names_and_types:
-        exareme2table_type = _convert_monet2exareme2table_type(table_type)
-        table_names_by_type[exareme2table_type].append(name)
-    return table_names_by_type
+    return {
+        name: _convert_monet2exareme2table_type(table_type)
+        for name, table_type in table_names_and_types
+    }
@@ -1,6 +1,12 @@
 from typing import List
 
 from exareme2.worker import config as worker_config
+from exareme2.worker.exareme2.cleanup.context_artifacts_registry import (
+    context_artifacts_registry,
+)
+from exareme2.worker.exareme2.cleanup.context_artifacts_registry import (
+    get_context_id_from_table_name,
+)
 from exareme2.worker.exareme2.tables import tables_db
 from exareme2.worker.exareme2.tables.tables_db import create_table_name
 from exareme2.worker.utils.logger import initialise_logger
@@ -25,7 +31,7 @@ def get_tables(request_id: str, context_id: str) -> List[str]:
     List[str]
         A list of table names
     """
-    return tables_db.get_normal_table_names(context_id)
+    return context_artifacts_registry.get_table_names(context_id, TableType.NORMAL)
 
 
 @initialise_logger
@@ -43,7 +49,7 @@ def get_remote_tables(request_id: str, context_id: str) -> List[str]:
     List[str]
         A list of remote table names
     """
-    return tables_db.get_remote_table_names(context_id)
+    return context_artifacts_registry.get_table_names(context_id, TableType.REMOTE)
 
 
 @initialise_logger
@@ -61,7 +67,7 @@ def get_merge_tables(request_id: str, context_id: str) -> List[str]:
     List[str]
         A list of merge table names
     """
-    return tables_db.get_merge_tables_names(context_id)
+    return context_artifacts_registry.get_table_names(context_id, TableType.MERGE)
 
 
 @initialise_logger
@@ -86,6 +92,7 @@ def create_table(
         context_id,
         command_id,
     )
+    context_artifacts_registry.register_table(context_id, table_name, TableType.NORMAL)
     tables_db.create_table(table_name, table_schema)
 
     return TableInfo(
@@ -114,17 +121,7 @@ def create_remote_table(
     monetdb_socket_address : str
         The monetdb_socket_address of the monetdb that we want to create the remote table from.
     """
-    local_username = worker_config.monetdb.local_username
-    public_username = worker_config.monetdb.public_username
-    public_password = worker_config.monetdb.public_password
-    tables_db.create_remote_table(
-        table_name=table_name,
-        schema=table_schema,
-        monetdb_socket_address=monetdb_socket_address,
-        table_creator_username=local_username,
-        public_username=public_username,
-        public_password=public_password,
-    )
+    _create_remote_table(table_name, table_schema, monetdb_socket_address)
 
 
 @initialise_logger
@@ -143,12 +140,85 @@ def create_merge_table(
     table_infos: List[str(TableInfo)]
         A list of TableInfo of the tables to be merged.
     """
+    return _create_merge_table(context_id, command_id, table_infos)
+
+
+@initialise_logger
+def create_remote_tables_and_merge_table(
+    request_id: str,
+    context_id: str,
+    command_id: str,
+    table_infos: List[TableInfo],
+    monetdb_socket_addresses: List[str],
+) -> TableInfo:
+    """
+    Creates a remote table for each of the given tables and a merge table
+    on top of them, in a single task.
+
+    Parameters
+    ----------
+    request_id : str
+        The identifier for the logging.
+    context_id : str
+        The id of the experiment.
+    command_id : str
+        The id of the command that the merge table.
+    table_infos: List[TableInfo]
+        A list of TableInfo of the tables, located on other workers, to be merged.
+    monetdb_socket_addresses : List[str]
+        The monetdb_socket_address of the monetdb of each table, in the same order.
+    """
+    if len(table_infos) != len(monetdb_socket_addresses):
+        raise ValueError(
+            f"Each table should have a monetdb socket address. {table_infos=} "
+            f"{monetdb_socket_addresses=}"
+        )
+
+    for table_info, monetdb_socket_address in zip(
+        table_infos, monetdb_socket_addresses
+    ):
+        _create_remote_table(
+            table_info.name, table_info.schema_, monetdb_socket_address
+        )
+
+    return _create_merge_table(context_id, command_id, table_infos)
+
+
+def _create_remote_table(
+    table_name: str,
+    table_schema: TableSchema,
+    monetdb_socket_address: str,
+):
+    local_username = worker_config.monetdb.local_username
+    public_username = worker_config.monetdb.public_username
+    public_password = worker_config.monetdb.public_password
+    context_id = get_context_id_from_table_name(table_name)
+    if context_id:
+        context_artifacts_registry.register_table(
+            context_id, table_name, TableType.REMOTE
+        )
+    tables_db.create_remote_table(
+        table_name=table_name,
+        schema=table_schema,
+        monetdb_socket_address=monetdb_socket_address,
+        table_creator_username=local_username,
+        public_username=public_username,
+        public_password=public_password,
+    )
+
+
+def _create_merge_table(
+    context_id: str, command_id: str, table_infos: List[TableInfo]
+) -> TableInfo:
     merge_table_name = create_table_name(
         TableType.MERGE,
         worker_config.identifier,
         context_id,
         command_id,
     )
+    context_artifacts_registry.register_table(
+        context_id, merge_table_name, TableType.MERGE
+    )
 
     tables_db.create_merge_table(
         table_name=merge_table_name,
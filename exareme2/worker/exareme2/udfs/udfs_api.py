@@ -4,6 +4,7 @@ from celery import shared_task
 
 from exareme2.worker.exareme2.udfs import udfs_service
 from exareme2.worker_communication import WorkerUDFKeyArguments
+from exareme2.worker_communication import WorkerUDFPipeline
 from exareme2.worker_communication import WorkerUDFPosArguments
 
 
@@ -30,3 +31,19 @@ def run_udf(
         use_smpc,
         output_schema,
     ).json()
+
+
+@shared_task
+def run_udf_pipeline(
+    request_id: str,
+    context_id: str,
+    pipeline_json: str,
+    use_smpc: bool = False,
+) -> str:
+    pipeline = WorkerUDFPipeline.parse_raw(pipeline_json)
+    return udfs_service.run_udf_pipeline(
+        request_id,
+        context_id,
+        pipeline,
+        use_smpc,
+    ).json()
@@ -3,6 +3,13 @@ from typing import List
 from exareme2.worker.exareme2.monetdb import monetdb_facade
 
 
-def run_udf(udf_defenitions: List[str], udf_exec_stmt):
-    monetdb_facade.execute_query(";\n".join(udf_defenitions))
+def create_udf_artifacts(queries: List[str]):
+    monetdb_facade.execute_query(";\n".join(queries))
+
+
+def run_udf(udf_exec_stmt: str):
     monetdb_facade.execute_udf(udf_exec_stmt)
+
+
+def run_udfs(udf_exec_stmts: List[str]):
+    monetdb_facade.execute_udfs(udf_exec_stmts)
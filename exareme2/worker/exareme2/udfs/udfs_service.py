@@ -1,8 +1,12 @@
+import hashlib
 from typing import Dict
 from typing import List
+from typing import NamedTuple
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 
+from exareme2.algorithms.exareme2.udfgen import DATASETS_CONTENT_HASH
 from exareme2.algorithms.exareme2.udfgen import FlowUdfArg
 from exareme2.algorithms.exareme2.udfgen import get_udfgenerator
 from exareme2.algorithms.exareme2.udfgen import udf
@@ -12,6 +16,9 @@ from exareme2.algorithms.exareme2.udfgen.udfgen_DTOs import UDFGenTableResult
 from exareme2.datatypes import DType
 from exareme2.smpc_cluster_communication import validate_smpc_usage
 from exareme2.worker import config as worker_config
+from exareme2.worker.exareme2.cleanup.context_artifacts_registry import (
+    context_artifacts_registry,
+)
 from exareme2.worker.exareme2.monetdb.guard import is_valid_request_id
 from exareme2.worker.exareme2.monetdb.guard import output_schema_validator
 from exareme2.worker.exareme2.monetdb.guard import sql_injection_guard
@@ -21,15 +28,20 @@ from exareme2.worker.exareme2.tables.tables_db import create_table_name
 from exareme2.worker.exareme2.tables.tables_db import get_table_type
 from exareme2.worker.exareme2.udfs import udfs_db
 from exareme2.worker.utils.logger import initialise_logger
+from exareme2.worker.worker_info.worker_info_db import get_datasets_content_hash
 from exareme2.worker_communication import SMPCTablesInfo
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableSchema
 from exareme2.worker_communication import TableType
+from exareme2.worker_communication import UDFPipelineOutputInfo
 from exareme2.worker_communication import WorkerLiteralDTO
 from exareme2.worker_communication import WorkerSMPCDTO
 from exareme2.worker_communication import WorkerTableDTO
 from exareme2.worker_communication import WorkerUDFDTO
 from exareme2.worker_communication import WorkerUDFKeyArguments
+from exareme2.worker_communication import WorkerUDFPipeline
+from exareme2.worker_communication import WorkerUDFPipelineOutputDTO
+from exareme2.worker_communication import WorkerUDFPipelineResults
 from exareme2.worker_communication import WorkerUDFPosArguments
 from exareme2.worker_communication import WorkerUDFResults
 
@@ -46,7 +58,8 @@ def run_udf(
     output_schema: Optional[str] = None,
 ) -> WorkerUDFResults:
     """
-    Creates the UDF, if provided, and adds it in the database.
+    Creates the UDF, if provided and unless an identical one is already used by
+    a context, and adds it in the database.
     Then it runs the select statement with the input provided.
 
     Parameters
@@ -79,7 +92,7 @@ def run_udf(
     if output_schema is not None:
         output_schema = _convert_output_schema(output_schema)
 
-    udf_definitions, udf_exec_stmt, udf_results = _generate_udf_statements(
+    udf_statements = _generate_udf_statements(
         request_id=request_id,
         command_id=command_id,
         context_id=context_id,
@@ -90,9 +103,133 @@ def run_udf(
         output_schema=output_schema,
     )
 
-    udfs_db.run_udf(udf_definitions, udf_exec_stmt)
+    _create_udf_artifacts(context_id, [udf_statements])
+    udfs_db.run_udf(udf_statements.udf_exec_stmt)
+
+    return udf_statements.udf_results
+
 
-    return udf_results
+@initialise_logger
+def run_udf_pipeline(
+    request_id: str,
+    context_id: str,
+    pipeline: WorkerUDFPipeline,
+    use_smpc: bool = False,
+) -> WorkerUDFPipelineResults:
+    """
+    Runs the UDFs of a pipeline in order, in a single transaction. A UDF can use
+    the outputs of the previous UDFs of the pipeline. The outputs of a UDF are
+    known when it is generated, so all the UDFs are generated first and the
+    tables and the functions of all of them are added in the database with a
+    single query.
+
+    Parameters
+    ----------
+        request_id : str
+            The identifier for the logging
+        context_id: str
+            The experiment identifier, common among all experiment related actions.
+        pipeline: WorkerUDFPipeline
+            The UDF calls, each one with its own command identifier.
+        use_smpc: bool
+            Should SMPC be used?
+    Returns
+    -------
+        WorkerUDFPipelineResults
+            The results of each UDF, with the tablenames that its execution created.
+    """
+    validate_smpc_usage(
+        use_smpc, worker_config.smpc.enabled, worker_config.smpc.optional
+    )
+
+    pipeline_udf_statements = []
+    pipeline_results = []
+    for step in pipeline.steps:
+        output_schema = step.output_schema.to_list() if step.output_schema else None
+        udf_statements = _generate_udf_statements(
+            request_id=request_id,
+            command_id=step.command_id,
+            context_id=context_id,
+            func_name=step.func_name,
+            positional_args=step.positional_args,
+            keyword_args=step.keyword_args,
+            use_smpc=use_smpc,
+            output_schema=output_schema,
+            pipeline_results=pipeline_results,
+        )
+        pipeline_udf_statements.append(udf_statements)
+        pipeline_results.append(udf_statements.udf_results)
+
+    udf_exec_stmts = [
+        udf_statements.udf_exec_stmt for udf_statements in pipeline_udf_statements
+    ]
+    _create_udf_artifacts(context_id, pipeline_udf_statements)
+    udfs_db.run_udfs(udf_exec_stmts)
+
+    return WorkerUDFPipelineResults(results=pipeline_results)
+
+
+class _UDFStatements(NamedTuple):
+    udf_name: str
+    udf_definition: str
+    table_creation_queries: List[str]
+    udf_exec_stmt: str
+    udf_results: WorkerUDFResults
+
+
+def _create_udf_artifacts(context_id: str, udfs_statements: List[_UDFStatements]):
+    """
+    Registers and creates the tables and the udfs of the statements. The udfs
+    that are already created for a context_id are not created again. The udfs
+    are registered in the order of their names, since a context_id waits for
+    the udfs that another one creates. If the creation fails, the newly
+    registered udfs are unregistered, so that they are created again when they
+    are used.
+    """
+    queries = []
+    for udf_statements in udfs_statements:
+        _register_udf_tables(context_id, udf_statements.udf_results)
+        queries.extend(udf_statements.table_creation_queries)
+
+    # Adhoc udfs are plain SQL queries, without a function definition
+    udf_definitions = {
+        udf_statements.udf_name: udf_statements.udf_definition
+        for udf_statements in udfs_statements
+        if udf_statements.udf_definition
+    }
+    new_udf_names = []
+    try:
+        for udf_name in sorted(udf_definitions):
+            if context_artifacts_registry.register_udf(context_id, udf_name):
+                new_udf_names.append(udf_name)
+                queries.append(udf_definitions[udf_name])
+        udfs_db.create_udf_artifacts(queries)
+    except Exception:
+        for udf_name in new_udf_names:
+            context_artifacts_registry.unregister_udf(context_id, udf_name)
+            context_artifacts_registry.finish_udf_creation(udf_name, created=False)
+        raise
+    for udf_name in new_udf_names:
+        context_artifacts_registry.finish_udf_creation(udf_name, created=True)
+
+
+def _register_udf_tables(context_id: str, udf_results: WorkerUDFResults):
+    for result in udf_results.results:
+        if isinstance(result, WorkerTableDTO):
+            table_infos = [result.value]
+        else:
+            smpc_tables_info = result.value
+            table_infos = [
+                smpc_tables_info.template,
+                smpc_tables_info.sum_op,
+                smpc_tables_info.min_op,
+                smpc_tables_info.max_op,
+            ]
+        for table_info in table_infos:
+            if table_info:
+                context_artifacts_registry.register_table(
+                    context_id, table_info.name, TableType.NORMAL
+                )
 
 
 def _convert_output_schema(output_schema: str) -> List[Tuple[str, DType]]:
@@ -100,17 +237,21 @@ def _convert_output_schema(output_schema: str) -> List[Tuple[str, DType]]:
     return table_schema.to_list()
 
 
-def _create_udf_name(func_name: str, command_id: str, context_id: str) -> str:
+def _create_udf_name(func_name: str, udf_definition_template: str) -> str:
     """
-    Creates a udf name with the format <func_name>_<commandId>_<contextId>
+    Creates a udf name with the format <func_name>_<definitionHash>, so that
+    identical definitions, i.e. the same function with the same inputs, share
+    the same udf, across commands and context_ids.
     """
     # TODO Monetdb UDF name cannot be larger than 63 character
-    return f"{func_name}_{command_id}_{context_id}"
+    definition_hash = hashlib.sha256(udf_definition_template.encode()).hexdigest()
+    return f"{func_name}_{definition_hash[:16]}"
 
 
 def _convert_workerudf_to_flow_args(
     positional_args: WorkerUDFPosArguments,
     keyword_args: WorkerUDFKeyArguments,
+    pipeline_results: Sequence[WorkerUDFResults] = (),
 ) -> Tuple[List[FlowUdfArg], Dict[str, FlowUdfArg]]:
     """
     Converts UDF arguments DTOs in format understood by UDF generator
@@ -128,6 +269,8 @@ def _convert_workerudf_to_flow_args(
         The pos arguments received from the controller.
     keyword_args : WorkerUDFKeyArguments
         The kw arguments received from the controller.
+    pipeline_results : Sequence[WorkerUDFResults]
+        The results of the previous UDFs, when the UDF is part of a pipeline.
 
     Returns
     -------
@@ -146,6 +289,9 @@ def _convert_workerudf_to_flow_args(
             return arg.value
         elif isinstance(arg, WorkerLiteralDTO):
             return arg.value
+        elif isinstance(arg, WorkerUDFPipelineOutputDTO):
+            # The tables of the previous UDFs of the pipeline are not created yet
+            return _get_pipeline_output(arg.value, pipeline_results)
         raise ValueError(f"A UDF argument needs to be an instance of {WorkerUDFDTO}'.")
 
     flowargs = [convert(arg) for arg in positional_args.args]
@@ -155,6 +301,24 @@ def _convert_workerudf_to_flow_args(
     return flowargs, flowkwargs
 
 
+def _get_pipeline_output(
+    output_info: UDFPipelineOutputInfo,
+    pipeline_results: Sequence[WorkerUDFResults],
+) -> FlowUdfArg:
+    if not 0 <= output_info.step < len(pipeline_results):
+        raise ValueError(
+            "A UDF of a pipeline can only use the outputs of the previous UDFs. "
+            f"Output: {output_info}, previous UDFs: {len(pipeline_results)}."
+        )
+    results = pipeline_results[output_info.step].results
+    if not 0 <= output_info.output < len(results):
+        raise ValueError(
+            f"The UDF of step {output_info.step} of the pipeline does not have "
+            f"output {output_info.output}, it has {len(results)} outputs."
+        )
+    return results[output_info.output].value
+
+
 def _validate_tableinfo_type_matches_actual_tabletype(table_info: TableInfo):
     if table_info.type_ != get_table_type(table_info.name):
         msg = f"Table: '{table_info.name}' is not of type: '{table_info.type_}'."
@@ -182,6 +346,7 @@ def _validate_smpctablesinfo_type_matches_actual_tablestype(
     keyword_args=udf_kwargs_validator,
     use_smpc=None,
     output_schema=output_schema_validator,
+    pipeline_results=None,
 )
 def _generate_udf_statements(
     request_id: str,
@@ -192,13 +357,13 @@ def _generate_udf_statements(
     keyword_args: WorkerUDFKeyArguments,
     use_smpc: bool,
     output_schema,
-) -> Tuple[List[str], str, WorkerUDFResults]:
+    pipeline_results: Sequence[WorkerUDFResults] = (),
+) -> _UDFStatements:
     # Data needed for UDF generation
     # ------------------------------
     flowargs, flowkwargs = _convert_workerudf_to_flow_args(
-        positional_args, keyword_args
+        positional_args, keyword_args, pipeline_results
     )
-    udf_name = _create_udf_name(func_name, command_id, context_id)
 
     # worker_id is needed for table name creation
     worker_id = worker_config.identifier
@@ -206,6 +371,12 @@ def _generate_udf_statements(
     # min_row_count is necessary when an algorithm needs it in the UDF
     min_row_count = worker_config.privacy.minimum_row_count
 
+    # datasets_content_hash is necessary when an algorithm needs it in the UDF,
+    # it is only read then, since it needs a query
+    datasets_content_hash = None
+    if _uses_datasets_content_hash(func_name):
+        datasets_content_hash = get_datasets_content_hash()
+
     udfgen = get_udfgenerator(
         udfregistry=udf.registry,
         func_name=func_name,
@@ -215,6 +386,7 @@ def _generate_udf_statements(
         request_id=request_id,
         output_schema=output_schema,
         min_row_count=min_row_count,
+        datasets_content_hash=datasets_content_hash,
     )
     # outputnum is the number of UDF outputs, we need it to create an
     # equal number of output names before calling the UDF generator
@@ -226,22 +398,40 @@ def _generate_udf_statements(
         outputnum, worker_id, context_id, command_id
     )
 
-    # UDF generation
-    udf_definition = udfgen.get_definition(udf_name, output_names)
+    # UDF generation, the udf name depends on the definition
+    udf_definition_template = udfgen.get_definition(_UDF_NAME_PLACEHOLDER, output_names)
+    udf_name = _create_udf_name(func_name, udf_definition_template)
+    udf_definition = udf_definition_template.replace(_UDF_NAME_PLACEHOLDER, udf_name)
     udf_exec_stmt = udfgen.get_exec_stmt(udf_name, output_names)
     udf_results = udfgen.get_results(output_names)
 
-    # Create list of udf definitions
+    # Create list of table creation queries
     table_creation_queries = _get_udf_table_creation_queries(udf_results)
     public_username = worker_config.monetdb.public_username
     table_sharing_queries = _get_udf_table_sharing_queries(udf_results, public_username)
-    udf_definitions = [*table_creation_queries, *table_sharing_queries, udf_definition]
 
     # Convert results
     results = [_convert_result(res) for res in udf_results]
     results_dto = WorkerUDFResults(results=results)
 
-    return udf_definitions, udf_exec_stmt, results_dto
+    return _UDFStatements(
+        udf_name=udf_name,
+        udf_definition=udf_definition,
+        table_creation_queries=[*table_creation_queries, *table_sharing_queries],
+        udf_exec_stmt=udf_exec_stmt,
+        udf_results=results_dto,
+    )
+
+
+_UDF_NAME_PLACEHOLDER = "$udf_name"
+
+
+def _uses_datasets_content_hash(func_name: str) -> bool:
+    # Adhoc udfs are not in the registry
+    if func_name not in udf.registry:
+        return False
+    parameter_types = udf.registry[func_name].sig.parameters.values()
+    return DATASETS_CONTENT_HASH in parameter_types
 
 
 def _make_output_table_names(
@@ -1,4 +1,5 @@
 from typing import List
+from typing import Optional
 
 from celery import shared_task
 
@@ -50,3 +51,25 @@ def create_view(
     return views_service.create_view(
         request_id, context_id, command_id, table_name, columns, filters
     ).json()
+
+
+@shared_task
+def create_views(
+    request_id: str,
+    context_id: str,
+    command_id: str,
+    table_name: str,
+    columns_per_view: List[List[str]],
+    filters_per_view: List[Optional[dict]],
+) -> List[str]:
+    return [
+        view.json()
+        for view in views_service.create_views(
+            request_id,
+            context_id,
+            command_id,
+            table_name,
+            columns_per_view,
+            filters_per_view,
+        )
+    ]
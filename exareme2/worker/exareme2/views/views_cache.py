@@ -0,0 +1,198 @@
+import hashlib
+import json
+from collections import Counter
+from collections import OrderedDict
+from typing import List
+from typing import Optional
+from uuid import uuid4
+
+from eventlet.lock import Semaphore
+from pydantic import BaseModel
+
+from exareme2.data_filters import build_filter_clause
+from exareme2.worker.exareme2.tables.tables_db import get_table_schema
+from exareme2.worker.exareme2.views import views_db
+from exareme2.worker_communication import TableSchema
+
+
+class CachedDataModelView(BaseModel):
+    table_name: str
+    schema_: TableSchema
+    row_count: int
+
+    class Config:
+        allow_mutation = False
+
+
+class DataModelViewsCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    rows: int = 0
+
+
+def get_data_model_view_key(
+    data_model: str,
+    datasets: List[str],
+    columns: List[str],
+    filters: Optional[dict],
+    dropna: bool,
+) -> str:
+    """
+    Creates a canonical key of a "data model view". The filters are converted to
+    their sql clause, so that filters differing only in the order of their keys
+    have the same key.
+    """
+    key_content = json.dumps(
+        {
+            "data_model": data_model,
+            "datasets": sorted(datasets),
+            "columns": columns,
+            "filters": build_filter_clause(filters) if filters else "",
+            "dropna": dropna,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(key_content.encode("utf-8")).hexdigest()
+
+
+class DataModelViewsCache:
+    """
+    Keeps the filtered projections of the data models, that the "data model views"
+    are created on, materialized as tables along with their row count, so that
+    repeated requests do not scan and count the data again.
+
+    Entries are evicted in a least recently used order, when either the number of
+    entries or their total number of rows exceeds the limits, and all of them are
+    invalidated when the datasets of the worker change. The table of an evicted
+    entry is dropped once it is no longer in use and no view depends on it.
+    """
+
+    def __init__(self, max_entries: int, max_rows: int):
+        self._max_entries = max_entries
+        self._max_rows = max_rows
+        self._entries: "OrderedDict[str, CachedDataModelView]" = OrderedDict()
+        self._datasets_content_hash: Optional[str] = None
+        self._tables_in_use = Counter()
+        self._tables_pending_drop = set()
+        self._stats = DataModelViewsCacheStats()
+        self._lock = Semaphore()
+        self._reconciled = False
+
+    def acquire(
+        self,
+        key: str,
+        datasets_content_hash: str,
+        source_table_name: str,
+        columns: List[str],
+        filters: Optional[dict],
+    ) -> CachedDataModelView:
+        """
+        Returns the cached view of the key, materializing it first if it is missing.
+        The table of the returned cached view is not dropped until it is released.
+        """
+        with self._lock:
+            self._reconcile()
+            self._invalidate_if_datasets_changed(datasets_content_hash)
+            cached_view = self._entries.get(key)
+            if cached_view:
+                self._entries.move_to_end(key)
+                self._tables_in_use[cached_view.table_name] += 1
+                self._stats.hits += 1
+                return cached_view
+            self._stats.misses += 1
+
+        table_name = f"{views_db.CACHED_VIEW_TABLE_PREFIX}_{uuid4().hex}"
+        row_count = views_db.create_cached_view_table(
+            table_name=table_name,
+            source_table_name=source_table_name,
+            columns=columns,
+            filters=filters,
+        )
+        cached_view = CachedDataModelView(
+            table_name=table_name,
+            schema_=get_table_schema(table_name),
+            row_count=row_count,
+        )
+
+        with self._lock:
+            self._tables_in_use[table_name] += 1
+            if self._datasets_content_hash != datasets_content_hash:
+                # The datasets changed while the table was being created
+                self._tables_pending_drop.add(table_name)
+                return cached_view
+            if key in self._entries:
+                # The same view was cached concurrently by another request
+                self._tables_pending_drop.add(self._entries.pop(key).table_name)
+            self._entries[key] = cached_view
+            self._evict()
+        return cached_view
+
+    def release(self, cached_view: CachedDataModelView):
+        with self._lock:
+            self._tables_in_use[cached_view.table_name] -= 1
+            if not self._tables_in_use[cached_view.table_name]:
+                del self._tables_in_use[cached_view.table_name]
+            droppable_tables = [
+                table_name
+                for table_name in self._tables_pending_drop
+                if table_name not in self._tables_in_use
+            ]
+
+        if droppable_tables:
+            self._drop_tables(droppable_tables)
+
+    def get_stats(self) -> DataModelViewsCacheStats:
+        with self._lock:
+            return self._stats.copy(
+                update={
+                    "entries": len(self._entries),
+                    "rows": self._get_total_rows(),
+                }
+            )
+
+    def _reconcile(self):
+        # Tables cached before a restart of the worker are unknown, so they are dropped
+        if self._reconciled:
+            return
+        self._tables_pending_drop.update(views_db.get_cached_view_table_names())
+        self._reconciled = True
+
+    def _invalidate_if_datasets_changed(self, datasets_content_hash: str):
+        if self._datasets_content_hash == datasets_content_hash:
+            return
+        if self._entries:
+            self._stats.invalidations += 1
+        self._tables_pending_drop.update(
+            cached_view.table_name for cached_view in self._entries.values()
+        )
+        self._entries.clear()
+        self._datasets_content_hash = datasets_content_hash
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self._max_entries
+            or self._get_total_rows() > self._max_rows
+        ):
+            _, cached_view = self._entries.popitem(last=False)
+            self._tables_pending_drop.add(cached_view.table_name)
+            self._stats.evictions += 1
+
+    def _get_total_rows(self) -> int:
+        return sum(cached_view.row_count for cached_view in self._entries.values())
+
+    def _drop_tables(self, table_names: List[str]):
+        # Tables that views still depend on, are dropped on a later release
+        tables_with_dependents = views_db.get_table_names_with_dependents(table_names)
+        tables_to_drop = [
+            table_name
+            for table_name in table_names
+            if table_name not in tables_with_dependents
+        ]
+        if not tables_to_drop:
+            return
+        views_db.drop_tables(tables_to_drop)
+        with self._lock:
+            self._tables_pending_drop.difference_update(tables_to_drop)
@@ -1,13 +1,18 @@
+from typing import Callable
+from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Tuple
 
 from exareme2.data_filters import build_filter_clause
 from exareme2.worker.exareme2.monetdb import monetdb_facade
+from exareme2.worker.exareme2.monetdb.guard import is_datamodel
 from exareme2.worker.exareme2.monetdb.guard import is_list_of_identifiers
+from exareme2.worker.exareme2.monetdb.guard import is_list_of_lists_of_identifiers
+from exareme2.worker.exareme2.monetdb.guard import is_list_of_valid_filters
 from exareme2.worker.exareme2.monetdb.guard import is_primary_data_table
 from exareme2.worker.exareme2.monetdb.guard import is_valid_filter
 from exareme2.worker.exareme2.monetdb.guard import sql_injection_guard
-from exareme2.worker.exareme2.tables.tables_db import get_table_names
 from exareme2.worker.exareme2.tables.tables_db import get_table_schema
 from exareme2.worker_communication import ColumnInfo
 from exareme2.worker_communication import InsufficientDataError
@@ -15,9 +20,8 @@ from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableSchema
 from exareme2.worker_communication import TableType
 
-
-def get_view_names(context_id: str) -> List[str]:
-    return get_table_names(TableType.VIEW, context_id)
+CACHED_VIEW_TABLE_PREFIX = "cacheddatamodelview"
+DATASET_COLUMN = "dataset"
 
 
 @sql_injection_guard(
@@ -27,6 +31,8 @@ def get_view_names(context_id: str) -> List[str]:
     filters=is_valid_filter,
     minimum_row_count=None,
     check_min_rows=None,
+    row_count_bounds=None,
+    are_row_count_bounds_current=None,
 )
 def create_view(
     view_name: str,
@@ -35,7 +41,20 @@ def create_view(
     filters: Optional[dict],
     minimum_row_count: int,
     check_min_rows=False,
+    row_count_bounds: Optional[Tuple[int, int]] = None,
+    are_row_count_bounds_current: Optional[Callable[[], bool]] = None,
 ) -> TableInfo:
+    """
+    Creates a view and checks that it contains sufficient data. The optional
+    row_count_bounds, a lower and an upper bound of the rows of the view, decide
+    the check when the required rows are outside of them. Otherwise, only up to
+    the required rows are fetched from the view.
+
+    The lower bound is trusted only if are_row_count_bounds_current, called once
+    the view is created, confirms that the bounds were not computed before the
+    last data load. Otherwise, the rows of the view are fetched.
+    """
+    required_row_count = _get_required_row_count(minimum_row_count, check_min_rows)
     filter_clause = ""
     if filters:
         filter_clause = f"WHERE {build_filter_clause(filters)}"
@@ -48,18 +67,20 @@ def create_view(
         {filter_clause}
         """
 
-    monetdb_facade.execute_query(view_creation_query)
+    if row_count_bounds and row_count_bounds[1] < required_row_count:
+        raise InsufficientDataError(
+            f"Query: {view_creation_query} would create an "
+            f"insufficient data view. ({row_count_bounds=})"
+        )
 
-    view_rows_query_result = monetdb_facade.execute_and_fetchall(
-        f"""
-        SELECT COUNT(*)
-        FROM {view_name}
-        """
-    )
-    view_rows_result_row = view_rows_query_result[0]
-    view_rows_count = view_rows_result_row[0]
+    monetdb_facade.execute_query(view_creation_query)
 
-    if view_rows_count < 1 or (check_min_rows and view_rows_count < minimum_row_count):
+    has_sufficient_data = (
+        row_count_bounds
+        and row_count_bounds[0] >= required_row_count
+        and (are_row_count_bounds_current is None or are_row_count_bounds_current())
+    ) or _has_at_least_rows(view_name, required_row_count)
+    if not has_sufficient_data:
         monetdb_facade.execute_query(f"""DROP VIEW {view_name}""")
         raise InsufficientDataError(
             f"Query: {view_creation_query} creates an "
@@ -76,6 +97,229 @@ def create_view(
     )
 
 
+@sql_injection_guard(
+    view_names=is_list_of_identifiers,
+    table_name=str.isidentifier,
+    columns_per_view=is_list_of_lists_of_identifiers,
+    filters_per_view=is_list_of_valid_filters,
+)
+def create_views_on_table(
+    view_names: List[str],
+    table_name: str,
+    columns_per_view: List[List[str]],
+    filters_per_view: List[Optional[dict]],
+) -> List[TableInfo]:
+    """
+    Creates, in a single query, views with different columns and filters on a
+    table that the worker created, e.g. the output of a UDF. As with the tables
+    that the UDFs create, the rows of the views are not checked.
+    """
+    view_creation_queries = []
+    for view_name, columns, filters in zip(
+        view_names, columns_per_view, filters_per_view
+    ):
+        filter_clause = ""
+        if filters:
+            filter_clause = f"WHERE {build_filter_clause(filters)}"
+        columns_clause = ", ".join([f'"{column}"' for column in columns])
+        view_creation_queries.append(
+            f"""
+            CREATE VIEW {view_name}
+            AS SELECT {columns_clause}
+            FROM {table_name}
+            {filter_clause};
+            """
+        )
+    monetdb_facade.execute_query("".join(view_creation_queries))
+
+    table_schema = get_table_schema(table_name)
+    return [
+        TableInfo(
+            name=view_name,
+            schema_=_get_ordered_table_schema(table_schema, columns),
+            type_=TableType.VIEW,
+        )
+        for view_name, columns in zip(view_names, columns_per_view)
+    ]
+
+
+@sql_injection_guard(
+    table_name=str.isidentifier,
+    source_table_name=is_primary_data_table,
+    columns=is_list_of_identifiers,
+    filters=is_valid_filter,
+)
+def create_cached_view_table(
+    table_name: str,
+    source_table_name: str,
+    columns: List[str],
+    filters: Optional[dict],
+) -> int:
+    """
+    Materializes the columns of a table, after applying the filters, into a new
+    table and returns its number of rows.
+    """
+    filter_clause = ""
+    if filters:
+        filter_clause = f"WHERE {build_filter_clause(filters)}"
+    columns_clause = ", ".join([f'"{column}"' for column in columns])
+
+    monetdb_facade.execute_query(
+        f"""
+        CREATE TABLE {table_name}
+        AS SELECT {columns_clause}
+        FROM {source_table_name}
+        {filter_clause}
+        WITH DATA
+        """
+    )
+
+    table_rows_query_result = monetdb_facade.execute_and_fetchall(
+        f"""
+        SELECT COUNT(*)
+        FROM {table_name}
+        """
+    )
+    return table_rows_query_result[0][0]
+
+
+@sql_injection_guard(
+    view_name=str.isidentifier,
+    cached_view_table_name=str.isidentifier,
+    columns=is_list_of_identifiers,
+    row_count=None,
+    table_schema=None,
+    minimum_row_count=None,
+    check_min_rows=None,
+)
+def create_view_on_cached_table(
+    view_name: str,
+    cached_view_table_name: str,
+    columns: List[str],
+    row_count: int,
+    table_schema: TableSchema,
+    minimum_row_count: int,
+    check_min_rows=False,
+) -> TableInfo:
+    """
+    Creates a view on a table created by create_cached_view_table. The row count
+    of the table is already known, so the sufficiency of the data is checked
+    before the view is created.
+    """
+    if _is_insufficient_data(row_count, minimum_row_count, check_min_rows):
+        raise InsufficientDataError(
+            f"The view {view_name} on {cached_view_table_name} would contain "
+            f"insufficient data. ({row_count=})"
+        )
+
+    columns_clause = ", ".join([f'"{column}"' for column in columns])
+    monetdb_facade.execute_query(
+        f"""
+        CREATE VIEW {view_name}
+        AS SELECT {columns_clause}
+        FROM {cached_view_table_name}
+        """
+    )
+
+    return TableInfo(
+        name=view_name,
+        schema_=_get_ordered_table_schema(table_schema, columns),
+        type_=TableType.VIEW,
+    )
+
+
+@sql_injection_guard(data_model=is_datamodel)
+def get_data_model_non_null_counts(data_model: str) -> Dict[str, Dict[str, int]]:
+    """
+    Counts, in a single scan of the data model's data, the non null values of each
+    column per dataset. The count of the primary key is the rows of the dataset.
+    """
+    columns = monetdb_facade.execute_and_fetchall(
+        f"""
+        SELECT columns.name
+        FROM columns
+        JOIN tables
+        ON tables.id = columns.table_id
+        JOIN schemas
+        ON schemas.id = tables.schema_id
+        WHERE schemas.name = '{data_model}'
+        AND tables.name = 'primary_data'
+        ORDER BY columns.number
+        """
+    )
+    column_names = [column_name for column_name, *_ in columns]
+    counts_clause = ", ".join([f'COUNT("{column}")' for column in column_names])
+    counts_per_dataset = monetdb_facade.execute_and_fetchall(
+        f"""
+        SELECT "{DATASET_COLUMN}", {counts_clause}
+        FROM "{data_model}"."primary_data"
+        GROUP BY "{DATASET_COLUMN}"
+        """
+    )
+    return {
+        dataset: dict(zip(column_names, counts))
+        for dataset, *counts in counts_per_dataset
+    }
+
+
+def get_cached_view_table_names() -> List[str]:
+    table_names = monetdb_facade.execute_and_fetchall(
+        f"""
+        SELECT name FROM tables
+        WHERE name LIKE '{CACHED_VIEW_TABLE_PREFIX}%'
+        AND system = false
+        """
+    )
+    return [table_name for table_name, *_ in table_names]
+
+
+@sql_injection_guard(table_names=is_list_of_identifiers)
+def get_table_names_with_dependents(table_names: List[str]) -> List[str]:
+    """
+    Retrieves which of the given tables have other database objects, e.g. views,
+    depending on them, so they cannot be dropped yet.
+    """
+    table_names_clause = ", ".join([f"'{table_name}'" for table_name in table_names])
+    table_names_with_dependents = monetdb_facade.execute_and_fetchall(
+        f"""
+        SELECT DISTINCT tables.name
+        FROM tables
+        JOIN dependencies
+        ON dependencies.id = tables.id
+        WHERE tables.name IN ({table_names_clause})
+        """
+    )
+    return [table_name for table_name, *_ in table_names_with_dependents]
+
+
+@sql_injection_guard(table_names=is_list_of_identifiers)
+def drop_tables(table_names: List[str]):
+    monetdb_facade.execute_query(
+        "".join([f"DROP TABLE {table_name};" for table_name in table_names])
+    )
+
+
+def _is_insufficient_data(
+    row_count: int, minimum_row_count: int, check_min_rows: bool
+) -> bool:
+    return row_count < _get_required_row_count(minimum_row_count, check_min_rows)
+
+
+def _get_required_row_count(minimum_row_count: int, check_min_rows: bool) -> int:
+    return max(minimum_row_count, 1) if check_min_rows else 1
+
+
+def _has_at_least_rows(view_name: str, row_count: int) -> bool:
+    rows = monetdb_facade.execute_and_fetchall(
+        f"""
+        SELECT 1
+        FROM {view_name}
+        LIMIT {row_count}
+        """
+    )
+    return len(rows) >= row_count
+
+
 def _get_ordered_table_schema(
     table_schema: TableSchema, ordered_columns: List[str]
 ) -> TableSchema:
@@ -1,19 +1,36 @@
+from typing import Callable
 from typing import List
+from typing import Optional
+from typing import Tuple
 
 from exareme2 import DATA_TABLE_PRIMARY_KEY
 from exareme2.worker import config as worker_config
+from exareme2.worker.exareme2.cleanup.context_artifacts_registry import (
+    context_artifacts_registry,
+)
 from exareme2.worker.exareme2.tables.tables_db import create_table_name
 from exareme2.worker.exareme2.views import views_db
+from exareme2.worker.exareme2.views.views_cache import DataModelViewsCache
+from exareme2.worker.exareme2.views.views_cache import get_data_model_view_key
+from exareme2.worker.exareme2.views.views_statistics import DataModelsStatistics
 from exareme2.worker.utils.logger import initialise_logger
 from exareme2.worker.worker_info.worker_info_db import get_data_models
 from exareme2.worker.worker_info.worker_info_db import get_dataset_infos
+from exareme2.worker.worker_info.worker_info_db import get_datasets_content_hash
 from exareme2.worker_communication import DataModelUnavailable
 from exareme2.worker_communication import DatasetUnavailable
+from exareme2.worker_communication import InsufficientDataError
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableType
 
 MINIMUM_ROW_COUNT = worker_config.privacy.minimum_row_count
 
+data_model_views_cache = DataModelViewsCache(
+    max_entries=worker_config.data_model_views_cache.max_entries,
+    max_rows=worker_config.data_model_views_cache.max_rows,
+)
+data_models_statistics = DataModelsStatistics()
+
 
 @initialise_logger
 def get_views(request_id: str, context_id: str) -> List[str]:
@@ -30,7 +47,7 @@ def get_views(request_id: str, context_id: str) -> List[str]:
     List[str]
         A list of view names
     """
-    return views_db.get_view_names(context_id)
+    return context_artifacts_registry.get_table_names(context_id, TableType.VIEW)
 
 
 @initialise_logger
@@ -68,8 +85,15 @@ def create_data_model_views(
         A flag that determines if the not null constraints about the columns should be included in the filters
     check_min_rows : bool
         A flag that determines if the min_rows_threshold should be checked.
+
+    When the 'data_model_views_cache' is enabled, the views are created on cached
+    tables, containing the filtered data of each view, instead of the data model's
+    data. Otherwise, the data model's statistics are used to check if the views
+    contain sufficient data, without scanning them when possible.
     """
     _validate_data_model_and_datasets_exist(data_model, datasets)
+    filtered = bool(filters)
+    not_null_columns = []
     if datasets:
         filters = _get_filters_with_datasets_constraints(
             filters=filters, datasets=datasets
@@ -81,7 +105,32 @@ def create_data_model_views(
         filters = _get_filters_with_columns_not_null_constraints(
             filters=filters, columns=all_columns
         )
+        not_null_columns = all_columns
+
+    datasets_content_hash = get_datasets_content_hash()
+    if worker_config.data_model_views_cache.enabled:
+        return [
+            _create_cached_data_model_view(
+                context_id=context_id,
+                command_id=command_id,
+                result_id=str(count),
+                data_model=data_model,
+                datasets=datasets,
+                columns=view_columns,
+                filters=filters,
+                dropna=dropna,
+                check_min_rows=check_min_rows,
+                datasets_content_hash=datasets_content_hash,
+            )
+            for count, view_columns in enumerate(columns_per_view)
+        ]
 
+    statistics = data_models_statistics.get(data_model, datasets_content_hash)
+    row_count_bounds = statistics.get_row_count_bounds(
+        datasets=datasets or statistics.datasets,
+        not_null_columns=not_null_columns,
+        filtered=filtered,
+    )
     return [
         create_data_model_view(
             context_id=context_id,
@@ -91,6 +140,10 @@ def create_data_model_views(
             columns=view_columns,
             filters=filters,
             check_min_rows=check_min_rows,
+            row_count_bounds=row_count_bounds,
+            are_row_count_bounds_current=lambda: (
+                get_datasets_content_hash() == datasets_content_hash
+            ),
         )
         for count, view_columns in enumerate(columns_per_view)
     ]
@@ -104,6 +157,8 @@ def create_data_model_view(
     columns: List[str],
     filters: dict = None,
     check_min_rows: bool = True,
+    row_count_bounds: Optional[Tuple[int, int]] = None,
+    are_row_count_bounds_current: Optional[Callable[[], bool]] = None,
 ) -> TableInfo:
     view_name = create_table_name(
         table_type=TableType.VIEW,
@@ -114,16 +169,134 @@ def create_data_model_view(
     )
     columns.insert(0, DATA_TABLE_PRIMARY_KEY)
 
-    return views_db.create_view(
+    return _create_registered_view(
+        context_id=context_id,
         view_name=view_name,
-        table_name=f'"{data_model}"."primary_data"',
+        create_view=lambda: views_db.create_view(
+            view_name=view_name,
+            table_name=f'"{data_model}"."primary_data"',
+            columns=columns,
+            filters=filters,
+            minimum_row_count=MINIMUM_ROW_COUNT,
+            check_min_rows=check_min_rows,
+            row_count_bounds=row_count_bounds,
+            are_row_count_bounds_current=are_row_count_bounds_current,
+        ),
+    )
+
+
+def _create_cached_data_model_view(
+    context_id: str,
+    command_id: str,
+    result_id: str,
+    data_model: str,
+    datasets: List[str],
+    columns: List[str],
+    filters: Optional[dict],
+    dropna: bool,
+    check_min_rows: bool,
+    datasets_content_hash: str,
+) -> TableInfo:
+    view_name = create_table_name(
+        table_type=TableType.VIEW,
+        worker_id=worker_config.identifier,
+        context_id=context_id,
+        command_id=command_id,
+        result_id=result_id,
+    )
+    columns = [DATA_TABLE_PRIMARY_KEY] + columns
+
+    cached_view = data_model_views_cache.acquire(
+        key=get_data_model_view_key(data_model, datasets, columns, filters, dropna),
+        datasets_content_hash=datasets_content_hash,
+        source_table_name=f'"{data_model}"."primary_data"',
         columns=columns,
         filters=filters,
-        minimum_row_count=MINIMUM_ROW_COUNT,
-        check_min_rows=check_min_rows,
+    )
+    try:
+        return _create_registered_view(
+            context_id=context_id,
+            view_name=view_name,
+            create_view=lambda: views_db.create_view_on_cached_table(
+                view_name=view_name,
+                cached_view_table_name=cached_view.table_name,
+                columns=columns,
+                row_count=cached_view.row_count,
+                table_schema=cached_view.schema_,
+                minimum_row_count=MINIMUM_ROW_COUNT,
+                check_min_rows=check_min_rows,
+            ),
+        )
+    finally:
+        data_model_views_cache.release(cached_view)
+
+
+@initialise_logger
+def create_views(
+    request_id: str,
+    context_id: str,
+    command_id: str,
+    table_name: str,
+    columns_per_view: List[List[str]],
+    filters_per_view: List[Optional[dict]],
+) -> List[TableInfo]:
+    """
+    Creates views, with different columns and filters, on a table of the context.
+    All the views are created with a single query.
+
+    Parameters
+    ----------
+    request_id : str
+        The identifier for the logging
+    context_id : str
+        The id of the experiment
+    command_id : str
+        The id of the command that the views
+    table_name : str
+        The name of the table
+    columns_per_view : List[List[str]]
+        The columns of each view
+    filters_per_view : List[Optional[dict]]
+        The Jquery filters of each view
+
+    Returns
+    ------
+    List[TableInfo]
+        A list of views(TableInfo), one for each element of columns_per_view
+    """
+    view_names = [
+        create_table_name(
+            table_type=TableType.VIEW,
+            worker_id=worker_config.identifier,
+            context_id=context_id,
+            command_id=command_id,
+            result_id=str(count),
+        )
+        for count in range(len(columns_per_view))
+    ]
+    for view_name in view_names:
+        context_artifacts_registry.register_table(context_id, view_name, TableType.VIEW)
+
+    return views_db.create_views_on_table(
+        view_names=view_names,
+        table_name=table_name,
+        columns_per_view=columns_per_view,
+        filters_per_view=filters_per_view,
     )
 
 
+def _create_registered_view(
+    context_id: str, view_name: str, create_view: Callable[[], TableInfo]
+) -> TableInfo:
+    context_artifacts_registry.register_table(context_id, view_name, TableType.VIEW)
+    try:
+        return create_view()
+    except InsufficientDataError:
+        # The view is dropped when there are not enough data, so it is not an artifact
+        context_artifacts_registry.unregister_table(context_id, view_name)
+        raise
+
+
 def _get_filters_with_datasets_constraints(filters, datasets):
     """
     This function will return the given filters which will also include the dataset's constraints.
@@ -222,10 +395,14 @@ def create_view(
         context_id,
         command_id,
     )
-    return views_db.create_view(
+    return _create_registered_view(
+        context_id=context_id,
         view_name=view_name,
-        table_name=table_name,
-        columns=columns,
-        filters=filters,
-        minimum_row_count=MINIMUM_ROW_COUNT,
+        create_view=lambda: views_db.create_view(
+            view_name=view_name,
+            table_name=table_name,
+            columns=columns,
+            filters=filters,
+            minimum_row_count=MINIMUM_ROW_COUNT,
+        ),
     )
@@ -0,0 +1,93 @@
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from eventlet.lock import Semaphore
+from pydantic import BaseModel
+
+from exareme2 import DATA_TABLE_PRIMARY_KEY
+from exareme2.worker.exareme2.views import views_db
+
+
+class DataModelStatistics(BaseModel):
+    """
+    The non null values of each column, per dataset, of a data model. The non null
+    values of the primary key are the rows of the dataset.
+    """
+
+    non_null_counts_per_dataset: Dict[str, Dict[str, int]]
+
+    class Config:
+        allow_mutation = False
+
+    @property
+    def datasets(self) -> List[str]:
+        return list(self.non_null_counts_per_dataset)
+
+    def get_row_count_bounds(
+        self,
+        datasets: List[str],
+        not_null_columns: List[str],
+        filtered: bool,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Estimates a lower and an upper bound of the rows of a view on the datasets,
+        where the not_null_columns cannot be null.
+
+        The upper bound assumes that the nulls of the columns are on the same rows,
+        while the lower bound assumes that they are on different rows. When the view
+        is also filtered, the lower bound is 0, since the filters could exclude any row.
+
+        Returns None if there are no statistics for any of the columns.
+        """
+        lower_bound = upper_bound = 0
+        for dataset in datasets:
+            non_null_counts = self.non_null_counts_per_dataset.get(dataset)
+            if not non_null_counts:
+                continue
+            if any(column not in non_null_counts for column in not_null_columns):
+                return None
+
+            row_count = non_null_counts[DATA_TABLE_PRIMARY_KEY]
+            null_counts = [
+                row_count - non_null_counts[column] for column in not_null_columns
+            ]
+            upper_bound += row_count - max(null_counts, default=0)
+            lower_bound += max(row_count - sum(null_counts), 0)
+
+        if filtered:
+            lower_bound = 0
+        return lower_bound, upper_bound
+
+
+class DataModelsStatistics:
+    """
+    Keeps the statistics of the data models. They are computed on their first use
+    and computed again after the datasets of the worker change, i.e. when data are
+    loaded.
+    """
+
+    def __init__(self):
+        self._statistics: Dict[str, DataModelStatistics] = {}
+        self._datasets_content_hash: Optional[str] = None
+        self._lock = Semaphore()
+
+    def get(self, data_model: str, datasets_content_hash: str) -> DataModelStatistics:
+        with self._lock:
+            if self._datasets_content_hash != datasets_content_hash:
+                self._statistics.clear()
+                self._datasets_content_hash = datasets_content_hash
+            statistics = self._statistics.get(data_model)
+        if statistics:
+            return statistics
+
+        statistics = DataModelStatistics(
+            non_null_counts_per_dataset=views_db.get_data_model_non_null_counts(
+                data_model
+            )
+        )
+        with self._lock:
+            if self._datasets_content_hash == datasets_content_hash:
+                self._statistics[data_model] = statistics
+        return statistics
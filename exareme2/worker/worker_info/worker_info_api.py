@@ -1,3 +1,5 @@
+from typing import Optional
+
 from celery import shared_task
 
 from exareme2.worker.worker_info import worker_info_service
@@ -23,6 +25,20 @@ def get_data_model_cdes(request_id: str, data_model: str) -> str:
     return worker_info_service.get_data_model_cdes(request_id, data_model).json()
 
 
+@shared_task
+def get_worker_metadata_snapshot(
+    request_id: str, known_content_hash: Optional[str] = None
+) -> str:
+    return worker_info_service.get_worker_metadata_snapshot(
+        request_id, known_content_hash
+    ).json()
+
+
+@shared_task
+def get_execution_scheduler_stats(request_id: str) -> str:
+    return worker_info_service.get_execution_scheduler_stats(request_id).json()
+
+
 @shared_task
 def healthcheck(request_id: str, check_db):
     return worker_info_service.healthcheck(request_id, check_db)
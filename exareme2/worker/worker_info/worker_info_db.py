@@ -1,15 +1,21 @@
+import hashlib
 import json
 import warnings
 from typing import Dict
 from typing import List
+from typing import Optional
 
+from exareme2 import DATA_TABLE_PRIMARY_KEY
 from exareme2.worker import config as worker_config
+from exareme2.worker.exareme2.monetdb import monetdb_facade
 from exareme2.worker.exareme2.monetdb.guard import is_datamodel
+from exareme2.worker.exareme2.monetdb.guard import is_list_of_datamodels
 from exareme2.worker.exareme2.monetdb.guard import sql_injection_guard
 from exareme2.worker.worker_info import sqlite
 from exareme2.worker_communication import CommonDataElement
 from exareme2.worker_communication import CommonDataElements
 from exareme2.worker_communication import DataModelAttributes
+from exareme2.worker_communication import DataModelsMetadataSnapshot
 from exareme2.worker_communication import DatasetInfo
 
 HEALTHCHECK_VALIDATION_STRING = "HEALTHCHECK"
@@ -133,6 +139,163 @@ def get_data_model_attributes(data_model: str) -> DataModelAttributes:
     )
 
 
+def get_data_models_metadata_snapshot(
+    known_content_hash: Optional[str] = None,
+) -> DataModelsMetadataSnapshot:
+    """
+    Retrieves the datasets, cdes and attributes of all the enabled data models,
+    using one query for the data models and datasets and one for all the cdes.
+
+    Parameters
+    ----------
+    known_content_hash : Optional[str]
+        The content hash the requester already has. If the content has not changed,
+        the metadata are not parsed and are omitted from the snapshot.
+
+    Returns
+    ------
+    DataModelsMetadataSnapshot
+    """
+    data_models_and_datasets_rows = sqlite.execute_and_fetchall(
+        """
+        SELECT data_models.code, data_models.version, data_models.properties,
+               datasets.code, datasets.label, datasets.csv_path
+        FROM data_models
+        LEFT JOIN datasets
+        ON datasets.data_model_id = data_models.data_model_id
+        AND datasets.status = 'ENABLED'
+        WHERE data_models.status = 'ENABLED'
+        ORDER BY data_models.code, data_models.version, datasets.code
+        """
+    )
+    data_models = list(
+        dict.fromkeys(
+            f"{code}:{version}" for code, version, *_ in data_models_and_datasets_rows
+        )
+    )
+    cdes_rows = _get_data_models_cdes_rows(data_models)
+
+    content = json.dumps([data_models_and_datasets_rows, cdes_rows])
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    if content_hash == known_content_hash:
+        return DataModelsMetadataSnapshot(content_hash=content_hash)
+
+    datasets_info_per_data_model = {data_model: [] for data_model in data_models}
+    attributes_per_data_model = {}
+    for (
+        code,
+        version,
+        properties,
+        dataset_code,
+        dataset_label,
+        dataset_csv_path,
+    ) in data_models_and_datasets_rows:
+        data_model = f"{code}:{version}"
+        if data_model not in attributes_per_data_model:
+            attributes = json.loads(properties)
+            attributes_per_data_model[data_model] = DataModelAttributes(
+                tags=attributes["tags"], properties=attributes["properties"]
+            )
+        if dataset_code is not None:
+            datasets_info_per_data_model[data_model].append(
+                DatasetInfo(
+                    code=dataset_code,
+                    label=dataset_label,
+                    csv_path=convert_absolute_dataset_path_to_relative(dataset_csv_path)
+                    if dataset_csv_path is not None
+                    else None,
+                )
+            )
+
+    cdes_per_data_model = {data_model: {} for data_model in data_models}
+    for data_model, code, metadata in cdes_rows:
+        cdes_per_data_model[data_model][code] = CommonDataElement.parse_raw(metadata)
+
+    return DataModelsMetadataSnapshot(
+        content_hash=content_hash,
+        datasets_info_per_data_model=datasets_info_per_data_model,
+        cdes_per_data_model={
+            data_model: CommonDataElements(values=cdes)
+            for data_model, cdes in cdes_per_data_model.items()
+        },
+        attributes_per_data_model=attributes_per_data_model,
+    )
+
+
+@sql_injection_guard(data_models=is_list_of_datamodels)
+def _get_data_models_cdes_rows(data_models: List[str]) -> List[tuple]:
+    """
+    Retrieves the data model, code and metadata of the cdes of all the data
+    models, with one query.
+    """
+    if not data_models:
+        return []
+    return sqlite.execute_and_fetchall(
+        " UNION ALL ".join(
+            f"""
+            SELECT '{data_model}', code, metadata
+            FROM "{data_model}_variables_metadata"
+            """
+            for data_model in data_models
+        )
+        + " ORDER BY 1, 2"
+    )
+
+
+def get_datasets_content_hash() -> str:
+    """
+    Computes a hash of the enabled data models and datasets, that changes whenever
+    a data model or a dataset is added, removed, enabled or disabled, as well as
+    whenever the data of a data model are loaded again, e.g. a dataset is removed
+    and added again with the same code and csv path but different rows.
+
+    Returns
+    ------
+    str
+    """
+    datasets_rows = sqlite.execute_and_fetchall(
+        """
+        SELECT data_models.data_model_id, data_models.code, data_models.version,
+        datasets.dataset_id, datasets.code, datasets.csv_path
+        FROM data_models
+        LEFT JOIN datasets
+        ON datasets.data_model_id = data_models.data_model_id
+        AND datasets.status = 'ENABLED'
+        WHERE data_models.status = 'ENABLED'
+        ORDER BY data_models.code, data_models.version, datasets.code
+        """
+    )
+    data_models = sorted(
+        {
+            f"{data_model_code}:{version}"
+            for _, data_model_code, version, *_ in datasets_rows
+        }
+    )
+    content = json.dumps(
+        [datasets_rows, _get_primary_data_markers(data_models)], default=str
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+@sql_injection_guard(data_models=is_list_of_datamodels)
+def _get_primary_data_markers(data_models: List[str]) -> List[tuple]:
+    """
+    Retrieves the row count and the max row id of the data of each data model,
+    with one query. They change whenever rows are loaded or removed.
+    """
+    if not data_models:
+        return []
+    return monetdb_facade.execute_and_fetchall(
+        " UNION ALL ".join(
+            f"""
+            SELECT '{data_model}', COUNT(*), MAX("{DATA_TABLE_PRIMARY_KEY}")
+            FROM "{data_model}"."primary_data"
+            """
+            for data_model in data_models
+        )
+    )
+
+
 def check_database_connection():
     """
     Check that the connection with the database is working.
@@ -1,4 +1,8 @@
+from typing import Optional
+
 from exareme2.worker import config as worker_config
+from exareme2.worker.exareme2.monetdb import monetdb_facade
+from exareme2.worker.exareme2.monetdb.monetdb_facade import ExecutionSchedulerStats
 from exareme2.worker.utils.logger import initialise_logger
 from exareme2.worker.worker_info import worker_info_db
 from exareme2.worker.worker_info.worker_info_db import check_database_connection
@@ -6,8 +10,11 @@ from exareme2.worker.worker_info.worker_info_db import get_data_models
 from exareme2.worker.worker_info.worker_info_db import get_dataset_infos
 from exareme2.worker_communication import CommonDataElements
 from exareme2.worker_communication import DataModelAttributes
+from exareme2.worker_communication import DataModelsMetadataSnapshot
 from exareme2.worker_communication import DatasetsInfoPerDataModel
 from exareme2.worker_communication import WorkerInfo
+from exareme2.worker_communication import WorkerMetadataSnapshot
+from exareme2.worker_communication import WorkerRole
 
 
 @initialise_logger
@@ -19,14 +26,7 @@ def get_worker_info(request_id: str) -> WorkerInfo:
         The identifier for the logging
     """
 
-    return WorkerInfo(
-        id=worker_config.identifier,
-        role=worker_config.role,
-        ip=worker_config.rabbitmq.ip,
-        port=worker_config.rabbitmq.port,
-        db_ip=worker_config.monetdb.ip,
-        db_port=worker_config.monetdb.port,
-    )
+    return _get_worker_info()
 
 
 @initialise_logger
@@ -75,6 +75,56 @@ def get_data_model_cdes(request_id: str, data_model: str) -> CommonDataElements:
     return worker_info_db.get_data_model_cdes(data_model)
 
 
+@initialise_logger
+def get_worker_metadata_snapshot(
+    request_id: str, known_content_hash: Optional[str] = None
+) -> WorkerMetadataSnapshot:
+    """
+    Parameters
+    ----------
+    request_id: str
+        The identifier for the logging
+    known_content_hash: Optional[str]
+        The content hash of the data models metadata already known by the controller.
+    Returns
+    ------
+    WorkerMetadataSnapshot
+        The worker info along with the datasets, cdes and attributes of all its data
+        models. The data models metadata are omitted when their content hash matches
+        the known_content_hash.
+    """
+    if worker_config.role == WorkerRole.GLOBALWORKER:
+        data_models_metadata = DataModelsMetadataSnapshot(
+            content_hash="",
+            datasets_info_per_data_model={},
+            cdes_per_data_model={},
+            attributes_per_data_model={},
+        )
+    else:
+        data_models_metadata = worker_info_db.get_data_models_metadata_snapshot(
+            known_content_hash
+        )
+    return WorkerMetadataSnapshot(
+        worker_info=_get_worker_info(), data_models_metadata=data_models_metadata
+    )
+
+
+@initialise_logger
+def get_execution_scheduler_stats(request_id: str) -> ExecutionSchedulerStats:
+    """
+    Parameters
+    ----------
+    request_id : str
+        The identifier for the logging
+    Returns
+    ------
+    ExecutionSchedulerStats
+        The memory in use by the running UDFs and, for each statement class, the
+        number of queued and running executions and their waiting times.
+    """
+    return monetdb_facade.get_execution_scheduler_stats()
+
+
 @initialise_logger
 def healthcheck(request_id: str, check_db):
     """
@@ -90,3 +140,14 @@ def healthcheck(request_id: str, check_db):
     """
     if check_db:
         check_database_connection()
+
+
+def _get_worker_info() -> WorkerInfo:
+    return WorkerInfo(
+        id=worker_config.identifier,
+        role=worker_config.role,
+        ip=worker_config.rabbitmq.ip,
+        port=worker_config.rabbitmq.port,
+        db_ip=worker_config.monetdb.ip,
+        db_port=worker_config.monetdb.port,
+    )
@@ -1,3 +1,5 @@
+import base64
+import json
 from abc import ABC
 from enum import Enum
 from enum import unique
@@ -6,9 +8,11 @@ from typing import Any
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import Union
 
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel
 from pydantic import validator
@@ -151,6 +155,7 @@ class _WorkerUDFDTOType(Enum):
     TABLE = "TABLE"
     LITERAL = "LITERAL"
     SMPC = "SMPC"
+    PIPELINE_OUTPUT = "PIPELINE_OUTPUT"
 
     def __str__(self):
         return self.name
@@ -337,6 +342,28 @@ class CommonDataElements(BaseModel):
         return True
 
 
+class DataModelsMetadataSnapshot(ImmutableBaseModel):
+    """
+    The datasets, cdes and attributes of all the data models of a worker, along with
+    a hash of their content. They are omitted when the content hash is the one
+    already known by the requester.
+    """
+
+    content_hash: str
+    datasets_info_per_data_model: Optional[Dict[str, List[DatasetInfo]]] = None
+    cdes_per_data_model: Optional[Dict[str, CommonDataElements]] = None
+    attributes_per_data_model: Optional[Dict[str, DataModelAttributes]] = None
+
+    @property
+    def is_omitted(self) -> bool:
+        return self.datasets_info_per_data_model is None
+
+
+class WorkerMetadataSnapshot(ImmutableBaseModel):
+    worker_info: WorkerInfo
+    data_models_metadata: DataModelsMetadataSnapshot
+
+
 # ~~~~~~~~~~~~~~~~~~~ Table Data DTOs ~~~~~~~~~~~~~~~~~~~~~~ #
 
 
@@ -360,6 +387,15 @@ class ColumnData(ImmutableBaseModel):
             )
         return tp
 
+    @classmethod
+    def from_trusted_data(cls, name: str, data: List[Any]) -> "ColumnData":
+        """
+        Creates the column without validating each one of its values. Only for
+        data coming from our own db layer, whose values already have the type of
+        the column, since the validation of large columns is very slow.
+        """
+        return cls.construct(name=name, data=data, type=cls.__fields__["type"].default)
+
 
 class ColumnDataInt(ColumnData):
     data: List[Union[None, int]]
@@ -386,10 +422,126 @@ class ColumnDataBinary(ColumnData):
     type = DType.BINARY
 
 
+class ColumnBuffer(ImmutableBaseModel):
+    """
+    The data of a column as a typed buffer along with a bitmap of its non null
+    values, in a layout similar to the one of Arrow. Numerical columns are stored
+    as 64-bit values, while the values of the variable length columns are
+    concatenated and the offsets of each value are stored separately.
+
+    The buffers are base64 encoded, so that they can be sent as part of the json
+    results of the tasks, and are only decoded when the data are used.
+    """
+
+    name: str
+    type: DType
+    length: int
+    validity: str
+    values: str
+    offsets: Optional[str] = None
+
+    @classmethod
+    def from_data(cls, name: str, type: DType, data: Sequence[Any]) -> "ColumnBuffer":
+        length = len(data)
+        objects = np.empty(length, dtype=object)
+        objects[:] = data
+        validity = np.not_equal(objects, None)
+        if type in _FIXED_WIDTH_COLUMN_NUMPY_TYPES:
+            values = np.zeros(length, dtype=_FIXED_WIDTH_COLUMN_NUMPY_TYPES[type])
+            values[validity] = objects[validity]
+            values, offsets = values.tobytes(), None
+        else:
+            encoded = [
+                _encode_variable_width_value(value) if valid else b""
+                for value, valid in zip(data, validity)
+            ]
+            offsets = np.zeros(length + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+            values, offsets = b"".join(encoded), _b64encode(offsets.tobytes())
+        return cls(
+            name=name,
+            type=type,
+            length=length,
+            validity=_b64encode(np.packbits(validity, bitorder="little").tobytes()),
+            values=_b64encode(values),
+            offsets=offsets,
+        )
+
+    @property
+    def data(self) -> List[Any]:
+        validity = self.get_validity()
+        values = self._decode_values(validity).tolist()
+        if validity.all():
+            return values
+        return [value if valid else None for value, valid in zip(values, validity)]
+
+    def get_validity(self) -> np.ndarray:
+        validity = np.frombuffer(_b64decode(self.validity), dtype=np.uint8)
+        return np.unpackbits(validity, count=self.length, bitorder="little").astype(
+            bool
+        )
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        Decodes the column into a numpy array. Numerical columns without nulls
+        keep their type, numerical columns with nulls are converted to floats with
+        nans in place of the nulls and all other columns become object arrays with
+        None in place of the nulls.
+        """
+        validity = self.get_validity()
+        values = self._decode_values(validity)
+        if self.type not in _FIXED_WIDTH_COLUMN_NUMPY_TYPES or validity.all():
+            return values
+        values = values.astype(np.float64)
+        values[~validity] = np.nan
+        return values
+
+    def _decode_values(self, validity: np.ndarray) -> np.ndarray:
+        if self.type in _FIXED_WIDTH_COLUMN_NUMPY_TYPES:
+            return np.frombuffer(
+                _b64decode(self.values),
+                dtype=_FIXED_WIDTH_COLUMN_NUMPY_TYPES[self.type],
+            )
+
+        values = _b64decode(self.values)
+        offsets = np.frombuffer(_b64decode(self.offsets), dtype=np.int64).tolist()
+        array = np.empty(self.length, dtype=object)
+        array[:] = [
+            _decode_variable_width_value(self.type, values[start:end])
+            if valid
+            else None
+            for start, end, valid in zip(offsets, offsets[1:], validity)
+        ]
+        return array
+
+
+_FIXED_WIDTH_COLUMN_NUMPY_TYPES = {
+    DType.INT: np.int64,
+    DType.FLOAT: np.float64,
+}
+
+
+def _encode_variable_width_value(value) -> bytes:
+    return value if isinstance(value, bytes) else value.encode("utf-8")
+
+
+def _decode_variable_width_value(type: DType, value: bytes):
+    return value if type == DType.BINARY else value.decode("utf-8")
+
+
+def _b64encode(buffer: bytes) -> str:
+    return base64.b64encode(buffer).decode("ascii")
+
+
+def _b64decode(buffer: str) -> bytes:
+    return base64.b64decode(buffer)
+
+
 class TableData(ImmutableBaseModel):
     name: str
     columns: List[
         Union[
+            ColumnBuffer,
             ColumnDataInt,
             ColumnDataStr,
             ColumnDataFloat,
@@ -398,9 +550,48 @@ class TableData(ImmutableBaseModel):
         ]
     ]
 
+    @classmethod
+    def parse_trusted_raw(cls, raw: str) -> "TableData":
+        """
+        Parses the json of a TableData created by a worker without validating it
+        again, see ColumnData.from_trusted_data.
+        """
+        table_data = json.loads(raw)
+        return cls.construct(
+            name=table_data["name"],
+            columns=[_construct_column(column) for column in table_data["columns"]],
+        )
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        return {
+            column.name: (
+                column.to_numpy()
+                if isinstance(column, ColumnBuffer)
+                else pd.Series(column.data).to_numpy()
+            )
+            for column in self.columns
+        }
+
     def to_pandas(self) -> pd.DataFrame:
-        data = {column.name: column.data for column in self.columns}
-        return pd.DataFrame(data)
+        return pd.DataFrame(self.to_numpy())
+
+
+def _construct_column(column: dict) -> Union[ColumnBuffer, ColumnData]:
+    column_type = DType(column["type"])
+    if "values" in column:
+        return ColumnBuffer.construct(**{**column, "type": column_type})
+    return _COLUMN_DATA_CLASSES[column_type].from_trusted_data(
+        name=column["name"], data=column["data"]
+    )
+
+
+_COLUMN_DATA_CLASSES = {
+    DType.INT: ColumnDataInt,
+    DType.STR: ColumnDataStr,
+    DType.FLOAT: ColumnDataFloat,
+    DType.JSON: ColumnDataJSON,
+    DType.BINARY: ColumnDataBinary,
+}
 
 
 class TabularDataResult(ImmutableBaseModel):
@@ -453,16 +644,61 @@ class WorkerSMPCDTO(WorkerUDFDTO):
     value: SMPCTablesInfo
 
 
+class UDFPipelineOutputInfo(ImmutableBaseModel):
+    """
+    An output of a previous step of a UDF pipeline.
+    """
+
+    step: int
+    output: int = 0
+
+
+class WorkerUDFPipelineOutputDTO(WorkerUDFDTO):
+    type = _WorkerUDFDTOType.PIPELINE_OUTPUT
+    value: UDFPipelineOutputInfo
+
+
 class WorkerUDFPosArguments(ImmutableBaseModel):
     # The WorkerSMPCDTO cannot be used here instead of the Union due to pydantic json deserialization.
-    args: List[Union[WorkerLiteralDTO, WorkerTableDTO, WorkerSMPCDTO]]
+    args: List[
+        Union[
+            WorkerLiteralDTO,
+            WorkerTableDTO,
+            WorkerSMPCDTO,
+            WorkerUDFPipelineOutputDTO,
+        ]
+    ]
 
 
 class WorkerUDFKeyArguments(ImmutableBaseModel):
     # The WorkerSMPCDTO cannot be used here instead of the Union due to pydantic json deserialization.
-    args: Dict[str, Union[WorkerLiteralDTO, WorkerTableDTO, WorkerSMPCDTO]]
+    args: Dict[
+        str,
+        Union[
+            WorkerLiteralDTO,
+            WorkerTableDTO,
+            WorkerSMPCDTO,
+            WorkerUDFPipelineOutputDTO,
+        ],
+    ]
 
 
 class WorkerUDFResults(ImmutableBaseModel):
     # The WorkerSMPCDTO cannot be used here instead of the Union due to pydantic json deserialization.
     results: List[Union[WorkerLiteralDTO, WorkerTableDTO, WorkerSMPCDTO]]
+
+
+class WorkerUDFPipelineStep(ImmutableBaseModel):
+    command_id: str
+    func_name: str
+    positional_args: WorkerUDFPosArguments
+    keyword_args: WorkerUDFKeyArguments
+    output_schema: Optional[TableSchema] = None
+
+
+class WorkerUDFPipeline(ImmutableBaseModel):
+    steps: List[WorkerUDFPipelineStep]
+
+
+class WorkerUDFPipelineResults(ImmutableBaseModel):
+    results: List[WorkerUDFResults]
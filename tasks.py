@@ -92,6 +92,9 @@ CLEANUP_DIR = Path("/tmp/cleanup_entries/")
 if not CLEANUP_DIR.exists():
     CLEANUP_DIR.mkdir()
 
+# The state store of the UDFs, shared by the MonetDB containers and the workers
+UDF_STATE_STORE_DIR = Path("/tmp/exareme2_udf_states/")
+
 TEST_DATA_FOLDER = PROJECT_ROOT / "tests" / "test_data"
 
 ALGORITHM_FOLDERS_ENV_VARIABLE = "ALGORITHM_FOLDERS"
@@ -151,6 +154,7 @@ def create_configs(c):
         worker_config["monetdb"]["public_username"] = worker["public_monetdb_username"]
         worker_config["monetdb"]["public_password"] = worker["public_monetdb_password"]
         worker_config["monetdb"]["public_password"] = worker["public_monetdb_password"]
+        worker_config["monetdb"]["udf_state_store_dir"] = str(UDF_STATE_STORE_DIR)
 
         worker_config["rabbitmq"]["ip"] = deployment_config["ip"]
         worker_config["rabbitmq"]["port"] = worker["rabbitmq_port"]
@@ -172,6 +176,9 @@ def create_configs(c):
                 "privacy"
             ]["protect_local_data"]
 
+        if data_model_views_cache := deployment_config.get("data_model_views_cache"):
+            worker_config["data_model_views_cache"].update(data_model_views_cache)
+
         worker_config["smpc"]["enabled"] = deployment_config["smpc"]["enabled"]
         if worker_config["smpc"]["enabled"]:
             worker_config["smpc"]["optional"] = deployment_config["smpc"]["optional"]
@@ -379,7 +386,7 @@ def create_monetdb(
             f"Starting container {container_name} on ports {container_ports}...",
             Level.HEADER,
         )
-        cmd = f"""docker run -d -P -p {container_ports} -e SOFT_RESTART_MEMORY_LIMIT={monetdb_memory_limit * 0.7} -e HARD_RESTART_MEMORY_LIMIT={monetdb_memory_limit * 0.85}  -e LOG_LEVEL={log_level} {monetdb_nclient_env_var} -e MAX_MEMORY={monetdb_memory_limit*1048576} {monetdb_nclient_env_var} -v {udfio_full_path}:/home/udflib/udfio.py -v {TEST_DATA_FOLDER}:{TEST_DATA_FOLDER} --name {container_name} --memory={monetdb_memory_limit}m {image}"""
+        cmd = f"""docker run -d -P -p {container_ports} -e SOFT_RESTART_MEMORY_LIMIT={monetdb_memory_limit * 0.7} -e HARD_RESTART_MEMORY_LIMIT={monetdb_memory_limit * 0.85}  -e LOG_LEVEL={log_level} {monetdb_nclient_env_var} -e MAX_MEMORY={monetdb_memory_limit*1048576} {monetdb_nclient_env_var} -v {udfio_full_path}:/home/udflib/udfio.py -v {TEST_DATA_FOLDER}:{TEST_DATA_FOLDER} -v {UDF_STATE_STORE_DIR}:{UDF_STATE_STORE_DIR} -e UDF_STATE_STORE_DIR={UDF_STATE_STORE_DIR} --name {container_name} --memory={monetdb_memory_limit}m {image}"""
         run(c, cmd)
 
 
@@ -68,3 +68,9 @@ def one_hundred_seconds_udf(table):
     sleep(100)
     rows = [len(table)]
     return rows
+
+
+@udf(previous=transfer(), return_type=transfer())
+def increment_transfer(previous):
+    result = {"count": previous["count"] + 1}
+    return result
@@ -2,7 +2,13 @@ from unittest.mock import Mock
 from unittest.mock import call
 from unittest.mock import sentinel as s
 
+import pandas as pd
+import sklearn.model_selection
+
+from exareme2 import DType
+from exareme2.algorithms.exareme2.crossvalidation import KFold
 from exareme2.algorithms.exareme2.crossvalidation import cross_validate
+from exareme2.worker_communication import TableSchema
 
 
 class FakeSplitter:
@@ -50,3 +56,55 @@ def test_cross_validate__return_probabilities():
     models[1].assert_has_calls(mod1_expected_calls)
     assert len(y_pred) == 2
     assert y_true == [s.y_te0, s.y_te1]
+
+
+def test_kfold_assign_folds_local():
+    x = pd.DataFrame({"row_id": range(7), "x1": range(7)}).set_index("row_id")
+    y = pd.DataFrame({"row_id": range(7), "y1": range(7, 14)}).set_index("row_id")
+
+    folds = KFold._assign_folds_local(x, y, n_splits=3, fold_column="cv_fold")
+
+    assert list(folds.columns) == ["x1", "y1", "cv_fold"]
+    kf = sklearn.model_selection.KFold(n_splits=3)
+    for i, (train_idx, test_idx) in enumerate(kf.split(x)):
+        assert list(folds.index[folds.cv_fold != i]) == list(x.index[train_idx])
+        assert list(folds.index[folds.cv_fold == i]) == list(x.index[test_idx])
+
+
+def make_table(columns):
+    table = Mock(columns=columns)
+    table.full_schema = TableSchema.from_list(
+        [("row_id", DType.INT)] + [(column, DType.FLOAT) for column in columns]
+    )
+    return table
+
+
+def test_kfold_split_creates_all_splits_with_one_views_task():
+    condition_transfers = Mock()
+    condition_transfers.get_table_data.return_value = [['{"n_obs >= n_splits": true}']]
+    engine = Mock()
+    engine.run_udf_on_local_workers.side_effect = [condition_transfers, s.folds]
+    engine.create_views_on_local_workers.return_value = list(range(8))
+    X, y = make_table(["x1", "x2"]), make_table(["y1"])
+
+    x_train, x_test, y_train, y_test = KFold(engine, n_splits=2).split(X, y)
+
+    assert (x_train, x_test, y_train, y_test) == ([0, 1], [2, 3], [4, 5], [6, 7])
+    assert engine.run_udf_on_local_workers.call_count == 2
+    assert engine.run_udf_on_local_workers.call_args.kwargs["output_schema"] == [
+        ("row_id", DType.INT),
+        ("x1", DType.FLOAT),
+        ("x2", DType.FLOAT),
+        ("y1", DType.FLOAT),
+        ("cv_fold", DType.INT),
+    ]
+    views_kwargs = engine.create_views_on_local_workers.call_args.kwargs
+    assert views_kwargs["table"] == s.folds
+    assert (
+        views_kwargs["columns_per_view"]
+        == [["row_id", "x1", "x2"]] * 4 + [["row_id", "y1"]] * 4
+    )
+    assert [
+        (filter_["operator"], filter_["value"])
+        for filter_ in views_kwargs["filters_per_view"]
+    ] == [("not_equal", 0), ("not_equal", 1), ("equal", 0), ("equal", 1)] * 2
@@ -4,6 +4,7 @@ import pytest
 from sklearn.linear_model import LinearRegression as LinearRegressionSKL
 
 from exareme2.algorithms.exareme2.linear_regression import LinearRegression
+from exareme2.algorithms.exareme2.udf_pipeline import UDFPipelineOutput
 
 np.random.seed(0)
 
@@ -14,6 +15,16 @@ class InMemoryExecutionEngine:
 
     run_udf_on_global_worker = run_udf_on_local_workers
 
+    def run_udf_pipeline_on_local_workers(self, steps):
+        results = []
+        for step in steps:
+            keyword_args = {
+                name: results[arg.step] if isinstance(arg, UDFPipelineOutput) else arg
+                for name, arg in (step.keyword_args or {}).items()
+            }
+            results.append(step.func(**keyword_args))
+        return results
+
 
 class TestLinearRegression:
     @pytest.mark.parametrize("nrows", range(10, 100, 10))
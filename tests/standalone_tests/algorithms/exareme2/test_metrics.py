@@ -96,6 +96,26 @@ def test_roc_curve():
         assert fpr_res == fpr_res
 
 
+def test_roc_curve_local_counts():
+    """Validates the counts of `_roc_curve_local` against a threshold by threshold
+    computation, with ties between probabilities and thresholds"""
+    rng = np.random.default_rng(0)
+    ytrue = pd.DataFrame({"ybin": rng.integers(0, 2, size=1000)})
+    proba = pd.DataFrame({"proba": rng.integers(0, 20, size=1000) / 20})
+    thresholds = np.linspace(1.0, 0.0, num=41).tolist()
+
+    result = _roc_curve_local(ytrue, proba, thresholds)
+
+    y, p = ytrue["ybin"].to_numpy(), proba["proba"].to_numpy()
+    assert result["tp"]["data"] == [int(sum((p > t) & (y == 1))) for t in thresholds]
+    assert result["tn"]["data"] == [int(sum((p <= t) & (y == 0))) for t in thresholds]
+    assert result["fp"]["data"] == [int(sum((p > t) & (y == 0))) for t in thresholds]
+    assert result["fn"]["data"] == [int(sum((p <= t) & (y == 1))) for t in thresholds]
+    assert all(
+        val["type"] == "int" and val["operation"] == "sum" for val in result.values()
+    )
+
+
 @st.composite
 def numeric_labels(draw):
     n_labels = draw(st.integers(2, 10))
@@ -1,12 +1,86 @@
+import json
+import operator
+import sqlite3
+from functools import partial
+from functools import reduce
+from unittest.mock import Mock
+
 import numpy as np
+import pandas as pd
 import pytest
 
+from exareme2.algorithms.exareme2.udfgen import udfio
+from exareme2.algorithms.exareme2.udfgen.udfio import as_matrix_table
+from exareme2.algorithms.exareme2.udfgen.udfio import as_tensor_table
 from exareme2.algorithms.exareme2.udfgen.udfio import construct_secure_transfer_dict
+from exareme2.algorithms.exareme2.udfgen.udfio import from_matrix_table
+from exareme2.algorithms.exareme2.udfgen.udfio import make_tensor_merge_table
+from exareme2.algorithms.exareme2.udfgen.udfio import merge_tensor_to_array
 from exareme2.algorithms.exareme2.udfgen.udfio import merge_tensor_to_list
+from exareme2.algorithms.exareme2.udfgen.udfio import reduce_tensor_merge_table
 from exareme2.algorithms.exareme2.udfgen.udfio import secure_transfers_to_merged_dict
 from exareme2.algorithms.exareme2.udfgen.udfio import split_secure_transfer_dict
 
 
+def test_as_matrix_table():
+    array = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+    table = as_matrix_table(array, "matrix_row")
+    assert list(table.keys()) == ["matrix_row", "col0", "col1", "col2"]
+    assert table["matrix_row"].tolist() == [0, 1]
+    assert table["col0"].tolist() == [1.0, 4.0]
+    assert table["col2"].tolist() == [3.0, 6.0]
+
+
+def test_as_matrix_table_1D():
+    table = as_matrix_table(np.array([1, 2, 3]), "matrix_row")
+    assert list(table.keys()) == ["matrix_row", "col0"]
+    assert table["col0"].tolist() == [1, 2, 3]
+
+
+def test_as_matrix_table_3D():
+    with pytest.raises(ValueError):
+        as_matrix_table(np.zeros((2, 2, 2)), "matrix_row")
+
+
+def test_from_matrix_table():
+    table = {
+        "matrix_row": np.array([0, 1]),
+        "col0": np.array([1.0, 4.0]),
+        "col1": np.array([2.0, 5.0]),
+        "col2": np.array([3.0, 6.0]),
+    }
+    array = from_matrix_table(table, "matrix_row")
+    assert array.shape == (2, 3)
+    assert array.tolist() == [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]
+
+
+def test_from_matrix_table_rows_out_of_order():
+    table = {
+        "matrix_row": np.array([2, 0, 1]),
+        "col0": np.array([7.0, 1.0, 4.0]),
+        "col1": np.array([8.0, 2.0, 5.0]),
+    }
+    array = from_matrix_table(table, "matrix_row")
+    assert array.tolist() == [[1.0, 2.0], [4.0, 5.0], [7.0, 8.0]]
+
+
+def test_from_matrix_table_without_rows():
+    table = {
+        "matrix_row": np.array([], dtype=np.int32),
+        "col0": np.array([]),
+        "col1": np.array([]),
+    }
+    array = from_matrix_table(table, "matrix_row")
+    assert array.shape == (0, 2)
+
+
+def test_matrix_table_roundtrip():
+    array = np.random.rand(100, 7)
+    result = from_matrix_table(as_matrix_table(array, "matrix_row"), "matrix_row")
+    assert result.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(result, array)
+
+
 def test_merge_tensor_to_list_2tables_0D():
     columns = dict(
         worker_id=np.array(["a", "b"]),
@@ -69,6 +143,65 @@ def test_merge_tensor_to_list_no_workerid():
         merge_tensor_to_list(columns)
 
 
+def test_merge_tensor_to_array_unordered_rows():
+    columns = dict(
+        worker_id=np.array(["b", "a", "b", "a"]),
+        dim0=np.array([1, 1, 0, 0]),
+        val=np.array([4, 2, 3, 1]),
+    )
+    stacked = merge_tensor_to_array(columns)
+    np.testing.assert_array_equal(stacked, np.array([[1, 2], [3, 4]]))
+
+
+def test_merge_tensor_to_array_shape_mismatch():
+    columns = dict(
+        worker_id=np.array(["a", "a", "b"]),
+        dim0=np.array([0, 1, 0]),
+        val=np.array([1, 2, 3]),
+    )
+    with pytest.raises(ValueError):
+        merge_tensor_to_array(columns)
+
+
+def make_merge_table(n_workers, shape):
+    tables = []
+    for worker in range(n_workers):
+        table = as_tensor_table(np.random.rand(*shape))
+        table["worker_id"] = np.full(np.prod(shape), f"worker{worker:02}")
+        tables.append(pd.DataFrame(table))
+    merge_table = pd.concat(tables, ignore_index=True)
+    return make_tensor_merge_table({c: merge_table[c] for c in merge_table.columns})
+
+
+def reduce_tensor_merge_table_pairwise(op, merge_table):
+    # Previous implementation, kept as a reference for correctness and speed
+    def reduce_tensor_pair(a, b):
+        dimensions = [c for c in a.columns if c.startswith("dim")]
+        merged = a.merge(b, left_on=dimensions, right_on=dimensions)
+        merged["val"] = merged.apply(lambda df: op(df.val_x, df.val_y), axis=1)
+        return merged[dimensions + ["val"]]
+
+    groups = [group for _, group in merge_table.groupby("worker_id")]
+    groups = [group.drop("worker_id", axis=1) for group in groups]
+    return reduce(reduce_tensor_pair, groups)
+
+
+@pytest.mark.parametrize("op", [np.add, np.maximum, operator.mul])
+def test_reduce_tensor_merge_table(op):
+    merge_table = make_merge_table(n_workers=4, shape=(3, 2))
+    result = reduce_tensor_merge_table(op, merge_table)
+    expected = reduce_tensor_merge_table_pairwise(op, merge_table)
+    assert list(result.columns) == ["dim0", "dim1", "val"]
+    np.testing.assert_allclose(result["val"].values, expected["val"].values)
+
+
+def test_reduce_tensor_merge_table_many_workers():
+    merge_table = make_merge_table(n_workers=30, shape=(20, 10))
+    result = reduce_tensor_merge_table(np.add, merge_table)
+    expected = reduce_tensor_merge_table_pairwise(np.add, merge_table)
+    np.testing.assert_allclose(result["val"].values, expected["val"].values)
+
+
 def get_secure_transfers_to_merged_dict_success_cases():
     secure_transfers_cases = [
         pytest.param(
@@ -267,6 +400,34 @@ def test_secure_transfer_to_merged_dict(transfers, result):
     assert secure_transfers_to_merged_dict(transfers) == result
 
 
+def test_secure_transfers_to_merged_dict_with_arrays():
+    transfers = [
+        {
+            "sum": {"data": np.full((2, 3), i), "operation": "sum", "type": "int"},
+            "min": {"data": np.arange(3.0) + i, "operation": "min", "type": "float"},
+        }
+        for i in range(3)
+    ]
+
+    assert secure_transfers_to_merged_dict(transfers) == {
+        "sum": [[3, 3, 3], [3, 3, 3]],
+        "min": [0.0, 1.0, 2.0],
+    }
+
+
+def test_secure_transfers_to_merged_dict_large_nested_lists():
+    rng = np.random.default_rng(0)
+    matrices = [rng.random((200, 200)) for _ in range(30)]
+    transfers = [
+        {"xTx": {"data": matrix.tolist(), "operation": "sum", "type": "float"}}
+        for matrix in matrices
+    ]
+
+    result = secure_transfers_to_merged_dict(transfers)
+
+    np.testing.assert_allclose(result["xTx"], np.sum(matrices, axis=0))
+
+
 def get_secure_transfers_merged_to_dict_fail_cases():
     secure_transfers_fail_cases = [
         (
@@ -391,37 +552,37 @@ def test_secure_transfers_to_merged_dict_fail_cases(transfers, exception):
 def get_secure_transfer_dict_success_cases():
     secure_transfer_cases = [
         pytest.param(
-            {
-                "a": {"data": 2, "operation": "sum", "type": "int"},
-            },
+            {"a": {"data": 2, "operation": "sum", "type": "int"}},
             (
                 {
-                    "a": {"data": 0, "operation": "sum", "type": "int"},
+                    "a": {
+                        "data": {"offset": 0, "shape": []},
+                        "operation": "sum",
+                        "type": "int",
+                    }
                 },
                 [2],
                 [],
                 [],
             ),
-            {
-                "a": 2,
-            },
+            {"a": 2},
             id="sum operation with int",
         ),
         pytest.param(
-            {
-                "a": {"data": 2.5, "operation": "sum", "type": "float"},
-            },
+            {"a": {"data": 2.5, "operation": "sum", "type": "float"}},
             (
                 {
-                    "a": {"data": 0, "operation": "sum", "type": "float"},
+                    "a": {
+                        "data": {"offset": 0, "shape": []},
+                        "operation": "sum",
+                        "type": "float",
+                    }
                 },
                 [2.5],
                 [],
                 [],
             ),
-            {
-                "a": 2.5,
-            },
+            {"a": 2.5},
             id="sum operation with float",
         ),
         pytest.param(
@@ -431,8 +592,16 @@ def get_secure_transfer_dict_success_cases():
             },
             (
                 {
-                    "a": {"data": 0, "operation": "sum", "type": "int"},
-                    "b": {"data": 1, "operation": "sum", "type": "int"},
+                    "a": {
+                        "data": {"offset": 0, "shape": []},
+                        "operation": "sum",
+                        "type": "int",
+                    },
+                    "b": {
+                        "data": {"offset": 1, "shape": []},
+                        "operation": "sum",
+                        "type": "int",
+                    },
                 },
                 [2, 5],
                 [],
@@ -448,8 +617,16 @@ def get_secure_transfer_dict_success_cases():
             },
             (
                 {
-                    "a": {"data": 0, "operation": "sum", "type": "int"},
-                    "b": {"data": 1, "operation": "sum", "type": "float"},
+                    "a": {
+                        "data": {"offset": 0, "shape": []},
+                        "operation": "sum",
+                        "type": "int",
+                    },
+                    "b": {
+                        "data": {"offset": 1, "shape": []},
+                        "operation": "sum",
+                        "type": "float",
+                    },
                 },
                 [2, 5.5],
                 [],
@@ -459,20 +636,20 @@ def get_secure_transfer_dict_success_cases():
             id="sum operation with int/float",
         ),
         pytest.param(
-            {
-                "a": {"data": [1, 2, 3], "operation": "sum", "type": "int"},
-            },
+            {"a": {"data": [1, 2, 3], "operation": "sum", "type": "int"}},
             (
                 {
-                    "a": {"data": [0, 1, 2], "operation": "sum", "type": "int"},
+                    "a": {
+                        "data": {"offset": 0, "shape": [3]},
+                        "operation": "sum",
+                        "type": "int",
+                    }
                 },
                 [1, 2, 3],
                 [],
                 [],
             ),
-            {
-                "a": [1, 2, 3],
-            },
+            {"a": [1, 2, 3]},
             id="sum operation with list of ints",
         ),
         pytest.param(
@@ -491,14 +668,18 @@ def get_secure_transfer_dict_success_cases():
             },
             (
                 {
-                    "a": {"data": 0, "operation": "sum", "type": "int"},
+                    "a": {
+                        "data": {"offset": 0, "shape": []},
+                        "operation": "sum",
+                        "type": "int",
+                    },
                     "b": {
-                        "data": [1, 2, 3, 4, 5, 6],
+                        "data": {"offset": 1, "shape": [6]},
                         "operation": "sum",
                         "type": "int",
                     },
                     "c": {
-                        "data": [[7, 8, 9, 10, 11, 12], [13, 14, 15]],
+                        "data": {"offset": 7, "shape": [[6], [3]]},
                         "operation": "sum",
                         "type": "int",
                     },
@@ -515,37 +696,37 @@ def get_secure_transfer_dict_success_cases():
             id="sum operation with nested lists of ints",
         ),
         pytest.param(
-            {
-                "min": {"data": [2, 5.6], "operation": "min", "type": "float"},
-            },
+            {"min": {"data": [2, 5.6], "operation": "min", "type": "float"}},
             (
                 {
-                    "min": {"data": [0, 1], "operation": "min", "type": "float"},
+                    "min": {
+                        "data": {"offset": 0, "shape": [2]},
+                        "operation": "min",
+                        "type": "float",
+                    }
                 },
                 [],
                 [2, 5.6],
                 [],
             ),
-            {
-                "min": [2, 5.6],
-            },
+            {"min": [2, 5.6]},
             id="min operation with int/float",
         ),
         pytest.param(
-            {
-                "max": {"data": [2, 5.6], "operation": "max", "type": "float"},
-            },
+            {"max": {"data": [2, 5.6], "operation": "max", "type": "float"}},
             (
                 {
-                    "max": {"data": [0, 1], "operation": "max", "type": "float"},
+                    "max": {
+                        "data": {"offset": 0, "shape": [2]},
+                        "operation": "max",
+                        "type": "float",
+                    }
                 },
                 [],
                 [],
                 [2, 5.6],
             ),
-            {
-                "max": [2, 5.6],
-            },
+            {"max": [2, 5.6]},
             id="max operation with int/float",
         ),
         pytest.param(
@@ -559,12 +740,36 @@ def get_secure_transfer_dict_success_cases():
             },
             (
                 {
-                    "sum1": {"data": [0, 1, 2, 3], "operation": "sum", "type": "float"},
-                    "sum2": {"data": [4, 5], "operation": "sum", "type": "float"},
-                    "min1": {"data": [0, 1], "operation": "min", "type": "float"},
-                    "min2": {"data": [2, 3], "operation": "min", "type": "float"},
-                    "max1": {"data": [0, 1], "operation": "max", "type": "float"},
-                    "max2": {"data": [2, 3], "operation": "max", "type": "float"},
+                    "sum1": {
+                        "data": {"offset": 0, "shape": [4]},
+                        "operation": "sum",
+                        "type": "float",
+                    },
+                    "sum2": {
+                        "data": {"offset": 4, "shape": [2]},
+                        "operation": "sum",
+                        "type": "float",
+                    },
+                    "min1": {
+                        "data": {"offset": 0, "shape": [2]},
+                        "operation": "min",
+                        "type": "float",
+                    },
+                    "min2": {
+                        "data": {"offset": 2, "shape": [2]},
+                        "operation": "min",
+                        "type": "float",
+                    },
+                    "max1": {
+                        "data": {"offset": 0, "shape": [2]},
+                        "operation": "max",
+                        "type": "float",
+                    },
+                    "max2": {
+                        "data": {"offset": 2, "shape": [2]},
+                        "operation": "max",
+                        "type": "float",
+                    },
                 },
                 [1, 2, 3, 4.5, 6, 7.8],
                 [6, 7.8, 1.5, 2.0],
@@ -592,23 +797,27 @@ def get_secure_transfer_dict_success_cases():
             },
             (
                 {
-                    "sum": {"data": [0, 1, 2], "operation": "sum", "type": "int"},
+                    "sum": {
+                        "data": {"offset": 0, "shape": [3]},
+                        "operation": "sum",
+                        "type": "int",
+                    },
                     "sumfloat": {
-                        "data": [3, 4, 5],
+                        "data": {"offset": 3, "shape": [3]},
                         "operation": "sum",
                         "type": "float",
                     },
-                    "max": {"data": 0, "operation": "max", "type": "int"},
+                    "max": {
+                        "data": {"offset": 0, "shape": []},
+                        "operation": "max",
+                        "type": "int",
+                    },
                 },
                 [100, 200, 300, 1.2, 2.3, 3.4],
                 [],
                 [58],
             ),
-            {
-                "sum": [100, 200, 300],
-                "sumfloat": [1.2, 2.3, 3.4],
-                "max": 58,
-            },
+            {"sum": [100, 200, 300], "sumfloat": [1.2, 2.3, 3.4], "max": 58},
             id="sum operations with ints/floats in separate keys",
         ),
     ]
@@ -707,9 +916,21 @@ def test_proper_int_casting_in_construct_secure_transfer_dict():
     """
     input_values = (
         {
-            "sum": {"data": [0, 1, 2], "operation": "sum", "type": "int"},
-            "min": {"data": [0, 1, 2], "operation": "sum", "type": "int"},
-            "max": {"data": 0, "operation": "max", "type": "int"},
+            "sum": {
+                "data": {"offset": 0, "shape": [3]},
+                "operation": "sum",
+                "type": "int",
+            },
+            "min": {
+                "data": {"offset": 0, "shape": [3]},
+                "operation": "sum",
+                "type": "int",
+            },
+            "max": {
+                "data": {"offset": 0, "shape": []},
+                "operation": "max",
+                "type": "int",
+            },
         },
         [100.0, 200.0, 300.0],
         [10.0, 20.0, 30.0],
@@ -721,3 +942,345 @@ def test_proper_int_casting_in_construct_secure_transfer_dict():
         "min": [100, 200, 300],
         "max": 1,
     }
+
+
+@pytest.fixture
+def cached_inputs(monkeypatch):
+    cached_inputs = udfio._CachedInputs()
+    monkeypatch.setattr(udfio, "_cached_inputs", cached_inputs)
+    return cached_inputs
+
+
+def test_get_cached_input_loads_once_per_table_and_kind(cached_inputs):
+    loads = []
+
+    def load():
+        loads.append(None)
+        return np.ones((2, 2))
+
+    first = udfio.get_cached_input(None, "table1", "matrix", load)
+    second = udfio.get_cached_input(None, "table1", "matrix", load)
+    udfio.get_cached_input(None, "table1", "relation", load)
+
+    assert first is second
+    assert len(loads) == 2
+    assert not first.flags.writeable
+
+
+def test_get_cached_relation_is_read_only(cached_inputs):
+    def load():
+        return pd.DataFrame({"a": [1.0, 2.0], "b": ["x", "y"]})
+
+    first = udfio.get_cached_input(None, "table1", "relation", load)
+    first["c"] = 0
+    with pytest.raises(ValueError):
+        first.iloc[0, 0] = 5.0
+    second = udfio.get_cached_input(None, "table1", "relation", load)
+
+    assert list(second.columns) == ["a", "b"]
+    assert second["a"].tolist() == [1.0, 2.0]
+
+
+def test_get_cached_input_evicts_least_recently_used(cached_inputs, monkeypatch):
+    monkeypatch.setenv(udfio.CACHED_INPUTS_MAX_BYTES_ENV_VARIABLE, str(2 * 8 * 10))
+    load = partial(np.zeros, 10)
+
+    udfio.get_cached_input(None, "table1", "matrix", load)
+    udfio.get_cached_input(None, "table2", "matrix", load)
+    udfio.get_cached_input(None, "table1", "matrix", load)
+    udfio.get_cached_input(None, "table3", "matrix", load)
+
+    assert [table_name for table_name, _ in cached_inputs._inputs] == [
+        "table1",
+        "table3",
+    ]
+
+
+def test_evict_cached_inputs_of_dropped_tables(cached_inputs):
+    load = partial(np.zeros, 10)
+    udfio.get_cached_input(None, "table1", "matrix", load)
+    udfio.get_cached_input(None, "table1", "relation", load)
+    udfio.get_cached_input(None, "table2", "matrix", load)
+
+    udfio.evict_cached_inputs(["table1", "table3"])
+
+    assert list(cached_inputs._inputs) == [("table2", "matrix")]
+    assert cached_inputs._nbytes == 8 * 10
+
+
+@pytest.mark.parametrize(
+    "table_names",
+    [
+        pytest.param("transfer_table,state_table", id="scalar"),
+        pytest.param(np.array(["transfer_table,state_table"]), id="array"),
+    ],
+)
+def test_bind_loopback_tables(table_names):
+    conn = Mock()
+
+    bound_conn = udfio.bind_loopback_tables(conn, table_names)
+    bound_conn.execute("SELECT transfer FROM __loopback_table_0__;")
+
+    conn.execute.assert_called_once_with("SELECT transfer FROM transfer_table;")
+    assert bound_conn.resolve("__loopback_table_1__sum") == "state_tablesum"
+
+
+@pytest.mark.parametrize(
+    "request_id, expected_request_id",
+    [
+        pytest.param("request1", "request1", id="scalar"),
+        pytest.param(np.array(["request1"]), "request1", id="argument"),
+        pytest.param(np.array(["request1"] * 3), "request1", id="column"),
+        pytest.param(np.array([], dtype=object), "", id="empty column"),
+    ],
+)
+def test_get_logger_with_request_id_argument(request_id, expected_request_id):
+    logger = udfio.get_logger("udf1", request_id)
+
+    [handler] = logger.handlers
+    assert f"udf1(%(lineno)d) - {expected_request_id} - " in handler.formatter._fmt
+
+
+def test_get_cached_input_of_bound_loopback_table(cached_inputs):
+    conn = udfio.bind_loopback_tables(Mock(), "table1")
+
+    udfio.get_cached_input(conn, "__loopback_table_0__", "matrix", partial(np.ones, 2))
+
+    assert list(cached_inputs._inputs) == [("table1", "matrix")]
+
+
+class _LoopbackConnection:
+    """Answers the loopback queries of udfio.RelationChunks from DataFrames."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.queries = []
+
+    def execute(self, query):
+        self.queries.append(query)
+        with sqlite3.connect(":memory:") as db:
+            for table_name, table in self.tables.items():
+                table.to_sql(table_name, db, index=False)
+            result = pd.read_sql_query(query, db)
+        return {column: result[column].to_numpy() for column in result.columns}
+
+
+def test_map_combine_over_chunks_of_aligned_rows():
+    x = pd.DataFrame({"row_id": range(10), "a": np.arange(10.0)})
+    y = pd.DataFrame({"row_id": range(2, 12), "b": np.arange(10.0)})
+    conn = _LoopbackConnection({"x": x, "y": y})
+    x_chunks = udfio.RelationChunks(conn, "x", "row_id", chunk_rows=3)
+    y_chunks = udfio.RelationChunks(conn, "y", "row_id", chunk_rows=3)
+
+    n_obs, sxy = udfio.map_combine(
+        lambda x, y: (len(x), float(x.a @ y.b)),
+        lambda p1, p2: (p1[0] + p2[0], p1[1] + p2[1]),
+        x_chunks,
+        y_chunks,
+    )
+
+    joined = x.merge(y, on="row_id")
+    assert n_obs == len(joined)
+    assert sxy == float(joined.a @ joined.b)
+    assert sum("ORDER BY" in query for query in conn.queries) == 1
+
+
+def test_map_combine_chunks_sparse_row_ids_by_row_count():
+    x = pd.DataFrame({"row_id": [0, 1, 2, 1000, 1001, 5000, 9999], "a": np.ones(7)})
+    conn = _LoopbackConnection({"x": x})
+    x_chunks = udfio.RelationChunks(conn, "x", "row_id", chunk_rows=3)
+
+    chunk_sizes = udfio.map_combine(lambda x: [len(x)], operator.add, x_chunks)
+
+    assert chunk_sizes == [3, 3, 1]
+    assert sum("ORDER BY" in query for query in conn.queries) == 1
+
+
+def test_map_combine_on_relations_sharing_column_names():
+    x = pd.DataFrame({"row_id": range(4), "a": np.arange(4.0)})
+    y = pd.DataFrame({"row_id": range(4), "a": np.arange(4.0) * 10})
+    conn = _LoopbackConnection({"x": x, "y": y})
+    x_chunks = udfio.RelationChunks(conn, "x", "row_id", chunk_rows=3)
+    y_chunks = udfio.RelationChunks(conn, "y", "row_id", chunk_rows=3)
+
+    sxy = udfio.map_combine(
+        lambda x, y: float(x.a @ y.a), operator.add, x_chunks, y_chunks
+    )
+
+    assert sxy == float(x.a @ y.a)
+
+
+def test_map_combine_on_empty_relation():
+    x = pd.DataFrame(
+        {"row_id": pd.Series([], dtype=int), "a": pd.Series([], dtype=float)}
+    )
+    conn = _LoopbackConnection({"x": x})
+    x_chunks = udfio.RelationChunks(conn, "x", "row_id")
+
+    result = udfio.map_combine(lambda x: x.a.sum(), operator.add, x_chunks)
+
+    assert result == 0
+
+
+def test_relation_chunks_default_chunk_rows(monkeypatch):
+    monkeypatch.setenv(udfio.CHUNK_ROWS_ENV_VARIABLE, "5")
+    relation_chunks = udfio.RelationChunks(None, "x", "row_id")
+    assert relation_chunks.chunk_rows == 5
+
+
+@pytest.fixture
+def gram_relations():
+    x = pd.DataFrame({"row_id": range(10), "a": np.arange(10.0), "b": np.ones(10)})
+    y = pd.DataFrame({"row_id": range(1, 11), "c": np.arange(10.0) ** 2})
+    conn = _LoopbackConnection({"x": x, "y": y})
+    relations = [
+        udfio.RelationChunks(conn, "x", "row_id", chunk_rows=4),
+        udfio.RelationChunks(conn, "y", "row_id", chunk_rows=4),
+    ]
+    z = x.merge(y, on="row_id").drop(columns="row_id")
+    return conn, relations, z
+
+
+def test_gram_matrix(gram_relations):
+    _, relations, z = gram_relations
+
+    gram, n_obs = udfio.gram_matrix(relations, [["A", "B"], ["C"]])
+
+    assert n_obs == len(z)
+    assert gram.index.tolist() == gram.columns.tolist() == ["A", "B", "C"]
+    np.testing.assert_allclose(gram.to_numpy(), z.T.to_numpy() @ z.to_numpy())
+
+
+def test_gram_matrix_sliced_from_cache(gram_relations, cached_inputs):
+    conn, relations, z = gram_relations
+    udfio.gram_matrix(relations, [["A", "B"], ["C"]], cache_key="data")
+    conn.queries.clear()
+
+    gram, n_obs = udfio.gram_matrix(relations, [["A"], ["C"]], cache_key="data")
+
+    assert not any("ORDER BY" in query for query in conn.queries)
+    assert n_obs == len(z)
+    assert gram.index.tolist() == ["A", "C"]
+    expected = z[["a", "c"]].to_numpy()
+    np.testing.assert_allclose(gram.to_numpy(), expected.T @ expected)
+
+
+def test_gram_matrix_cache_keeps_the_union_of_the_labels(cached_inputs):
+    z = pd.DataFrame(
+        {"a": np.arange(10.0), "b": np.ones(10), "c": np.arange(10.0) ** 2}
+    )
+    conn = _LoopbackConnection(
+        {name: z[[name]].assign(row_id=range(10)) for name in z.columns}
+    )
+    a, b, c = (udfio.RelationChunks(conn, name, "row_id") for name in z.columns)
+    udfio.gram_matrix([a, b], [["A"], ["B"]], cache_key="data")
+    udfio.gram_matrix([a, c], [["A"], ["C"]], cache_key="data")
+    conn.queries.clear()
+
+    gram, _ = udfio.gram_matrix([a, b], [["A"], ["B"]], cache_key="data")
+    assert not any("ORDER BY" in query for query in conn.queries)
+    expected = z[["a", "b"]].to_numpy()
+    np.testing.assert_allclose(gram.to_numpy(), expected.T @ expected)
+
+    # A and C were never read together with B, so their products are computed
+    gram, _ = udfio.gram_matrix([b, c], [["B"], ["C"]], cache_key="data")
+    assert any("ORDER BY" in query for query in conn.queries)
+    expected = z[["b", "c"]].to_numpy()
+    np.testing.assert_allclose(gram.to_numpy(), expected.T @ expected)
+
+
+def test_gram_matrix_not_shared_between_different_rows(gram_relations, cached_inputs):
+    conn, relations, z = gram_relations
+    udfio.gram_matrix(relations, [["A", "B"], ["C"]], cache_key="data")
+    conn.tables["y"] = conn.tables["y"].iloc[2:]
+    conn.queries.clear()
+
+    gram, n_obs = udfio.gram_matrix(relations, [["A", "B"], ["C"]], cache_key="data")
+
+    assert any("ORDER BY" in query for query in conn.queries)
+    assert n_obs == len(z) - 2
+    expected = z.iloc[2:].to_numpy()
+    np.testing.assert_allclose(gram.to_numpy(), expected.T @ expected)
+
+
+@pytest.fixture
+def state_store(tmp_path, monkeypatch):
+    monkeypatch.setenv(udfio.STATE_STORE_DIR_ENV_VARIABLE, str(tmp_path))
+    monkeypatch.setenv(udfio.STATE_STORE_MIN_BYTES_ENV_VARIABLE, "1024")
+    return tmp_path
+
+
+def test_small_state_is_kept_inline(state_store):
+    state = {"num": 5}
+
+    blob = udfio.dump_state(None, "state_table", state)
+
+    assert udfio.load_state(blob) == state
+    assert not list(state_store.iterdir())
+
+
+def test_large_state_is_stored_out_of_band(state_store):
+    state = {"coeffs": np.arange(10_000, dtype=float), "names": ["a", "b"]}
+
+    blob = udfio.dump_state(None, "state_table", state)
+    loaded = udfio.load_state(blob)
+
+    assert len(blob) < 100
+    assert [p.name for p in state_store.iterdir()] == ["state_table.state"]
+    assert loaded["names"] == ["a", "b"]
+    np.testing.assert_array_equal(loaded["coeffs"], state["coeffs"])
+    assert loaded["coeffs"].ctypes.data % 64 == 0
+    loaded["coeffs"][0] = -1.0
+    assert udfio.load_state(blob)["coeffs"][0] == 0.0
+
+
+def test_remove_states(state_store):
+    state = {"coeffs": np.zeros(1000)}
+    udfio.dump_state(None, "dropped_table", state)
+    udfio.dump_state(None, "kept_table", state)
+
+    udfio.remove_states(str(state_store), ["dropped_table", "inline_state_table"])
+
+    assert [p.name for p in state_store.iterdir()] == ["kept_table.state"]
+
+
+def test_state_of_bound_loopback_table_is_stored_by_table_name(state_store):
+    conn = udfio.bind_loopback_tables(None, "state_table")
+
+    blob = udfio.dump_state(conn, "__loopback_table_0__", {"coeffs": np.zeros(1000)})
+
+    assert [p.name for p in state_store.iterdir()] == ["state_table.state"]
+    np.testing.assert_array_equal(udfio.load_state(blob)["coeffs"], np.zeros(1000))
+
+
+def test_transfer_arrays_are_kept_binary():
+    transfer = {
+        "matrix": np.arange(6, dtype=float).reshape(2, 3),
+        "ints": np.array([1, 2], dtype=np.int32),
+        "nested": {"scalar": np.float64(0.5), "n": 3},
+        "names": ["a", "b"],
+    }
+
+    transfer_str = udfio.dumps_transfer(transfer)
+    result = udfio.loads_transfer(transfer_str)
+
+    assert "__ndarray__" in json.loads(transfer_str)["matrix"]
+    np.testing.assert_array_equal(result["matrix"], transfer["matrix"])
+    assert result["ints"].dtype == np.int32
+    assert result["nested"] == {"scalar": 0.5, "n": 3}
+    assert result["names"] == ["a", "b"]
+    result["matrix"][0, 0] = -1.0
+
+
+def test_json_transfers_are_loaded_unchanged():
+    transfer = {"matrix": [[1.0, 2.0], [3.0, 4.0]], "n": 3}
+
+    assert udfio.loads_transfer(json.dumps(transfer)) == transfer
+
+
+def test_transfer_serialization_large_matrix():
+    matrix = np.random.default_rng(0).random((1000, 1000))
+
+    result = udfio.loads_transfer(udfio.dumps_transfer({"matrix": matrix}))
+
+    np.testing.assert_array_equal(result["matrix"], matrix)
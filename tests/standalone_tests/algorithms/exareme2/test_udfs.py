@@ -2,6 +2,7 @@ import json
 import pickle
 import uuid
 from typing import Tuple
+from unittest.mock import patch
 
 import pytest
 
@@ -9,7 +10,12 @@ from exareme2 import DType
 from exareme2.algorithms.exareme2.udfgen import make_unique_func_name
 from exareme2.algorithms.exareme2.udfgen.udfgen_DTOs import UDFGenSMPCResult
 from exareme2.algorithms.exareme2.udfgen.udfgen_DTOs import UDFGenTableResult
+from exareme2.worker.exareme2.cleanup.context_artifacts_registry import (
+    ContextArtifactsRegistry,
+)
+from exareme2.worker.exareme2.monetdb.guard import InvalidSQLParameter
 from exareme2.worker.exareme2.tables.tables_service import create_table_name
+from exareme2.worker.exareme2.udfs import udfs_service
 from exareme2.worker.exareme2.udfs.udfs_service import _convert_output_schema
 from exareme2.worker.exareme2.udfs.udfs_service import _convert_result
 from exareme2.worker.exareme2.udfs.udfs_service import _get_udf_table_sharing_queries
@@ -19,10 +25,16 @@ from exareme2.worker_communication import TableData
 from exareme2.worker_communication import TableInfo
 from exareme2.worker_communication import TableSchema
 from exareme2.worker_communication import TableType
+from exareme2.worker_communication import UDFPipelineOutputInfo
 from exareme2.worker_communication import WorkerTableDTO
 from exareme2.worker_communication import WorkerUDFKeyArguments
+from exareme2.worker_communication import WorkerUDFPipeline
+from exareme2.worker_communication import WorkerUDFPipelineOutputDTO
+from exareme2.worker_communication import WorkerUDFPipelineStep
 from exareme2.worker_communication import WorkerUDFPosArguments
 from exareme2.worker_communication import WorkerUDFResults
+from tests.algorithms.orphan_udfs import get_column_rows
+from tests.algorithms.orphan_udfs import increment_transfer
 from tests.algorithms.orphan_udfs import local_step
 from tests.standalone_tests.conftest import TASKS_TIMEOUT
 from tests.standalone_tests.conftest import insert_data_to_db
@@ -329,3 +341,286 @@ def get_udf_table_sharing_queries_params():
 )
 def test_get_udf_table_sharing_queries(udf_results, expected_queries):
     assert _get_udf_table_sharing_queries(udf_results, "guest") == expected_queries
+
+
+def test_run_udf_pipeline_uses_the_outputs_of_previous_udfs():
+    table_info = TableInfo(
+        name=create_table_name(TableType.NORMAL, "worker1", "ctx1", "0"),
+        schema_=TableSchema(columns=[ColumnInfo(name="col1", dtype=DType.INT)]),
+        type_=TableType.NORMAL,
+    )
+    func_name = make_unique_func_name(get_column_rows)
+    pipeline = WorkerUDFPipeline(
+        steps=[
+            WorkerUDFPipelineStep(
+                command_id="1",
+                func_name=func_name,
+                positional_args=WorkerUDFPosArguments(
+                    args=[WorkerTableDTO(value=table_info)]
+                ),
+                keyword_args=WorkerUDFKeyArguments(args={}),
+            ),
+            WorkerUDFPipelineStep(
+                command_id="2",
+                func_name=func_name,
+                positional_args=WorkerUDFPosArguments(
+                    args=[
+                        WorkerUDFPipelineOutputDTO(value=UDFPipelineOutputInfo(step=0))
+                    ]
+                ),
+                keyword_args=WorkerUDFKeyArguments(args={}),
+            ),
+        ]
+    )
+
+    with patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.worker_config.identifier",
+        "worker1",
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.get_table_type",
+        return_value=TableType.NORMAL,
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.context_artifacts_registry"
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.udfs_db"
+    ) as udfs_db_mock:
+        # The logger initialisation of the service is skipped, since it needs a task
+        pipeline_results = udfs_service.run_udf_pipeline.__wrapped__(
+            request_id="request", context_id="ctx1", pipeline=pipeline
+        )
+
+    [[first_result], [second_result]] = [
+        udf_results.results for udf_results in pipeline_results.results
+    ]
+    [udf_exec_stmts] = udfs_db_mock.run_udfs.call_args.args
+    assert len(udf_exec_stmts) == 2
+    assert f"INSERT INTO {first_result.value.name}" in udf_exec_stmts[0]
+    assert f"FROM\n            {table_info.name}" in udf_exec_stmts[0]
+    assert f"INSERT INTO {second_result.value.name}" in udf_exec_stmts[1]
+    assert f"FROM\n            {first_result.value.name}" in udf_exec_stmts[1]
+
+
+@pytest.mark.parametrize(
+    "output_info, exception",
+    [
+        pytest.param(UDFPipelineOutputInfo(step=1), ValueError, id="later step"),
+        pytest.param(
+            UDFPipelineOutputInfo(step=0, output=1), ValueError, id="missing output"
+        ),
+        pytest.param(
+            UDFPipelineOutputInfo(step=-1), InvalidSQLParameter, id="negative step"
+        ),
+    ],
+)
+def test_run_udf_pipeline_with_invalid_output(output_info, exception):
+    table_info = TableInfo(
+        name=create_table_name(TableType.NORMAL, "worker1", "ctx1", "0"),
+        schema_=TableSchema(columns=[ColumnInfo(name="col1", dtype=DType.INT)]),
+        type_=TableType.NORMAL,
+    )
+    func_name = make_unique_func_name(get_column_rows)
+    pipeline = WorkerUDFPipeline(
+        steps=[
+            WorkerUDFPipelineStep(
+                command_id="1",
+                func_name=func_name,
+                positional_args=WorkerUDFPosArguments(
+                    args=[WorkerTableDTO(value=table_info)]
+                ),
+                keyword_args=WorkerUDFKeyArguments(args={}),
+            ),
+            WorkerUDFPipelineStep(
+                command_id="2",
+                func_name=func_name,
+                positional_args=WorkerUDFPosArguments(
+                    args=[WorkerUDFPipelineOutputDTO(value=output_info)]
+                ),
+                keyword_args=WorkerUDFKeyArguments(args={}),
+            ),
+        ]
+    )
+
+    with patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.worker_config.identifier",
+        "worker1",
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.get_table_type",
+        return_value=TableType.NORMAL,
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.context_artifacts_registry"
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.udfs_db"
+    ) as udfs_db_mock:
+        with pytest.raises(exception):
+            udfs_service.run_udf_pipeline.__wrapped__(
+                request_id="request", context_id="ctx1", pipeline=pipeline
+            )
+
+    udfs_db_mock.create_udf_artifacts.assert_not_called()
+    udfs_db_mock.run_udfs.assert_not_called()
+
+
+def test_run_udf_reuses_identical_udf_definitions():
+    table_info = TableInfo(
+        name=create_table_name(TableType.NORMAL, "worker1", "ctx1", "0"),
+        schema_=TableSchema(columns=[ColumnInfo(name="col1", dtype=DType.INT)]),
+        type_=TableType.NORMAL,
+    )
+    registry = ContextArtifactsRegistry()
+
+    def run_udf(command_id, context_id):
+        return udfs_service.run_udf.__wrapped__(
+            request_id="request",
+            command_id=command_id,
+            context_id=context_id,
+            func_name=make_unique_func_name(get_column_rows),
+            positional_args=WorkerUDFPosArguments(
+                args=[WorkerTableDTO(value=table_info)]
+            ),
+            keyword_args=WorkerUDFKeyArguments(args={}),
+        )
+
+    with patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.worker_config.identifier",
+        "worker1",
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.get_table_type",
+        return_value=TableType.NORMAL,
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.context_artifacts_registry",
+        registry,
+    ), patch(
+        "exareme2.worker.exareme2.cleanup.context_artifacts_registry.cleanup_db"
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.udfs_db"
+    ) as udfs_db_mock:
+        # The logger initialisation of the service is skipped, since it needs a task
+        run_udf(command_id="1", context_id="ctx1")
+        run_udf(command_id="2", context_id="ctx1")
+        run_udf(command_id="1", context_id="ctx2")
+
+    [udf_name] = registry.get_udf_names("ctx1")
+    assert registry.get_udf_names("ctx2") == [udf_name]
+    udf_definitions_per_call = [
+        call.args[0] for call in udfs_db_mock.create_udf_artifacts.call_args_list
+    ]
+    assert f"FUNCTION\n{udf_name}(" in udf_definitions_per_call[0][-1]
+    assert not any(
+        udf_name in udf_definition
+        for udf_definitions in udf_definitions_per_call[1:]
+        for udf_definition in udf_definitions
+    )
+
+
+def test_run_udf_reuses_udf_with_transfer_inputs_of_other_commands():
+    registry = ContextArtifactsRegistry()
+
+    def run_udf(command_id, transfer_command_id):
+        transfer_table_info = TableInfo(
+            name=create_table_name(
+                TableType.NORMAL, "worker1", "ctx1", transfer_command_id
+            ),
+            schema_=TableSchema(
+                columns=[ColumnInfo(name="transfer", dtype=DType.JSON)]
+            ),
+            type_=TableType.NORMAL,
+        )
+        return udfs_service.run_udf.__wrapped__(
+            request_id="request",
+            command_id=command_id,
+            context_id="ctx1",
+            func_name=make_unique_func_name(increment_transfer),
+            positional_args=WorkerUDFPosArguments(
+                args=[WorkerTableDTO(value=transfer_table_info)]
+            ),
+            keyword_args=WorkerUDFKeyArguments(args={}),
+        )
+
+    with patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.worker_config.identifier",
+        "worker1",
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.get_table_type",
+        return_value=TableType.NORMAL,
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.context_artifacts_registry",
+        registry,
+    ), patch(
+        "exareme2.worker.exareme2.cleanup.context_artifacts_registry.cleanup_db"
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.udfs_db"
+    ) as udfs_db_mock:
+        # The logger initialisation of the service is skipped, since it needs a task
+        first_results = run_udf(command_id="2", transfer_command_id="1")
+        second_results = run_udf(command_id="3", transfer_command_id="2")
+
+    [udf_name] = registry.get_udf_names("ctx1")
+    [first_udf_definitions, second_udf_definitions] = [
+        call.args[0] for call in udfs_db_mock.create_udf_artifacts.call_args_list
+    ]
+    [first_udf_exec_stmt, second_udf_exec_stmt] = [
+        call.args[0] for call in udfs_db_mock.run_udf.call_args_list
+    ]
+    assert f"FUNCTION\n{udf_name}(" in first_udf_definitions[-1]
+    assert not any(udf_name in definition for definition in second_udf_definitions)
+    for results, transfer_command_id, udf_exec_stmt in [
+        (first_results, "1", first_udf_exec_stmt),
+        (second_results, "2", second_udf_exec_stmt),
+    ]:
+        [result] = results.results
+        transfer_table_name = create_table_name(
+            TableType.NORMAL, "worker1", "ctx1", transfer_command_id
+        )
+        assert f"{udf_name}('{transfer_table_name},{result.value.name}')" in (
+            udf_exec_stmt
+        )
+
+
+def test_run_udf_does_not_reuse_a_udf_whose_creation_failed():
+    table_info = TableInfo(
+        name=create_table_name(TableType.NORMAL, "worker1", "ctx1", "0"),
+        schema_=TableSchema(columns=[ColumnInfo(name="col1", dtype=DType.INT)]),
+        type_=TableType.NORMAL,
+    )
+    registry = ContextArtifactsRegistry()
+
+    def run_udf(command_id, context_id):
+        return udfs_service.run_udf.__wrapped__(
+            request_id="request",
+            command_id=command_id,
+            context_id=context_id,
+            func_name=make_unique_func_name(get_column_rows),
+            positional_args=WorkerUDFPosArguments(
+                args=[WorkerTableDTO(value=table_info)]
+            ),
+            keyword_args=WorkerUDFKeyArguments(args={}),
+        )
+
+    with patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.worker_config.identifier",
+        "worker1",
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.get_table_type",
+        return_value=TableType.NORMAL,
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.context_artifacts_registry",
+        registry,
+    ), patch(
+        "exareme2.worker.exareme2.cleanup.context_artifacts_registry.cleanup_db"
+    ), patch(
+        "exareme2.worker.exareme2.udfs.udfs_service.udfs_db"
+    ) as udfs_db_mock:
+        udfs_db_mock.create_udf_artifacts.side_effect = [ValueError, None]
+        # The logger initialisation of the service is skipped, since it needs a task
+        with pytest.raises(ValueError):
+            run_udf(command_id="1", context_id="ctx1")
+        run_udf(command_id="1", context_id="ctx2")
+
+    assert registry.get_udf_names("ctx1") == []
+    [udf_name] = registry.get_udf_names("ctx2")
+    [failed_udf_definitions, udf_definitions] = [
+        call.args[0] for call in udfs_db_mock.create_udf_artifacts.call_args_list
+    ]
+    assert f"FUNCTION\n{udf_name}(" in failed_udf_definitions[-1]
+    assert f"FUNCTION\n{udf_name}(" in udf_definitions[-1]
+    udfs_db_mock.run_udf.assert_called_once()
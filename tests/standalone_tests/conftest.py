@@ -39,6 +39,8 @@ PULL_DOCKER_IMAGES = PULL_DOCKER_IMAGES_STR.lower() == "true"
 this_mod_path = os.path.dirname(os.path.abspath(__file__))
 TEST_ENV_CONFIG_FOLDER = path.join(this_mod_path, "testing_env_configs")
 TEST_DATA_FOLDER = Path(this_mod_path).parent / "test_data"
+# The state store of the UDFs, shared by the MonetDB containers and the workers
+UDF_STATE_STORE_DIR = "/tmp/exareme2_udf_states"
 
 OUTDIR = Path("/tmp/exareme2/")
 if not OUTDIR.exists():
@@ -237,7 +239,9 @@ def _create_monetdb_container(cont_name, cont_port):
             volumes=[
                 f"{udfio_full_path}:/home/udflib/udfio.py",
                 f"{TEST_DATA_FOLDER}:{TEST_DATA_FOLDER}",
+                f"{UDF_STATE_STORE_DIR}:{UDF_STATE_STORE_DIR}",
             ],
+            environment={"UDF_STATE_STORE_DIR": UDF_STATE_STORE_DIR},
             name=cont_name,
             publish_all_ports=True,
         )
@@ -1,14 +1,28 @@
+from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
 
 from exareme2.controller import logger as ctrl_logger
+from exareme2.controller.services.exareme2.algorithm_flow_data_objects import (
+    GlobalWorkerTable,
+)
+from exareme2.controller.services.exareme2.algorithm_flow_data_objects import (
+    LocalWorkersTable,
+)
 from exareme2.controller.services.exareme2.execution_engine import (
     AlgorithmExecutionEngine,
 )
+from exareme2.controller.services.exareme2.execution_engine import CommandIdGenerator
 from exareme2.controller.services.exareme2.execution_engine import InitializationParams
 from exareme2.controller.services.exareme2.execution_engine import SMPCParams
+from exareme2.controller.services.exareme2.execution_engine import Workers
+from exareme2.datatypes import DType
 from exareme2.smpc_cluster_communication import DifferentialPrivacyParams
+from exareme2.worker_communication import ColumnInfo
+from exareme2.worker_communication import TableInfo
+from exareme2.worker_communication import TableSchema
+from exareme2.worker_communication import TableType
 
 
 class TestAlgorithmExecutionEngine:
@@ -78,9 +92,7 @@ class TestAlgorithmExecutionEngine:
             "exareme2.controller.services.exareme2.execution_engine.get_smpc_results"
         ) as mock_get_smpc_results, patch(
             "exareme2.controller.services.exareme2.execution_engine.GlobalWorkerSMPCTables"
-        ) as MockGlobalWorkerSMPCTables, patch(
-            "exareme2.controller.services.exareme2.execution_engine.SMPCTablesInfo"
-        ) as MockSMPCTablesInfo:
+        ) as MockGlobalWorkerSMPCTables:
             command_id = 12345
 
             mock_load_data_to_smpc_clients_return_value = "a_dummy_value"
@@ -94,11 +106,7 @@ class TestAlgorithmExecutionEngine:
                 "another_dummy_value",
             ]
 
-            mock_get_smpc_results.return_value = [
-                "another_dummy_value",
-                "another_dummy_value",
-                "another_dummy_value",
-            ]
+            mock_get_smpc_results.return_value = "another_dummy_value"
 
             class MockLocalWorkersSMPCTables:
                 template_local_workers_table = ""
@@ -126,3 +134,99 @@ class TestAlgorithmExecutionEngine:
                 smpc_clients_per_op=mock_load_data_to_smpc_clients_return_value,
                 dp_params=algorithm_execution_engine._smpc_params.dp_params,
             )
+
+
+class TestAlgorithmExecutionEngineTablesSharing:
+    @pytest.fixture
+    def table_info(self):
+        return TableInfo(
+            name="normal_worker_context_0_0",
+            schema_=TableSchema(columns=[ColumnInfo(name="col", dtype=DType.INT)]),
+            type_=TableType.NORMAL,
+        )
+
+    @pytest.fixture
+    def calls(self):
+        return []
+
+    @pytest.fixture
+    def workers(self, calls, table_info):
+        def make_worker(worker_id):
+            worker = MagicMock(worker_id=worker_id)
+            worker.queue_create_remote_table.side_effect = (
+                lambda **kwargs: calls.append(("queue", worker_id)) or worker_id
+            )
+            worker.get_create_remote_table_result.side_effect = (
+                lambda **kwargs: calls.append(("get", worker_id)) or table_info
+            )
+            worker.queue_create_remote_tables_and_merge_table.side_effect = (
+                lambda **kwargs: calls.append(("queue", worker_id)) or worker_id
+            )
+            worker.get_create_merge_table_result.side_effect = (
+                lambda task: calls.append(("get", worker_id)) or table_info
+            )
+            return worker
+
+        return Workers(
+            local_workers=[make_worker(f"localworker{i}") for i in range(3)],
+            global_worker=make_worker("globalworker"),
+        )
+
+    @pytest.fixture
+    def algorithm_execution_engine(self, workers):
+        return AlgorithmExecutionEngine(
+            initialization_params=InitializationParams(
+                smpc_params=SMPCParams(smpc_enabled=False, smpc_optional=False),
+                request_id="dummyrequestid",
+            ),
+            command_id_generator=CommandIdGenerator(),
+            workers=workers,
+        )
+
+    def test_share_global_table_to_locals_queues_all_before_waiting(
+        self, algorithm_execution_engine, workers, calls, table_info
+    ):
+        global_table = GlobalWorkerTable(
+            worker=workers.global_worker, table_info=table_info
+        )
+
+        local_table = algorithm_execution_engine._share_global_table_to_locals(
+            global_table
+        )
+
+        assert [call for call, _ in calls] == ["queue"] * 3 + ["get"] * 3
+        assert set(local_table.workers_tables_info) == set(workers.local_workers)
+
+    def test_share_local_workers_data_uses_one_task_per_shared_table(
+        self, algorithm_execution_engine, workers, calls, table_info
+    ):
+        local_table = LocalWorkersTable(
+            {worker: table_info for worker in workers.local_workers}
+        )
+
+        results = algorithm_execution_engine._share_local_workers_data(
+            share_to_global=(True, False, True),
+            all_local_workers_data=[local_table, local_table, local_table],
+        )
+
+        assert calls == [
+            ("queue", "globalworker"),
+            ("queue", "globalworker"),
+            ("get", "globalworker"),
+            ("get", "globalworker"),
+        ]
+        assert isinstance(results[0], GlobalWorkerTable)
+        assert results[1] is local_table
+        assert isinstance(results[2], GlobalWorkerTable)
+        merge_table_task_kwargs = [
+            call.kwargs
+            for call in workers.global_worker.queue_create_remote_tables_and_merge_table.call_args_list
+        ]
+        assert [kwargs["command_id"] for kwargs in merge_table_task_kwargs] == [
+            "0",
+            "1",
+        ]
+        assert all(
+            list(kwargs["table_info_per_native_worker"]) == workers.local_workers
+            for kwargs in merge_table_task_kwargs
+        )
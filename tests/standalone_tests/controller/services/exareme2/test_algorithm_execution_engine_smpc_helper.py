@@ -1,16 +1,35 @@
+import json
+import threading
+import time
 import unittest.mock
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
 from logging import Logger
 
+import pytest
+
 from exareme2.controller.services.exareme2.smpc_cluster_comm_helpers import (
     _trigger_smpc_operation,
 )
 from exareme2.controller.services.exareme2.smpc_cluster_comm_helpers import (
     get_smpc_job_id,
 )
+from exareme2.controller.services.exareme2.smpc_cluster_comm_helpers import (
+    get_smpc_results,
+)
+from exareme2.controller.services.exareme2.smpc_cluster_comm_helpers import (
+    load_data_to_smpc_clients,
+)
 from exareme2.controller.services.exareme2.smpc_cluster_comm_helpers import (
     trigger_smpc_operations,
 )
+from exareme2.controller.services.exareme2.smpc_cluster_comm_helpers import (
+    wait_for_smpc_results_to_be_ready,
+)
+from exareme2.smpc_cluster_communication import GET_RESULT_ENDPOINT
+from exareme2.smpc_cluster_communication import TRIGGER_COMPUTATION_ENDPOINT
 from exareme2.smpc_cluster_communication import DifferentialPrivacyParams
+from exareme2.smpc_cluster_communication import SMPCComputationError
 from exareme2.smpc_cluster_communication import SMPCRequestType
 from exareme2.smpc_cluster_communication import create_payload
 from exareme2.utils import AttrDict
@@ -89,10 +108,16 @@ def test_trigger_smpc_operations():
         expected_return1 = 123
         expected_return2 = 456
         expected_return3 = 789
-        expected = [expected_return1, expected_return2, expected_return3]
+        expected = {
+            SMPCRequestType.SUM: expected_return1,
+            SMPCRequestType.MIN: expected_return2,
+            SMPCRequestType.MAX: expected_return3,
+        }
 
-        def side_effect(*args, **kwargs):
-            return expected.pop(0)
+        # the operations are triggered concurrently, so the return value
+        # depends on the operation instead of the order of the calls
+        def side_effect(logger, context_id, command_id, op_type, *args):
+            return expected[op_type]
 
         mock_trigger_smpc_operation.side_effect = side_effect
 
@@ -143,3 +168,259 @@ def test_trigger_smpc_operations():
         ]
         for args in expected_call_args:
             assert args in called_args_list
+
+
+class StandInSMPCCoordinator:
+    """
+    A local stand-in for the SMPC coordinator. Triggering a job takes
+    trigger_latency seconds and its result is ready computation_time seconds
+    after it was triggered. Jobs listed in failing_jobids fail. The most
+    triggers handled at the same time are kept in max_concurrent_triggers.
+    """
+
+    def __init__(self, trigger_latency=0.0, computation_time=0.0):
+        self.trigger_latency = trigger_latency
+        self.computation_time = computation_time
+        self.failing_jobids = set()
+        self.jobs = {}
+        self.polls = []
+        self.max_concurrent_triggers = 0
+        self._concurrent_triggers = 0
+        self._lock = threading.Lock()
+        coordinator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                jobid = self.path[len(TRIGGER_COMPUTATION_ENDPOINT) :]
+                payload = json.loads(
+                    self.rfile.read(int(self.headers["Content-Length"]))
+                )
+                with coordinator._lock:
+                    coordinator._concurrent_triggers += 1
+                    coordinator.max_concurrent_triggers = max(
+                        coordinator.max_concurrent_triggers,
+                        coordinator._concurrent_triggers,
+                    )
+                time.sleep(coordinator.trigger_latency)
+                coordinator.jobs[jobid] = (payload["computationType"], time.monotonic())
+                with coordinator._lock:
+                    coordinator._concurrent_triggers -= 1
+                self._respond("")
+
+            def do_GET(self):
+                jobid = self.path[len(GET_RESULT_ENDPOINT) :]
+                coordinator.polls.append(jobid)
+                computation_type, triggered_at = coordinator.jobs[jobid]
+                if jobid in coordinator.failing_jobids:
+                    status = "FAILED"
+                elif time.monotonic() - triggered_at >= coordinator.computation_time:
+                    status = "COMPLETED"
+                else:
+                    status = "RUNNING"
+                response = {
+                    "computationType": computation_type,
+                    "jobId": jobid,
+                    "status": status,
+                    "computationOutput": [],
+                }
+                self._respond(json.dumps(response))
+
+            def _respond(self, body):
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.address = f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def smpc_ctrl_config():
+    with unittest.mock.patch(
+        "exareme2.controller.services.exareme2.smpc_cluster_comm_helpers.ctrl_config"
+    ) as mock_ctrl_config:
+        mock_ctrl_config.smpc = AttrDict(
+            {
+                "coordinator_address": None,
+                "get_result_interval": 1,
+                "get_result_max_retries": 5,
+            }
+        )
+        yield mock_ctrl_config.smpc
+
+
+@pytest.fixture
+def fake_clock():
+    """
+    Replaces the sleeps of the SMPC polling with a clock that advances by the
+    slept seconds, which are kept in the returned list.
+    """
+    sleeps = []
+    module = "exareme2.controller.services.exareme2.smpc_cluster_comm_helpers"
+    with unittest.mock.patch(
+        f"{module}.sleep", side_effect=sleeps.append
+    ), unittest.mock.patch(f"{module}.monotonic", side_effect=lambda: sum(sleeps)):
+        yield sleeps
+
+
+def test_smpc_operations_are_triggered_concurrently(smpc_ctrl_config):
+    logger = Logger("dummy_logger")
+    clients = ["client1", "client2"]
+
+    with StandInSMPCCoordinator(trigger_latency=0.3) as coordinator:
+        smpc_ctrl_config.coordinator_address = coordinator.address
+        sum_op, min_op, max_op = trigger_smpc_operations(
+            logger=logger,
+            context_id="contextid",
+            command_id=0,
+            smpc_clients_per_op=(clients, clients, clients),
+        )
+        wait_for_smpc_results_to_be_ready(
+            logger, "contextid", 0, sum_op, min_op, max_op
+        )
+
+    assert (sum_op, min_op, max_op) == (True, True, True)
+    assert coordinator.max_concurrent_triggers == 3
+
+
+def test_wait_for_smpc_results_polls_pending_operations_together(
+    smpc_ctrl_config, fake_clock
+):
+    logger = Logger("dummy_logger")
+    sum_jobid = get_smpc_job_id("contextid", 0, SMPCRequestType.SUM)
+    max_jobid = get_smpc_job_id("contextid", 0, SMPCRequestType.MAX)
+    ready_after_polls = {sum_jobid: 1, max_jobid: 3}
+    polls = []
+
+    def is_smpc_result_ready(jobid):
+        polls.append(jobid)
+        return polls.count(jobid) >= ready_after_polls[jobid]
+
+    with unittest.mock.patch(
+        "exareme2.controller.services.exareme2.smpc_cluster_comm_helpers._is_smpc_result_ready",
+        side_effect=is_smpc_result_ready,
+    ):
+        wait_for_smpc_results_to_be_ready(logger, "contextid", 0, True, False, True)
+
+    assert polls.count(sum_jobid) == 1
+    assert polls.count(max_jobid) == 3
+
+
+def test_wait_for_smpc_results_backs_off_exponentially(smpc_ctrl_config, fake_clock):
+    logger = Logger("dummy_logger")
+    smpc_ctrl_config.get_result_interval = 0.3
+
+    with unittest.mock.patch(
+        "exareme2.controller.services.exareme2.smpc_cluster_comm_helpers._is_smpc_result_ready",
+        side_effect=[False, False, False, False, True],
+    ):
+        wait_for_smpc_results_to_be_ready(logger, "contextid", 0, True, False, False)
+
+    # doubled from 0.05 seconds, up to the get_result_interval
+    assert fake_clock == pytest.approx([0.05, 0.1, 0.2, 0.3, 0.3])
+
+
+def test_wait_for_smpc_results_fails_when_an_operation_fails(smpc_ctrl_config):
+    logger = Logger("dummy_logger")
+
+    with StandInSMPCCoordinator(computation_time=10) as coordinator:
+        smpc_ctrl_config.coordinator_address = coordinator.address
+        coordinator.failing_jobids.add(
+            get_smpc_job_id("contextid", 0, SMPCRequestType.MAX)
+        )
+        trigger_smpc_operations(
+            logger=logger,
+            context_id="contextid",
+            command_id=0,
+            smpc_clients_per_op=(["client1"], [], ["client1"]),
+        )
+        with pytest.raises(SMPCComputationError, match="FAILED"):
+            wait_for_smpc_results_to_be_ready(logger, "contextid", 0, True, False, True)
+
+
+def test_wait_for_smpc_results_fails_when_max_retries_are_exceeded(
+    smpc_ctrl_config, fake_clock
+):
+    logger = Logger("dummy_logger")
+    smpc_ctrl_config.get_result_interval = 0.1
+    smpc_ctrl_config.get_result_max_retries = 2
+
+    with StandInSMPCCoordinator(computation_time=10) as coordinator:
+        smpc_ctrl_config.coordinator_address = coordinator.address
+        trigger_smpc_operations(
+            logger=logger,
+            context_id="contextid",
+            command_id=0,
+            smpc_clients_per_op=(["client1"], [], []),
+        )
+        with pytest.raises(SMPCComputationError, match="Max retries"):
+            wait_for_smpc_results_to_be_ready(
+                logger, "contextid", 0, True, False, False
+            )
+
+    # the deadline is get_result_max_retries times the get_result_interval
+    assert fake_clock == pytest.approx([0.05, 0.1, 0.1])
+
+
+def test_load_data_to_smpc_clients_queues_all_tasks_before_waiting():
+    calls = []
+
+    def make_worker(worker_id):
+        worker = unittest.mock.MagicMock()
+        worker.queue_load_data_to_smpc_client.side_effect = (
+            lambda table_name, jobid: calls.append(("queue", jobid)) or jobid
+        )
+        worker.get_load_data_to_smpc_client_result.side_effect = (
+            lambda task: calls.append(("get", task)) or worker_id
+        )
+        return worker
+
+    def make_local_workers_table(op_name):
+        table_info = unittest.mock.MagicMock(context_id="contextid")
+        table_info.name = op_name
+        return unittest.mock.MagicMock(
+            workers_tables_info={
+                make_worker("client1"): table_info,
+                make_worker("client2"): table_info,
+            }
+        )
+
+    smpc_tables = unittest.mock.MagicMock(
+        sum_op_local_workers_table=make_local_workers_table("sum"),
+        min_op_local_workers_table=None,
+        max_op_local_workers_table=make_local_workers_table("max"),
+    )
+
+    clients = load_data_to_smpc_clients(0, smpc_tables)
+
+    assert clients == (["client1", "client2"], [], ["client1", "client2"])
+    assert [call for call, _ in calls] == ["queue"] * 4 + ["get"] * 4
+
+
+def test_get_smpc_results_in_a_single_task():
+    worker = unittest.mock.MagicMock()
+    template = unittest.mock.MagicMock()
+
+    results = get_smpc_results(worker, "contextid", 0, template, True, False, True)
+
+    assert results == worker.get_smpc_results.return_value
+    worker.get_smpc_results.assert_called_once_with(
+        command_id="0",
+        template=template,
+        sum_op_jobid=get_smpc_job_id("contextid", 0, SMPCRequestType.SUM),
+        min_op_jobid=None,
+        max_op_jobid=get_smpc_job_id("contextid", 0, SMPCRequestType.MAX),
+    )
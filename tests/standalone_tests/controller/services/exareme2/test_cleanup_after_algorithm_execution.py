@@ -370,7 +370,7 @@ def test_synchronous_cleanup(
     # Poll WorkerLandscapeAggregator until it has some worker info
     wait_wla(worker_landscape_aggregator)
 
-    cleaner._reset()  # deletes all existing persistence files (cleanup_<context_id>.toml files)
+    cleaner._reset()  # deletes all existing cleanup entries
 
     # contextid is added to Cleaner but is not released
     cleaner.add_contextid_for_cleanup(
@@ -429,7 +429,7 @@ def test_asynchronous_cleanup(
     wait_wla(worker_landscape_aggregator)
 
     # Start the Cleaner
-    cleaner._reset()  # deletes all existing persistence files (cleanup_<context_id>.toml files)
+    cleaner._reset()  # deletes all existing cleanup entries
     cleaner.start()
 
     # contextid is added to Cleaner but is not yet released
@@ -493,7 +493,7 @@ def test_cleanup_triggered_by_release_timelimit(
     wait_wla(worker_landscape_aggregator)
 
     # Start the Cleaner
-    cleaner._reset()  # deletes all existing persistence files(cleanup files)
+    cleaner._reset()  # deletes all existing cleanup entries
     cleaner.start()
 
     # create some dummy tables
@@ -558,7 +558,7 @@ def test_cleanup_after_rabbitmq_restart(
     wait_wla(worker_landscape_aggregator)
 
     # Start the Cleaner
-    cleaner._reset()  # deletes all existing persistence files(cleanup files)
+    cleaner._reset()  # deletes all existing cleanup entries
     cleaner.start()
 
     # Add contextid to Cleaner but is not yet released
@@ -644,7 +644,7 @@ def test_cleanup_after_worker_service_restart(
     wait_wla(worker_landscape_aggregator)
 
     # Start the Cleaner
-    cleaner._reset()  # deletes all existing persistence files(cleanup files)
+    cleaner._reset()  # deletes all existing cleanup entries
     cleaner.start()
 
     # Add contextid to Cleaner but is not yet released
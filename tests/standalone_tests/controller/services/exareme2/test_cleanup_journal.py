@@ -0,0 +1,126 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+import toml
+
+from exareme2.controller.services.exareme2.cleaner import Cleaner
+from exareme2.controller.services.exareme2.cleaner import CleanupJournal
+
+
+@pytest.fixture
+def cleanup_journal(tmp_path):
+    return CleanupJournal(MagicMock(), str(tmp_path))
+
+
+def test_only_due_entries_are_returned(cleanup_journal):
+    cleanup_journal.add_entries("context1", ["worker1", "worker2"], due_at=100)
+    cleanup_journal.add_entries("context2", ["worker1"], due_at=200)
+
+    assert cleanup_journal.get_due_context_ids_per_worker(now=50) == {}
+    assert cleanup_journal.get_due_context_ids_per_worker(now=150) == {
+        "worker1": ["context1"],
+        "worker2": ["context1"],
+    }
+    assert cleanup_journal.get_due_context_ids_per_worker(now=250) == {
+        "worker1": ["context1", "context2"],
+        "worker2": ["context1"],
+    }
+
+
+def test_released_entries_are_due(cleanup_journal):
+    cleanup_journal.add_entries("context1", ["worker1"], due_at=100)
+
+    cleanup_journal.release_entries("context1", released_at=10)
+
+    assert cleanup_journal.get_due_context_ids_per_worker(now=10) == {
+        "worker1": ["context1"]
+    }
+
+
+def test_deleted_entries_are_not_returned(cleanup_journal):
+    cleanup_journal.add_entries("context1", ["worker1", "worker2"], due_at=100)
+
+    cleanup_journal.delete_entries("worker1", ["context1"])
+
+    assert cleanup_journal.get_worker_ids_by_context_id("context1") == ["worker2"]
+
+
+def test_entries_are_durable(tmp_path):
+    CleanupJournal(MagicMock(), str(tmp_path)).add_entries(
+        "context1", ["worker1"], due_at=100
+    )
+
+    cleanup_journal = CleanupJournal(MagicMock(), str(tmp_path))
+
+    assert cleanup_journal.get_worker_ids_by_context_id("context1") == ["worker1"]
+
+
+def test_cleanup_files_are_imported(tmp_path):
+    cleanup_file = tmp_path / "cleanup_context1.toml"
+    with open(cleanup_file, "w") as f:
+        toml.dump(
+            {
+                "context_id": "context1",
+                "worker_ids": ["worker1"],
+                "timestamp": "1970-01-01T00:01:40+00:00",
+                "released": False,
+            },
+            f,
+        )
+    cleanup_journal = CleanupJournal(MagicMock(), str(tmp_path))
+
+    cleanup_journal.import_cleanup_files(contextid_release_timelimit=100)
+
+    assert not cleanup_file.exists()
+    assert cleanup_journal.get_due_context_ids_per_worker(now=150) == {}
+    assert cleanup_journal.get_due_context_ids_per_worker(now=200) == {
+        "worker1": ["context1"]
+    }
+
+
+def test_cleanup_is_batched_per_worker(tmp_path):
+    cleaner = Cleaner(
+        logger=MagicMock(),
+        cleanup_interval=1,
+        contextid_release_timelimit=3600,
+        cleanup_task_timeout=10,
+        run_udf_task_timeout=10,
+        contextids_cleanup_folder=str(tmp_path),
+        worker_landscape_aggregator=MagicMock(),
+    )
+    cleaner.add_contextid_for_cleanup("context1", ["worker1", "worker2"])
+    cleaner.add_contextid_for_cleanup("context2", ["worker1"])
+    cleaner.release_context_id("context1")
+    cleaner.release_context_id("context2")
+
+    task_handlers = {}
+
+    def get_worker_task_handler(worker_info):
+        task_handler = MagicMock(worker_id=worker_info.worker_id)
+        task_handlers[worker_info.worker_id] = task_handler
+        return task_handler
+
+    with patch.object(
+        cleaner,
+        "_get_worker_info_by_id",
+        side_effect=lambda worker_id: MagicMock(worker_id=worker_id),
+    ), patch(
+        "exareme2.controller.services.exareme2.cleaner._get_worker_task_handler",
+        side_effect=get_worker_task_handler,
+    ):
+        context_ids_per_worker = (
+            cleaner._cleanup_journal.get_due_context_ids_per_worker(now=float("inf"))
+        )
+        failed_worker_ids = cleaner._exec_cleanup(context_ids_per_worker)
+
+    assert failed_worker_ids == []
+    task_handlers["worker1"].queue_cleanup.assert_called_once_with(
+        context_ids=["context1", "context2"]
+    )
+    task_handlers["worker2"].queue_cleanup.assert_called_once_with(
+        context_ids=["context1"]
+    )
+    assert (
+        cleaner._cleanup_journal.get_due_context_ids_per_worker(now=float("inf")) == {}
+    )
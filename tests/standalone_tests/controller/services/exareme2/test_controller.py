@@ -329,11 +329,11 @@ class TestDataModelViewsCreator:
             command_id=data_model_views_creator_init_params.command_id,
         )
 
-        # assert that create_data_model_views was called for all local workers with the
-        # expected args
+        # assert that the creation of the data model views was queued for all local
+        # workers with the expected args
         data_model_views_creator.create_data_model_views()
         for worker in local_worker_mocks:
-            worker.create_data_model_views.assert_called_once_with(
+            worker.queue_create_data_model_views.assert_called_once_with(
                 columns_per_view=data_model_views_creator_init_params.variable_groups,
                 filters=data_model_views_creator_init_params.var_filters,
                 dropna=data_model_views_creator_init_params.dropna,
@@ -343,6 +343,33 @@ class TestDataModelViewsCreator:
 
         assert isinstance(data_model_views_creator.data_model_views, DataModelViews)
 
+    def test_create_data_model_views_queued_on_all_workers_before_waiting(
+        self, local_worker_mocks, data_model_views_creator_init_params
+    ):
+        calls = []
+        table_info = self.TableInfoMock()
+        table_info.schema_ = "dummy_schema"
+        for worker in local_worker_mocks:
+            worker.queue_create_data_model_views.side_effect = (
+                lambda *args, **kwargs: calls.append("queue")
+            )
+            worker.get_create_data_model_views_result.side_effect = (
+                lambda *args, **kwargs: calls.append("get") or [table_info]
+            )
+
+        data_model_views_creator = DataModelViewsCreator(
+            local_workers=data_model_views_creator_init_params.local_workers,
+            variable_groups=data_model_views_creator_init_params.variable_groups,
+            var_filters=data_model_views_creator_init_params.var_filters,
+            dropna=data_model_views_creator_init_params.dropna,
+            check_min_rows=data_model_views_creator_init_params.check_min_rows,
+            command_id=data_model_views_creator_init_params.command_id,
+        )
+        data_model_views_creator.create_data_model_views()
+
+        number_of_workers = len(local_worker_mocks)
+        assert calls == ["queue"] * number_of_workers + ["get"] * number_of_workers
+
     def test_create_data_model_views_contains_only_workers_with_sufficient_data(
         self, data_model_views_creator_init_params
     ):
@@ -359,11 +386,13 @@ class TestDataModelViewsCreator:
             worker.worker_id = "sufficientdataworker"
             table_info = self.TableInfoMock()
             table_info.schema_ = "dummy_schema"
-            worker.create_data_model_views.return_value = [table_info]
+            worker.get_create_data_model_views_result.return_value = [table_info]
         # and some of them without sufficient data
         for worker in local_worker_mocks_insufficient_data:
             worker.worker_id = "insufficientdataworker"
-            worker.create_data_model_views.side_effect = InsufficientDataError("")
+            worker.get_create_data_model_views_result.side_effect = (
+                InsufficientDataError("")
+            )
 
         data_model_views_creator = DataModelViewsCreator(
             local_workers=(
@@ -391,7 +420,9 @@ class TestDataModelViewsCreator:
         local_worker_mocks = [MagicMock(LocalWorker) for number_of_workers in range(10)]
         for worker_mock in local_worker_mocks:
             worker_mock.worker_id = "some_id.."
-            worker_mock.create_data_model_views.side_effect = InsufficientDataError("")
+            worker_mock.get_create_data_model_views_result.side_effect = (
+                InsufficientDataError("")
+            )
 
         data_model_views_creator = DataModelViewsCreator(
             local_workers=local_worker_mocks,
@@ -175,3 +175,27 @@ class TestWorkerTasksHandlerRefactored(unittest.TestCase):
             monetdb_socket_address=monetdb_socket_address,
             request_id=self.request_id,
         )
+
+    def test_create_remote_tables_and_merge_table(self):
+        table_infos = [MagicMock(), MagicMock()]
+        monetdb_socket_addresses = ["fake_socket_address1", "fake_socket_address2"]
+        self.mock_celery_app.queue_task.return_value = self.mock_async_result
+        result = self.worker_tasks_handler.create_remote_tables_and_merge_table(
+            self.request_id,
+            self.context_id,
+            self.command_id,
+            table_infos,
+            monetdb_socket_addresses,
+        )
+
+        self.assertIsInstance(result, WorkerTaskResult)
+        expected_table_infos_json = [info.json() for info in table_infos]
+        self.mock_celery_app.queue_task.assert_called_with(
+            task_signature="exareme2.worker.exareme2.tables.tables_api.create_remote_tables_and_merge_table",
+            logger=self.mock_logger,
+            request_id=self.request_id,
+            context_id=self.context_id,
+            command_id=self.command_id,
+            table_infos_json=expected_table_infos_json,
+            monetdb_socket_addresses=monetdb_socket_addresses,
+        )
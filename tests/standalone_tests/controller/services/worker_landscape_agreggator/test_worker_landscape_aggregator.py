@@ -1,7 +1,14 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
 import pytest
 
 from exareme2 import AttrDict
 from exareme2.controller import logger as ctrl_logger
+from exareme2.controller.celery.app import CeleryTaskTimeoutException
+from exareme2.controller.services.worker_landscape_aggregator.worker_landscape_aggregator import (
+    MAX_CONSECUTIVE_TIMEOUTS,
+)
 from exareme2.controller.services.worker_landscape_aggregator.worker_landscape_aggregator import (
     DataModelMetadata,
 )
@@ -35,7 +42,11 @@ from exareme2.controller.services.worker_landscape_aggregator.worker_landscape_a
 from exareme2.worker_communication import CommonDataElement
 from exareme2.worker_communication import CommonDataElements
 from exareme2.worker_communication import DataModelAttributes
+from exareme2.worker_communication import DataModelsMetadataSnapshot
 from exareme2.worker_communication import DatasetInfo
+from exareme2.worker_communication import WorkerInfo
+from exareme2.worker_communication import WorkerMetadataSnapshot
+from exareme2.worker_communication import WorkerRole
 from tests.standalone_tests.conftest import RABBITMQ_LOCALWORKERTMP_ADDR
 
 
@@ -2915,28 +2926,217 @@ def test_data_model_registry_missing_data_model_attributes(worker_landscape_aggr
 
 
 @pytest.mark.slow
-def test_get_workers_info_properly_handles_errors(worker_landscape_aggregator):
-    workers_info = worker_landscape_aggregator._get_workers_info(
+def test_get_workers_metadata_snapshots_properly_handles_errors(
+    worker_landscape_aggregator,
+):
+    snapshots = worker_landscape_aggregator._get_workers_metadata_snapshots(
         [RABBITMQ_LOCALWORKERTMP_ADDR]
     )
-    assert not workers_info
+    assert not snapshots
 
 
-@pytest.mark.slow
-def test_get_worker_datasets_per_data_model_properly_handles_errors(
+def get_worker_info(worker_id, role=WorkerRole.LOCALWORKER):
+    return WorkerInfo(
+        id=worker_id,
+        role=role,
+        ip="172.17.0.1",
+        port=60001,
+        db_ip="172.17.0.1",
+        db_port=61001,
+    )
+
+
+def get_worker_metadata_snapshot(worker_info, content_hash, omitted=False):
+    if omitted:
+        return WorkerMetadataSnapshot(
+            worker_info=worker_info,
+            data_models_metadata=DataModelsMetadataSnapshot(content_hash=content_hash),
+        )
+    return WorkerMetadataSnapshot(
+        worker_info=worker_info,
+        data_models_metadata=DataModelsMetadataSnapshot(
+            content_hash=content_hash,
+            datasets_info_per_data_model={
+                "dementia:0.1": [DatasetInfo(code="edsd", label="EDSD")]
+            },
+            cdes_per_data_model={
+                "dementia:0.1": CommonDataElements(
+                    values={
+                        "dataset": CommonDataElement(
+                            code="dataset",
+                            label="Dataset",
+                            sql_type="text",
+                            is_categorical=True,
+                            enumerations={"edsd": "EDSD"},
+                            min=None,
+                            max=None,
+                        ),
+                    }
+                )
+            },
+            attributes_per_data_model={
+                "dementia:0.1": DataModelAttributes(tags=[], properties={})
+            },
+        ),
+    )
+
+
+def get_timeout_exception():
+    return CeleryTaskTimeoutException(
+        timeout_type="timeout",
+        connection_address="172.17.0.1:60001",
+        async_result=MagicMock(),
+    )
+
+
+def test_get_workers_metadata_snapshots_reuses_omitted_metadata(
     worker_landscape_aggregator,
 ):
-    datasets_per_data_model = (
-        worker_landscape_aggregator._get_worker_datasets_per_data_model(
-            RABBITMQ_LOCALWORKERTMP_ADDR
+    worker_info = get_worker_info("localworker1")
+    tasks_handler = MagicMock()
+    tasks_handler.get_worker_metadata_snapshot_result.side_effect = [
+        get_worker_metadata_snapshot(worker_info, "hash1"),
+        get_worker_metadata_snapshot(worker_info, "hash1", omitted=True),
+    ]
+    with patch.object(
+        worker_landscape_aggregator,
+        "_get_worker_info_tasks_handler",
+        return_value=tasks_handler,
+    ):
+        (first,) = worker_landscape_aggregator._get_workers_metadata_snapshots(
+            ["172.17.0.1:60001"]
+        )
+        (second,) = worker_landscape_aggregator._get_workers_metadata_snapshots(
+            ["172.17.0.1:60001"]
         )
+
+    assert second == first
+    assert not second.data_models_metadata.is_omitted
+    assert [
+        call.args
+        for call in tasks_handler.queue_worker_metadata_snapshot_task.mock_calls
+    ] == [(None,), ("hash1",)]
+
+
+def test_get_workers_metadata_snapshots_keeps_last_known_on_timeout(
+    worker_landscape_aggregator,
+):
+    worker_info = get_worker_info("localworker1")
+    last_known = get_worker_metadata_snapshot(worker_info, "hash1")
+    tasks_handler = MagicMock()
+    tasks_handler.get_worker_metadata_snapshot_result.side_effect = [
+        last_known,
+        get_timeout_exception(),
+        get_timeout_exception(),
+        get_worker_metadata_snapshot(worker_info, "hash1", omitted=True),
+    ]
+    with patch.object(
+        worker_landscape_aggregator,
+        "_get_worker_info_tasks_handler",
+        return_value=tasks_handler,
+    ):
+        snapshots_per_update = [
+            worker_landscape_aggregator._get_workers_metadata_snapshots(
+                ["172.17.0.1:60001"]
+            )
+            for _ in range(4)
+        ]
+
+    assert snapshots_per_update == [[last_known]] * 4
+    assert [
+        call.args
+        for call in tasks_handler.queue_worker_metadata_snapshot_task.mock_calls
+    ] == [(None,), ("hash1",), ("hash1",), ("hash1",)]
+
+
+def test_get_workers_metadata_snapshots_drops_worker_that_keeps_timing_out(
+    worker_landscape_aggregator,
+):
+    worker_info = get_worker_info("localworker1")
+    last_known = get_worker_metadata_snapshot(worker_info, "hash1")
+    tasks_handler = MagicMock()
+    tasks_handler.get_worker_metadata_snapshot_result.side_effect = [last_known] + [
+        get_timeout_exception()
+    ] * (MAX_CONSECUTIVE_TIMEOUTS + 2)
+    with patch.object(
+        worker_landscape_aggregator,
+        "_get_worker_info_tasks_handler",
+        return_value=tasks_handler,
+    ):
+        snapshots_per_update = [
+            worker_landscape_aggregator._get_workers_metadata_snapshots(
+                ["172.17.0.1:60001"]
+            )
+            for _ in range(MAX_CONSECUTIVE_TIMEOUTS + 3)
+        ]
+
+    assert (
+        snapshots_per_update
+        == [[last_known]] * (MAX_CONSECUTIVE_TIMEOUTS + 1) + [[]] * 2
+    )
+    assert worker_landscape_aggregator._metadata_snapshots_cache == {}
+    assert worker_landscape_aggregator._consecutive_timeouts == {}
+    # The evicted worker is asked for its full metadata again
+    assert tasks_handler.queue_worker_metadata_snapshot_task.mock_calls[-1].args == (
+        None,
     )
-    assert not datasets_per_data_model
 
 
-@pytest.mark.slow
-def test_get_worker_cdes_properly_handles_errors(worker_landscape_aggregator):
-    cdes = worker_landscape_aggregator._get_worker_cdes(
-        RABBITMQ_LOCALWORKERTMP_ADDR, "dementia:0.1"
+def test_get_workers_metadata_snapshots_drops_cache_of_departed_workers(
+    worker_landscape_aggregator,
+):
+    tasks_handler = MagicMock()
+    tasks_handler.get_worker_metadata_snapshot_result.side_effect = [
+        get_worker_metadata_snapshot(get_worker_info("localworker1"), "hash1"),
+        get_worker_metadata_snapshot(get_worker_info("localworker2"), "hash2"),
+        get_worker_metadata_snapshot(get_worker_info("localworker1"), "hash1"),
+    ]
+    with patch.object(
+        worker_landscape_aggregator,
+        "_get_worker_info_tasks_handler",
+        return_value=tasks_handler,
+    ):
+        worker_landscape_aggregator._get_workers_metadata_snapshots(
+            ["172.17.0.1:60001", "172.17.0.1:60002"]
+        )
+        worker_landscape_aggregator._get_workers_metadata_snapshots(
+            ["172.17.0.1:60001"]
+        )
+
+    assert set(worker_landscape_aggregator._metadata_snapshots_cache) == {
+        "172.17.0.1:60001"
+    }
+
+
+def test_fetch_workers_metadata_excludes_global_worker_metadata(
+    worker_landscape_aggregator,
+):
+    snapshots = [
+        get_worker_metadata_snapshot(
+            get_worker_info("globalworker", WorkerRole.GLOBALWORKER), ""
+        ),
+        get_worker_metadata_snapshot(get_worker_info("localworker1"), "hash1"),
+    ]
+    with patch(
+        "exareme2.controller.services.worker_landscape_aggregator.worker_landscape_aggregator.WorkersAddressesFactory"
+    ), patch.object(
+        worker_landscape_aggregator,
+        "_get_workers_metadata_snapshots",
+        return_value=snapshots,
+    ):
+        (
+            workers_info,
+            data_models_metadata_per_worker,
+        ) = worker_landscape_aggregator._fetch_workers_metadata()
+
+    assert [worker_info.id for worker_info in workers_info] == [
+        "globalworker",
+        "localworker1",
+    ]
+    data_models_metadata = (
+        data_models_metadata_per_worker.data_models_metadata_per_worker
     )
-    assert not cdes
+    assert set(data_models_metadata) == {"localworker1"}
+    assert data_models_metadata["localworker1"].data_models_metadata[
+        "dementia:0.1"
+    ].dataset_infos == [DatasetInfo(code="edsd", label="EDSD")]
@@ -468,28 +468,34 @@ def test_load_data_to_smpc_client(
 @pytest.mark.slow
 @pytest.mark.very_slow
 @pytest.mark.smpc
-def test_get_smpc_result_from_localworker_fails(
+def test_get_smpc_results_from_localworker_fails(
     smpc_localworker1_worker_service,
     smpc_localworker1_celery_app,
 ):
     smpc_localworker1_celery_app = smpc_localworker1_celery_app._celery_app
-    get_smpc_result_task = get_celery_task_signature("get_smpc_result")
+    get_smpc_results_task = get_celery_task_signature("get_smpc_results")
+    template = TableInfo(
+        name="whatever",
+        schema_=TableSchema(columns=[ColumnInfo(name="col1", dtype=DType.INT)]),
+        type_=TableType.NORMAL,
+    )
 
     with pytest.raises(PermissionError) as exc:
-        smpc_localworker1_celery_app.signature(get_smpc_result_task).delay(
+        smpc_localworker1_celery_app.signature(get_smpc_results_task).delay(
             request_id="whatever",
             context_id="whatever",
             command_id="whatever",
-            jobid="whatever",
+            template_json=template.json(),
+            sum_op_jobid="whatever",
         ).get(timeout=TASKS_TIMEOUT)
-    assert "get_smpc_result is allowed only for a GLOBALWORKER." in str(exc)
+    assert "get_smpc_results is allowed only for a GLOBALWORKER." in str(exc)
 
 
 @pytest.mark.slow
 @pytest.mark.very_slow
 @pytest.mark.smpc
 @pytest.mark.smpc_cluster
-def test_get_smpc_result(
+def test_get_smpc_results(
     smpc_globalworker_worker_service,
     use_smpc_globalworker_database,
     smpc_globalworker_celery_app,
@@ -497,7 +503,12 @@ def test_get_smpc_result(
     smpc_cluster,
 ):
     smpc_globalworker_celery_app = smpc_globalworker_celery_app._celery_app
-    get_smpc_result_task = get_celery_task_signature("get_smpc_result")
+    get_smpc_results_task = get_celery_task_signature("get_smpc_results")
+    template = TableInfo(
+        name=f"smpc_template_{context_id}",
+        schema_=TableSchema(columns=[ColumnInfo(name="col1", dtype=DType.INT)]),
+        type_=TableType.NORMAL,
+    )
 
     # --------------- LOAD Dataset to SMPC --------------------
     worker_config = get_worker_config_by_id(LOCALWORKER1_SMPC_CONFIG_FILE)
@@ -543,20 +554,24 @@ def test_get_smpc_result(
         raise TimeoutError("SMPC did not finish in 100 tries.")
 
     # --------------- GET SMPC RESULT IN GLOBALWORKER ------------------------
-    result_tableinfo = TableInfo.parse_raw(
-        smpc_globalworker_celery_app.signature(get_smpc_result_task)
+    result_tables_info = SMPCTablesInfo.parse_raw(
+        smpc_globalworker_celery_app.signature(get_smpc_results_task)
         .delay(
             request_id=request_id,
             context_id=context_id,
             command_id=command_id,
-            jobid=smpc_job_id,
+            template_json=template.json(),
+            sum_op_jobid=smpc_job_id,
         )
         .get(timeout=TASKS_TIMEOUT)
     )
 
+    assert result_tables_info.template == template
+    assert result_tables_info.min_op is None
+    assert result_tables_info.max_op is None
     validate_table_data_match_expected(
         db_cursor=globalworker_smpc_db_cursor,
-        table_name=result_tableinfo.name,
+        table_name=result_tables_info.sum_op.name,
         expected_values=smpc_computation_data,
     )
 
@@ -610,8 +625,8 @@ def test_orchestrate_SMPC_between_two_localworkers_and_the_globalworker(
     load_data_to_smpc_client_task_localworker2 = smpc_localworker2_celery_app.signature(
         get_celery_task_signature("load_data_to_smpc_client")
     )
-    get_smpc_result_task_globalworker = smpc_globalworker_celery_app.signature(
-        get_celery_task_signature("get_smpc_result")
+    get_smpc_results_task_globalworker = smpc_globalworker_celery_app.signature(
+        get_celery_task_signature("get_smpc_results")
     )
 
     # ---------------- CREATE LOCAL TABLES WITH INITIAL DATA ----------------------
@@ -750,22 +765,18 @@ def test_orchestrate_SMPC_between_two_localworkers_and_the_globalworker(
         raise TimeoutError("SMPC did not finish in 100 tries.")
 
     # --------- Get SMPC result in globalworker -----------------
-    sum_op_values_tableinfo = TableInfo.parse_raw(
-        get_smpc_result_task_globalworker.delay(
+    smpc_tables_info = SMPCTablesInfo.parse_raw(
+        get_smpc_results_task_globalworker.delay(
             request_id=request_id,
             context_id=context_id,
             command_id="4",
-            jobid=smpc_job_id,
+            template_json=globalworker_template_tableinfo.json(),
+            sum_op_jobid=smpc_job_id,
         ).get()
     )
 
     # ----------------------- RUN GLOBAL UDF USING SMPC RESULTS ----------------------
-    smpc_arg = WorkerSMPCDTO(
-        value=SMPCTablesInfo(
-            template=globalworker_template_tableinfo,
-            sum_op=sum_op_values_tableinfo,
-        )
-    )
+    smpc_arg = WorkerSMPCDTO(value=smpc_tables_info)
     pos_args_str = WorkerUDFPosArguments(args=[smpc_arg]).json()
     udf_results_str = run_udf_task_globalworker.delay(
         command_id="5",
@@ -1,8 +1,10 @@
 from typing import List
 
+import numpy as np
 import pytest
 from pydantic import ValidationError
 
+from exareme2.worker_communication import ColumnBuffer
 from exareme2.worker_communication import ColumnDataFloat
 from exareme2.worker_communication import ColumnDataInt
 from exareme2.worker_communication import ColumnDataStr
@@ -91,6 +93,84 @@ def test_table_data_with_different_column_types():
     assert TableData.parse_raw(data.json()) == data
 
 
+@pytest.mark.parametrize(
+    "dtype, data",
+    [
+        (DType.INT, [1, None, -3]),
+        (DType.FLOAT, [1.5, 2.0, None]),
+        (DType.STR, ["a", None, "αβ"]),
+        (DType.JSON, ['{"a": 1}', None, "[]"]),
+        (DType.BINARY, [b"\x00\x01", None, b""]),
+        (DType.INT, []),
+    ],
+)
+def test_column_buffer_data(dtype, data):
+    column = ColumnBuffer.from_data(name="column", type=dtype, data=data)
+    column = ColumnBuffer.parse_raw(column.json())
+    assert column.length == len(data)
+    assert column.data == data
+
+
+def test_column_buffer_to_numpy():
+    int_column = ColumnBuffer.from_data(name="int", type=DType.INT, data=[1, 2])
+    nullable_int_column = ColumnBuffer.from_data(
+        name="nullable_int", type=DType.INT, data=[1, None]
+    )
+    str_column = ColumnBuffer.from_data(name="str", type=DType.STR, data=["a", None])
+
+    assert int_column.to_numpy().dtype == np.int64
+    np.testing.assert_array_equal(nullable_int_column.to_numpy(), [1.0, np.nan])
+    assert str_column.to_numpy().tolist() == ["a", None]
+
+
+def test_table_data_with_column_buffers():
+    data = TableData(
+        name="table_name",
+        columns=[
+            ColumnBuffer.from_data(name="column1", type=DType.FLOAT, data=[1.0, None]),
+            ColumnBuffer.from_data(name="column2", type=DType.STR, data=["3", None]),
+        ],
+    )
+    parsed_data = TableData.parse_raw(data.json())
+    assert parsed_data == data
+    assert all(isinstance(column, ColumnBuffer) for column in parsed_data.columns)
+
+    dataframe = parsed_data.to_pandas()
+    assert list(dataframe.columns) == ["column1", "column2"]
+    assert dataframe["column2"].tolist() == ["3", None]
+
+
+def test_table_data_parse_trusted_raw():
+    data = TableData(
+        name="table_name",
+        columns=[
+            ColumnBuffer.from_data(name="column1", type=DType.FLOAT, data=[1.0, None]),
+            ColumnDataFloat(data=[1.0, None], name="column2"),
+            ColumnDataInt(data=[2, None], name="column3"),
+            ColumnDataStr(data=["3", None], name="column4"),
+        ],
+    )
+    parsed_data = TableData.parse_trusted_raw(data.json())
+    assert parsed_data == data
+    assert [type(column) for column in parsed_data.columns] == [
+        type(column) for column in data.columns
+    ]
+
+
+def test_table_data_parse_trusted_raw_large_column():
+    data = TableData(
+        name="table_name",
+        columns=[
+            ColumnDataFloat.from_trusted_data(
+                name="column", data=np.random.rand(100_000).tolist()
+            )
+        ],
+    )
+    raw = data.json()
+
+    assert TableData.parse_trusted_raw(raw) == TableData.parse_raw(raw)
+
+
 def test_table_schema_immutable():
     schema = TableSchema(
         columns=[
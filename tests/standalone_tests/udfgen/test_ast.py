@@ -257,6 +257,18 @@ FROM
     assert result == expected
 
 
+def test_select_table_returning_func_with_scalar_args():
+    func = TableFunction(name="the_func", arguments=("tab1,tab2",))
+    sel = Select([Column("*")], [func])
+    result = sel.compile()
+    expected = """\
+SELECT
+    *
+FROM
+    the_func('tab1,tab2')"""
+    assert result == expected
+
+
 def test_select_with_groupby():
     tab = Table(name="tab", columns=["a", "b"])
     func = ScalarFunction(name="the_func", columns=[tab.c["a"]])
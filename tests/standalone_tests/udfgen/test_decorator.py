@@ -1,6 +1,10 @@
 # type: ignore
 import pytest
 
+from exareme2.algorithms.exareme2.udfgen import cached_matrix
+from exareme2.algorithms.exareme2.udfgen import cached_relation
+from exareme2.algorithms.exareme2.udfgen import chunked_relation
+from exareme2.algorithms.exareme2.udfgen import matrix
 from exareme2.algorithms.exareme2.udfgen import merge_transfer
 from exareme2.algorithms.exareme2.udfgen import relation
 from exareme2.algorithms.exareme2.udfgen import secure_transfer
@@ -222,6 +226,84 @@ class TestUDFValidation:
 
         assert "tensors and relations" in str(exc)
 
+    def test_matrix_and_relation(self):
+        with pytest.raises(UDFBadDefinition) as exc:
+
+            @udf(
+                x=matrix(dtype=float, ncols=2),
+                y=relation(schema=[]),
+                return_type=relation([("result", int)]),
+            )
+            def f(x, y):
+                return x
+
+        assert "matrices together with tensors or relations" in str(exc)
+
+    def test_two_matrices(self):
+        with pytest.raises(UDFBadDefinition) as exc:
+
+            @udf(
+                x=matrix(dtype=float, ncols=2),
+                y=matrix(dtype=float, ncols=2),
+                return_type=relation([("result", int)]),
+            )
+            def f(x, y):
+                return x
+
+        assert "more than one matrix" in str(exc)
+
+    def test_cached_matrix_and_relation(self):
+        @udf(
+            x=cached_matrix(dtype=float, ncols=2),
+            y=relation(schema=[]),
+            return_type=relation([("result", int)]),
+        )
+        def f(x, y):
+            return x
+
+    def test_cached_relation_and_relation(self):
+        with pytest.raises(UDFBadDefinition) as exc:
+
+            @udf(
+                x=cached_relation(schema=[]),
+                y=relation(schema=[]),
+                return_type=relation([("result", int)]),
+            )
+            def f(x, y):
+                return x
+
+        assert "cached relations together with tensors or relations" in str(exc)
+
+    def test_chunked_relations(self):
+        @udf(
+            x=chunked_relation(schema=[]),
+            y=chunked_relation(schema=[]),
+            return_type=relation([("result", int)]),
+        )
+        def f(x, y):
+            return x
+
+    @pytest.mark.parametrize(
+        "other_table",
+        [
+            relation(schema=[]),
+            matrix(dtype=float, ncols=2),
+            cached_matrix(dtype=float, ncols=2),
+        ],
+    )
+    def test_chunked_relation_and_other_table(self, other_table):
+        with pytest.raises(UDFBadDefinition) as exc:
+
+            @udf(
+                x=chunked_relation(schema=[]),
+                y=other_table,
+                return_type=relation([("result", int)]),
+            )
+            def f(x, y):
+                return x
+
+        assert "chunked relations together with other tables" in str(exc)
+
     def test_validate_func_as_valid_udf_with_secure_transfer_output(self):
         @udf(
             y=state(),
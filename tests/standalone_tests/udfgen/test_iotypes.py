@@ -5,6 +5,7 @@ import pytest
 
 from exareme2.algorithms.exareme2.udfgen import DEFERRED
 from exareme2.algorithms.exareme2.udfgen import literal
+from exareme2.algorithms.exareme2.udfgen import matrix
 from exareme2.algorithms.exareme2.udfgen import relation
 from exareme2.algorithms.exareme2.udfgen import state
 from exareme2.algorithms.exareme2.udfgen import tensor
@@ -81,6 +82,24 @@ def test_tensor_column_names():
     assert colnames == ["pre_dim0", "pre_dim1", "pre_val"]
 
 
+def test_matrix_generic():
+    N = TypeVar("N")
+    m = matrix(dtype=float, ncols=N)
+    assert m.is_generic
+    assert m.known_typeparams == {"dtype": DType.FLOAT}
+    assert m.unknown_typeparams == {"ncols": N}
+
+
+def test_matrix_schema():
+    m = matrix(dtype=DType.FLOAT, ncols=3)
+    assert m.schema == [
+        ("matrix_row", DType.INT),
+        ("col0", DType.FLOAT),
+        ("col1", DType.FLOAT),
+        ("col2", DType.FLOAT),
+    ]
+
+
 def test_relation_column_names():
     r = relation(schema=[("ci", DType.INT), ("cf", DType.FLOAT), ("cs", DType.STR)])
     colnames = r.column_names(prefix="pre")
@@ -5,9 +5,14 @@ from typing import TypeVar
 
 import pytest
 
+from exareme2.algorithms.exareme2.udfgen import DATASETS_CONTENT_HASH
 from exareme2.algorithms.exareme2.udfgen import DEFERRED
 from exareme2.algorithms.exareme2.udfgen import MIN_ROW_COUNT
+from exareme2.algorithms.exareme2.udfgen import cached_matrix
+from exareme2.algorithms.exareme2.udfgen import cached_relation
+from exareme2.algorithms.exareme2.udfgen import chunked_relation
 from exareme2.algorithms.exareme2.udfgen import literal
+from exareme2.algorithms.exareme2.udfgen import matrix
 from exareme2.algorithms.exareme2.udfgen import merge_transfer
 from exareme2.algorithms.exareme2.udfgen import relation
 from exareme2.algorithms.exareme2.udfgen import secure_transfer
@@ -18,6 +23,7 @@ from exareme2.algorithms.exareme2.udfgen import udf_logger
 from exareme2.algorithms.exareme2.udfgen.decorator import UdfRegistry
 from exareme2.algorithms.exareme2.udfgen.decorator import udf
 from exareme2.algorithms.exareme2.udfgen.iotypes import LiteralArg
+from exareme2.algorithms.exareme2.udfgen.iotypes import MatrixArg
 from exareme2.algorithms.exareme2.udfgen.iotypes import MergeTensorType
 from exareme2.algorithms.exareme2.udfgen.iotypes import RelationArg
 from exareme2.algorithms.exareme2.udfgen.iotypes import StateArg
@@ -94,6 +100,50 @@ def test_convert_udfgenargs_to_udfargs_tensor():
     assert result == expected_udf_posargs
 
 
+def test_convert_udfgenargs_to_udfargs_matrix():
+    udfgen_posargs = [
+        TableInfo(
+            name="tab",
+            schema_=TableSchema(
+                columns=[
+                    ColumnInfo(name="matrix_row", dtype=DType.INT),
+                    ColumnInfo(name="col0", dtype=DType.FLOAT),
+                    ColumnInfo(name="col1", dtype=DType.FLOAT),
+                    ColumnInfo(name="col2", dtype=DType.FLOAT),
+                ]
+            ),
+            type_=TableType.NORMAL,
+        )
+    ]
+    expected_udf_posargs = [MatrixArg(table_name="tab", dtype=float, ncols=3)]
+    converter = FlowArgsToUdfArgsConverter()
+    result, _ = converter.convert(udfgen_posargs, {})
+    assert result == expected_udf_posargs
+
+
+def test_convert_udfgenargs_to_udfargs_columns_named_like_matrix():
+    udfgen_posargs = [
+        TableInfo(
+            name="tab",
+            schema_=TableSchema(
+                columns=[
+                    ColumnInfo(name="col0", dtype=DType.FLOAT),
+                    ColumnInfo(name="col1", dtype=DType.FLOAT),
+                ]
+            ),
+            type_=TableType.NORMAL,
+        )
+    ]
+    expected_udf_posargs = [
+        RelationArg(
+            table_name="tab", schema=[("col0", DType.FLOAT), ("col1", DType.FLOAT)]
+        )
+    ]
+    converter = FlowArgsToUdfArgsConverter()
+    result, _ = converter.convert(udfgen_posargs, {})
+    assert result == expected_udf_posargs
+
+
 def test_convert_udfgenargs_to_udfargs_literal():
     udfgen_posargs = [42]
     expected_udf_posargs = [LiteralArg(value=42)]
@@ -200,9 +250,12 @@ class TestUDFGenBase:
 
     @pytest.fixture(scope="class")
     def udfregistry(self):
+        # The registry of the other tests, e.g. of the algorithms, is restored
+        registry = udf.registry
         udf.registry = UdfRegistry()
         self.define_pyfunc()
-        return udf.registry
+        yield udf.registry
+        udf.registry = registry
 
     @pytest.fixture(scope="function")
     def create_transfer_table(self, globalworker_db_cursor):
@@ -949,6 +1002,407 @@ FROM
         assert results[0] == expected_udf_outputs[0]
 
 
+class TestUDFGen_RelationToMatrix(TestUDFGenBase):
+    def define_pyfunc(self):
+        S = TypeVar("S")
+        N = TypeVar("N")
+
+        @udf(r=relation(schema=S), return_type=matrix(dtype=DType.FLOAT, ncols=N))
+        def f(r):
+            result = r
+            return result
+
+    @pytest.fixture(scope="class")
+    def positional_args(self):
+        return [
+            TableInfo(
+                name="rel_in_db",
+                schema_=TableSchema(
+                    columns=[
+                        ColumnInfo(name="row_id", dtype=DType.INT),
+                        ColumnInfo(name="c1", dtype=DType.INT),
+                        ColumnInfo(name="c2", dtype=DType.FLOAT),
+                    ]
+                ),
+                type_=TableType.NORMAL,
+            )
+        ]
+
+    @pytest.fixture(scope="class")
+    def expected_udfdef(self):
+        return """\
+CREATE OR REPLACE FUNCTION
+__udf("r_row_id" INT,"r_c1" INT,"r_c2" DOUBLE)
+RETURNS
+TABLE("matrix_row" INT,"col0" DOUBLE,"col1" DOUBLE)
+LANGUAGE PYTHON
+{
+    import pandas as pd
+    import udfio
+    r = udfio.from_relational_table({name: _columns[name_w_prefix] for name, name_w_prefix in zip(['row_id', 'c1', 'c2'], ['r_row_id', 'r_c1', 'r_c2'])}, 'row_id')
+    result = r
+    return udfio.as_matrix_table(numpy.array(result), 'matrix_row')
+}"""
+
+    @pytest.fixture(scope="class")
+    def expected_udfexec(self):
+        return """\
+INSERT INTO __main
+SELECT
+    *
+FROM
+    __udf((
+        SELECT
+            rel_in_db."row_id",
+            rel_in_db."c1",
+            rel_in_db."c2"
+        FROM
+            rel_in_db
+    ));"""
+
+    @pytest.fixture(scope="class")
+    def expected_udf_outputs(self):
+        return [
+            UDFGenTableResult(
+                table_name="__main",
+                table_schema=[
+                    ("matrix_row", DType.INT),
+                    ("col0", DType.FLOAT),
+                    ("col1", DType.FLOAT),
+                ],
+                create_query='CREATE TABLE __main("matrix_row" INT,"col0" DOUBLE,"col1" DOUBLE);',
+            )
+        ]
+
+    def test_generate_udf_queries(
+        self,
+        funcname,
+        positional_args,
+        expected_udfdef,
+        expected_udfexec,
+        expected_udf_outputs,
+    ):
+        gen = PyUdfGenerator(
+            udf.registry,
+            func_name=funcname,
+            flowargs=positional_args,
+            flowkwargs={},
+            smpc_used=False,
+        )
+        definition = gen.get_definition(udf_name="__udf")
+        assert definition == expected_udfdef
+        exec = gen.get_exec_stmt(udf_name="__udf", output_table_names=["__main"])
+        assert exec == expected_udfexec
+        results = gen.get_results(output_table_names=["__main"])
+        assert len(results) == len(expected_udf_outputs)
+        assert results[0] == expected_udf_outputs[0]
+
+
+class TestUDFGen_MatrixToMatrix(TestUDFGenBase):
+    def define_pyfunc(self):
+        T = TypeVar("T")
+        N = TypeVar("N")
+
+        @udf(x=matrix(dtype=T, ncols=N), return_type=matrix(dtype=T, ncols=N))
+        def f(x):
+            result = x * 2
+            return result
+
+    @pytest.fixture(scope="class")
+    def positional_args(self):
+        return [
+            TableInfo(
+                name="mat_in_db",
+                schema_=TableSchema(
+                    columns=[
+                        ColumnInfo(name="matrix_row", dtype=DType.INT),
+                        ColumnInfo(name="col0", dtype=DType.FLOAT),
+                        ColumnInfo(name="col1", dtype=DType.FLOAT),
+                    ]
+                ),
+                type_=TableType.NORMAL,
+            )
+        ]
+
+    @pytest.fixture(scope="class")
+    def expected_udfdef(self):
+        return """\
+CREATE OR REPLACE FUNCTION
+__udf("x_matrix_row" INT,"x_col0" DOUBLE,"x_col1" DOUBLE)
+RETURNS
+TABLE("matrix_row" INT,"col0" DOUBLE,"col1" DOUBLE)
+LANGUAGE PYTHON
+{
+    import pandas as pd
+    import udfio
+    x = udfio.from_matrix_table({name: _columns[name_w_prefix] for name, name_w_prefix in zip(['matrix_row', 'col0', 'col1'], ['x_matrix_row', 'x_col0', 'x_col1'])}, 'matrix_row')
+    result = x * 2
+    return udfio.as_matrix_table(numpy.array(result), 'matrix_row')
+}"""
+
+    @pytest.fixture(scope="class")
+    def expected_udfexec(self):
+        return """\
+INSERT INTO __main
+SELECT
+    *
+FROM
+    __udf((
+        SELECT
+            mat_in_db."matrix_row",
+            mat_in_db."col0",
+            mat_in_db."col1"
+        FROM
+            mat_in_db
+    ));"""
+
+    @pytest.fixture(scope="class")
+    def expected_udf_outputs(self):
+        return [
+            UDFGenTableResult(
+                table_name="__main",
+                table_schema=[
+                    ("matrix_row", DType.INT),
+                    ("col0", DType.FLOAT),
+                    ("col1", DType.FLOAT),
+                ],
+                create_query='CREATE TABLE __main("matrix_row" INT,"col0" DOUBLE,"col1" DOUBLE);',
+            )
+        ]
+
+    def test_generate_udf_queries(
+        self,
+        funcname,
+        positional_args,
+        expected_udfdef,
+        expected_udfexec,
+        expected_udf_outputs,
+    ):
+        gen = PyUdfGenerator(
+            udf.registry,
+            func_name=funcname,
+            flowargs=positional_args,
+            flowkwargs={},
+            smpc_used=False,
+        )
+        definition = gen.get_definition(udf_name="__udf")
+        assert definition == expected_udfdef
+        exec = gen.get_exec_stmt(udf_name="__udf", output_table_names=["__main"])
+        assert exec == expected_udfexec
+        results = gen.get_results(output_table_names=["__main"])
+        assert len(results) == len(expected_udf_outputs)
+        assert results[0] == expected_udf_outputs[0]
+
+
+class TestUDFGen_CachedMatrixAndTransferToTransfer(TestUDFGenBase):
+    def define_pyfunc(self):
+        T = TypeVar("T")
+        N = TypeVar("N")
+
+        @udf(
+            x=cached_matrix(dtype=T, ncols=N),
+            t=transfer(),
+            return_type=transfer(),
+        )
+        def f(x, t):
+            result = {"sum": x.sum() + t["num"]}
+            return result
+
+    @pytest.fixture(scope="class")
+    def positional_args(self):
+        return [
+            TableInfo(
+                name="mat_in_db",
+                schema_=TableSchema(
+                    columns=[
+                        ColumnInfo(name="matrix_row", dtype=DType.INT),
+                        ColumnInfo(name="col0", dtype=DType.FLOAT),
+                        ColumnInfo(name="col1", dtype=DType.FLOAT),
+                    ]
+                ),
+                type_=TableType.NORMAL,
+            ),
+            TableInfo(
+                name="transfer_in_db",
+                schema_=TableSchema(
+                    columns=[ColumnInfo(name="transfer", dtype=DType.JSON)]
+                ),
+                type_=TableType.NORMAL,
+            ),
+        ]
+
+    @pytest.fixture(scope="class")
+    def expected_udfdef(self):
+        return """\
+CREATE OR REPLACE FUNCTION
+__udf("loopback_table_names" CLOB)
+RETURNS
+TABLE("transfer" CLOB)
+LANGUAGE PYTHON
+{
+    import pandas as pd
+    import udfio
+    import json
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    x = udfio.get_cached_input(_conn, "__loopback_table_0__", "matrix", lambda: udfio.from_matrix_table(_conn.execute("SELECT * FROM __loopback_table_0__;"), 'matrix_row'))
+    __transfer_str = _conn.execute("SELECT transfer from __loopback_table_1__;")["transfer"][0]
+    t = udfio.loads_transfer(__transfer_str)
+    result = {'sum': x.sum() + t['num']}
+    return udfio.dumps_transfer(result)
+}"""
+
+    @pytest.fixture(scope="class")
+    def expected_udfexec(self):
+        return """\
+INSERT INTO __main
+SELECT
+    *
+FROM
+    __udf('mat_in_db,transfer_in_db,__main');"""
+
+    def test_generate_udf_queries(
+        self,
+        funcname,
+        positional_args,
+        expected_udfdef,
+        expected_udfexec,
+    ):
+        gen = PyUdfGenerator(
+            udf.registry,
+            func_name=funcname,
+            flowargs=positional_args,
+            flowkwargs={},
+            smpc_used=False,
+        )
+        definition = gen.get_definition(udf_name="__udf")
+        assert definition == expected_udfdef
+        exec = gen.get_exec_stmt(udf_name="__udf", output_table_names=["__main"])
+        assert exec == expected_udfexec
+
+
+class TestUDFGen_CachedRelationsToTransfer(TestUDFGenBase):
+    def define_pyfunc(self):
+        @udf(x=cached_relation(), y=cached_relation(), return_type=transfer())
+        def f(x, y):
+            result = {"n": len(x) + len(y)}
+            return result
+
+    @pytest.fixture(scope="class")
+    def positional_args(self):
+        def table_info(name, column):
+            return TableInfo(
+                name=name,
+                schema_=TableSchema(
+                    columns=[
+                        ColumnInfo(name="row_id", dtype=DType.INT),
+                        ColumnInfo(name=column, dtype=DType.FLOAT),
+                    ]
+                ),
+                type_=TableType.NORMAL,
+            )
+
+        return [table_info("x_in_db", "a"), table_info("y_in_db", "b")]
+
+    @pytest.fixture(scope="class")
+    def expected_udfdef(self):
+        return """\
+CREATE OR REPLACE FUNCTION
+__udf("loopback_table_names" CLOB)
+RETURNS
+TABLE("transfer" CLOB)
+LANGUAGE PYTHON
+{
+    import pandas as pd
+    import udfio
+    import json
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    x = udfio.get_cached_input(_conn, "__loopback_table_0__", "relation", lambda: udfio.from_relational_table(_conn.execute("SELECT * FROM __loopback_table_0__;"), 'row_id').sort_index())
+    y = udfio.get_cached_input(_conn, "__loopback_table_1__", "relation", lambda: udfio.from_relational_table(_conn.execute("SELECT * FROM __loopback_table_1__;"), 'row_id').sort_index())
+    result = {'n': len(x) + len(y)}
+    return udfio.dumps_transfer(result)
+}"""
+
+    def test_generate_udf_definition(self, funcname, positional_args, expected_udfdef):
+        gen = PyUdfGenerator(
+            udf.registry,
+            func_name=funcname,
+            flowargs=positional_args,
+            flowkwargs={},
+            smpc_used=False,
+        )
+        definition = gen.get_definition(udf_name="__udf")
+        assert definition == expected_udfdef
+
+
+class TestUDFGen_ChunkedRelationsToTransfer(TestUDFGenBase):
+    def define_pyfunc(self):
+        @udf(x=chunked_relation(), y=chunked_relation(), return_type=transfer())
+        def f(x, y):
+            n = udfio.map_combine(lambda x, y: len(x), lambda a, b: a + b, x, y)
+            result = {"n": n}
+            return result
+
+    @pytest.fixture(scope="class")
+    def positional_args(self):
+        def table_info(name, column):
+            return TableInfo(
+                name=name,
+                schema_=TableSchema(
+                    columns=[
+                        ColumnInfo(name="row_id", dtype=DType.INT),
+                        ColumnInfo(name=column, dtype=DType.FLOAT),
+                    ]
+                ),
+                type_=TableType.NORMAL,
+            )
+
+        return [table_info("x_in_db", "a"), table_info("y_in_db", "b")]
+
+    @pytest.fixture(scope="class")
+    def expected_udfdef(self):
+        return """\
+CREATE OR REPLACE FUNCTION
+__udf("loopback_table_names" CLOB)
+RETURNS
+TABLE("transfer" CLOB)
+LANGUAGE PYTHON
+{
+    import pandas as pd
+    import udfio
+    import json
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    x = udfio.RelationChunks(_conn, "__loopback_table_0__", 'row_id')
+    y = udfio.RelationChunks(_conn, "__loopback_table_1__", 'row_id')
+    n = udfio.map_combine(lambda x, y: len(x), lambda a, b: a + b, x, y)
+    result = {'n': n}
+    return udfio.dumps_transfer(result)
+}"""
+
+    @pytest.fixture(scope="class")
+    def expected_udfexec(self):
+        return """\
+INSERT INTO __main
+SELECT
+    *
+FROM
+    __udf('x_in_db,y_in_db,__main');"""
+
+    def test_generate_udf_queries(
+        self, funcname, positional_args, expected_udfdef, expected_udfexec
+    ):
+        gen = PyUdfGenerator(
+            udf.registry,
+            func_name=funcname,
+            flowargs=positional_args,
+            flowkwargs={},
+            smpc_used=False,
+        )
+        definition = gen.get_definition(udf_name="__udf")
+        assert definition == expected_udfdef
+        exec = gen.get_exec_stmt(udf_name="__udf", output_table_names=["__main"])
+        assert exec == expected_udfexec
+
+
 class TestUDFGen_2RelationsToTensor(TestUDFGenBase):
     def define_pyfunc(self):
         S = TypeVar("S")
@@ -2462,17 +2916,17 @@ class TestUDFGen_StateReturnType(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("state" BLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
     t = 5
     result = {'num': 5}
-    return pickle.dumps(result)
+    return udfio.dump_state(_conn, "__loopback_table_0__", result)
 }"""
 
     @pytest.fixture(scope="class")
@@ -2482,7 +2936,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('__main');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -2525,7 +2979,7 @@ FROM
             flowargs=positional_args,
             flowkwargs={},
         )
-        definition = gen.get_definition(udf_name="__udf")
+        definition = gen.get_definition(udf_name="__udf", output_table_names=["__main"])
         assert definition == expected_udfdef
         exec = gen.get_exec_stmt(udf_name="__udf", output_table_names=["__main"])
         assert exec == expected_udfexec
@@ -2564,19 +3018,19 @@ class TestUDFGen_StateInputandReturnType(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("state" BLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
-    __state_str = _conn.execute("SELECT state from test_state_table;")["state"][0]
-    prev_state = pickle.loads(__state_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __state_str = _conn.execute("SELECT state from __loopback_table_0__;")["state"][0]
+    prev_state = udfio.load_state(__state_str)
     t = 5
     prev_state['num'] = prev_state['num'] + t
-    return pickle.dumps(prev_state)
+    return udfio.dump_state(_conn, "__loopback_table_1__", prev_state)
 }"""
 
     @pytest.fixture(scope="class")
@@ -2586,7 +3040,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_state_table,__main');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -2629,7 +3083,7 @@ FROM
             flowargs=positional_args,
             flowkwargs={},
         )
-        definition = gen.get_definition(udf_name="__udf")
+        definition = gen.get_definition(udf_name="__udf", output_table_names=["__main"])
         assert definition == expected_udfdef
         exec = gen.get_exec_stmt(udf_name="__udf", output_table_names=["__main"])
         assert exec == expected_udfexec
@@ -2663,7 +3117,7 @@ LANGUAGE PYTHON
     import json
     t = 5
     result = {'num': t, 'list_of_nums': [t, t, t]}
-    return json.dumps(result)
+    return udfio.dumps_transfer(result)
 }"""
 
     @pytest.fixture(scope="class")
@@ -2756,7 +3210,7 @@ class TestUDFGen_TransferInputAndReturnType(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("transfer" CLOB)
 LANGUAGE PYTHON
@@ -2764,11 +3218,12 @@ LANGUAGE PYTHON
     import pandas as pd
     import udfio
     import json
-    __transfer_str = _conn.execute("SELECT transfer from test_transfer_table;")["transfer"][0]
-    transfer = json.loads(__transfer_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __transfer_str = _conn.execute("SELECT transfer from __loopback_table_0__;")["transfer"][0]
+    transfer = udfio.loads_transfer(__transfer_str)
     t = 5
     transfer['num'] = transfer['num'] + t
-    return json.dumps(transfer)
+    return udfio.dumps_transfer(transfer)
 }"""
 
     @pytest.fixture(scope="class")
@@ -2778,7 +3233,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_transfer_table,__main');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -2861,20 +3316,20 @@ class TestUDFGen_TransferInputAndStateReturnType(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("state" BLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
     import json
-    __transfer_str = _conn.execute("SELECT transfer from test_transfer_table;")["transfer"][0]
-    transfer = json.loads(__transfer_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __transfer_str = _conn.execute("SELECT transfer from __loopback_table_0__;")["transfer"][0]
+    transfer = udfio.loads_transfer(__transfer_str)
     t = 5
     transfer['num'] = transfer['num'] + t
-    return pickle.dumps(transfer)
+    return udfio.dump_state(_conn, "__loopback_table_1__", transfer)
 }"""
 
     @pytest.fixture(scope="class")
@@ -2884,7 +3339,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_transfer_table,__main');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -2927,7 +3382,7 @@ FROM
             flowargs=positional_args,
             flowkwargs={},
         )
-        definition = gen.get_definition(udf_name="__udf")
+        definition = gen.get_definition(udf_name="__udf", output_table_names=["__main"])
         assert definition == expected_udfdef
         exec = gen.get_exec_stmt(udf_name="__udf", output_table_names=["__main"])
         assert exec == expected_udfexec
@@ -2977,23 +3432,23 @@ class TestUDFGen_TransferAndStateInputandStateReturnType(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("state" BLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
     import json
-    __transfer_str = _conn.execute("SELECT transfer from test_transfer_table;")["transfer"][0]
-    transfer = json.loads(__transfer_str)
-    __state_str = _conn.execute("SELECT state from test_state_table;")["state"][0]
-    state = pickle.loads(__state_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __transfer_str = _conn.execute("SELECT transfer from __loopback_table_0__;")["transfer"][0]
+    transfer = udfio.loads_transfer(__transfer_str)
+    __state_str = _conn.execute("SELECT state from __loopback_table_1__;")["state"][0]
+    state = udfio.load_state(__state_str)
     t = 5
     result = {}
     result['num'] = transfer['num'] + state['num'] + t
-    return pickle.dumps(result)
+    return udfio.dump_state(_conn, "__loopback_table_2__", result)
 }"""
 
     @pytest.fixture(scope="class")
@@ -3003,7 +3458,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_transfer_table,test_state_table,__main');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -3050,7 +3505,7 @@ FROM
             flowargs=positional_args,
             flowkwargs={},
         )
-        definition = gen.get_definition(udf_name="__udf")
+        definition = gen.get_definition(udf_name="__udf", output_table_names=["__main"])
         assert definition == expected_udfdef
         exec = gen.get_exec_stmt(udf_name="__udf", output_table_names=["__main"])
         assert exec == expected_udfexec
@@ -3101,25 +3556,25 @@ class TestUDFGen_MergeTransferAndStateInputandTransferReturnType(TestUDFGenBase)
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("transfer" CLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
     import json
-    __transfer_strs = _conn.execute("SELECT transfer from test_merge_transfer_table;")["transfer"]
-    transfers = [json.loads(str) for str in __transfer_strs]
-    __state_str = _conn.execute("SELECT state from test_state_table;")["state"][0]
-    state = pickle.loads(__state_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __transfer_strs = _conn.execute("SELECT transfer from __loopback_table_0__;")["transfer"]
+    transfers = [udfio.loads_transfer(str) for str in __transfer_strs]
+    __state_str = _conn.execute("SELECT state from __loopback_table_1__;")["state"][0]
+    state = udfio.load_state(__state_str)
     sum = 0
     for t in transfers:
         sum += t['num']
     sum += state['num']
     result = {'num': sum}
-    return json.dumps(result)
+    return udfio.dumps_transfer(result)
 }"""
 
     @pytest.fixture(scope="class")
@@ -3129,7 +3584,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_merge_transfer_table,test_state_table,__main');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -3225,23 +3680,23 @@ class TestUDFGen_LocalStepLogic(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("state" BLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
     import json
-    __state_str = _conn.execute("SELECT state from test_state_table;")["state"][0]
-    state = pickle.loads(__state_str)
-    __transfer_str = _conn.execute("SELECT transfer from test_transfer_table;")["transfer"][0]
-    transfer = json.loads(__transfer_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __state_str = _conn.execute("SELECT state from __loopback_table_0__;")["state"][0]
+    state = udfio.load_state(__state_str)
+    __transfer_str = _conn.execute("SELECT transfer from __loopback_table_1__;")["transfer"][0]
+    transfer = udfio.loads_transfer(__transfer_str)
     result1 = {'num': transfer['num'] + state['num']}
     result2 = {'num': transfer['num'] * state['num']}
-    _conn.execute(f"INSERT INTO __lt0 VALUES ('{json.dumps(result2)}');")
-    return pickle.dumps(result1)
+    _conn.execute(f"INSERT INTO __loopback_table_3__ VALUES ('{udfio.dumps_transfer(result2)}');")
+    return udfio.dump_state(_conn, "__loopback_table_2__", result1)
 }"""
 
     @pytest.fixture(scope="class")
@@ -3251,7 +3706,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_state_table,test_transfer_table,__main,__lt0');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -3364,23 +3819,23 @@ class TestUDFGen_LocalStepLogic_Transfer_first_input_and_output(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("transfer" CLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
     import json
-    __transfer_str = _conn.execute("SELECT transfer from test_transfer_table;")["transfer"][0]
-    transfer = json.loads(__transfer_str)
-    __state_str = _conn.execute("SELECT state from test_state_table;")["state"][0]
-    state = pickle.loads(__state_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __transfer_str = _conn.execute("SELECT transfer from __loopback_table_0__;")["transfer"][0]
+    transfer = udfio.loads_transfer(__transfer_str)
+    __state_str = _conn.execute("SELECT state from __loopback_table_1__;")["state"][0]
+    state = udfio.load_state(__state_str)
     result1 = {'num': transfer['num'] + state['num']}
     result2 = {'num': transfer['num'] * state['num']}
-    _conn.execute(f"INSERT INTO __lt0 VALUES ('{pickle.dumps(result2).hex()}');")
-    return json.dumps(result1)
+    _conn.execute(f"INSERT INTO __loopback_table_3__ VALUES ('{udfio.dump_state(_conn, '__loopback_table_3__', result2).hex()}');")
+    return udfio.dumps_transfer(result1)
 }"""
 
     @pytest.fixture(scope="class")
@@ -3390,7 +3845,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_transfer_table,test_state_table,__main,__lt0');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -3512,26 +3967,26 @@ class TestUDFGen_GlobalStepLogic(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("state" BLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
     import json
-    __state_str = _conn.execute("SELECT state from test_state_table;")["state"][0]
-    state = pickle.loads(__state_str)
-    __transfer_strs = _conn.execute("SELECT transfer from test_merge_transfer_table;")["transfer"]
-    transfers = [json.loads(str) for str in __transfer_strs]
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __state_str = _conn.execute("SELECT state from __loopback_table_0__;")["state"][0]
+    state = udfio.load_state(__state_str)
+    __transfer_strs = _conn.execute("SELECT transfer from __loopback_table_1__;")["transfer"]
+    transfers = [udfio.loads_transfer(str) for str in __transfer_strs]
     sum_transfers = 0
     for transfer in transfers:
         sum_transfers += transfer['num']
     result1 = {'num': sum_transfers + state['num']}
     result2 = {'num': sum_transfers * state['num']}
-    _conn.execute(f"INSERT INTO __lt0 VALUES ('{json.dumps(result2)}');")
-    return pickle.dumps(result1)
+    _conn.execute(f"INSERT INTO __loopback_table_3__ VALUES ('{udfio.dumps_transfer(result2)}');")
+    return udfio.dump_state(_conn, "__loopback_table_2__", result1)
 }"""
 
     @pytest.fixture(scope="class")
@@ -3541,7 +3996,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_state_table,test_merge_transfer_table,__main,__lt0');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -3647,21 +4102,21 @@ class TestUDFGen_SecureTransferOutput_with_SMPC_off(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("secure_transfer" CLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
     import json
-    __state_str = _conn.execute("SELECT state from test_state_table;")["state"][0]
-    state = pickle.loads(__state_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __state_str = _conn.execute("SELECT state from __loopback_table_0__;")["state"][0]
+    state = udfio.load_state(__state_str)
     result = {'sum': {'data': state['num'], 'operation': 'sum', 'type': 'int'},
         'min': {'data': state['num'], 'operation': 'min', 'type': 'int'}, 'max':
         {'data': state['num'], 'operation': 'max', 'type': 'int'}}
-    return json.dumps(result)
+    return udfio.dumps_transfer(result)
 }"""
 
     @pytest.fixture(scope="class")
@@ -3671,7 +4126,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_state_table,__main');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -3764,22 +4219,22 @@ class TestUDFGen_SecureTransferOutput_with_SMPC_on(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("secure_transfer" CLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
     import json
-    __state_str = _conn.execute("SELECT state from test_state_table;")["state"][0]
-    state = pickle.loads(__state_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __state_str = _conn.execute("SELECT state from __loopback_table_0__;")["state"][0]
+    state = udfio.load_state(__state_str)
     result = {'sum': {'data': state['num'], 'operation': 'sum', 'type': 'int'},
         'max': {'data': state['num'], 'operation': 'max', 'type': 'int'}}
     template, sum_op, min_op, max_op = udfio.split_secure_transfer_dict(result)
-    _conn.execute(f"INSERT INTO __mainsum VALUES ('{json.dumps(sum_op)}');")
-    _conn.execute(f"INSERT INTO __mainmax VALUES ('{json.dumps(max_op)}');")
+    _conn.execute(f"INSERT INTO __loopback_table_1__sum VALUES ('{json.dumps(sum_op)}');")
+    _conn.execute(f"INSERT INTO __loopback_table_1__max VALUES ('{json.dumps(max_op)}');")
     return json.dumps(template)
 }"""
 
@@ -3790,7 +4245,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_state_table,__main');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -3916,22 +4371,22 @@ class TestUDFGen_SecureTransferOutputAs2ndOutput_with_SMPC_off(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("state" BLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
     import json
-    __state_str = _conn.execute("SELECT state from test_state_table;")["state"][0]
-    state = pickle.loads(__state_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __state_str = _conn.execute("SELECT state from __loopback_table_0__;")["state"][0]
+    state = udfio.load_state(__state_str)
     result = {'sum': {'data': state['num'], 'operation': 'sum', 'type': 'int'},
         'min': {'data': state['num'], 'operation': 'min', 'type': 'int'}, 'max':
         {'data': state['num'], 'operation': 'max', 'type': 'int'}}
-    _conn.execute(f"INSERT INTO __lt0 VALUES ('{json.dumps(result)}');")
-    return pickle.dumps(state)
+    _conn.execute(f"INSERT INTO __loopback_table_2__ VALUES ('{udfio.dumps_transfer(result)}');")
+    return udfio.dump_state(_conn, "__loopback_table_1__", state)
 }"""
 
     @pytest.fixture(scope="class")
@@ -3941,7 +4396,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_state_table,__main,__lt0');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -4050,26 +4505,26 @@ class TestUDFGen_SecureTransferOutputAs2ndOutput_with_SMPC_on(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("state" BLOB)
 LANGUAGE PYTHON
 {
     import pandas as pd
     import udfio
-    import pickle
     import json
-    __state_str = _conn.execute("SELECT state from test_state_table;")["state"][0]
-    state = pickle.loads(__state_str)
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __state_str = _conn.execute("SELECT state from __loopback_table_0__;")["state"][0]
+    state = udfio.load_state(__state_str)
     result = {'sum': {'data': state['num'], 'operation': 'sum', 'type': 'int'},
         'min': {'data': state['num'], 'operation': 'min', 'type': 'int'}, 'max':
         {'data': state['num'], 'operation': 'max', 'type': 'int'}}
     template, sum_op, min_op, max_op = udfio.split_secure_transfer_dict(result)
-    _conn.execute(f"INSERT INTO __lt0 VALUES ('{json.dumps(template)}');")
-    _conn.execute(f"INSERT INTO __lt0sum VALUES ('{json.dumps(sum_op)}');")
-    _conn.execute(f"INSERT INTO __lt0min VALUES ('{json.dumps(min_op)}');")
-    _conn.execute(f"INSERT INTO __lt0max VALUES ('{json.dumps(max_op)}');")
-    return pickle.dumps(state)
+    _conn.execute(f"INSERT INTO __loopback_table_2__ VALUES ('{json.dumps(template)}');")
+    _conn.execute(f"INSERT INTO __loopback_table_2__sum VALUES ('{json.dumps(sum_op)}');")
+    _conn.execute(f"INSERT INTO __loopback_table_2__min VALUES ('{json.dumps(min_op)}');")
+    _conn.execute(f"INSERT INTO __loopback_table_2__max VALUES ('{json.dumps(max_op)}');")
+    return udfio.dump_state(_conn, "__loopback_table_1__", state)
 }"""
 
     @pytest.fixture(scope="class")
@@ -4079,7 +4534,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_state_table,__main,__lt0');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -4219,7 +4674,7 @@ class TestUDFGen_SecureTransferInput_with_SMPC_off(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("transfer" CLOB)
 LANGUAGE PYTHON
@@ -4227,10 +4682,11 @@ LANGUAGE PYTHON
     import pandas as pd
     import udfio
     import json
-    __transfer_strs = _conn.execute("SELECT secure_transfer from test_secure_transfer_table;")["secure_transfer"]
-    __transfers = [json.loads(str) for str in __transfer_strs]
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __transfer_strs = _conn.execute("SELECT secure_transfer from __loopback_table_0__;")["secure_transfer"]
+    __transfers = [udfio.loads_transfer(str) for str in __transfer_strs]
     transfer = udfio.secure_transfers_to_merged_dict(__transfers)
-    return json.dumps(transfer)
+    return udfio.dumps_transfer(transfer)
 }"""
 
     @pytest.fixture(scope="class")
@@ -4240,7 +4696,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_secure_transfer_table,__main');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -4343,7 +4799,7 @@ class TestUDFGen_SecureTransferInput_with_SMPC_on(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("loopback_table_names" CLOB)
 RETURNS
 TABLE("transfer" CLOB)
 LANGUAGE PYTHON
@@ -4351,15 +4807,16 @@ LANGUAGE PYTHON
     import pandas as pd
     import udfio
     import json
-    __template_str = _conn.execute("SELECT secure_transfer from test_smpc_template_table;")["secure_transfer"][0]
+    _conn = udfio.bind_loopback_tables(_conn, loopback_table_names)
+    __template_str = _conn.execute("SELECT secure_transfer from __loopback_table_0__;")["secure_transfer"][0]
     __template = json.loads(__template_str)
-    __sum_op_values_str = _conn.execute("SELECT secure_transfer from test_smpc_sum_op_values_table;")["secure_transfer"][0]
+    __sum_op_values_str = _conn.execute("SELECT secure_transfer from __loopback_table_1__;")["secure_transfer"][0]
     __sum_op_values = json.loads(__sum_op_values_str)
     __min_op_values = None
-    __max_op_values_str = _conn.execute("SELECT secure_transfer from test_smpc_max_op_values_table;")["secure_transfer"][0]
+    __max_op_values_str = _conn.execute("SELECT secure_transfer from __loopback_table_2__;")["secure_transfer"][0]
     __max_op_values = json.loads(__max_op_values_str)
     transfer = udfio.construct_secure_transfer_dict(__template,__sum_op_values,__min_op_values,__max_op_values)
-    return json.dumps(transfer)
+    return udfio.dumps_transfer(transfer)
 }"""
 
     @pytest.fixture(scope="class")
@@ -4369,7 +4826,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('test_smpc_template_table,test_smpc_sum_op_values_table,test_smpc_max_op_values_table,__main');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -4448,7 +4905,7 @@ class TestUDFGen_LoggerArgument(TestUDFGenBase):
     def expected_udfdef(self):
         return """\
 CREATE OR REPLACE FUNCTION
-__udf()
+__udf("request_id" CLOB)
 RETURNS
 TABLE("transfer" CLOB)
 LANGUAGE PYTHON
@@ -4457,10 +4914,10 @@ LANGUAGE PYTHON
     import udfio
     import json
     t = 5
-    logger = udfio.get_logger('__udf', '123')
+    logger = udfio.get_logger('__udf', request_id)
     logger.info('Log inside monetdb udf.')
     result = {'num': t}
-    return json.dumps(result)
+    return udfio.dumps_transfer(result)
 }"""
 
     @pytest.fixture(scope="class")
@@ -4470,7 +4927,7 @@ INSERT INTO __main
 SELECT
     *
 FROM
-    __udf();"""
+    __udf('123');"""
 
     @pytest.fixture(scope="class")
     def expected_udf_outputs(self):
@@ -4524,6 +4981,101 @@ FROM
         assert results[0] == expected_udf_outputs[0]
 
 
+class TestUDFGen_LoggerArgumentWithTableArgument(TestUDFGenBase):
+    def define_pyfunc(self):
+        @udf(
+            r=relation(),
+            logger=udf_logger(),
+            return_type=transfer(),
+        )
+        def f(r, logger):
+            logger.info("Log inside monetdb udf.")
+            result = {"num": len(r)}
+            return result
+
+    @pytest.fixture(scope="class")
+    def positional_args(self):
+        return [
+            TableInfo(
+                name="rel_in_db",
+                schema_=TableSchema(
+                    columns=[
+                        ColumnInfo(name="row_id", dtype=DType.INT),
+                        ColumnInfo(name="col0", dtype=DType.INT),
+                    ]
+                ),
+                type_=TableType.NORMAL,
+            )
+        ]
+
+    @pytest.fixture(scope="class")
+    def expected_udfdef(self):
+        return """\
+CREATE OR REPLACE FUNCTION
+__udf("r_row_id" INT,"r_col0" INT,"request_id" CLOB)
+RETURNS
+TABLE("transfer" CLOB)
+LANGUAGE PYTHON
+{
+    import pandas as pd
+    import udfio
+    import json
+    r = udfio.from_relational_table({name: _columns[name_w_prefix] for name, name_w_prefix in zip(['row_id', 'col0'], ['r_row_id', 'r_col0'])}, 'row_id')
+    logger = udfio.get_logger('__udf', request_id)
+    logger.info('Log inside monetdb udf.')
+    result = {'num': len(r)}
+    return udfio.dumps_transfer(result)
+}"""
+
+    @pytest.fixture(scope="class")
+    def expected_udfexec(self):
+        return """\
+INSERT INTO __main
+SELECT
+    *
+FROM
+    __udf((
+        SELECT
+            rel_in_db."row_id",
+            rel_in_db."col0",
+            '123' AS "request_id"
+        FROM
+            rel_in_db
+    ));"""
+
+    def test_generate_udf_queries(
+        self,
+        funcname,
+        positional_args,
+        expected_udfdef,
+        expected_udfexec,
+    ):
+        gen = PyUdfGenerator(
+            udf.registry,
+            func_name=funcname,
+            flowargs=positional_args,
+            flowkwargs={},
+            request_id="123",
+        )
+        definition = gen.get_definition(udf_name="__udf")
+        assert definition == expected_udfdef
+        exec = gen.get_exec_stmt(udf_name="__udf", output_table_names=["__main"])
+        assert exec == expected_udfexec
+
+    def test_definition_does_not_depend_on_the_request(self, funcname, positional_args):
+        definitions = {
+            PyUdfGenerator(
+                udf.registry,
+                func_name=funcname,
+                flowargs=positional_args,
+                flowkwargs={},
+                request_id=request_id,
+            ).get_definition(udf_name="__udf")
+            for request_id in ["123", "456"]
+        }
+        assert len(definitions) == 1
+
+
 class TestUDFGen_DeferredOutputSchema(TestUDFGenBase):
     def define_pyfunc(self):
         @udf(return_type=relation(schema=DEFERRED))
@@ -4613,7 +5165,7 @@ LANGUAGE PYTHON
     import json
     a = 10
     result = {'a': a}
-    return json.dumps(result)
+    return udfio.dumps_transfer(result)
 }"""
 
     def test_generate_udf_queries(
@@ -4630,3 +5182,43 @@ LANGUAGE PYTHON
         )
         definition = gen.get_definition(udf_name="__udf")
         assert definition == expected_udfdef
+
+
+class TestUDFGen_DatasetsContentHashInputType(TestUDFGenBase):
+    def define_pyfunc(self):
+        @udf(h=DATASETS_CONTENT_HASH, return_type=transfer())
+        def f(h):
+            result = {"h": h}
+            return result
+
+    @pytest.fixture(scope="class")
+    def expected_udfdef(self):
+        return """\
+CREATE OR REPLACE FUNCTION
+__udf()
+RETURNS
+TABLE("transfer" CLOB)
+LANGUAGE PYTHON
+{
+    import pandas as pd
+    import udfio
+    import json
+    h = 'abc'
+    result = {'h': h}
+    return udfio.dumps_transfer(result)
+}"""
+
+    def test_generate_udf_queries(
+        self,
+        funcname,
+        expected_udfdef,
+    ):
+        gen = PyUdfGenerator(
+            udf.registry,
+            func_name=funcname,
+            flowargs=[],
+            flowkwargs={},
+            datasets_content_hash="abc",
+        )
+        definition = gen.get_definition(udf_name="__udf")
+        assert definition == expected_udfdef
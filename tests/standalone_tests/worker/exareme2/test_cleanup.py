@@ -79,7 +79,7 @@ def test_create_and_find_tables(
         task_signature=clean_up_task_signature,
         logger=StdOutputLogger(),
         request_id=request_id,
-        context_id=context_id,
+        context_ids=[context_id],
     )
     localworker1_celery_app.get_result(
         async_result=async_result,
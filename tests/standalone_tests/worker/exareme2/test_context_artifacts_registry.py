@@ -0,0 +1,367 @@
+import re
+from unittest.mock import patch
+
+import eventlet
+import pytest
+
+from exareme2.worker.exareme2.cleanup import cleanup_service
+from exareme2.worker.exareme2.cleanup.cleanup_db import drop_db_artifacts
+from exareme2.worker.exareme2.cleanup.cleanup_db import evict_cached_inputs
+from exareme2.worker.exareme2.cleanup.context_artifacts_registry import (
+    ContextArtifactsRegistry,
+)
+from exareme2.worker.exareme2.cleanup.context_artifacts_registry import (
+    get_context_id_from_table_name,
+)
+from exareme2.worker.exareme2.cleanup.context_artifacts_registry import is_udf_name
+from exareme2.worker.exareme2.monetdb.guard import InvalidSQLParameter
+from exareme2.worker_communication import TableType
+
+
+@pytest.fixture
+def cleanup_db_mock():
+    with patch(
+        "exareme2.worker.exareme2.cleanup.context_artifacts_registry.cleanup_db"
+    ) as cleanup_db_mock:
+        cleanup_db_mock.get_table_types_by_name.return_value = {}
+        cleanup_db_mock.get_udf_names.return_value = []
+        yield cleanup_db_mock
+
+
+@pytest.mark.parametrize(
+    "table_name, expected_context_id",
+    [
+        ("normal_localworker1_ctx1_cmd1_0", "ctx1"),
+        ("VIEW_localworker1_Ctx1_cmd1_0", "ctx1"),
+        ("normal_local_worker_1_ctx1_cmd1_0", "ctx1"),
+        ("normal_ctx1_cmd1_0", None),
+        ("normal_localworker1_ctx-1_cmd1_0", None),
+        ("cacheddatamodelview_0123456789abcdef", None),
+        ("other_localworker1_ctx1_cmd1_0", None),
+        ("primary_data", None),
+    ],
+)
+def test_get_context_id_from_table_name(table_name, expected_context_id):
+    assert get_context_id_from_table_name(table_name) == expected_context_id
+
+
+def test_registry_lists_tables_in_creation_order(cleanup_db_mock):
+    registry = ContextArtifactsRegistry()
+    registry.register_table("ctx1", "normal_w_ctx1_a_0", TableType.NORMAL)
+    registry.register_table("ctx1", "view_w_ctx1_b_0", TableType.VIEW)
+    registry.register_table("ctx1", "normal_w_ctx1_c_0", TableType.NORMAL)
+    registry.register_table("ctx2", "normal_w_ctx2_a_0", TableType.NORMAL)
+
+    assert registry.get_table_names("ctx1", TableType.NORMAL) == [
+        "normal_w_ctx1_a_0",
+        "normal_w_ctx1_c_0",
+    ]
+    assert registry.get_table_names_by_type("ctx1") == {
+        TableType.NORMAL: ["normal_w_ctx1_c_0", "normal_w_ctx1_a_0"],
+        TableType.VIEW: ["view_w_ctx1_b_0"],
+        TableType.REMOTE: [],
+        TableType.MERGE: [],
+    }
+
+
+def test_registry_removes_context(cleanup_db_mock):
+    registry = ContextArtifactsRegistry()
+    registry.register_table("ctx1", "normal_w_ctx1_a_0", TableType.NORMAL)
+    registry.register_udf("ctx1", "func_a_ctx1")
+    registry.finish_udf_creation("func_a_ctx1", created=True)
+    registry.register_table("ctx1", "view_w_ctx1_b_0", TableType.VIEW)
+    registry.unregister_table("ctx1", "view_w_ctx1_b_0")
+
+    assert registry.get_table_names("ctx1", TableType.VIEW) == []
+
+    with registry.removed_contexts(["ctx1"]) as (table_names_by_type, udf_names):
+        assert table_names_by_type[TableType.NORMAL] == ["normal_w_ctx1_a_0"]
+        assert udf_names == ["func_a_ctx1"]
+
+    assert registry.get_table_names("ctx1", TableType.NORMAL) == []
+    assert registry.get_udf_names("ctx1") == []
+
+
+def test_registry_counts_the_context_ids_that_use_a_udf(cleanup_db_mock):
+    registry = ContextArtifactsRegistry()
+
+    assert registry.register_udf("ctx1", "func_a_0123456789abcdef")
+    registry.finish_udf_creation("func_a_0123456789abcdef", created=True)
+    assert not registry.register_udf("ctx2", "func_a_0123456789abcdef")
+    assert registry.register_udf("ctx2", "func_b_0123456789abcdef")
+    registry.finish_udf_creation("func_b_0123456789abcdef", created=True)
+
+    with registry.removed_contexts(["ctx2"]) as (_, udf_names):
+        assert udf_names == ["func_b_0123456789abcdef"]
+    with registry.removed_contexts(["ctx1"]) as (_, udf_names):
+        assert udf_names == ["func_a_0123456789abcdef"]
+
+    assert registry.register_udf("ctx2", "func_b_0123456789abcdef")
+
+
+def test_registry_waits_for_the_creation_of_a_udf(cleanup_db_mock):
+    registry = ContextArtifactsRegistry()
+    assert registry.register_udf("ctx1", "func_a_0123456789abcdef")
+
+    waiting_registration = eventlet.spawn(
+        registry.register_udf, "ctx2", "func_a_0123456789abcdef"
+    )
+    eventlet.sleep(0)
+    assert not waiting_registration.dead
+
+    registry.finish_udf_creation("func_a_0123456789abcdef", created=True)
+    assert not waiting_registration.wait()
+
+
+def test_registry_creates_again_a_udf_whose_creation_failed(cleanup_db_mock):
+    registry = ContextArtifactsRegistry()
+    assert registry.register_udf("ctx1", "func_a_0123456789abcdef")
+
+    waiting_registration = eventlet.spawn(
+        registry.register_udf, "ctx2", "func_a_0123456789abcdef"
+    )
+    eventlet.sleep(0)
+    assert not waiting_registration.dead
+
+    registry.unregister_udf("ctx1", "func_a_0123456789abcdef")
+    registry.finish_udf_creation("func_a_0123456789abcdef", created=False)
+    assert waiting_registration.wait()
+
+
+def test_registry_waits_for_the_drop_of_a_udf(cleanup_db_mock):
+    registry = ContextArtifactsRegistry()
+    registry.register_udf("ctx1", "func_a_0123456789abcdef")
+    registry.finish_udf_creation("func_a_0123456789abcdef", created=True)
+
+    with registry.removed_contexts(["ctx1"]) as (_, udf_names):
+        assert udf_names == ["func_a_0123456789abcdef"]
+        waiting_registration = eventlet.spawn(
+            registry.register_udf, "ctx2", "func_a_0123456789abcdef"
+        )
+        eventlet.sleep(0)
+        assert not waiting_registration.dead
+
+    assert waiting_registration.wait()
+
+
+def test_registry_restores_the_contexts_whose_drop_failed(cleanup_db_mock):
+    registry = ContextArtifactsRegistry()
+    registry.register_table("ctx1", "normal_w_ctx1_a_0", TableType.NORMAL)
+    registry.register_udf("ctx1", "func_a_0123456789abcdef")
+    registry.finish_udf_creation("func_a_0123456789abcdef", created=True)
+
+    with pytest.raises(ValueError):
+        with registry.removed_contexts(["ctx1"]):
+            raise ValueError
+
+    assert registry.get_table_names("ctx1", TableType.NORMAL) == ["normal_w_ctx1_a_0"]
+    assert registry.get_udf_names("ctx1") == ["func_a_0123456789abcdef"]
+    # The drop may have failed after the udf was dropped, so it is created again
+    assert registry.register_udf("ctx2", "func_a_0123456789abcdef")
+
+
+def test_registry_reconciles_with_db_artifacts_once(cleanup_db_mock):
+    cleanup_db_mock.get_table_types_by_name.return_value = {
+        "normal_w_ctx1_a_0": TableType.NORMAL,
+        "merge_w_ctx1_b_0": TableType.MERGE,
+        "cacheddatamodelview_0123456789abcdef": TableType.NORMAL,
+    }
+    cleanup_db_mock.get_udf_names.return_value = [
+        "func_a_0123456789abcdef",
+        "other_function",
+    ]
+    registry = ContextArtifactsRegistry()
+
+    registry.register_table("ctx2", "normal_w_ctx2_a_0", TableType.NORMAL)
+    registry.get_udf_names("ctx1")
+
+    assert cleanup_db_mock.get_table_types_by_name.call_count == 1
+    assert registry.get_table_names("ctx1", TableType.MERGE) == ["merge_w_ctx1_b_0"]
+    assert registry.get_udf_names("ctx1") == []
+
+
+def test_registry_reuses_the_reconciled_udfs(cleanup_db_mock):
+    cleanup_db_mock.get_udf_names.return_value = ["func_a_0123456789abcdef"]
+    registry = ContextArtifactsRegistry()
+
+    assert not registry.register_udf("ctx1", "func_a_0123456789abcdef")
+
+    with registry.removed_contexts(["ctx2"]) as (_, udf_names):
+        assert udf_names == []
+    with registry.removed_contexts(["ctx1"]) as (_, udf_names):
+        assert udf_names == ["func_a_0123456789abcdef"]
+
+
+def test_registry_drops_the_unused_reconciled_udfs_on_cleanup(cleanup_db_mock):
+    cleanup_db_mock.get_udf_names.return_value = [
+        "func_a_0123456789abcdef",
+        "other_function",
+    ]
+    registry = ContextArtifactsRegistry()
+
+    with registry.removed_contexts(["ctx1"]) as (_, udf_names):
+        assert udf_names == ["func_a_0123456789abcdef"]
+    with registry.removed_contexts(["ctx1"]) as (_, udf_names):
+        assert udf_names == []
+    assert registry.register_udf("ctx2", "func_a_0123456789abcdef")
+
+
+@pytest.mark.parametrize(
+    "udf_name, expected",
+    [
+        ("func_a_0123456789abcdef", True),
+        ("FUNC_A_0123456789ABCDEF", True),
+        ("func_a_0123456789abcde", False),
+        ("func_a_0123456789abcdeg", False),
+        ("other_function", False),
+    ],
+)
+def test_is_udf_name(udf_name, expected):
+    assert is_udf_name(udf_name) == expected
+
+
+def test_drop_db_artifacts_in_one_query():
+    with patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_db.monetdb_facade"
+    ) as monetdb_facade_mock:
+        drop_db_artifacts(
+            udf_names=["func_a_ctx1"],
+            table_names_by_type={
+                TableType.NORMAL: ["normal_w_ctx1_a_0"],
+                TableType.VIEW: ["view_w_ctx1_b_0"],
+                TableType.REMOTE: [],
+                TableType.MERGE: ["merge_w_ctx1_c_0"],
+            },
+        )
+
+    monetdb_facade_mock.execute_query.assert_called_once_with(
+        "DROP FUNCTION func_a_ctx1;"
+        "DROP TABLE merge_w_ctx1_c_0;"
+        "DROP VIEW view_w_ctx1_b_0;"
+        "DROP TABLE normal_w_ctx1_a_0;"
+    )
+
+
+def test_drop_db_artifacts_guards_table_names():
+    with pytest.raises(InvalidSQLParameter):
+        drop_db_artifacts(
+            udf_names=[],
+            table_names_by_type={TableType.NORMAL: ["table; DROP TABLE other"]},
+        )
+
+
+def test_evict_cached_inputs_with_a_loopback_function():
+    with patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_db.monetdb_facade"
+    ) as monetdb_facade_mock:
+        evict_cached_inputs(table_names=["normal_w_ctx1_a_0", "view_w_ctx1_b_0"])
+
+    (query,), _ = monetdb_facade_mock.execute_query.call_args
+    function_name = re.match(r"CREATE FUNCTION (\w+)\(\)", query).group(1)
+    assert not is_udf_name(function_name)
+    assert (
+        "udfio.evict_cached_inputs(['normal_w_ctx1_a_0', 'view_w_ctx1_b_0'])" in query
+    )
+    assert query.endswith(f"SELECT {function_name}();DROP FUNCTION {function_name};")
+
+
+def test_evict_cached_inputs_of_no_tables_skips_the_query():
+    with patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_db.monetdb_facade"
+    ) as monetdb_facade_mock:
+        evict_cached_inputs(table_names=[])
+
+    monetdb_facade_mock.execute_query.assert_not_called()
+
+
+def test_evict_cached_inputs_guards_table_names():
+    with pytest.raises(InvalidSQLParameter):
+        evict_cached_inputs(table_names=["table']); import os; (['"])
+
+
+def test_cleanup_drops_artifacts_of_all_context_ids_in_one_query(cleanup_db_mock):
+    cleanup_db_mock.get_table_types_by_name.return_value = {
+        "normal_w_ctx3_a_0": TableType.NORMAL
+    }
+    registry = ContextArtifactsRegistry()
+    registry.register_table("ctx1", "normal_w_ctx1_a_0", TableType.NORMAL)
+    for context_id, udf_name in [
+        ("ctx1", "func_a_0123456789abcdef"),
+        ("ctx1", "func_b_0123456789abcdef"),
+        ("ctx4", "func_b_0123456789abcdef"),
+    ]:
+        if registry.register_udf(context_id, udf_name):
+            registry.finish_udf_creation(udf_name, created=True)
+    registry.register_table("ctx2", "view_w_ctx2_a_0", TableType.VIEW)
+
+    with patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_service.context_artifacts_registry",
+        registry,
+    ), patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_service.drop_db_artifacts"
+    ) as drop_db_artifacts_mock, patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_service.evict_cached_inputs"
+    ):
+        # The logger initialisation of the service is skipped, since it needs a task
+        cleanup_service.cleanup.__wrapped__(
+            request_id="request", context_ids=["ctx1", "ctx2", "ctx3"]
+        )
+
+    drop_db_artifacts_mock.assert_called_once_with(
+        udf_names=["func_a_0123456789abcdef"],
+        table_names_by_type={
+            TableType.NORMAL: ["normal_w_ctx1_a_0", "normal_w_ctx3_a_0"],
+            TableType.VIEW: ["view_w_ctx2_a_0"],
+            TableType.REMOTE: [],
+            TableType.MERGE: [],
+        },
+    )
+    assert registry.get_table_names("ctx1", TableType.NORMAL) == []
+    assert registry.get_udf_names("ctx1") == []
+
+
+def test_cleanup_of_unknown_context_ids_does_not_search_the_db(cleanup_db_mock):
+    registry = ContextArtifactsRegistry()
+    registry.register_table("ctx1", "normal_w_ctx1_a_0", TableType.NORMAL)
+
+    with patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_service.context_artifacts_registry",
+        registry,
+    ), patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_service.drop_db_artifacts"
+    ), patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_service.evict_cached_inputs"
+    ):
+        for _ in range(2):
+            cleanup_service.cleanup.__wrapped__(
+                request_id="request", context_ids=["ctx1"]
+            )
+
+    assert cleanup_db_mock.get_table_types_by_name.call_count == 1
+
+
+def test_cleanup_removes_the_states_and_cached_inputs_of_the_dropped_tables(
+    cleanup_db_mock, tmp_path
+):
+    for name in ["normal_w_ctx1_a_0", "normal_w_ctx2_a_0"]:
+        (tmp_path / f"{name}.state").touch()
+    registry = ContextArtifactsRegistry()
+    registry.register_table("ctx1", "normal_w_ctx1_a_0", TableType.NORMAL)
+    registry.register_table("ctx2", "normal_w_ctx2_a_0", TableType.NORMAL)
+
+    with patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_service.context_artifacts_registry",
+        registry,
+    ), patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_service.worker_config.monetdb.udf_state_store_dir",
+        str(tmp_path),
+    ), patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_service.drop_db_artifacts"
+    ), patch(
+        "exareme2.worker.exareme2.cleanup.cleanup_service.evict_cached_inputs"
+    ) as evict_cached_inputs_mock:
+        # The logger initialisation of the service is skipped, since it needs a task
+        cleanup_service.cleanup.__wrapped__(request_id="request", context_ids=["ctx1"])
+
+    assert [p.name for p in tmp_path.iterdir()] == ["normal_w_ctx2_a_0.state"]
+    evict_cached_inputs_mock.assert_called_once_with(table_names=["normal_w_ctx1_a_0"])
@@ -0,0 +1,138 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from exareme2 import DType
+from exareme2.worker.exareme2.views import views_db
+from exareme2.worker.exareme2.views.views_statistics import DataModelsStatistics
+from exareme2.worker.exareme2.views.views_statistics import DataModelStatistics
+from exareme2.worker_communication import ColumnInfo
+from exareme2.worker_communication import InsufficientDataError
+from exareme2.worker_communication import TableSchema
+
+
+@pytest.fixture
+def statistics():
+    return DataModelStatistics(
+        non_null_counts_per_dataset={
+            "dataset1": {"row_id": 100, "age": 90, "gender": 80},
+            "dataset2": {"row_id": 50, "age": 50, "gender": 45},
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "datasets, not_null_columns, filtered, expected_bounds",
+    [
+        (["dataset1", "dataset2"], [], False, (150, 150)),
+        (["dataset1"], ["age"], False, (90, 90)),
+        (["dataset1"], ["age", "gender"], False, (70, 80)),
+        (["dataset1", "dataset2"], ["age", "gender"], False, (115, 125)),
+        (["dataset1", "dataset2"], ["age", "gender"], True, (0, 125)),
+        (["dataset3"], ["age"], False, (0, 0)),
+    ],
+)
+def test_get_row_count_bounds(
+    statistics, datasets, not_null_columns, filtered, expected_bounds
+):
+    bounds = statistics.get_row_count_bounds(datasets, not_null_columns, filtered)
+    assert bounds == expected_bounds
+
+
+def test_get_row_count_bounds_without_column_statistics(statistics):
+    assert statistics.get_row_count_bounds(["dataset1"], ["unknown"], False) is None
+
+
+def test_data_models_statistics_are_computed_again_when_datasets_change():
+    non_null_counts = {"dataset1": {"row_id": 10}}
+    with patch(
+        "exareme2.worker.exareme2.views.views_statistics.views_db"
+    ) as views_db_mock:
+        views_db_mock.get_data_model_non_null_counts.return_value = non_null_counts
+        data_models_statistics = DataModelsStatistics()
+
+        data_models_statistics.get("data_model:0.1", "hash1")
+        data_models_statistics.get("data_model:0.1", "hash1")
+        assert views_db_mock.get_data_model_non_null_counts.call_count == 1
+
+        data_models_statistics.get("data_model:0.1", "hash2")
+        assert views_db_mock.get_data_model_non_null_counts.call_count == 2
+
+
+@pytest.fixture
+def monetdb_facade_mock():
+    table_schema = TableSchema(columns=[ColumnInfo(name="row_id", dtype=DType.INT)])
+    with patch(
+        "exareme2.worker.exareme2.views.views_db.monetdb_facade"
+    ) as monetdb_facade_mock, patch(
+        "exareme2.worker.exareme2.views.views_db.get_table_schema",
+        return_value=table_schema,
+    ):
+        yield monetdb_facade_mock
+
+
+def create_view(row_count_bounds, are_row_count_bounds_current=None):
+    return views_db.create_view(
+        view_name="view1",
+        table_name='"data_model:0.1"."primary_data"',
+        columns=["row_id"],
+        filters=None,
+        minimum_row_count=10,
+        check_min_rows=True,
+        row_count_bounds=row_count_bounds,
+        are_row_count_bounds_current=are_row_count_bounds_current,
+    )
+
+
+def test_create_view_definitely_insufficient_data_is_not_created(
+    monetdb_facade_mock,
+):
+    with pytest.raises(InsufficientDataError):
+        create_view(row_count_bounds=(0, 9))
+
+    monetdb_facade_mock.execute_query.assert_not_called()
+    monetdb_facade_mock.execute_and_fetchall.assert_not_called()
+
+
+def test_create_view_definitely_sufficient_data_is_not_scanned(monetdb_facade_mock):
+    create_view(row_count_bounds=(10, 100))
+
+    monetdb_facade_mock.execute_query.assert_called_once()
+    monetdb_facade_mock.execute_and_fetchall.assert_not_called()
+
+
+def test_create_view_with_bounds_computed_before_the_last_data_load_is_scanned(
+    monetdb_facade_mock,
+):
+    monetdb_facade_mock.execute_and_fetchall.return_value = [(1,)] * 9
+
+    with pytest.raises(InsufficientDataError):
+        create_view(
+            row_count_bounds=(10, 100), are_row_count_bounds_current=lambda: False
+        )
+
+    (query,) = monetdb_facade_mock.execute_and_fetchall.call_args.args
+    assert "LIMIT 10" in query
+
+
+def test_create_view_borderline_data_fetches_only_the_required_rows(
+    monetdb_facade_mock,
+):
+    monetdb_facade_mock.execute_and_fetchall.return_value = [(1,)] * 10
+
+    create_view(row_count_bounds=(0, 100))
+
+    (query,) = monetdb_facade_mock.execute_and_fetchall.call_args.args
+    assert "LIMIT 10" in query
+    assert "COUNT" not in query
+
+
+def test_create_view_borderline_insufficient_data_is_dropped(monetdb_facade_mock):
+    monetdb_facade_mock.execute_and_fetchall.return_value = [(1,)] * 9
+
+    with pytest.raises(InsufficientDataError):
+        create_view(row_count_bounds=None)
+
+    drop_query = monetdb_facade_mock.execute_query.call_args.args[0]
+    assert "DROP VIEW view1" in drop_query
@@ -0,0 +1,147 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from exareme2 import DType
+from exareme2.worker.exareme2.views.views_cache import DataModelViewsCache
+from exareme2.worker.exareme2.views.views_cache import get_data_model_view_key
+from exareme2.worker_communication import ColumnInfo
+from exareme2.worker_communication import TableSchema
+
+DATASETS_CONTENT_HASH = "datasetshash"
+
+
+@pytest.fixture
+def views_db_mock():
+    views_db = MagicMock()
+    views_db.CACHED_VIEW_TABLE_PREFIX = "cacheddatamodelview"
+    views_db.create_cached_view_table.return_value = 10
+    views_db.get_cached_view_table_names.return_value = []
+    views_db.get_table_names_with_dependents.return_value = []
+    table_schema = TableSchema(columns=[ColumnInfo(name="row_id", dtype=DType.INT)])
+    with patch("exareme2.worker.exareme2.views.views_cache.views_db", views_db), patch(
+        "exareme2.worker.exareme2.views.views_cache.get_table_schema",
+        return_value=table_schema,
+    ):
+        yield views_db
+
+
+def acquire_and_release(cache, key, datasets_content_hash=DATASETS_CONTENT_HASH):
+    cached_view = cache.acquire(
+        key=key,
+        datasets_content_hash=datasets_content_hash,
+        source_table_name='"data_model:0.1"."primary_data"',
+        columns=["row_id"],
+        filters=None,
+    )
+    cache.release(cached_view)
+    return cached_view
+
+
+def get_dropped_tables(views_db_mock):
+    return [
+        table_name
+        for call in views_db_mock.drop_tables.mock_calls
+        for table_name in call.args[0]
+    ]
+
+
+def test_data_model_view_key_is_canonical():
+    filters = {
+        "condition": "AND",
+        "rules": [{"id": "age", "type": "int", "operator": "equal", "value": 17}],
+    }
+    reordered_filters = {
+        "rules": [{"value": 17, "operator": "equal", "type": "int", "id": "age"}],
+        "condition": "AND",
+    }
+
+    key = get_data_model_view_key(
+        "data_model:0.1", ["dataset1", "dataset2"], ["age"], filters, True
+    )
+
+    assert key == get_data_model_view_key(
+        "data_model:0.1", ["dataset2", "dataset1"], ["age"], reordered_filters, True
+    )
+    assert key != get_data_model_view_key(
+        "data_model:0.1", ["dataset1", "dataset2"], ["age"], filters, False
+    )
+
+
+def test_cache_hit_does_not_materialize_again(views_db_mock):
+    cache = DataModelViewsCache(max_entries=10, max_rows=1000)
+
+    first = acquire_and_release(cache, "key1")
+    second = acquire_and_release(cache, "key1")
+
+    assert first == second
+    assert views_db_mock.create_cached_view_table.call_count == 1
+    stats = cache.get_stats()
+    assert (stats.hits, stats.misses, stats.entries, stats.rows) == (1, 1, 1, 10)
+
+
+def test_cache_evicts_least_recently_used_entry(views_db_mock):
+    cache = DataModelViewsCache(max_entries=2, max_rows=1000)
+
+    first = acquire_and_release(cache, "key1")
+    second = acquire_and_release(cache, "key2")
+    acquire_and_release(cache, "key1")
+    acquire_and_release(cache, "key3")
+
+    assert get_dropped_tables(views_db_mock) == [second.table_name]
+    assert acquire_and_release(cache, "key1") == first
+    assert cache.get_stats().evictions == 1
+
+
+def test_cache_evicts_entries_exceeding_max_rows(views_db_mock):
+    cache = DataModelViewsCache(max_entries=10, max_rows=25)
+
+    first = acquire_and_release(cache, "key1")
+    acquire_and_release(cache, "key2")
+    acquire_and_release(cache, "key3")
+
+    assert get_dropped_tables(views_db_mock) == [first.table_name]
+    assert cache.get_stats().rows == 20
+
+
+def test_cache_is_invalidated_when_datasets_change(views_db_mock):
+    cache = DataModelViewsCache(max_entries=10, max_rows=1000)
+
+    first = acquire_and_release(cache, "key1")
+    second = acquire_and_release(cache, "key1", datasets_content_hash="newhash")
+
+    assert first != second
+    assert get_dropped_tables(views_db_mock) == [first.table_name]
+    assert cache.get_stats().invalidations == 1
+
+
+def test_cache_does_not_drop_tables_in_use_or_with_dependent_views(views_db_mock):
+    cache = DataModelViewsCache(max_entries=1, max_rows=1000)
+
+    in_use = cache.acquire(
+        key="key1",
+        datasets_content_hash=DATASETS_CONTENT_HASH,
+        source_table_name='"data_model:0.1"."primary_data"',
+        columns=["row_id"],
+        filters=None,
+    )
+    acquire_and_release(cache, "key2")
+    assert get_dropped_tables(views_db_mock) == []
+
+    views_db_mock.get_table_names_with_dependents.return_value = [in_use.table_name]
+    cache.release(in_use)
+    assert get_dropped_tables(views_db_mock) == []
+
+    views_db_mock.get_table_names_with_dependents.return_value = []
+    acquire_and_release(cache, "key2")
+    assert get_dropped_tables(views_db_mock) == [in_use.table_name]
+
+
+def test_cache_drops_tables_left_from_previous_run(views_db_mock):
+    views_db_mock.get_cached_view_table_names.return_value = ["cacheddatamodelview_old"]
+    cache = DataModelViewsCache(max_entries=10, max_rows=1000)
+
+    acquire_and_release(cache, "key1")
+
+    assert get_dropped_tables(views_db_mock) == ["cacheddatamodelview_old"]
@@ -4,14 +4,17 @@ import pytest
 
 from exareme2.worker.exareme2.monetdb.guard import InvalidSQLParameter
 from exareme2.worker.exareme2.monetdb.guard import is_datamodel
+from exareme2.worker.exareme2.monetdb.guard import is_list_of_datamodels
 from exareme2.worker.exareme2.monetdb.guard import is_list_of_identifiers
 from exareme2.worker.exareme2.monetdb.guard import is_primary_data_table
 from exareme2.worker.exareme2.monetdb.guard import is_socket_address
 from exareme2.worker.exareme2.monetdb.guard import is_valid_filter
 from exareme2.worker.exareme2.monetdb.guard import is_valid_literal_value
+from exareme2.worker.exareme2.monetdb.guard import is_valid_pipeline_output_info
 from exareme2.worker.exareme2.monetdb.guard import is_valid_request_id
 from exareme2.worker.exareme2.monetdb.guard import is_valid_table_schema
 from exareme2.worker.exareme2.monetdb.guard import sql_injection_guard
+from exareme2.worker_communication import UDFPipelineOutputInfo
 
 
 @pytest.mark.parametrize(
@@ -100,6 +103,17 @@ def test_is_list_of_identifiers():
     assert not is_list_of_identifiers(["name.1", "name_2"])
 
 
+def test_is_list_of_datamodels():
+    assert is_list_of_datamodels(["dementia:0.1", "tbi:0.1"])
+    assert not is_list_of_datamodels(["dementia:0.1", 'tbi:0.1"; DROP TABLE x; --'])
+
+
+def test_is_valid_pipeline_output_info():
+    assert is_valid_pipeline_output_info(UDFPipelineOutputInfo(step=0, output=1))
+    assert not is_valid_pipeline_output_info(UDFPipelineOutputInfo(step=-1))
+    assert not is_valid_pipeline_output_info(UDFPipelineOutputInfo(step=0, output=-1))
+
+
 def test_is_valid_filter():
     assert is_valid_filter({"rules": [{"id": "name1"}, {"rules": [{"id": "name2"}]}]})
     assert not is_valid_filter(
@@ -24,6 +24,9 @@ from tests.standalone_tests.std_output_logger import StdOutputLogger
 create_remote_task_signature = get_celery_task_signature("create_remote_table")
 create_merge_table_task_signature = get_celery_task_signature("create_merge_table")
 get_merge_tables_task_signature = get_celery_task_signature("get_merge_tables")
+create_remote_tables_and_merge_table_task_signature = get_celery_task_signature(
+    "create_remote_tables_and_merge_table"
+)
 
 
 @pytest.fixture(autouse=True)
@@ -327,3 +330,75 @@ def test_create_merge_table_on_top_of_remote_tables(
     assert row_count * 2 == len(
         merge_table_values
     )  # The rows are doubled since we have 2 localworkers with N rows each.
+
+
+@pytest.mark.slow
+def test_create_remote_tables_and_merge_table(
+    request_id,
+    context_id,
+    localworker1_worker_service,
+    localworker1_celery_app,
+    localworker1_db_cursor,
+    use_localworker1_database,
+    localworker2_worker_service,
+    localworker2_celery_app,
+    localworker2_db_cursor,
+    use_localworker2_database,
+    globalworker_worker_service,
+    globalworker_celery_app,
+    globalworker_db_cursor,
+    use_globalworker_database,
+):
+    table_schema = TableSchema(
+        columns=[
+            ColumnInfo(name="col1", dtype=DType.INT),
+            ColumnInfo(name="col2", dtype=DType.FLOAT),
+            ColumnInfo(name="col3", dtype=DType.STR),
+        ]
+    )
+    initial_table_values = [[1, 0.1, "test1"], [2, 0.2, "test2"], [3, 0.3, "test3"]]
+    localworker1_tableinfo = TableInfo(
+        name=f"normal_testlocalworker1_{context_id}",
+        schema_=table_schema,
+        type_=TableType.NORMAL,
+    )
+    localworker2_tableinfo = TableInfo(
+        name=f"normal_testlocalworker2_{context_id}",
+        schema_=table_schema,
+        type_=TableType.NORMAL,
+    )
+    for db_cursor, table_info in (
+        (localworker1_db_cursor, localworker1_tableinfo),
+        (localworker2_db_cursor, localworker2_tableinfo),
+    ):
+        create_table_in_db(db_cursor, table_info.name, table_info.schema_, True)
+        insert_data_to_db(table_info.name, initial_table_values, db_cursor)
+
+    async_result = globalworker_celery_app.queue_task(
+        task_signature=create_remote_tables_and_merge_table_task_signature,
+        logger=StdOutputLogger(),
+        request_id=request_id,
+        context_id=context_id,
+        command_id=uuid.uuid4().hex,
+        table_infos_json=[
+            localworker1_tableinfo.json(),
+            localworker2_tableinfo.json(),
+        ],
+        monetdb_socket_addresses=[
+            f"{str(COMMON_IP)}:{MONETDB_LOCALWORKER1_PORT}",
+            f"{str(COMMON_IP)}:{MONETDB_LOCALWORKER2_PORT}",
+        ],
+    )
+    merge_table_info = TableInfo.parse_raw(
+        globalworker_celery_app.get_result(
+            async_result=async_result,
+            logger=StdOutputLogger(),
+            timeout=TASKS_TIMEOUT,
+        )
+    )
+
+    merge_table_values = get_table_data_from_db(
+        globalworker_db_cursor, merge_table_info.name
+    )
+    assert merge_table_info.type_ == TableType.MERGE
+    assert len(initial_table_values) * 2 == len(merge_table_values)
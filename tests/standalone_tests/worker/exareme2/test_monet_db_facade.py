@@ -1,17 +1,25 @@
+from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import eventlet
 import pytest
+from eventlet.event import Event
 from pymonetdb import DatabaseError
 from pymonetdb import OperationalError
 from pymonetdb import ProgrammingError
 
 from exareme2 import AttrDict
 from exareme2.worker.exareme2.monetdb import monetdb_facade
+from exareme2.worker.exareme2.monetdb.monetdb_facade import StatementClass
+from exareme2.worker.exareme2.monetdb.monetdb_facade import _connection
 from exareme2.worker.exareme2.monetdb.monetdb_facade import _DBExecutionDTO
 from exareme2.worker.exareme2.monetdb.monetdb_facade import _execute_and_fetchall
+from exareme2.worker.exareme2.monetdb.monetdb_facade import _ExecutionScheduler
+from exareme2.worker.exareme2.monetdb.monetdb_facade import _get_statement_class
 from exareme2.worker.exareme2.monetdb.monetdb_facade import (
     _validate_exception_could_be_recovered,
 )
+from exareme2.worker.exareme2.monetdb.monetdb_facade import get_connection_pool_stats
 from exareme2.worker.utils.logger import init_logger
 from tests.standalone_tests.conftest import COMMON_IP
 from tests.standalone_tests.conftest import MONETDB_LOCALWORKERTMP_NAME
@@ -57,6 +65,11 @@ def patch_worker_config():
                     "local_password": "executor",
                     "public_username": "guest",
                     "public_password": "guest",
+                    "connection_pool_size": 2,
+                    "max_concurrent_udfs": 2,
+                    "udfs_memory_budget_mb": 1152,
+                    "udf_memory_estimate_mb": 512,
+                    "udf_cached_inputs_max_mb": 128,
                 },
                 "celery": {
                     "tasks_timeout": 5,
@@ -180,3 +193,252 @@ def test_db_execute_use_public_user_parameter(
         monetdb_facade.execute_and_fetchall(
             query=f"select * from {table_name};", use_public_user=True
         )
+
+
+@pytest.fixture
+def mocked_connect():
+    pools = monetdb_facade._connection_pools.values()
+    for pool in pools:
+        pool.clear()
+        pool._checkout_slots = None
+        pool._stats = monetdb_facade.ConnectionPoolStats()
+    with patch(
+        "exareme2.worker.exareme2.monetdb.monetdb_facade.pymonetdb.connect",
+        side_effect=lambda **kwargs: MagicMock(),
+    ) as connect:
+        yield connect
+    for pool in pools:
+        pool.clear()
+
+
+def test_connection_pool_reuses_connection(mocked_connect):
+    with _connection(use_public_user=False) as first_conn:
+        pass
+    with _connection(use_public_user=False) as second_conn:
+        pass
+
+    assert first_conn is second_conn
+    assert mocked_connect.call_count == 1
+    stats = get_connection_pool_stats(use_public_user=False)
+    assert (stats.hits, stats.misses, stats.evictions, stats.idle) == (1, 1, 0, 1)
+
+
+def test_connection_pool_is_per_user(mocked_connect):
+    with _connection(use_public_user=False) as local_conn:
+        pass
+    with _connection(use_public_user=True) as public_conn:
+        pass
+
+    assert local_conn is not public_conn
+    assert mocked_connect.call_args_list[0].kwargs["username"] == "executor"
+    assert mocked_connect.call_args_list[1].kwargs["username"] == "guest"
+
+
+def test_connection_pool_evicts_connection_failing_validation(mocked_connect):
+    with _connection(use_public_user=False) as first_conn:
+        pass
+    first_conn.rollback.side_effect = BrokenPipeError()
+
+    with _connection(use_public_user=False) as second_conn:
+        pass
+
+    assert first_conn is not second_conn
+    first_conn.close.assert_called_once()
+    stats = get_connection_pool_stats(use_public_user=False)
+    assert (stats.hits, stats.misses, stats.evictions) == (0, 2, 1)
+
+
+@pytest.mark.parametrize(
+    "exception,evicted",
+    [
+        pytest.param(ConnectionResetError("error"), True, id="connection error"),
+        pytest.param(ProgrammingError("error"), False, id="query error"),
+    ],
+)
+def test_connection_pool_evicts_connection_after_recoverable_error(
+    mocked_connect, exception, evicted
+):
+    with pytest.raises(type(exception)):
+        with _connection(use_public_user=False) as conn:
+            raise exception
+
+    stats = get_connection_pool_stats(use_public_user=False)
+    assert stats.evictions == int(evicted)
+    assert stats.idle == int(not evicted)
+    assert conn.close.called == evicted
+
+
+def test_connection_pool_evicts_connection_after_base_exception(mocked_connect):
+    with pytest.raises(eventlet.Timeout):
+        with _connection(use_public_user=False) as conn:
+            raise eventlet.Timeout()
+
+    conn.close.assert_called_once()
+    stats = get_connection_pool_stats(use_public_user=False)
+    assert (stats.evictions, stats.idle) == (1, 0)
+    for _ in range(2):
+        with _connection(use_public_user=False, timeout=0.01):
+            pass
+
+
+def test_connection_pool_checks_out_at_most_pool_size_connections(mocked_connect):
+    released = Event()
+
+    def hold_connection():
+        with _connection(use_public_user=False):
+            released.wait()
+
+    holders = [eventlet.spawn(hold_connection) for _ in range(2)]
+    eventlet.sleep(0.01)
+
+    with pytest.raises(TimeoutError):
+        with _connection(use_public_user=False, timeout=0.01):
+            pass
+
+    waiting = eventlet.spawn(hold_connection)
+    eventlet.sleep(0.01)
+    assert mocked_connect.call_count == 2
+    released.send()
+    for greenthread in [*holders, waiting]:
+        greenthread.wait()
+
+    assert mocked_connect.call_count == 2
+    assert get_connection_pool_stats(use_public_user=False).idle == 2
+
+
+def _run_in_greenthreads(scheduler, executions):
+    """Runs the executions until they are all admitted or queued and returns a
+    function finishing them."""
+    finish = Event()
+
+    def run(statement_class, memory_mb):
+        with scheduler.admit(statement_class, memory_mb=memory_mb):
+            finish.wait()
+
+    greenthreads = [eventlet.spawn(run, *execution) for execution in executions]
+    eventlet.sleep(0.01)
+
+    def finish_executions():
+        finish.send()
+        for greenthread in greenthreads:
+            greenthread.wait()
+
+    return finish_executions
+
+
+def test_execution_scheduler_limits_concurrent_udfs():
+    scheduler = _ExecutionScheduler()
+
+    finish = _run_in_greenthreads(scheduler, [(StatementClass.UDF, 1)] * 3)
+
+    stats = scheduler.stats.statement_classes[StatementClass.UDF]
+    assert (stats.running, stats.queued) == (2, 1)
+    finish()
+    stats = scheduler.stats.statement_classes[StatementClass.UDF]
+    assert (stats.running, stats.queued, stats.admitted) == (0, 0, 3)
+    assert stats.max_wait_seconds > 0
+
+
+def test_execution_scheduler_admits_udfs_within_memory_budget():
+    scheduler = _ExecutionScheduler()
+
+    finish = _run_in_greenthreads(
+        scheduler, [(StatementClass.UDF, 800), (StatementClass.UDF, 800)]
+    )
+
+    stats = scheduler.stats
+    assert stats.memory_in_use_mb == 800
+    assert stats.statement_classes[StatementClass.UDF].queued == 1
+    finish()
+    assert scheduler.stats.memory_in_use_mb == 0
+
+
+def test_execution_scheduler_counts_the_cached_inputs_in_the_memory_budget():
+    scheduler = _ExecutionScheduler()
+
+    # The UDFs fit in the budget, but not along with the cached inputs
+    finish = _run_in_greenthreads(
+        scheduler, [(StatementClass.UDF, 600), (StatementClass.UDF, 500)]
+    )
+
+    stats = scheduler.stats
+    assert stats.memory_in_use_mb == 600
+    assert stats.statement_classes[StatementClass.UDF].queued == 1
+    finish()
+
+
+def test_execution_scheduler_serializes_only_conflicting_statements():
+    scheduler = _ExecutionScheduler()
+
+    finish = _run_in_greenthreads(
+        scheduler,
+        [(StatementClass.CREATE_FUNCTION, 0)] * 2 + [(StatementClass.QUERY, 0)] * 2,
+    )
+
+    stats = scheduler.stats.statement_classes
+    assert stats[StatementClass.CREATE_FUNCTION].running == 1
+    assert stats[StatementClass.CREATE_FUNCTION].queued == 1
+    assert stats[StatementClass.QUERY].running == 2
+    finish()
+
+
+def test_execution_scheduler_timeout():
+    scheduler = _ExecutionScheduler()
+    finish = _run_in_greenthreads(scheduler, [(StatementClass.CREATE_FUNCTION, 0)])
+
+    with pytest.raises(TimeoutError):
+        with scheduler.admit(StatementClass.CREATE_FUNCTION, timeout=0.01):
+            pass
+
+    stats = scheduler.stats.statement_classes[StatementClass.CREATE_FUNCTION]
+    assert (stats.running, stats.queued, stats.timed_out) == (1, 0, 1)
+    finish()
+
+
+@pytest.mark.parametrize(
+    "query,statement_class",
+    [
+        ("CREATE OR REPLACE FUNCTION f() ...", StatementClass.CREATE_FUNCTION),
+        (
+            "DROP FUNCTION IF EXISTS f;DROP TABLE IF EXISTS t;",
+            StatementClass.CREATE_FUNCTION,
+        ),
+        (
+            "CREATE REMOTE TABLE t (a INT) ON 'mapi:...'",
+            StatementClass.CREATE_REMOTE_TABLE,
+        ),
+        ("CREATE TABLE t (a INT)", StatementClass.QUERY),
+        ("DROP TABLE IF EXISTS t;", StatementClass.QUERY),
+        ("INSERT INTO t VALUES (1)", StatementClass.QUERY),
+    ],
+)
+def test_get_statement_class(query, statement_class):
+    assert _get_statement_class(query) == statement_class
+
+
+def test_execute_udfs_in_one_transaction():
+    with patch(
+        "exareme2.worker.exareme2.monetdb.monetdb_facade._execute"
+    ) as execute_mock:
+        monetdb_facade.execute_udfs(
+            [
+                "INSERT INTO t1 SELECT * FROM f1((SELECT * FROM t0));",
+                "INSERT INTO t2 SELECT * FROM f2((SELECT * FROM t1));",
+            ]
+        )
+
+    execute_mock.assert_called_once()
+    kwargs = execute_mock.call_args.kwargs
+    assert kwargs["statement_class"] == StatementClass.UDF
+    assert kwargs["memory_mb"] == 512
+    assert kwargs["db_execution_dto"].query == (
+        "INSERT INTO t1 SELECT * FROM f1((SELECT * FROM t0))\n"
+        "WHERE NOT EXISTS (SELECT * FROM t1);\n"
+        "INSERT INTO t2 SELECT * FROM f2((SELECT * FROM t1))\n"
+        "WHERE NOT EXISTS (SELECT * FROM t2);"
+    )
+
+
+def test_execute_udfs_with_more_than_one_query_per_udf():
+    with pytest.raises(ValueError, match="should contain only one query"):
+        monetdb_facade.execute_udfs(["INSERT INTO t1 SELECT 1; DROP TABLE t0;"])
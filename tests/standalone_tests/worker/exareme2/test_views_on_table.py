@@ -0,0 +1,57 @@
+from unittest.mock import patch
+
+import pytest
+
+from exareme2 import DType
+from exareme2.worker.exareme2.monetdb.guard import InvalidSQLParameter
+from exareme2.worker.exareme2.views import views_db
+from exareme2.worker_communication import ColumnInfo
+from exareme2.worker_communication import TableSchema
+from exareme2.worker_communication import TableType
+
+
+@pytest.fixture
+def monetdb_facade_mock():
+    table_schema = TableSchema(
+        columns=[
+            ColumnInfo(name="row_id", dtype=DType.INT),
+            ColumnInfo(name="x", dtype=DType.FLOAT),
+            ColumnInfo(name="fold", dtype=DType.INT),
+        ]
+    )
+    with patch(
+        "exareme2.worker.exareme2.views.views_db.monetdb_facade"
+    ) as monetdb_facade_mock, patch(
+        "exareme2.worker.exareme2.views.views_db.get_table_schema",
+        return_value=table_schema,
+    ):
+        yield monetdb_facade_mock
+
+
+def test_create_views_on_table_in_one_query(monetdb_facade_mock):
+    views = views_db.create_views_on_table(
+        view_names=["view_w_ctx1_1_0", "view_w_ctx1_1_1"],
+        table_name="normal_w_ctx1_0_0",
+        columns_per_view=[["row_id", "x"], ["x"]],
+        filters_per_view=[
+            {"id": "fold", "type": "int", "operator": "not_equal", "value": 0},
+            None,
+        ],
+    )
+
+    (query,) = monetdb_facade_mock.execute_query.call_args.args
+    assert query.count("CREATE VIEW") == 2
+    assert 'WHERE "fold" <> 0' in query
+    assert [view.name for view in views] == ["view_w_ctx1_1_0", "view_w_ctx1_1_1"]
+    assert [view.schema_.column_names for view in views] == [["row_id", "x"], ["x"]]
+    assert all(view.type_ == TableType.VIEW for view in views)
+
+
+def test_create_views_on_table_guards_filters(monetdb_facade_mock):
+    with pytest.raises(InvalidSQLParameter):
+        views_db.create_views_on_table(
+            view_names=["view_w_ctx1_1_0"],
+            table_name="normal_w_ctx1_0_0",
+            columns_per_view=[["x"]],
+            filters_per_view=[{"id": "fold; DROP TABLE other", "value": 0}],
+        )
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+import pytest
+
+from exareme2.worker.worker_info.worker_info_db import get_datasets_content_hash
+
+
+@pytest.fixture
+def worker_dbs():
+    with patch(
+        "exareme2.worker.worker_info.worker_info_db.sqlite"
+    ) as sqlite_mock, patch(
+        "exareme2.worker.worker_info.worker_info_db.monetdb_facade"
+    ) as monetdb_facade_mock:
+        yield sqlite_mock, monetdb_facade_mock
+
+
+def test_datasets_content_hash_changes_when_a_dataset_is_removed_and_added_again(
+    worker_dbs,
+):
+    sqlite_mock, monetdb_facade_mock = worker_dbs
+    sqlite_mock.execute_and_fetchall.return_value = [
+        (1, "data_model", "0.1", 1, "dataset1", "/data/dataset1.csv")
+    ]
+    monetdb_facade_mock.execute_and_fetchall.return_value = [
+        ("data_model:0.1", 100, 100)
+    ]
+    content_hash = get_datasets_content_hash()
+
+    # Same dataset code and csv path, with different rows.
+    sqlite_mock.execute_and_fetchall.return_value = [
+        (1, "data_model", "0.1", 2, "dataset1", "/data/dataset1.csv")
+    ]
+    monetdb_facade_mock.execute_and_fetchall.return_value = [
+        ("data_model:0.1", 90, 190)
+    ]
+    assert get_datasets_content_hash() != content_hash
+
+
+def test_datasets_content_hash_changes_when_the_data_are_loaded_again(worker_dbs):
+    sqlite_mock, monetdb_facade_mock = worker_dbs
+    sqlite_mock.execute_and_fetchall.return_value = [
+        (1, "data_model", "0.1", 1, "dataset1", "/data/dataset1.csv")
+    ]
+    monetdb_facade_mock.execute_and_fetchall.return_value = [
+        ("data_model:0.1", 100, 100)
+    ]
+    content_hash = get_datasets_content_hash()
+    assert get_datasets_content_hash() == content_hash
+
+    monetdb_facade_mock.execute_and_fetchall.return_value = [
+        ("data_model:0.1", 100, 200)
+    ]
+    assert get_datasets_content_hash() != content_hash
+    (query,) = monetdb_facade_mock.execute_and_fetchall.call_args.args
+    assert '"data_model:0.1"."primary_data"' in query
@@ -0,0 +1,65 @@
+import uuid
+
+import pytest
+
+from exareme2.worker_communication import WorkerMetadataSnapshot
+from tests.standalone_tests.conftest import TASKS_TIMEOUT
+from tests.standalone_tests.controller.workers_communication_helper import (
+    get_celery_task_signature,
+)
+from tests.standalone_tests.std_output_logger import StdOutputLogger
+
+
+def get_worker_metadata_snapshot(celery_app, known_content_hash=None):
+    request_id = "test_metadata_snapshot_" + uuid.uuid4().hex + "_request"
+    task_signature = get_celery_task_signature("get_worker_metadata_snapshot")
+    async_result = celery_app.queue_task(
+        task_signature=task_signature,
+        logger=StdOutputLogger(),
+        request_id=request_id,
+        known_content_hash=known_content_hash,
+    )
+    snapshot_json = celery_app.get_result(
+        async_result=async_result,
+        logger=StdOutputLogger(),
+        timeout=TASKS_TIMEOUT,
+    )
+    return WorkerMetadataSnapshot.parse_raw(snapshot_json)
+
+
+@pytest.mark.slow
+def test_get_worker_metadata_snapshot(
+    localworker1_worker_service,
+    localworker1_celery_app,
+    load_data_localworker1,
+):
+    snapshot = get_worker_metadata_snapshot(localworker1_celery_app)
+
+    data_models_metadata = snapshot.data_models_metadata
+    assert snapshot.worker_info.id == "testlocalworker1"
+    assert data_models_metadata.content_hash
+    for data_model in ["dementia:0.1", "tbi:0.1"]:
+        assert data_models_metadata.datasets_info_per_data_model[data_model]
+        assert data_models_metadata.cdes_per_data_model[data_model].values
+        attributes = data_models_metadata.attributes_per_data_model[data_model]
+        assert (
+            f"{attributes.properties['cdes']['code']}:{attributes.properties['cdes']['version']}"
+            == data_model
+        )
+
+
+@pytest.mark.slow
+def test_get_worker_metadata_snapshot_omits_unchanged_metadata(
+    localworker1_worker_service,
+    localworker1_celery_app,
+    load_data_localworker1,
+):
+    snapshot = get_worker_metadata_snapshot(localworker1_celery_app)
+    content_hash = snapshot.data_models_metadata.content_hash
+
+    unchanged_snapshot = get_worker_metadata_snapshot(
+        localworker1_celery_app, known_content_hash=content_hash
+    )
+
+    assert unchanged_snapshot.data_models_metadata.content_hash == content_hash
+    assert unchanged_snapshot.data_models_metadata.is_omitted